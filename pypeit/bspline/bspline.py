@@ -21,13 +21,13 @@ from pypeit import datamodel
 from pypeit import msgs
 
 try:
-    from pypeit.bspline.utilc import cholesky_band, cholesky_solve, solution_arrays, intrv, \
-                                     bspline_model
+    from pypeit.bspline.utilc import cholesky_band, cholesky_solve, cholesky_band_solve, \
+                                     solution_arrays, intrv, bspline_model
 except:
     warnings.warn('Unable to load bspline C extension.  Try rebuilding pypeit.  In the '
                   'meantime, falling back to pure python code.')
-    from pypeit.bspline.utilpy import cholesky_band, cholesky_solve, solution_arrays, intrv, \
-                                        bspline_model
+    from pypeit.bspline.utilpy import cholesky_band, cholesky_solve, cholesky_band_solve, \
+                                        solution_arrays, intrv, bspline_model
 
 # TODO: Used for testing.  Keep around for now.
 #from pypeit.bspline.utilpy import bspline_model
@@ -353,23 +353,11 @@ class bspline(datamodel.DataContainer):
                 alpha.T.flat[bo+itop*bw] += work.flat[bi]
                 beta[itop:ibottom+1] += wb
         min_influence = 1.0e-10 * invvar.sum() / nfull
-        errb = cholesky_band(alpha, mininf=min_influence)  # ,verbose=True)
-        if isinstance(errb[0], int) and errb[0] == -1:
-            a = errb[1]
-        else:
-            yfit, foo = self.value(xdata, x2=x2, action=a1, upper=upper, lower=lower)
-            return (self.maskpoints(errb[0]), yfit)
-        errs = cholesky_solve(a, beta)
-        if isinstance(errs[0], int) and errs[0] == -1:
-            sol = errs[1]
-        else:
-            #
-            # It is not possible for this to get called, because cholesky_solve
-            # has only one return statement, & that statement guarantees that
-            # errs[0] == -1
-            #
+        # Decompose and solve in one call
+        err, a, sol = cholesky_band_solve(alpha, beta, mininf=min_influence)
+        if not isinstance(err, int) or err != -1:
             yfit, foo = self.value(xdata, x2=x2, action=a1, upper=upper, lower=lower)
-            return (self.maskpoints(errs[0]), yfit)
+            return (self.maskpoints(err), yfit)
         if self.coeff.ndim == 2:
             # JFH made major bug fix here.
             self.icoeff[:, goodbk] = np.array(a[0, 0:nfull].T.reshape(self.npoly, nn,order='F'), dtype=a.dtype)
@@ -646,16 +634,14 @@ class bspline(datamodel.DataContainer):
 
         # Right now we are not returning the covariance, although it may arise that we should
 #        covariance = alpha
-        err, a = cholesky_band(alpha, mininf=1.0e-10 * invvar.sum() / nfull)
+        # Decompose and solve in one call
+        err, a, sol = cholesky_band_solve(alpha, beta, mininf=1.0e-10 * invvar.sum() / nfull)
 
         # successful cholseky_band returns -1
         if not isinstance(err, int) or err != -1:
             return self.maskpoints(err), \
                         self.value(xdata, x2=xdata, action=action, upper=upper, lower=lower)[0]
 
-        # NOTE: cholesky_solve ALWAYS returns err == -1; don't even catch it.
-        sol = cholesky_solve(a, beta)[1]
-
         if self.coeff.ndim == 2:
             self.icoeff[:,goodbk] = np.array(a[0,:nfull].T.reshape(self.npoly, nn, order='F'), dtype=a.dtype)
             self.coeff[:,goodbk] = np.array(sol[:nfull].T.reshape(self.npoly, nn, order='F'), dtype=sol.dtype)
@@ -16,4 +16,4 @@ def get_extensions():
                       extra_compile_args=extra_compile_args, language='c',
                       export_symbols=['bspline_model', 'solution_arrays',
                                       'cholesky_band', 'cholesky_solve',
-                                      'intrv'])]
+                                      'cholesky_band_solve', 'intrv'])]
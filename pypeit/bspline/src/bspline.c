@@ -383,3 +383,37 @@ void cholesky_solve(double *a, int32_t ar, int32_t ac, double *b, int32_t bn) {
     }
 }
 
+
+
+int cholesky_band_solve(double *a, int32_t ar, int32_t ac, double *b, int32_t bn) {
+    /*
+       Compute the Cholesky decomposition of a banded matrix and use it to
+       solve the equations A x = b.
+
+       This is equivalent to calling cholesky_band and then, if the
+       decomposition is successful, cholesky_solve.
+
+    Args:
+        a:
+            The flattened matrix, with shape (ar, ac).  The matrix is
+            replaced by its decomposition.
+        ar:
+            The number of rows in the matrix.
+        ac:
+            The number of columns in the matrix.
+        b:
+            The vector b, with length bn.  The values are replaced by the
+            solution.
+        bn:
+            The number of elements in b.
+
+    Returns:
+        -1 if the decomposition was successful; otherwise, the index of the
+        column that contains a problem for the decomposition, in which case
+        the vector b is not solved.
+    */
+    int err = cholesky_band(a, ar, ac);
+    if (err == -1)
+        cholesky_solve(a, ar, ac, b, bn);
+    return err;
+}
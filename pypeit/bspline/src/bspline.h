@@ -16,6 +16,7 @@ void solution_arrays(int32_t nn, int32_t npoly, int32_t nord, int32_t nd, double
                      double *alpha, int32_t ar, double *beta, int32_t bn);
 void cholesky_solve(double *a, int32_t ar, int32_t ac, double *b, int32_t bn);
 int cholesky_band(double *lower, int32_t lr, int32_t lc);
+int cholesky_band_solve(double *a, int32_t ar, int32_t ac, double *b, int32_t bn);
 
 #endif // _BSPLINE_H_
 
@@ -253,3 +253,59 @@ def cholesky_solve(a, bb):
     cholesky_solve_c(a, a.shape[0], a.shape[1], b, b.shape[0])
     return -1, b
 #-----------------------------------------------------------------------
+
+
+#-----------------------------------------------------------------------
+cholesky_band_solve_c = _bspline.cholesky_band_solve
+cholesky_band_solve_c.restype = ctypes.c_int
+cholesky_band_solve_c.argtypes = [np.ctypeslib.ndpointer(ctypes.c_double, flags="C_CONTIGUOUS"),
+                                  ctypes.c_int32, ctypes.c_int32,
+                                  np.ctypeslib.ndpointer(ctypes.c_double, flags="C_CONTIGUOUS"),
+                                  ctypes.c_int32]
+
+def cholesky_band_solve(l, bb, mininf=0.0, verbose=False):
+    r"""
+    Compute the Cholesky decomposition of a banded matrix and use it to
+    solve the equations :math:`Ax=b`.
+
+    This is equivalent to calling :func:`cholesky_band` and, if the
+    decomposition is successful, :func:`cholesky_solve`, but both steps are
+    performed by a single call to the C function.
+
+    This method wraps a C function.
+
+    Parameters
+    ----------
+    l : `numpy.ndarray`_
+        The banded matrix :math:`A` with shape ``(bw, nc)``.
+    bb : `numpy.ndarray`_
+        The vector :math:`b` with shape ``(nc,)``.
+    mininf : :obj:`float`, optional
+        Diagonal entries in the matrix are considered negative if they are
+        less than this value.
+
+    Returns
+    -------
+    :obj:`tuple`
+        The error status, the Cholesky decomposition, and the solution.  The
+        error status is -1 if the solution was successful; otherwise, it is
+        the index or indices where a problem was detected (see
+        :func:`cholesky_band`), the returned matrix is the input matrix, and
+        the returned vector is a copy of the input vector.
+    """
+    bw, nc = l.shape
+    n = nc - bw
+
+    # Check the diagonals
+    negative = (l[0,:n] <= mininf) | np.invert(np.isfinite(l[0,:n]))
+    if negative.any():
+        nz = negative.nonzero()[0]
+        if verbose:
+            warnings.warn('Found {0} bad entries: {1}'.format(nz.size, nz))
+        return nz, l, np.array(bb, dtype=float)
+
+    a = np.ascontiguousarray(l, dtype=float).copy()
+    b = np.ascontiguousarray(bb, dtype=float).copy()
+    err = cholesky_band_solve_c(a, bw, nc, b, b.size)
+    return (-1, a, b) if err == -1 else (err, l, np.array(bb, dtype=float))
+#-----------------------------------------------------------------------
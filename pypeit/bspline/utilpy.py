@@ -248,3 +248,33 @@ def cholesky_solve(a, bb):
         b[j] = (b[j] - np.sum(a[spot,j] * b[j+spot]))/a[0,j]
     return -1, b
 
+
+
+def cholesky_band_solve(l, bb, mininf=0.0, verbose=False):
+    r"""
+    Compute the Cholesky decomposition of a banded matrix and use it to
+    solve the equations :math:`Ax=b`.
+
+    This function is pure python; the system is decomposed and solved using
+    :func:`cholesky_band` and :func:`cholesky_solve`.
+
+    Parameters
+    ----------
+    l : `numpy.ndarray`_
+        The banded matrix :math:`A` with shape ``(bw, nc)``.
+    bb : `numpy.ndarray`_
+        The vector :math:`b` with shape ``(nc,)``.
+    mininf : :obj:`float`, optional
+        Diagonal entries in the matrix are considered negative if they are
+        less than this value.
+
+    Returns
+    -------
+    :obj:`tuple`
+        The error status, the Cholesky decomposition, and the solution.  See
+        :func:`pypeit.bspline.utilc.cholesky_band_solve`.
+    """
+    err, a = cholesky_band(l, mininf=mininf, verbose=verbose)
+    if isinstance(err, int) and err == -1:
+        return err, a, cholesky_solve(a, bb)[1]
+    return err, a, np.array(bb, dtype=float)
@@ -60,6 +60,9 @@ class Calibrations:
             Requires interaction from the users.
         slitspat_num (??):
             ??
+        slit_nproc (:obj:`int`, optional):
+            Number of processes used by the calibration steps that treat the
+            slits independently; see :func:`~pypeit.utils.get_nproc`.
 
     .. todo: Fix these
 
@@ -100,7 +103,7 @@ class Calibrations:
 
     @classmethod
     def get_instance(cls, fitstbl, par, spectrograph, caldir, qadir=None,
-                     reuse_masters=False, show=False, user_slits=None):
+                     reuse_masters=False, show=False, user_slits=None, slit_nproc=1):
         """
         Get the instance of the appropriate subclass of :class:`Calibrations` to
         use for reducing data from the provided ``spectrograph``.  For argument
@@ -117,10 +120,11 @@ class Calibrations:
         return next(c for c in cls.__subclasses__()
                     if c.__name__ == (pypeline + 'Calibrations'))(
             fitstbl, par, spectrograph, caldir, qadir=qadir,
-                     reuse_masters=reuse_masters, show=show, user_slits=user_slits)
+                     reuse_masters=reuse_masters, show=show, user_slits=user_slits,
+                     slit_nproc=slit_nproc)
 
     def __init__(self, fitstbl, par, spectrograph, caldir, qadir=None,
-                 reuse_masters=False, show=False, user_slits=None):
+                 reuse_masters=False, show=False, user_slits=None, slit_nproc=1):
 
         # Check the types
         # TODO -- Remove this None option once we have data models for all the Calibrations
@@ -149,6 +153,9 @@ class Calibrations:
         self.write_qa = qadir is not None
         self.show = show
 
+        # Parallel processing
+        self.slit_nproc = slit_nproc
+
         # Check the directories exist
         # TODO: This should be done when the masters are saved
         if caldir is not None and not os.path.isdir(self.master_dir):
@@ -556,7 +563,7 @@ class Calibrations:
             # Initialise the pixel flat
             pixelFlatField = flatfield.FlatField(pixel_flat, self.spectrograph,
                                                  self.par['flatfield'], self.slits, self.wavetilts,
-                                                 self.wv_calib)
+                                                 self.wv_calib, nproc=self.slit_nproc)
             # Generate
             pixelflatImages = pixelFlatField.run(show=self.show)
 
@@ -569,7 +576,8 @@ class Calibrations:
             # Initialise the pixel flat
             illumFlatField = flatfield.FlatField(illum_flat, self.spectrograph,
                                                  self.par['flatfield'], self.slits, self.wavetilts,
-                                                 self.wv_calib, spat_illum_only=True)
+                                                 self.wv_calib, spat_illum_only=True,
+                                                 nproc=self.slit_nproc)
             # Generate
             illumflatImages = illumFlatField.run(show=self.show)
 
@@ -724,7 +732,8 @@ class Calibrations:
                                                       self.par['wavelengths'], lamps,
                                                       binspectral=binspec, det=self.det,
                                                       master_key=self.master_key_dict['arc'],
-                                                      qa_path=self.qa_path) #, msbpm=self.msbpm)
+                                                      qa_path=self.qa_path,
+                                                      nproc=self.slit_nproc) #, msbpm=self.msbpm)
             self.wv_calib = self.waveCalib.run(skip_QA=(not self.write_qa))
             # Save to Masters
             self.wv_calib.to_master_file(masterframe_name)
@@ -772,7 +781,8 @@ class Calibrations:
             buildwaveTilts = wavetilts.BuildWaveTilts(
                 self.mstilt, self.slits, self.spectrograph, self.par['tilts'],
                 self.par['wavelengths'], det=self.det, qa_path=self.qa_path,
-                master_key=self.master_key_dict['tilt'], spat_flexure=_spat_flexure)
+                master_key=self.master_key_dict['tilt'], spat_flexure=_spat_flexure,
+                nproc=self.slit_nproc)
 
             # TODO still need to deal with syntax for LRIS ghosts. Maybe we don't need it
             self.wavetilts = buildwaveTilts.run(doqa=self.write_qa, show=self.show)
@@ -24,6 +24,12 @@ from pypeit.history import History
 
 class CoAdd1D:
 
+    select_by_name = True
+    """
+    Only read the spectra of the requested objects from the spec1d files,
+    selecting them by their ``NAME``.
+    """
+
     @classmethod
     def get_instance(cls, spec1dfiles, objids, spectrograph=None, par=None, sensfile=None, debug=False, show=False):
         """
@@ -96,8 +102,11 @@ class CoAdd1D:
                - waves, fluxes, ivars, gpms, header
         """
         for iexp in range(self.nexp):
-            sobjs = specobjs.SpecObjs.from_fitsfile(self.spec1dfiles[iexp])
-            indx = sobjs.name_indices(self.objids[iexp])
+            sobjs = specobjs.SpecObjs.from_fitsfile(
+                        self.spec1dfiles[iexp],
+                        names=self.objids[iexp] if self.select_by_name else None)
+            indx = sobjs.name_indices(self.objids[iexp]) if sobjs.nobj > 0 \
+                        else np.zeros(0, dtype=bool)
             if not np.any(indx):
                 msgs.error("No matching objects for {:s}.  Odds are you input the wrong OBJID".format(self.objids[iexp]))
             wave_iexp, flux_iexp, ivar_iexp, gpm_iexp, meta_spec, header = \
@@ -208,6 +217,12 @@ class EchelleCoAdd1D(CoAdd1D):
     Child of CoAdd1d for Echelle reductions
     """
 
+    select_by_name = False
+    """
+    Echelle objects are identified by their ``ECH_NAME``, which is shared by
+    the spectra of all orders, so all spectra are read.
+    """
+
     def __init__(self, spec1dfiles, objids, spectrograph=None, par=None, sensfile=None, debug=False, show=False):
         """
         See `CoAdd1D` doc string
@@ -12,7 +12,8 @@ import os.path
 import numpy as np
 from astropy.time import Time
 import astropy.units as u
-from astropy.coordinates import SkyCoord, Angle
+from astropy.coordinates import SkyCoord, Angle, angular_separation
+from scipy.spatial import cKDTree
 
 from pypeit import specobjs
 from pypeit.spectrographs.util import load_spectrograph
@@ -202,11 +203,78 @@ class SourceObject:
 
         return self
 
+def _source_neighbors(source_list, tolerance, unit=u.arcsec):
+    """
+    Find the preceding sources within the matching tolerance of each source.
+
+    All the pairs of sources closer than the tolerance are found at once using
+    a KD-tree built from the positions of the sources: the 3D unit vectors
+    for 'ra/dec' matching, or the spatial pixel positions for 'pixel'
+    matching.  The separation of each pair is then checked against the
+    tolerance the same way as in :func:`SourceObject.match`.
+
+    Args:
+        source_list (list of :obj:`SourceObject`): The source objects, all with
+            the same match type.
+        tolerance (float): 
+            Maximum distance that two spectra can be from each other to be 
+            considered to be from the same source. Measured in floating
+            point pixels or as an angular distance (see ``unit`` argument).
+        unit (:obj:`astropy.units.Unit`):
+            Units of ``tolerance`` argument if match_type is 'ra/dec'. 
+            Defaults to arcseconds. Ignored if match_type is 'pixel'.
+
+    Returns:
+        list: For each source, a sorted integer array with the indices of
+        the sources that precede it in ``source_list`` and are within the
+        tolerance.
+    """
+    match_type = source_list[0].match_type
+    if any([source.match_type != match_type for source in source_list]):
+        msgs.error('All source objects must use the same match type.')
+
+    if match_type == 'ra/dec':
+        coord = SkyCoord([source.spec_obj_list[0].RA for source in source_list],
+                         [source.spec_obj_list[0].DEC for source in source_list], unit='deg')
+        ra, dec = coord.ra.deg, coord.dec.deg
+        _ra, _dec = np.radians(ra), np.radians(dec)
+        pos = np.column_stack((np.cos(_dec)*np.cos(_ra), np.cos(_dec)*np.sin(_ra), np.sin(_dec)))
+        _tolerance = Angle(tolerance, unit=unit)
+        # Chord length of the tolerance on the unit sphere
+        radius = 2*np.sin(min(max(_tolerance.radian, 0.), np.pi)/2)
+    else:
+        pos = np.array([source.coord for source in source_list], dtype=float).reshape(-1,1)
+        radius = max(tolerance, 0.)
+
+    # Pad the search radius so that round-off does not drop pairs right at
+    # the tolerance; all pairs are checked below.
+    pairs = cKDTree(pos).query_pairs(radius*(1+1e-6) + 1e-12, output_type='ndarray')
+    # NOTE: i < j for all pairs
+    i, j = pairs[:,0], pairs[:,1]
+    if match_type == 'ra/dec':
+        sep = angular_separation(ra[i]*u.deg, dec[i]*u.deg, ra[j]*u.deg, dec[j]*u.deg)
+        indx = Angle(sep, unit=u.deg) <= _tolerance
+    else:
+        indx = np.fabs(pos[j,0] - pos[i,0]) <= tolerance
+    i, j = i[indx], j[indx]
+
+    # Group the preceding sources by source
+    srt = np.lexsort((i, j))
+    i, j = i[srt], j[srt]
+    return np.split(i, np.searchsorted(j, np.arange(1, len(source_list))))
+
+
 def collate_spectra_by_source(source_list, tolerance, unit=u.arcsec):
     """Given a list of spec1d files from PypeIt, group the spectra within the
     files by their source object. The grouping is done by comparing the 
     position of each spectra (using either pixel or RA/DEC) using a given tolerance.
 
+    The sources are collated in order: each source is combined with all the
+    collated sources that it matches (see :func:`SourceObject.match`), or it
+    starts a new collated source if there is no match.  The positions
+    of the sources are matched using a KD-tree; see
+    :func:`_source_neighbors`.
+
     Args:
         source_list (list of :obj:`SourceObject`): A list of source objects, one
             SpecObj per object, ready for collation.
@@ -222,22 +290,38 @@ def collate_spectra_by_source(source_list, tolerance, unit=u.arcsec):
         (list of `obj`:SourceObject): The collated spectra as SourceObjects.
 
     """
+    if len(source_list) == 0:
+        return []
+
+    # Preceding sources within the tolerance of each source
+    neighbors = _source_neighbors(source_list, tolerance, unit=unit)
 
     collated_list = []
-    for source in source_list:
+    # Index of the collated SourceObject started by each source
+    collated_indx = np.full(len(source_list), -1, dtype=int)
+    for isrc, source in enumerate(source_list):
 
         # Search for a collated SourceObject that matches this one.
         # If one can't be found, treat this as a new collated SourceObject.
+        # NOTE: A collated SourceObject is matched using the position of the
+        # source that started it, so only those sources need to be checked.
         found = False
-        for collated_source in collated_list:
-            if  collated_source.match(source.spec_obj_list[0], 
-                                      source.spec1d_header_list[0],
-                                      tolerance, unit):
-
+        for jsrc in neighbors[isrc]:
+            if collated_indx[jsrc] < 0:
+                continue
+            collated_source = collated_list[collated_indx[jsrc]]
+            if collated_source._config_key_match(source.spec1d_header_list[0]):
                 collated_source.combine(source)
                 found = True
 
         if not found:
-            collated_list.append(copy.deepcopy(source))
+            collated_indx[isrc] = len(collated_list)
+            # Copy the lists so that combining other sources with the new
+            # collated source does not alter the input source.
+            new_source = copy.copy(source)
+            new_source.spec_obj_list = list(source.spec_obj_list)
+            new_source.spec1d_file_list = list(source.spec1d_file_list)
+            new_source.spec1d_header_list = list(source.spec1d_header_list)
+            collated_list.append(new_source)
 
     return collated_list
@@ -8,6 +8,7 @@ Module containing routines used by 3D datacubes.
 import os
 import copy
 import inspect
+import tempfile
 
 from astropy import wcs, units
 from astropy.coordinates import AltAz, SkyCoord
@@ -118,7 +119,10 @@ class DataCube(datamodel.DataContainer):
             if self.datamodel[key]['otype'] == np.ndarray:
                 tmp = {}
                 if self.datamodel[key]['atype'] == np.floating:
-                    tmp[key] = self[key].astype(np.float32)
+                    # Single-precision arrays are not copied, such that
+                    # memory-mapped cubes are written without loading them
+                    tmp[key] = self[key] if self[key].dtype.itemsize == 4 \
+                                    else self[key].astype(np.float32)
                 else:
                     tmp[key] = self[key]
                 d.append(tmp)
@@ -141,6 +145,10 @@ class DataCube(datamodel.DataContainer):
             **kwargs:  Passed to super.to_file()
 
         """
+        if isinstance(self.flux, np.memmap) and 'checksum' not in kwargs:
+            # Memory-mapped cubes are written without loading them into
+            # memory, but astropy copies the full array to compute the checksum
+            kwargs['checksum'] = False
         if primary_hdr is None:
             primary_hdr = io.initialize_header(primary=True)
         # Build the header
@@ -318,6 +326,144 @@ def make_whitelight_fromref(all_ra, all_dec, all_wave, all_sci, all_wghts, all_i
     return reference_image, whitelight_imgs, wlwcs
 
 
+def histogram_indices(pix_coord, bins):
+    """
+    Compute the flattened bin index of each pixel in a multi-dimensional
+    histogram.
+
+    The binning follows the conventions of `numpy.histogramdd`_: each bin
+    includes its lower edge, and the last bin along each axis also includes its
+    upper edge.  Computing the indices once allows any number of histograms of
+    the same coordinates to be constructed with :func:`scatter_histogram`.
+
+    Args:
+        pix_coord (`numpy.ndarray`_, :obj:`list`):
+            The coordinates of each pixel, either as an array of shape
+            ``(N,D)`` or as a sequence of ``D`` arrays with ``N`` elements.
+        bins (:obj:`tuple`):
+            The bin edges along each of the ``D`` dimensions.
+
+    Returns:
+        :obj:`tuple`: A 1D integer `numpy.ndarray`_ with the flattened bin
+        index of each pixel (-1 for pixels outside the binned region), and
+        the shape of the histogram.
+    """
+    coord = pix_coord.T if isinstance(pix_coord, np.ndarray) else pix_coord
+    shape = tuple(len(b)-1 for b in bins)
+    bin_idx = np.zeros(len(coord[0]), dtype=np.int64)
+    inside = np.ones(bin_idx.size, dtype=bool)
+    for ii, (crd, edges) in enumerate(zip(coord, bins)):
+        _idx = np.searchsorted(edges, crd, side='right') - 1
+        # Include the upper edge in the last bin
+        _idx[crd == edges[-1]] -= 1
+        inside &= (_idx >= 0) & (_idx < shape[ii])
+        bin_idx = bin_idx * shape[ii] + _idx
+    bin_idx[np.logical_not(inside)] = -1
+    return bin_idx, shape
+
+
+def scatter_histogram(bin_idx, shape, weights=None):
+    """
+    Construct a histogram by summing the weights of all pixels in each bin.
+
+    Args:
+        bin_idx (`numpy.ndarray`_):
+            The flattened bin index of each pixel, as returned by
+            :func:`histogram_indices`.  Pixels with negative indices are
+            ignored.
+        shape (:obj:`tuple`):
+            The shape of the histogram.
+        weights (`numpy.ndarray`_, :obj:`list`, optional):
+            The weight of each pixel, or a list of weight arrays.  If None, the
+            histogram gives the number of pixels in each bin.
+
+    Returns:
+        `numpy.ndarray`_, :obj:`list`: The histogram, or a list of histograms
+        with one for each array of weights.
+    """
+    gpm = bin_idx >= 0
+    _idx = bin_idx[gpm]
+    _weights = weights if isinstance(weights, list) else [weights]
+    hists = [np.bincount(_idx, weights=None if w is None else w[gpm],
+                         minlength=np.prod(shape)).reshape(shape).astype(float)
+                for w in _weights]
+    return hists if isinstance(weights, list) else hists[0]
+
+
+def make_cube_chunked(all_ra, all_dec, all_wave, all_sci, all_ivar, all_wghts, offsets, world2pix,
+                      bins, wave_edges, wave_chunk, flux, variance):
+    """
+    Construct a datacube in chunks of wavelength channels.
+
+    The pixels of each input frame must be contiguous in the input arrays and
+    sorted by wavelength, such that only the pixels that can contribute to each
+    chunk need to be read (e.g., from memory-mapped arrays).  The binning is
+    identical to constructing the full cube at once.
+
+    Args:
+        all_ra (`numpy.ndarray`_):
+            1D flattened array containing the RA values of each pixel from all spec2d files
+        all_dec (`numpy.ndarray`_):
+            1D flattened array containing the DEC values of each pixel from all spec2d files
+        all_wave (`numpy.ndarray`_):
+            1D flattened array containing the wavelength values of each pixel from all spec2d files
+        all_sci (`numpy.ndarray`_):
+            1D flattened array containing the counts of each pixel from all spec2d files
+        all_ivar (`numpy.ndarray`_):
+            1D flattened array containing the inverse variance of each pixel from all spec2d files
+        all_wghts (`numpy.ndarray`_):
+            1D flattened array containing the weights attributed to each pixel from all spec2d files
+        offsets (`numpy.ndarray`_):
+            The index of the first pixel of each spec2d file in the flattened
+            arrays, followed by the total number of pixels.
+        world2pix (callable):
+            Function that converts the RA, DEC and wavelength of a set of
+            pixels to the pixel coordinates of the datacube.
+        bins (:obj:`tuple`):
+            The bin edges along each dimension of the datacube.
+        wave_edges (`numpy.ndarray`_):
+            The (increasing) wavelength of each spectral bin edge.
+        wave_chunk (:obj:`int`):
+            The number of wavelength channels to construct at once.
+        flux (`numpy.ndarray`_):
+            The array to fill with the flux datacube, with shape (nwave,
+            nspaxel_y, nspaxel_x) (e.g., a memory-mapped array).
+        variance (`numpy.ndarray`_):
+            The array to fill with the variance datacube, with the same shape as
+            ``flux``.
+    """
+    xbins, ybins, spec_bins = bins
+    numwav = spec_bins.size - 1
+    nchunk = -(-numwav // wave_chunk)
+    for cc in range(nchunk):
+        s = cc*wave_chunk
+        e = min(s + wave_chunk, numwav)
+        msgs.info("Generating data cube channels {0:d}-{1:d}/{2:d}".format(s+1, e, numwav))
+        # Select the pixels of each frame that could fall in this chunk,
+        # allowing for a one channel buffer
+        wave_lo = -np.inf if s == 0 else wave_edges[s-1]
+        wave_hi = np.inf if e == numwav else wave_edges[e+1]
+        indx = np.concatenate([np.arange(*(offsets[ff] + np.searchsorted(
+                                    all_wave[offsets[ff]:offsets[ff+1]], [wave_lo, wave_hi])))
+                                for ff in range(offsets.size-1)])
+        pix_coord = world2pix(all_ra[indx], all_dec[indx], all_wave[indx])
+        bin_idx, shape = histogram_indices(pix_coord, (xbins, ybins, spec_bins[s:e+1]))
+        if e < numwav:
+            # The upper edge of this chunk belongs to the next chunk
+            spec_coord = pix_coord[:, 2] if isinstance(pix_coord, np.ndarray) else pix_coord[2]
+            bin_idx[spec_coord == spec_bins[e]] = -1
+        # Accumulate the flux, weights and variance
+        _ivar = all_ivar[indx]
+        _wghts = all_wghts[indx]
+        _var = (_ivar > 0) / (_ivar + (_ivar == 0))
+        datacube, norm, var_cube = scatter_histogram(bin_idx, shape,
+                                                     weights=[all_sci[indx]*_wghts, _wghts,
+                                                              _var * _wghts**2])
+        norm_cube = (norm > 0) / (norm + (norm == 0))
+        flux[s:e] = (datacube * norm_cube).T
+        variance[s:e] = (var_cube * norm_cube**2).T
+
+
 def make_whitelight(all_ra, all_dec, all_wave, all_sci, all_wghts, all_idx, dspat,
                     all_ivar=None, whitelightWCS=None, numra=None, numdec=None):
     """ Generate a whitelight image of every input frame
@@ -389,8 +535,9 @@ def make_whitelight(all_ra, all_dec, all_wave, all_sci, all_wghts, all_idx, dspa
         ww = (all_idx == ff)
         # Make the cube
         pix_coord = whitelightWCS.wcs_world2pix(np.vstack((all_ra[ww], all_dec[ww], all_wave[ww] * 1.0E-10)).T, 0)
-        wlcube, edges = np.histogramdd(pix_coord, bins=bins, weights=all_sci[ww] * all_wghts[ww])
-        norm, edges = np.histogramdd(pix_coord, bins=bins, weights=all_wghts[ww])
+        bin_idx, shape = histogram_indices(pix_coord, bins)
+        wlcube, norm = scatter_histogram(bin_idx, shape, weights=[all_sci[ww] * all_wghts[ww],
+                                                                  all_wghts[ww]])
         nrmCube = (norm > 0) / (norm + (norm == 0))
         whtlght = (wlcube * nrmCube)[:, :, 0]
         # Create a mask of good pixels (trim the edges)
@@ -405,7 +552,7 @@ def make_whitelight(all_ra, all_dec, all_wave, all_sci, all_wghts, all_idx, dspa
         whitelight_Imgs[:, :, ff] = whtlght.copy()
         # Now operate on the inverse variance image
         if all_ivar is not None:
-            ivar_img, _ = np.histogramdd(pix_coord, bins=bins, weights=all_ivar[ww])
+            ivar_img = scatter_histogram(bin_idx, shape, weights=all_ivar[ww])
             ivar_img = ivar_img[:, :, 0]
             ivar_img *= gpm
             minval = np.min(ivar_img[gpm == 1])
@@ -514,9 +661,9 @@ def compute_weights(all_ra, all_dec, all_wave, all_sci, all_ivar, all_idx, white
         ww = (all_idx == ff)
         # Extract the spectrum
         pix_coord = whitelightWCS.wcs_world2pix(np.vstack((all_ra[ww], all_dec[ww], all_wave[ww] * 1.0E-10)).T, 0)
-        spec, edges = np.histogramdd(pix_coord, bins=bins, weights=all_sci[ww])
-        var, edges = np.histogramdd(pix_coord, bins=bins, weights=1/all_ivar[ww])
-        norm, edges = np.histogramdd(pix_coord, bins=bins)
+        bin_idx, shape = histogram_indices(pix_coord, bins)
+        spec, var, norm = scatter_histogram(bin_idx, shape,
+                                            weights=[all_sci[ww], 1/all_ivar[ww], None])
         normspec = (norm > 0) / (norm + (norm == 0))
         var_spec = var[0, 0, :]
         ivar_spec = (var_spec > 0) / (var_spec + (var_spec == 0))
@@ -608,8 +755,17 @@ def coadd_cube(files, spectrograph=None, parset=None, overwrite=False):
     numfiles = len(files)
     combine = cubepar['combine']
 
-    all_ra, all_dec, all_wave = np.array([]), np.array([]), np.array([])
-    all_sci, all_ivar, all_idx, all_wghts = np.array([]), np.array([]), np.array([]), np.array([])
+    # The pixels of each frame are collected in lists and concatenated once all
+    # frames are read, to avoid copying all the previous frames at each step
+    all_ra, all_dec, all_wave = [], [], []
+    all_sci, all_ivar, all_idx, all_wghts = [], [], [], []
+    # If the cube is constructed in chunks, the pixels of each frame are sorted
+    # by wavelength and streamed to (memory-mapped) scratch files instead
+    wave_chunk = cubepar['wave_chunk']
+    if wave_chunk is not None:
+        scratch = [tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(outfile)))
+                   for i in range(7)]
+        numpix_files = np.zeros(numfiles, dtype=int)
     all_wcs = []
     dspat = None if cubepar['spatial_delta'] is None else  cubepar['spatial_delta']/3600.0  # binning size on the sky (/3600 to convert to degrees)
     dwv = cubepar['wave_delta']       # binning size in wavelength direction (in Angstroms)
@@ -619,7 +775,9 @@ def coadd_cube(files, spectrograph=None, parset=None, overwrite=False):
     locations = parset['calibrations']['alignment']['locations']
     for ff, fil in enumerate(files):
         # Load it up
-        spec2DObj = spec2dobj.Spec2DObj.from_file(fil, detname)
+        spec2DObj = spec2dobj.Spec2DObj.from_file(fil, detname,
+                                                  images=['sciimg', 'skymodel', 'ivarraw',
+                                                          'waveimg', 'bpmmask', 'tilts'])
         detector = spec2DObj.detector
         flexure = None  #spec2DObj.sci_spat_flexure
 
@@ -726,13 +884,30 @@ def coadd_cube(files, spectrograph=None, parset=None, overwrite=False):
 
         # Store the information
         numpix = raimg[onslit_gpm].size
-        all_ra = np.append(all_ra, raimg[onslit_gpm].copy())
-        all_dec = np.append(all_dec, decimg[onslit_gpm].copy())
-        all_wave = np.append(all_wave, wave_ext.copy())
-        all_sci = np.append(all_sci, flux_sav[resrt].copy())
-        all_ivar = np.append(all_ivar, ivar_sav[resrt].copy())
-        all_idx = np.append(all_idx, ff*np.ones(numpix))
-        all_wghts = np.append(all_wghts, weights[ff]*np.ones(numpix))
+        pixels = [raimg[onslit_gpm], decimg[onslit_gpm], wave_ext, flux_sav[resrt], ivar_sav[resrt],
+                  np.full(numpix, ff, dtype=float), np.full(numpix, weights[ff])]
+        if wave_chunk is None:
+            for _all, _pix in zip([all_ra, all_dec, all_wave, all_sci, all_ivar, all_idx, all_wghts],
+                                  pixels):
+                _all += [_pix]
+        else:
+            wvsrt = np.argsort(wave_ext, kind='stable')
+            for _scratch, _pix in zip(scratch, pixels):
+                _pix[wvsrt].astype(float).tofile(_scratch)
+            numpix_files[ff] = numpix
+
+    if wave_chunk is None:
+        all_ra, all_dec, all_wave = np.concatenate(all_ra), np.concatenate(all_dec), np.concatenate(all_wave)
+        all_sci, all_ivar = np.concatenate(all_sci), np.concatenate(all_ivar)
+        all_idx, all_wghts = np.concatenate(all_idx), np.concatenate(all_wghts)
+    else:
+        # The index of the first pixel of each frame
+        offsets = np.append(0, np.cumsum(numpix_files))
+        for _scratch in scratch:
+            _scratch.flush()
+        all_ra, all_dec, all_wave, all_sci, all_ivar, all_idx, all_wghts \
+                = [np.memmap(_scratch, dtype=float, mode='r+', shape=(offsets[-1],))
+                   for _scratch in scratch]
 
     # Grab cos(dec) for convenience
     cosdec = np.cos(np.mean(all_dec) * np.pi / 180.0)
@@ -841,32 +1016,53 @@ def coadd_cube(files, spectrograph=None, parset=None, overwrite=False):
         xbins, ybins, spec_bins = spec.get_datacube_bins(slitlength, minmax, numwav)
 
     # Make the cube
-    msgs.info("Generating pixel coordinates")
     if combine:
-        pix_coord = masterwcs.wcs_world2pix(all_ra, all_dec, all_wave * 1.0E-10, 0)
+        world2pix = lambda ra, dec, wave: masterwcs.wcs_world2pix(ra, dec, wave * 1.0E-10, 0)
+        cube_wcs = masterwcs
         hdr = masterwcs.to_header()
     else:
-        pix_coord = wcs.wcs_world2pix(np.vstack((all_ra, all_dec, all_wave*1.0E-10)).T, 0)
+        world2pix = lambda ra, dec, wave: frame_wcs.wcs_world2pix(np.vstack((ra, dec, wave*1.0E-10)).T, 0)
+        cube_wcs = frame_wcs
         hdr = frame_wcs.to_header()
+    bins = (xbins, ybins, spec_bins)
+
+    if wave_chunk is not None:
+        # Construct the cube in slabs of wavelength channels, written directly
+        # to memory-mapped arrays
+        msgs.info("Generating data cube in chunks of {0:d} channels".format(wave_chunk))
+        wave_edges = cube_wcs.wcs_pix2world(np.zeros(spec_bins.size), np.zeros(spec_bins.size),
+                                            spec_bins, 0)[2] * 1.0E10
+        cube_shape = (spec_bins.size-1, ybins.size-1, xbins.size-1)
+        datacube, var_cube = [np.memmap(tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(outfile))),
+                                        dtype='>f4', mode='w+', shape=cube_shape) for i in range(2)]
+        make_cube_chunked(all_ra, all_dec, all_wave, all_sci, all_ivar, all_wghts, offsets, world2pix,
+                          bins, wave_edges, wave_chunk, datacube, var_cube)
+        msgs.info("Saving datacube as: {0:s}".format(outfile))
+        final_cube = DataCube(datacube, var_cube, specname, fluxed=cubepar['flux_calibrate'])
+        final_cube.to_file(outfile, hdr=hdr, overwrite=overwrite)
+        return
+
+    msgs.info("Generating pixel coordinates")
+    pix_coord = world2pix(all_ra, all_dec, all_wave)
 
     # Find the NGP coordinates for all input pixels
     msgs.info("Generating data cube")
-    bins = (xbins, ybins, spec_bins)
-    datacube, edges = np.histogramdd(pix_coord, bins=bins, weights=all_sci*all_wghts)
-    norm, edges = np.histogramdd(pix_coord, bins=bins, weights=all_wghts)
+    # The bin of each pixel is only computed once, and the flux, weights and
+    # variance (including weights) are then accumulated into the cube
+    bin_idx, shape = histogram_indices(pix_coord, bins)
+    all_var = (all_ivar > 0) / (all_ivar + (all_ivar == 0))
+    datacube, norm, var_cube = scatter_histogram(bin_idx, shape,
+                                                 weights=[all_sci*all_wghts, all_wghts,
+                                                          all_var * all_wghts**2])
     norm_cube = (norm > 0) / (norm + (norm == 0))
     datacube *= norm_cube
-    # Create the variance cube, including weights
-    msgs.info("Generating variance cube")
-    all_var = (all_ivar > 0) / (all_ivar + (all_ivar == 0))
-    var_cube, edges = np.histogramdd(pix_coord, bins=bins, weights=all_var * all_wghts**2)
     var_cube *= norm_cube**2
 
     # Save the datacube
     debug = False
     if debug:
-        datacube_resid, edges = np.histogramdd(pix_coord, bins=(xbins, ybins, spec_bins), weights=all_sci*np.sqrt(all_ivar))
-        norm, edges = np.histogramdd(pix_coord, bins=(xbins, ybins, spec_bins))
+        datacube_resid, norm = scatter_histogram(bin_idx, shape,
+                                                 weights=[all_sci*np.sqrt(all_ivar), None])
         norm_cube = (norm > 0) / (norm + (norm == 0))
         outfile = "datacube_resid.fits"
         msgs.info("Saving datacube as: {0:s}".format(outfile))
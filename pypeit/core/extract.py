@@ -198,6 +198,185 @@ def extract_optimal(sciimg, ivar, mask, waveimg, skyimg, thismask, oprof,
     spec.OPT_CHI2 = chi2            # Reduced chi2 of the model fit for this spectral pixel
 
 
+def extract_optimal_group(sciimg, ivar, mask, waveimg, skyimg, thismask, oprof, specs,
+                          aper_nbox=None, min_frac_use=0.05, base_var=None, count_scale=None,
+                          noise_floor=None):
+    """
+    Perform the optimal extraction for a group of objects simultaneously.
+
+    This is the batched equivalent of calling :func:`extract_optimal` for each
+    object.  The images shared by all objects (e.g., the sky-subtracted image
+    and noise variance) are computed once, and only for the range of spatial
+    pixels covered by the object profiles, and the extraction sums for all
+    objects are computed with array operations over a (nobj, nspec, nsub)
+    stack.  The results are identical to :func:`extract_optimal` to within
+    numerical round-off.
+
+    Each :class:`~pypeit.specobj.SpecObj` in ``specs`` is modified in place.
+
+    Parameters
+    ----------
+    sciimg : float `numpy.ndarray`_, shape (nspec, nspat)
+        Science frame
+    ivar : float `numpy.ndarray`_, shape (nspec, nspat)
+        Inverse variance of science frame.
+    mask : boolean `numpy.ndarray`_, shape (nspec, nspat)
+        Good-pixel mask used for all objects.  Good pixels = True, Bad Pixels
+        = False
+    waveimg : float `numpy.ndarray`_, shape (nspec, nspat)
+        Wavelength image.
+    skyimg : float `numpy.ndarray`_, shape (nspec, nspat)
+        Image containing our model of the sky
+    thismask : boolean `numpy.ndarray`_, shape (nspec, nspat)
+        Image indicating which pixels are on the slit/order in question.
+        True=Good.
+    oprof : float `numpy.ndarray`_, shape (nspec, nspat, nobj)
+        Images containing the profile of each object.
+    specs : :obj:`list`, :class:`~pypeit.specobjs.SpecObjs`
+        The nobj objects to extract.  **These objects are altered in place!**
+    aper_nbox : :obj:`float`, optional
+        If provided, the good-pixel mask for each object is further limited to
+        pixels within ``aper_nbox`` times the object's ``BOX_RADIUS`` of its
+        trace.
+    min_frac_use : :obj:`float`, optional
+        See :func:`extract_optimal`.
+    base_var : `numpy.ndarray`_, shape is (nspec, nspat), optional
+        See :func:`extract_optimal`.
+    count_scale : :obj:`float`, `numpy.ndarray`_, optional
+        See :func:`extract_optimal`.
+    noise_floor : :obj:`float`, optional
+        See :func:`extract_optimal`.
+    """
+    nspec, nspat = sciimg.shape
+    nobj = len(specs)
+    if oprof.shape != (nspec, nspat, nobj):
+        msgs.error('Object profiles must have shape (nspec, nspat, nobj).')
+
+    # Exit gracefully for objects without positive profiles, since that means
+    # something was wrong with object fitting
+    posprof = oprof > 0.0
+    posspat = np.any(posprof, axis=0)
+    good = np.any(posspat, axis=0)
+    for i in np.where(np.logical_not(good))[0]:
+        msgs.warn('Object profile is zero everywhere. This aperture is junk.')
+    if not np.any(good):
+        return
+    indx = np.where(good)[0]
+    posspat = posspat[:,indx]
+
+    # Spatial range for each object and for the full group
+    _mincol = np.argmax(posspat, axis=0)
+    _maxcol = nspat - np.argmax(posspat[::-1], axis=0)
+    mincol = np.min(_mincol)
+    maxcol = np.max(_maxcol)
+    spat_sub = np.arange(mincol, maxcol, dtype=float)
+    colmask = (spat_sub[None,:] >= _mincol[:,None]) & (spat_sub[None,:] < _maxcol[:,None])
+
+    # Images shared by all objects
+    thismask_sub = thismask[:,mincol:maxcol]
+    wave_sub = waveimg[:,mincol:maxcol]
+    # enforce positivity since these are used as weights
+    ivar_sub = np.fmax(ivar[:,mincol:maxcol],0.0)
+    sky_sub = skyimg[:,mincol:maxcol]
+    img_sub = sciimg[:,mincol:maxcol] - sky_sub
+    base_sub = None if base_var is None else base_var[:,mincol:maxcol]
+    if base_var is None:
+        vno_sub = None
+    else:
+        _count_scale = count_scale[:,mincol:maxcol] if isinstance(count_scale, np.ndarray) \
+                            else count_scale
+        vno_sub = np.fmax(procimg.variance_model(base_sub, counts=sky_sub,
+                                                 count_scale=_count_scale,
+                                                 noise_floor=noise_floor), 0.0)
+
+    # Mask for each object, limited to the spatial range of its profile
+    mask_sub = mask[None,:,mincol:maxcol] & colmask[:,None,:]
+    if aper_nbox is not None:
+        for j, i in enumerate(indx):
+            trace = specs[i].TRACE_SPAT[:,None]
+            mask_sub[j] &= (spat_sub[None,:] >= (trace - aper_nbox * specs[i].BOX_RADIUS)) \
+                                & (spat_sub[None,:] <= (trace + aper_nbox * specs[i].BOX_RADIUS))
+
+    # enforce normalization and positivity of object profiles
+    oprof_sub = np.where(colmask[:,None,:], np.moveaxis(oprof[:,mincol:maxcol,indx], -1, 0), 0.0)
+    norm = np.nansum(oprof_sub, axis=2)
+    oprof_sub = np.fmax(oprof_sub/norm[...,None], 0.0)
+    oprof_sub2 = oprof_sub**2
+
+    ivar_denom = np.nansum(mask_sub*oprof_sub, axis=2)
+    mivar_num = np.nansum(mask_sub*ivar_sub*oprof_sub2, axis=2)
+    mivar_opt = mivar_num/(ivar_denom + (ivar_denom == 0.0))
+    flux_opt = np.nansum(mask_sub*ivar_sub*img_sub*oprof_sub, axis=2) \
+                    / (mivar_num + (mivar_num == 0.0))
+    # See extract_optimal for the noise and sky estimates
+    nivar_num = np.nansum(mask_sub*oprof_sub2, axis=2) # Uses unit weights
+    nivar_denom = nivar_num**2 + (nivar_num**2 == 0.0)
+    if vno_sub is None:
+        nivar_opt = None
+    else:
+        nvar_opt = ivar_denom * np.nansum(mask_sub * vno_sub * oprof_sub2, axis=2) / nivar_denom
+        nivar_opt = 1.0/(nvar_opt + (nvar_opt == 0.0))
+    sky_opt = ivar_denom*(np.nansum(mask_sub*sky_sub*oprof_sub2, axis=2))/nivar_denom
+    if base_var is None:
+        base_opt = None
+    else:
+        base_opt = ivar_denom * np.nansum(mask_sub * base_sub * oprof_sub2, axis=2) / nivar_denom
+        base_opt = np.sqrt(base_opt)
+        base_opt[np.isnan(base_opt)]=0.0
+
+    tot_weight = np.nansum(mask_sub*ivar_sub*oprof_sub, axis=2)
+    prof_norm = np.nansum(oprof_sub, axis=2)
+    frac_use = (prof_norm > 0.0)*np.nansum((mask_sub*ivar_sub > 0.0)*oprof_sub, axis=2) \
+                    / (prof_norm + (prof_norm == 0.0))
+
+    wave_opt = np.nansum(mask_sub*ivar_sub*wave_sub*oprof_sub2, axis=2) \
+                    / (mivar_num + (mivar_num == 0.0))
+    mask_opt = (tot_weight > 0.0) & (frac_use > min_frac_use) & (mivar_num > 0.0) \
+                    & (ivar_denom > 0.0) & np.isfinite(wave_opt) & (wave_opt > 0.0)
+
+    flux_model = flux_opt[...,None]*oprof_sub
+    chi2_num = np.nansum((img_sub - flux_model)**2*ivar_sub*mask_sub, axis=2)
+    chi2_denom = np.fmax(np.nansum(ivar_sub*mask_sub > 0.0, axis=2) - 1.0, 1.0)
+    chi2 = chi2_num/chi2_denom
+
+    # Interpolate wavelengths over masked pixels
+    badwvs = (mivar_num <= 0) | np.invert(np.isfinite(wave_opt)) | (wave_opt <= 0.0)
+    f_wave = None
+    for j in np.where(np.any(badwvs, axis=1))[0]:
+        oprof_smash = np.nansum(thismask_sub*oprof_sub2[j], axis=1)
+        # Can we use the profile average wavelengths instead?
+        oprof_good = badwvs[j] & (oprof_smash > 0.0)
+        if oprof_good.any():
+            wave_opt[j,oprof_good] = np.nansum(
+                wave_sub[oprof_good,:]*thismask_sub[oprof_good,:]*oprof_sub2[j,oprof_good,:],
+                axis=1) / np.nansum(thismask_sub[oprof_good,:]*oprof_sub2[j,oprof_good,:],
+                                    axis=1)
+        oprof_bad = badwvs[j] & ((oprof_smash <= 0.0) | (np.isfinite(oprof_smash) == False)
+                                 | (wave_opt[j] <= 0.0) | (np.isfinite(wave_opt[j]) == False))
+        if oprof_bad.any():
+            # For pixels with completely bad profile values, interpolate from trace.
+            if f_wave is None:
+                f_wave = scipy.interpolate.RectBivariateSpline(np.arange(nspec), np.arange(nspat),
+                                                               waveimg*thismask)
+            spec = specs[indx[j]]
+            wave_opt[j,oprof_bad] = f_wave(spec.trace_spec[oprof_bad],
+                                           spec.TRACE_SPAT[oprof_bad], grid=False)
+
+    # Fill in the optimally extraction tags; see extract_optimal
+    for j, i in enumerate(indx):
+        spec = specs[i]
+        spec.OPT_WAVE = wave_opt[j]
+        spec.OPT_COUNTS = flux_opt[j]
+        spec.OPT_COUNTS_IVAR = mivar_opt[j]
+        spec.OPT_COUNTS_SIG = np.sqrt(utils.inverse(mivar_opt[j]))
+        spec.OPT_COUNTS_NIVAR = None if nivar_opt is None else nivar_opt[j]
+        spec.OPT_MASK = mask_opt[j]
+        spec.OPT_COUNTS_SKY = sky_opt[j]
+        spec.OPT_COUNTS_SIG_DET = None if base_opt is None else base_opt[j]
+        spec.OPT_FRAC_USE = frac_use[j]
+        spec.OPT_CHI2 = chi2[j]
+
+
 def extract_boxcar(sciimg, ivar, mask, waveimg, skyimg, spec, base_var=None,
                    count_scale=None, noise_floor=None):
     """
@@ -1015,7 +1015,8 @@ def Flam_to_Nlam(wave, zeropoint, zp_min=5.0, zp_max=30.0):
     wave (`numpy.ndarray`_):
        Wavelength array, float, shape (nspec,)
     zeropoint (`numpy.ndarray`_):
-       zeropoint array, float, shape (nspec,)
+       zeropoint array, float, shape (nspec,).  Can also have shape (nvec,
+       nspec), in which case the returned factor has the same shape.
 
     Returns:
     --------
@@ -1023,6 +1024,7 @@ def Flam_to_Nlam(wave, zeropoint, zp_min=5.0, zp_max=30.0):
         Factor that when multiplied into F_lam converts to N_lam
 
     """
+    wave, zeropoint = np.broadcast_arrays(wave, zeropoint)
     gpm = (wave > 1.0) & (zeropoint > zp_min) & (zeropoint < zp_max)
     factor = np.zeros_like(wave)
     factor[gpm] = np.power(10.0, 0.4*(zeropoint[gpm] - ZP_UNIT_CONST))*np.square(wave[gpm])
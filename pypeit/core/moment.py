@@ -528,3 +528,108 @@ def moment1d(flux, col, width, ivar=None, bpm=None, fwgt=None, row=None, weighti
                   np.concatenate(mue[_order]).reshape(outshape),
                   np.concatenate(mum[_order]).reshape(outshape))
 
+
+
+def centroid1d(flux, col, width, row, ivar=None, bpm=None, fwgt=None, fill_error=-1.):
+    """
+    Compute the uniformly weighted first moment (centroid) within 1D
+    apertures, one aperture per image row.
+
+    This is a streamlined version of :func:`moment1d` for the most
+    common use case when following features through an image: one
+    aperture center per row, uniform weighting, and only the first
+    moment.  It avoids the input parsing and the masked-array operations
+    of :func:`moment1d`, and it yields results that are identical to::
+
+        moment1d(flux, col, width, ivar=ivar, bpm=bpm, fwgt=fwgt, row=row,
+                 order=1, fill_error=fill_error)
+
+    Args:
+        flux (`numpy.ndarray`_):
+            Intensity image. Shape is :math:`(N_{\rm row}, N_{\rm col})`.
+        col (`numpy.ndarray`_):
+            1D array with the floating-point column locations for the
+            center of each aperture.
+        width (:obj:`float`):
+            The full width of each (uniform) aperture.
+        row (:obj:`int`, `numpy.ndarray`_):
+            The row of each aperture.  Can be a single row used for all
+            apertures; otherwise, the shape must match ``col``.
+        ivar (`numpy.ndarray`_, optional):
+            Inverse variance of the image intensity.  Shape must match
+            ``flux``.
+        bpm (`numpy.ndarray`_, optional):
+            Boolean bad-pixel mask for the image; True values are ignored.
+            Shape must match ``flux``.
+        fwgt (`numpy.ndarray`_, optional):
+            An additional weight to apply to each pixel.  Shape must
+            match ``flux``.
+        fill_error (scalar-like, optional):
+            Value to use as filler for undetermined errors.
+
+    Returns:
+        :obj:`tuple`: Three `numpy.ndarray`_ objects with the same shape
+        as ``col``: the centroids, their errors, and a boolean mask
+        flagging measurements that could not be computed (in which case
+        the centroid is set to the input column and the error to
+        ``fill_error``).
+    """
+    nrow, ncol = flux.shape
+    _col = np.asarray(col, dtype=float)
+    if _col.ndim != 1:
+        raise ValueError('Aperture centers must be provided as a 1D array.')
+    _row = np.full(_col.size, row, dtype=int) if np.ndim(row) == 0 \
+                else np.asarray(row).astype(int)
+    if _row.shape != _col.shape:
+        raise ValueError('Number of rows and columns must match.')
+    if _col.size == 0:
+        return _col.copy(), np.zeros(0, dtype=float), np.zeros(0, dtype=bool)
+    if np.any((_row < 0) | (_row >= nrow)):
+        raise ValueError('Row locations outside provided image.')
+
+    # Set up the integration window as done by moment1d
+    _radius = np.full(_col.size, width, dtype=float)/2
+    i1 = np.floor(_col - _radius + 0.5).astype(int)
+    i2 = np.floor(_col + _radius + 0.5).astype(int)
+    c = i1[:,None]-1+np.arange(int(np.amax(np.amin(i2-i1)-1,0))+4)[None,:]
+    ih = np.clip(c,0,ncol-1)
+    good = (c >= 0) & (c < ncol)
+    if bpm is not None:
+        good = good & np.invert(bpm[_row[:,None],ih])
+    if ivar is not None:
+        _ivar = ivar[_row[:,None],ih]
+        good = good & (_ivar > 0)
+    wt = good * np.clip(_radius[:,None] - np.abs(c - _col[:,None]) + 0.5,0,1)
+    integ = flux[_row[:,None],ih] * wt
+    if fwgt is not None:
+        integ *= fwgt[_row[:,None],ih]
+
+    # The zeroth and first moments.  The masks replicate the domains of
+    # the numpy.ma functions used by moment1d.
+    tiny = np.finfo(float).tiny
+    mu0 = np.sum(integ, axis=1)
+    num = np.sum(integ*c, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        mu1 = num / mu0
+        mum = np.logical_not(np.isfinite(mu1)) | (np.absolute(num) * tiny >= np.absolute(mu0))
+
+        # Error in the first moment
+        var1 = np.square(wt * (c - mu1[:,None]))
+        var1_msk = np.zeros(var1.shape, dtype=bool)
+        if ivar is not None:
+            _var1 = var1 / _ivar
+            var1_msk = np.logical_not(np.isfinite(_var1)) \
+                            | (np.absolute(var1) * tiny >= np.absolute(_ivar))
+            var1 = _var1
+        var1_msk |= mum[:,None]
+        var1[var1_msk] = 0.
+        sqrt_var = np.sqrt(np.sum(var1, axis=1))
+        mue_msk = np.all(var1_msk, axis=1) | np.logical_not(np.isfinite(sqrt_var)) \
+                    | (sqrt_var < 0)
+        mue = sqrt_var / np.absolute(mu0)
+        mue_msk |= np.logical_not(np.isfinite(mue)) \
+                    | (np.absolute(sqrt_var) * tiny >= np.absolute(mu0))
+
+    mu1[mum] = _col[mum]
+    mue[mue_msk] = fill_error
+    return mu1, mue, mum
@@ -3,6 +3,8 @@
 .. include common links, assuming primary doc root is up one directory
 .. include:: ../include/links.rst
 """
+from concurrent.futures import ThreadPoolExecutor
+
 from IPython import embed
 
 import numpy as np
@@ -97,8 +99,63 @@ def boxcar_replicate(arr, boxcar):
     return _arr
 
 
+def tiled_filter(func, img, halo, tile_nspec=None, nproc=1):
+    """
+    Apply a local image filter to overlapping blocks of spectral rows.
+
+    The image is split into blocks of ``tile_nspec`` rows along the first
+    (spectral) axis.  Each block is padded with ``halo`` rows from its
+    neighbors, the filter is applied to the padded block, and the halo is
+    trimmed from the result.  Provided ``halo`` is at least the filter radius
+    along the first axis, the result is identical to applying the filter to the
+    full image: interior halos supply the real neighboring pixels, and blocks at
+    the image boundary reproduce the filter's own boundary treatment.  Because
+    the blocks span the full second (spatial) axis, filters that operate on
+    entire rows (e.g., :func:`cr_screen`) can be applied with ``halo=0``.
+
+    Args:
+        func (callable):
+            Function that takes a 2D array and returns a filtered array with
+            the same shape.
+        img (`numpy.ndarray`_):
+            2D image to filter.
+        halo (:obj:`int`):
+            Number of rows to include on either side of each block.
+        tile_nspec (:obj:`int`, optional):
+            Number of rows in each block.  If None, the image is split evenly
+            among the ``nproc`` threads.
+        nproc (:obj:`int`, optional):
+            Number of threads used to filter the blocks.  Blocks are only
+            filtered concurrently to the extent that ``func`` releases the GIL.
+
+    Returns:
+        `numpy.ndarray`_: The filtered image.
+    """
+    nspec = img.shape[0]
+    if tile_nspec is None:
+        tile_nspec = -(-nspec // max(nproc, 1))
+    if tile_nspec >= nspec:
+        return func(img)
+
+    starts = np.arange(0, nspec, tile_nspec)
+
+    def _filter_tile(start):
+        end = min(start + tile_nspec, nspec)
+        lo = max(start - halo, 0)
+        hi = min(end + halo, nspec)
+        return func(img[lo:hi])[start-lo:end-lo]
+
+    if nproc > 1:
+        with ThreadPoolExecutor(max_workers=nproc) as pool:
+            tiles = list(pool.map(_filter_tile, starts))
+    else:
+        tiles = [_filter_tile(start) for start in starts]
+    return np.concatenate(tiles, axis=0)
+
+
 def lacosmic(sciframe, saturation=None, nonlinear=1., bpm=None, varframe=None, maxiter=1, grow=1.5,
-             remove_compact_obj=True, sigclip=5.0, sigfrac=0.3, objlim=5.0, rm_false_pos=True):
+             remove_compact_obj=True, sigclip=5.0, sigfrac=0.3, objlim=5.0, rm_false_pos=True,
+             onslit=None, nproc=1, tile_nspec=None):
     r"""
     Identify cosmic rays using the L.A.Cosmic algorithm.
 
@@ -148,6 +205,19 @@ def lacosmic(sciframe, saturation=None, nonlinear=1., bpm=None, varframe=None, m
         rm_false_pos (:obj:`bool`, optional):
             Apply algorithm to detect and remove false positives.  This is not a
             traditional component of the L.A.Cosmic algorithm.
+        onslit (`numpy.ndarray`_, optional):
+            Boolean array selecting the pixels (e.g., those on a slit) that can
+            be flagged as cosmic rays.  If None, all pixels are searched.
+            Shape must match ``sciframe``.
+        nproc (:obj:`int`, optional):
+            Number of threads used to apply the image filters.  See
+            :func:`tiled_filter`.
+        tile_nspec (:obj:`int`, optional):
+            Number of spectral rows in each block processed by the image
+            filters.  If None and ``nproc`` is 1, the filters are applied to
+            the full image; if None and ``nproc`` is larger than 1, the image
+            is split evenly among the threads.  The returned mask is
+            independent of the tiling.
 
     Returns:
         `numpy.ndarray`_: Boolean array flagging pixels with detected cosmic
@@ -163,6 +233,8 @@ def lacosmic(sciframe, saturation=None, nonlinear=1., bpm=None, varframe=None, m
         msgs.error('Bad-pixel mask must match shape of science frame.')
     if varframe is not None and varframe.shape != sciframe.shape:
         msgs.error('Variance frame must match shape of science frame.')
+    if onslit is not None and onslit.shape != sciframe.shape:
+        msgs.error('On-slit mask must match shape of science frame.')
 
     msgs.info("Detecting cosmic rays with the L.A.Cosmic algorithm")
 
@@ -199,11 +271,25 @@ def lacosmic(sciframe, saturation=None, nonlinear=1., bpm=None, varframe=None, m
                            [0.0, -1.0, 0.0]])
     # - Growth kernel
     growkernel = np.ones((3,3), dtype=bool)
+
+    # Filters applied in overlapping blocks of spectral rows; the halo is the
+    # filter radius along the spectral axis.  See tiled_filter.
+    def _tiled(func, img, halo):
+        return tiled_filter(func, img, halo, tile_nspec=tile_nspec, nproc=nproc)
+
+    def _median(size):
+        return lambda x: ndimage.filters.median_filter(x, size=size, mode='mirror')
+
+    def _laplacian(x):
+        deriv = convolve(boxcar_replicate(x, 2), laplkernel, normalize_kernel=False,
+                         boundary='extend')
+        return utils.rebin_evlist(np.clip(deriv, 0, None), x.shape)
+
     for i in range(maxiter):
 
         if varframe is None:
             msgs.info("Updating the noise model")
-            m5 = ndimage.filters.median_filter(_sciframe, size=5, mode='mirror')
+            m5 = _tiled(_median(5), _sciframe, 2)
             noise = np.sqrt(np.absolute(m5))
             # NOTE: Inverting the error avoids division by 0 errors
             _inv_err = utils.inverse(noise)
@@ -213,18 +299,22 @@ def lacosmic(sciframe, saturation=None, nonlinear=1., bpm=None, varframe=None, m
         # the 2x2 subsampling.  astropy.convolution.convolve gives the same
         # result as scipy.signal.convolve2d, but is nearly a factor of 2 faster.
         msgs.info("Convolving image with Laplacian kernel")
-        deriv = convolve(boxcar_replicate(_sciframe, 2), laplkernel, normalize_kernel=False,
-                         boundary='extend')
-        s = utils.rebin_evlist(np.clip(deriv, 0, None), _sciframe.shape) * _inv_err / 2.0 
+        s = _tiled(_laplacian, _sciframe, 1) * _inv_err / 2.0
 
         # Remove the large structures
-        sp = s - ndimage.filters.median_filter(s, size=5, mode='mirror')
+        sp = s - _tiled(_median(5), s, 2)
 
         # Candidate cosmic rays
         cosmics = sp > sigclip
         ncr = np.sum(cosmics)
         msgs.info(f'Found {ncr} candidate cosmic-ray pixels')
 
+        if onslit is not None:
+            # Only search pixels on the slits
+            cosmics &= onslit
+            ncr = np.sum(cosmics)
+            msgs.info(f'Reduced to {ncr} candidates after excluding off-slit pixels.')
+
         if _bpm is not None:
             # Remove known bad pixels
             cosmics &= np.logical_not(_bpm)
@@ -233,8 +323,8 @@ def lacosmic(sciframe, saturation=None, nonlinear=1., bpm=None, varframe=None, m
 
         if remove_compact_obj:
             # Build the fine structure image
-            m3 = ndimage.filters.median_filter(_sciframe, size=3, mode='mirror')
-            m37 = ndimage.filters.median_filter(m3, size=7, mode='mirror')
+            m3 = _tiled(_median(3), _sciframe, 1)
+            m37 = _tiled(_median(7), m3, 3)
             # TODO: How does clip treat NaNs?
             f = np.clip((m3 - m37) * _inv_err, 0.01, None)
             # Require cosmics to have significant contrast
@@ -262,6 +352,10 @@ def lacosmic(sciframe, saturation=None, nonlinear=1., bpm=None, varframe=None, m
             ncr = np.sum(cosmics)
             msgs.info(f'Reduced to {ncr} candidates after excluding known bad pixels.')
 
+        if onslit is not None:
+            # Remove neighboring pixels that fall off the slits
+            cosmics &= onslit
+
         # Determine how many new cosmics were found
         nnew = np.sum(np.logical_not(crmask) & cosmics)
         crmask |= cosmics
@@ -284,13 +378,15 @@ def lacosmic(sciframe, saturation=None, nonlinear=1., bpm=None, varframe=None, m
     #msgs.work("The following algorithm would be better on the rectified, tilts-corrected image")
     filt  = ndimage.sobel(sciframe, axis=1, mode='constant')
     _inv_mad = utils.inverse(np.sqrt(np.abs(sciframe))) # Avoid divisions by 0
-    filty = ndimage.sobel(filt * _inv_mad, axis=0, mode='constant')
+    filty = _tiled(lambda x: ndimage.sobel(x, axis=0, mode='constant'), filt * _inv_mad, 1)
     # TODO: Can we skip this now that we're not dividing by 0?
     filty[np.isnan(filty)] = 0.0
 
-    sigimg = cr_screen(filty)
+    # NOTE: cr_screen operates on full rows, so it needs no halo
+    sigimg = _tiled(cr_screen, filty, 0)
 
-    sigsmth = ndimage.filters.gaussian_filter(sigimg, 1.5)
+    # NOTE: The radius of the Gaussian filter is int(4*1.5+0.5) = 6 pixels
+    sigsmth = _tiled(lambda x: ndimage.filters.gaussian_filter(x, 1.5), sigimg, 6)
     sigsmth[np.isnan(sigsmth)] = 0.0
 
     crmask &= sigsmth > sigclip
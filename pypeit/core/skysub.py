@@ -480,7 +480,7 @@ def local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
                          debug_bkpts=False, force_gauss=False, sn_gauss=4.0, model_full_slit=False,
                          model_noise=True, show_profile=False, show_resids=False,
                          use_2dmodel_mask=True, no_local_sky=False, base_var=None,
-                         count_scale=None):
+                         count_scale=None, batch=False):
     r"""
     Perform local sky subtraction and  extraction
 
@@ -625,6 +625,12 @@ def local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
         wherever :math:`s \leq 0`, modulo the provided ``adderr``.  This is one
         of the components needed to construct the model variance; see
         ``model_noise``.
+    batch : :obj:`bool`, optional
+        Perform the optimal extractions of all objects in each extraction
+        group simultaneously using
+        :func:`~pypeit.core.extract.extract_optimal_group`, instead of one
+        object at a time.  The results are identical to within numerical
+        round-off.  The object profiles are still fit one object at a time.
 
     Returns
     -------
@@ -740,6 +746,29 @@ def local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
             msgs.info('--------------------------REDUCING: Iteration # ' + '{:2d}'.format(iiter) + ' of ' +
                       '{:2d}'.format(niter) + '---------------------------------------------------')
             img_minsky = sciimg - skyimage
+            # Sub-images used to fit the object profiles.  These are not
+            # altered while looping over the objects.
+            fit_img = img_minsky[ipix]
+            fit_ivar = (modelivar * outmask)[ipix]
+            fit_wave = waveimg[ipix]
+            fit_thismask = thismask[ipix]
+            fit_spat_pix = spat_pix[ipix]
+            fit_inmask = outmask[ipix]
+            if batch and iiter > 1:
+                # Extract all objects before fitting their profiles.  Each
+                # extraction only depends on the profile and trace of its own
+                # object, so this is equivalent to the serial order below.
+                for ii in range(objwork):
+                    iobj = group[ii]
+                    trace = sobjs[iobj].TRACE_SPAT[:, None]
+                    objmask = ((spat_img >= (trace - 2.0 * sobjs[iobj].BOX_RADIUS)) & (spat_img <= (trace + 2.0 * sobjs[iobj].BOX_RADIUS)))
+                    extract.extract_boxcar(sciimg, modelivar, (outmask & objmask), waveimg,
+                                           skyimage, sobjs[iobj], base_var=base_var,
+                                           count_scale=count_scale, noise_floor=adderr)
+                extract.extract_optimal_group(sciimg, modelivar, outmask, waveimg, skyimage,
+                                              thismask, obj_profiles, [sobjs[i] for i in group],
+                                              aper_nbox=2.0, base_var=base_var,
+                                              count_scale=count_scale, noise_floor=adderr)
             for ii in range(objwork):
                 iobj = group[ii]
                 if iiter == 1:
@@ -759,18 +788,19 @@ def local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
                     wave = sobjs[iobj].BOX_WAVE
                 else:
                     # For later iterations, profile fitting is based on an optimal extraction
-                    last_profile = obj_profiles[:, :, ii]
-                    trace = sobjs[iobj].TRACE_SPAT[:, None]
-                    objmask = ((spat_img >= (trace - 2.0 * sobjs[iobj].BOX_RADIUS)) & (spat_img <= (trace + 2.0 * sobjs[iobj].BOX_RADIUS)))
-                    # Boxcar
-                    extract.extract_boxcar(sciimg, modelivar, (outmask & objmask), waveimg,
-                                           skyimage, sobjs[iobj], base_var=base_var,
-                                           count_scale=count_scale, noise_floor=adderr)
-                    # Optimal
-                    extract.extract_optimal(sciimg, modelivar, (outmask & objmask), waveimg,
-                                            skyimage, thismask, last_profile, sobjs[iobj],
-                                            base_var=base_var, count_scale=count_scale,
-                                            noise_floor=adderr)
+                    if not batch:
+                        last_profile = obj_profiles[:, :, ii]
+                        trace = sobjs[iobj].TRACE_SPAT[:, None]
+                        objmask = ((spat_img >= (trace - 2.0 * sobjs[iobj].BOX_RADIUS)) & (spat_img <= (trace + 2.0 * sobjs[iobj].BOX_RADIUS)))
+                        # Boxcar
+                        extract.extract_boxcar(sciimg, modelivar, (outmask & objmask), waveimg,
+                                               skyimage, sobjs[iobj], base_var=base_var,
+                                               count_scale=count_scale, noise_floor=adderr)
+                        # Optimal
+                        extract.extract_optimal(sciimg, modelivar, (outmask & objmask),
+                                                waveimg, skyimage, thismask, last_profile,
+                                                sobjs[iobj], base_var=base_var,
+                                                count_scale=count_scale, noise_floor=adderr)
                     # If the extraction is bad do not update
                     if sobjs[iobj].OPT_MASK is not None:
                         # if there is only one good pixel `extract.fit_profile` fails
@@ -780,12 +810,18 @@ def local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
                             wave = sobjs[iobj].OPT_WAVE
 
                 obj_string = 'obj # {:}'.format(sobjs[iobj].OBJID) + ' on slit # {:}'.format(sobjs[iobj].slit_order) + ', iter # {:}'.format(iiter) + ':'
+                # NOTE: The profiles are fit one object at a time, even when
+                # batch is True.  Each fit is a sequence of iterative b-spline
+                # fits with rejection, and the breakpoints, fitted pixels, and
+                # number of rejection iterations all depend on the object;
+                # i.e., the objects do not share a system of equations that
+                # could be solved together.
                 if wave.any():
                     sign = sobjs[iobj].sign
                     # TODO This is "sticky" masking. Do we want it to be?
                     profile_model, trace_new, fwhmfit, med_sn2 = extract.fit_profile(
-                        sign*img_minsky[ipix], (modelivar * outmask)[ipix],waveimg[ipix], thismask[ipix], spat_pix[ipix], sobjs[iobj].TRACE_SPAT,
-                        wave, sign*flux, fluxivar, inmask = outmask[ipix],
+                        sign*fit_img, fit_ivar, fit_wave, fit_thismask, fit_spat_pix, sobjs[iobj].TRACE_SPAT,
+                        wave, sign*flux, fluxivar, inmask = fit_inmask,
                         thisfwhm=sobjs[iobj].FWHM, prof_nsigma=sobjs[iobj].prof_nsigma, sn_gauss=sn_gauss, gauss=force_gauss, obj_string=obj_string,
                         show_profile=show_profile)
                     # Update the object profile and the fwhm and mask parameters
@@ -887,19 +923,28 @@ def local_skysub_extract(sciimg, sciivar, tilts, waveimg, global_sky, thismask,
 
         # Now that the iterations of profile fitting and sky subtraction are completed,
         # loop over the objwork objects in this grouping and perform the final extractions.
+        if batch:
+            msgs.info('Extracting {:d} objects'.format(objwork) +
+                      ' on slit # {:d}'.format(sobjs[group[0]].slit_order))
+            extract.extract_optimal_group(sciimg, modelivar * thismask, outmask_extract,
+                                          waveimg, skyimage, thismask, obj_profiles,
+                                          [sobjs[i] for i in group], aper_nbox=2.0,
+                                          base_var=base_var, count_scale=count_scale,
+                                          noise_floor=adderr)
         for ii in range(objwork):
             iobj = group[ii]
-            msgs.info('Extracting obj # {:d}'.format(iobj + 1) + ' of {:d}'.format(nobj) +
-                      ' with objid = {:d}'.format(sobjs[iobj].OBJID) + ' on slit # {:d}'.format(sobjs[iobj].slit_order) +
-                      ' at x = {:5.2f}'.format(sobjs[iobj].SPAT_PIXPOS))
-            this_profile = obj_profiles[:, :, ii]
             trace = sobjs[iobj].TRACE_SPAT[:, None]
-            # Optimal
             objmask = ((spat_img >= (trace - 2.0 * sobjs[iobj].BOX_RADIUS)) & (spat_img <= (trace + 2.0 * sobjs[iobj].BOX_RADIUS)))
-            extract.extract_optimal(sciimg, modelivar * thismask, (outmask_extract & objmask),
-                                    waveimg, skyimage, thismask, this_profile, sobjs[iobj],
-                                    base_var=base_var, count_scale=count_scale,
-                                    noise_floor=adderr)
+            if not batch:
+                msgs.info('Extracting obj # {:d}'.format(iobj + 1) + ' of {:d}'.format(nobj) +
+                          ' with objid = {:d}'.format(sobjs[iobj].OBJID) + ' on slit # {:d}'.format(sobjs[iobj].slit_order) +
+                          ' at x = {:5.2f}'.format(sobjs[iobj].SPAT_PIXPOS))
+                this_profile = obj_profiles[:, :, ii]
+                # Optimal
+                extract.extract_optimal(sciimg, modelivar * thismask,
+                                        (outmask_extract & objmask), waveimg, skyimage,
+                                        thismask, this_profile, sobjs[iobj], base_var=base_var,
+                                        count_scale=count_scale, noise_floor=adderr)
             # Boxcar
             extract.extract_boxcar(sciimg, modelivar*thismask, (outmask_extract & objmask),
                                    waveimg, skyimage, sobjs[iobj], base_var=base_var,
@@ -957,7 +1002,7 @@ def ech_local_skysub_extract(sciimg, sciivar, fullmask, tilts, waveimg, global_s
                              force_gauss=False, sn_gauss=4.0, model_full_slit=False,
                              model_noise=True, debug_bkpts=False, show_profile=False,
                              show_resids=False, show_fwhm=False, adderr=0.01, base_var=None,
-                             count_scale=None):
+                             count_scale=None, batch=False):
     """
     Perform local sky subtraction, profile fitting, and optimal extraction slit by slit
 
@@ -1040,6 +1085,9 @@ def ech_local_skysub_extract(sciimg, sciivar, fullmask, tilts, waveimg, global_s
         array is not positive, modulo the provided ``adderr``.  This is one of
         the components needed to construct the model variance; see
         ``model_noise``.
+    batch : :obj:`bool`, optional
+        Extract all objects in each extraction group simultaneously.  See
+        :func:`local_skysub_extract`.
 
     Returns:
         skymodel, objmodel, ivarmodel, outmask, sobjs
@@ -1179,7 +1227,8 @@ def ech_local_skysub_extract(sciimg, sciivar, fullmask, tilts, waveimg, global_s
                                        sn_gauss=sn_gauss, model_full_slit=model_full_slit,
                                        model_noise=model_noise, debug_bkpts=debug_bkpts,
                                        show_resids=show_resids, show_profile=show_profile,
-                                       adderr=adderr, base_var=base_var, count_scale=count_scale)
+                                       adderr=adderr, base_var=base_var, count_scale=count_scale,
+                                       batch=batch)
 
         # update the FWHM fitting vector for the brighest object
         indx = (sobjs.ECH_OBJID == uni_objid[ibright]) & (sobjs.ECH_ORDERINDX == iord)
@@ -5,6 +5,12 @@
 """
 import os
 import sys
+import json
+import functools
+import shutil
+import hashlib
+
+from pkg_resources import resource_filename
 
 from IPython import embed
 
@@ -83,7 +89,8 @@ def pca_eval(theta,pca_dict):
     Args:
         theta (`numpy.ndarray`_):
           Parameter vector, where theta_pca[0] is redshift, theta_pca[1] is the normalization, and
-          theta_pca[2:npca+1] are the PCA coefficients, where npca is the PCA dimensionality
+          theta_pca[2:npca+1] are the PCA coefficients, where npca is the PCA dimensionality.  Can also be a 2D
+          array with one parameter vector per row, to evaluate a set of models at once.
         pca_dict (dict):
           Dictionary continaing the PCA information generated by init_pca
 
@@ -95,6 +102,16 @@ def pca_eval(theta,pca_dict):
     z_fid = pca_dict['z_fid']
     dloglam = pca_dict['dloglam']
     npca = pca_dict['npca']  # Size of the PCA currently being used, original PCA in the dict could be larger
+    if np.ndim(theta) > 1:
+        # Rolling the components and the linear combination commute, so
+        # combine the components for all vectors and then roll each model
+        z_qso = theta[:,0]
+        norm = theta[:,1]
+        A = np.hstack((np.ones((theta.shape[0],1)), theta[:,2:]))
+        dshift = np.round(np.log10((1.0 + z_qso)/(1.0 + z_fid))/dloglam).astype(int)
+        nspec = C.shape[1]
+        indx = (np.arange(nspec)[None,:] - dshift[:,None]) % nspec
+        return norm[:,None]*np.exp(np.take_along_axis(np.dot(A, C[:npca,:]), indx, axis=1))
     z_qso = theta[0]
     norm = theta[1]
     A = theta[2:]
@@ -131,13 +148,77 @@ def pca_eval(theta,pca_dict):
 #    return gaussian_mixture_model.score_samples(A.reshape(1,-1))
 
 
-def read_telluric_grid(filename, wave_min=None, wave_max=None, pad_frac=0.10):
+telluric_grid_store_path = os.path.join(resource_filename('pypeit', 'data/telluric/atm_grids'),
+                                        'store')
+"""
+Default directory for the memory-mapped stores of the telluric grids; see
+:class:`TelluricGridStore`.
+"""
+
+
+def telluric_grid_axes(hdr):
+    """
+    Construct the pressure, temperature, humidity, and airmass vectors
+    sampled by a telluric grid.
+
+    Args:
+        hdr (`astropy.io.fits.Header`_, :obj:`dict`):
+            Primary header of the telluric grid file, or a dictionary with
+            the relevant header keywords.
+
+    Returns:
+        :obj:`tuple`: The pressure, temperature, humidity, and airmass
+        vectors.
+    """
+    pg = hdr['PRES0']+hdr['DPRES']*np.arange(0,hdr['NPRES'])
+    tg = hdr['TEMP0']+hdr['DTEMP']*np.arange(0,hdr['NTEMP'])
+    hg = hdr['HUM0']+hdr['DHUM']*np.arange(0,hdr['NHUM'])
+    if hdr['NAM'] > 1:
+        ag = hdr['AM0']+hdr['DAM']*np.arange(0,hdr['NAM'])
+    else:
+        ag = hdr['AM0']+1*np.arange(0,1)
+    return pg, tg, hg, ag
+
+
+def telluric_grid_limits(wave_grid_full, wave_min=None, wave_max=None, pad_frac=0.10):
+    """
+    Return the index range of the telluric grid within a (padded) wavelength
+    range.
+
+    Args:
+        wave_grid_full (`numpy.ndarray`_):
+            Wavelength vector of the full telluric grid.
+        wave_min (:obj:`float`, optional):
+            Minimum wavelength at which the grid is desired
+        wave_max (:obj:`float`, optional):
+            Maximum wavelength at which the grid is desired.
+        pad_frac (:obj:`float`, optional):
+            Fractional padding added to the wavelength limits; see
+            :func:`read_telluric_grid`.
+
+    Returns:
+        :obj:`tuple`: The first index included in the grid and the index
+        just beyond the last one (i.e., to be used as the end of a slice).
+    """
+    ind_lower = np.argmin(np.abs(wave_grid_full - (1.0 - pad_frac)*wave_min)) \
+                    if wave_min is not None else 0
+    ind_upper = np.argmin(np.abs(wave_grid_full - (1.0 + pad_frac)*wave_max)) \
+                    if wave_max is not None else wave_grid_full.size
+    return int(ind_lower), int(ind_upper)
+
+
+def read_telluric_grid(filename, wave_min=None, wave_max=None, pad_frac=0.10, resln_ladder=None):
     """
     Reads in the telluric grid from a file.
 
     Optionally, this method also trims the grid to be in within ``wave_min``
     and ``wave_max`` and pads the data (see ``pad_frac``).
 
+    The grid is read from its memory-mapped store (see
+    :func:`get_telluric_grid_store`), such that the trimmed grid is only
+    extracted from the (large) grid file the first time it is requested.
+    If the store cannot be used, the grid is read directly from the file.
+
     .. todo::
         List and describe the contents of the dictionary in the return
         description.
@@ -154,6 +235,12 @@ def read_telluric_grid(filename, wave_min=None, wave_max=None, pad_frac=0.10):
            ``wave_min`` or ``wave_max`` are input; ignored otherwise. The
            resulting grid will extend from ``(1.0 - pad_frac)*wave_min`` to
            ``(1.0 + pad_frac)*wave_max``.
+        resln_ladder (array-like, optional):
+           Sorted spectral resolutions at which to preconvolve the grid (see
+           :func:`preconvolve_telluric_grid`).  If provided, the dictionary
+           also includes the ``resln_ladder`` and the preconvolved grid,
+           ``tell_grid_conv``, which :func:`eval_telluric` interpolates
+           instead of convolving the model at every call.
 
     Returns:
         :obj:`dict`: Dictionary containing the telluric grid.
@@ -162,32 +249,333 @@ def read_telluric_grid(filename, wave_min=None, wave_max=None, pad_frac=0.10):
     if not os.path.isfile(filename):
         msgs.error(f"File {filename} is not on your disk.  You likely need to download the Telluric files.  See https://pypeit.readthedocs.io/en/release/installing.html#atmospheric-model-grids")
 
+    store = get_telluric_grid_store(filename)
+    if store is not None:
+        return store.subgrid(wave_min=wave_min, wave_max=wave_max, pad_frac=pad_frac,
+                             resln_ladder=resln_ladder)
+
     hdul = io.fits_open(filename)
     wave_grid_full = 10.0*hdul[1].data
     model_grid_full = hdul[0].data
-    nspec_full = wave_grid_full.size
 
-    ind_lower = np.argmin(np.abs(wave_grid_full - (1.0 - pad_frac)*wave_min)) \
-                    if wave_min is not None else 0
-    ind_upper = np.argmin(np.abs(wave_grid_full - (1.0 + pad_frac)*wave_max)) \
-                    if wave_max is not None else nspec_full
+    ind_lower, ind_upper = telluric_grid_limits(wave_grid_full, wave_min=wave_min,
+                                                wave_max=wave_max, pad_frac=pad_frac)
     wave_grid = wave_grid_full[ind_lower:ind_upper]
     model_grid = model_grid_full[...,ind_lower:ind_upper]
 
-    pg = hdul[0].header['PRES0']+hdul[0].header['DPRES']*np.arange(0,hdul[0].header['NPRES'])
-    tg = hdul[0].header['TEMP0']+hdul[0].header['DTEMP']*np.arange(0,hdul[0].header['NTEMP'])
-    hg = hdul[0].header['HUM0']+hdul[0].header['DHUM']*np.arange(0,hdul[0].header['NHUM'])
-    if hdul[0].header['NAM'] > 1:
-        ag = hdul[0].header['AM0']+hdul[0].header['DAM']*np.arange(0,hdul[0].header['NAM'])
-    else:
-        ag = hdul[0].header['AM0']+1*np.arange(0,1)
+    pg, tg, hg, ag = telluric_grid_axes(hdul[0].header)
 
     dwave, dloglam, resln_guess, pix_per_sigma = wvutils.get_sampling(wave_grid)
     tell_pad_pix = int(np.ceil(10.0 * pix_per_sigma))
 
-    return dict(wave_grid=wave_grid, dloglam=dloglam, resln_guess=resln_guess,
-                pix_per_sigma=pix_per_sigma, tell_pad_pix=tell_pad_pix, pressure_grid=pg,
-                temp_grid=tg, h2o_grid=hg, airmass_grid=ag, tell_grid=model_grid)
+    tell_dict = dict(wave_grid=wave_grid, dloglam=dloglam, resln_guess=resln_guess,
+                     pix_per_sigma=pix_per_sigma, tell_pad_pix=tell_pad_pix, pressure_grid=pg,
+                     temp_grid=tg, h2o_grid=hg, airmass_grid=ag, tell_grid=model_grid)
+    if resln_ladder is not None:
+        tell_dict['resln_ladder'] = np.asarray(resln_ladder, dtype=float)
+        tell_dict['tell_grid_conv'] = preconvolve_telluric_grid(model_grid, dloglam,
+                                                                tell_dict['resln_ladder'])
+    return tell_dict
+
+
+class TelluricGridStore:
+    """
+    Memory-mapped store of a telluric grid, of the grid trimmed to the
+    wavelength ranges that have been requested, and of the trimmed grids
+    preconvolved to a set of spectral resolutions.
+
+    The telluric grids are large, and most of the grid is typically outside
+    the wavelength range of any given instrument.  The store keeps the
+    wavelength vector of the grid and, for each wavelength range requested
+    by :func:`subgrid`, the trimmed model grid as ``.npy`` files that are
+    read with ``mmap_mode='r'``.  The trimmed grids are extracted from the
+    grid file only once, and all processes using the store share the same
+    (page-cached) data.  The same applies to the preconvolved grids.
+
+    Because of the size of the grid files, the store is identified with the
+    grid file by its size and modification time instead of a checksum.  The
+    store is rebuilt if either changes.
+
+    The trimmed and preconvolved grids are kept until their total size
+    exceeds :attr:`max_size`; the least recently used grids are then removed
+    from the store.
+
+    Args:
+        telgrid (:obj:`str`):
+            Name of the telluric grid file.
+        store_path (:obj:`str`, optional):
+            Directory with the stores of all grid files.  If None, use
+            :attr:`telluric_grid_store_path`.
+        max_size (:obj:`int`, optional):
+            Maximum size in bytes of the trimmed and preconvolved grids in
+            the store.  If None, use the class attribute :attr:`max_size`.
+
+    Attributes:
+        telgrid (:obj:`str`):
+            Full path to the telluric grid file.
+        directory (:obj:`str`):
+            Directory with the store for this grid file.
+        params (:obj:`dict`):
+            Store version and grid file identification.
+        header (:obj:`dict`):
+            Header keywords of the grid file that define the parameter
+            grid; see :func:`telluric_grid_axes`.
+    """
+    version = 1
+    """
+    Version of the store format.  Stores with a different version are rebuilt.
+    """
+
+    max_size = 8*2**30
+    """
+    Default maximum size in bytes of the trimmed and preconvolved grids in
+    the store.
+    """
+
+    header_keys = ['PRES0', 'DPRES', 'NPRES', 'TEMP0', 'DTEMP', 'NTEMP', 'HUM0', 'DHUM', 'NHUM',
+                   'AM0', 'DAM', 'NAM']
+    """
+    Header keywords that define the parameter grid.
+    """
+
+    def __init__(self, telgrid, store_path=None, max_size=None):
+        self.telgrid = os.path.abspath(telgrid)
+        if max_size is not None:
+            self.max_size = max_size
+        self.directory = os.path.join(telluric_grid_store_path if store_path is None
+                                      else os.path.abspath(store_path),
+                                      os.path.basename(self.telgrid))
+        stat = os.stat(self.telgrid)
+        self.params = dict(version=self.version, telgrid=os.path.basename(self.telgrid),
+                           size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        if self._read_json('params.json') != self.params:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(os.path.dirname(self.directory), exist_ok=True)
+        self.wave_grid = io.load_npy_dir(self.directory, self._build, self.params)['wave_grid']
+        self.header = self._read_json('header.json')
+        self._subgrids = {}
+
+    def _read_json(self, filename):
+        """Read a json file in the store; returns None if it can't be read."""
+        try:
+            with open(os.path.join(self.directory, filename), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _build(self, tmpdir):
+        """
+        Build the store in the provided (temporary) directory.
+        """
+        msgs.info('Building the memory-mapped store of {0}'.format(
+                  os.path.basename(self.telgrid)))
+        with io.fits_open(self.telgrid) as hdul:
+            np.save(os.path.join(tmpdir, 'wave_grid.npy'), 10.0*hdul[1].data)
+            header = {key: hdul[0].header[key] for key in self.header_keys}
+        with open(os.path.join(tmpdir, 'header.json'), 'w') as f:
+            json.dump(header, f)
+        os.makedirs(os.path.join(tmpdir, 'subgrids'))
+
+    def subgrid(self, wave_min=None, wave_max=None, pad_frac=0.10, resln_ladder=None):
+        """
+        Return the telluric grid trimmed to a wavelength range.
+
+        The arguments and returned dictionary are the same as for
+        :func:`read_telluric_grid`.  The trimmed grid is extracted from the
+        grid file and added to the store the first time it is requested.  If
+        the grids cannot be added to the store (e.g., the store is
+        read-only), they are held in memory instead.
+        """
+        ind_lower, ind_upper = telluric_grid_limits(self.wave_grid, wave_min=wave_min,
+                                                    wave_max=wave_max, pad_frac=pad_frac)
+        path = os.path.join(self.directory, 'subgrids', '{0}_{1}'.format(ind_lower, ind_upper))
+        if path in self._subgrids and isinstance(self._subgrids[path]['tell_grid'], np.memmap) \
+                and not os.path.isdir(path):
+            # Removed from the store by another process
+            del self._subgrids[path]
+        if path not in self._subgrids:
+            def read_grid():
+                with io.fits_open(self.telgrid) as hdul:
+                    model_grid = hdul[0].data[...,ind_lower:ind_upper]
+                    return model_grid.astype(model_grid.dtype.newbyteorder('='))
+
+            def build(tmpdir):
+                msgs.info('Adding the telluric grid for pixels {0}-{1} to the store'.format(
+                          ind_lower, ind_upper))
+                np.save(os.path.join(tmpdir, 'tell_grid.npy'), read_grid())
+
+            try:
+                tell_grid = io.load_npy_dir(path, build, dict(ind_lower=ind_lower,
+                                                              ind_upper=ind_upper))['tell_grid']
+            except OSError as e:
+                msgs.warn('Unable to add the telluric grid for pixels {0}-{1} to the store: '
+                          '{2}'.format(ind_lower, ind_upper, e))
+                tell_grid = read_grid()
+            wave_grid = np.array(self.wave_grid[ind_lower:ind_upper])
+            pg, tg, hg, ag = telluric_grid_axes(self.header)
+            dwave, dloglam, resln_guess, pix_per_sigma = wvutils.get_sampling(wave_grid)
+            tell_pad_pix = int(np.ceil(10.0 * pix_per_sigma))
+            self._subgrids[path] = dict(wave_grid=wave_grid, dloglam=dloglam,
+                                        resln_guess=resln_guess, pix_per_sigma=pix_per_sigma,
+                                        tell_pad_pix=tell_pad_pix, pressure_grid=pg, temp_grid=tg,
+                                        h2o_grid=hg, airmass_grid=ag, tell_grid=tell_grid)
+        self._touch(path)
+        tell_dict = self._subgrids[path].copy()
+        if resln_ladder is None:
+            self._prune(keep=[path])
+            return tell_dict
+
+        tell_dict['resln_ladder'] = np.asarray(resln_ladder, dtype=float)
+        key = hashlib.sha1(tell_dict['resln_ladder'].tobytes()).hexdigest()[:16]
+
+        def build(tmpdir):
+            msgs.info('Preconvolving the telluric grid to {0} resolutions'.format(
+                      tell_dict['resln_ladder'].size))
+            tell_grid = tell_dict['tell_grid']
+            out = np.lib.format.open_memmap(os.path.join(tmpdir, 'tell_grid_conv.npy'),
+                                            mode='w+', dtype=tell_grid.dtype,
+                                            shape=(tell_dict['resln_ladder'].size,)
+                                                    + tell_grid.shape)
+            preconvolve_telluric_grid(tell_grid, tell_dict['dloglam'], tell_dict['resln_ladder'],
+                                      out=out)
+            out.flush()
+
+        ladder_path = os.path.join(path, 'resln_{0}'.format(key))
+        try:
+            tell_dict['tell_grid_conv'] \
+                    = io.load_npy_dir(ladder_path, build,
+                                      dict(resln_ladder=tell_dict['resln_ladder'].tolist())
+                                      )['tell_grid_conv']
+        except OSError as e:
+            msgs.warn('Unable to add the preconvolved telluric grid to the store: {0}'.format(e))
+            tell_dict['tell_grid_conv'] \
+                    = preconvolve_telluric_grid(tell_dict['tell_grid'], tell_dict['dloglam'],
+                                                tell_dict['resln_ladder'])
+        self._touch(ladder_path)
+        self._prune(keep=[path, ladder_path])
+        return tell_dict
+
+    @staticmethod
+    def _touch(path):
+        """Record the use of a grid in the store by updating its modification time."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _prune(self, keep=None):
+        """
+        Remove the least recently used trimmed and preconvolved grids until
+        their total size is no larger than :attr:`max_size`.
+
+        Removing a trimmed grid also removes the grids preconvolved from it.
+        Grids that are still memory-mapped remain readable by the processes
+        that use them until they are closed.
+
+        Args:
+            keep (:obj:`list`, optional):
+                Directories of grids that must not be removed.
+        """
+        _keep = [] if keep is None else keep
+        subgrids = os.path.join(self.directory, 'subgrids')
+        entries = []
+        for root, dirs, files in os.walk(subgrids):
+            # Ignore directories that are being built
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            if root == subgrids:
+                continue
+            try:
+                entries += [[os.path.getmtime(root), root,
+                             sum([os.path.getsize(os.path.join(root, f)) for f in files])]]
+            except OSError:
+                # Removed by another process
+                continue
+        total = np.sum([entry[2] for entry in entries])
+        for _, root, _ in sorted(entries):
+            if total <= self.max_size:
+                break
+            if not os.path.isdir(root) \
+                    or any([k == root or k.startswith(root + os.sep) for k in _keep]):
+                continue
+            msgs.info('Removing {0} from the telluric grid store'.format(
+                      os.path.relpath(root, self.directory)))
+            shutil.rmtree(root, ignore_errors=True)
+            self._subgrids.pop(root, None)
+            for entry in entries:
+                if entry[1] == root or entry[1].startswith(root + os.sep):
+                    total -= entry[2]
+                    entry[2] = 0
+
+
+_telluric_grid_stores = {}
+
+
+def get_telluric_grid_store(telgrid, store_path=None):
+    """
+    Return the memory-mapped store of a telluric grid.
+
+    Stores are cached, such that all calls in the same process for an
+    unchanged grid file return the same object.
+
+    Args:
+        telgrid (:obj:`str`):
+            Name of the telluric grid file.
+        store_path (:obj:`str`, optional):
+            Directory with the stores of all grid files.  If None, use
+            :attr:`telluric_grid_store_path`.
+
+    Returns:
+        :class:`TelluricGridStore`: The store, or None if the store could
+        not be built (e.g., because the store directory is not writeable).
+    """
+    stat = os.stat(telgrid)
+    key = (os.path.abspath(telgrid), store_path, stat.st_size, stat.st_mtime_ns)
+    if key not in _telluric_grid_stores:
+        try:
+            _telluric_grid_stores[key] = TelluricGridStore(telgrid, store_path=store_path)
+        except OSError as e:
+            msgs.warn('Unable to use the memory-mapped store of {0}: {1}'.format(
+                      os.path.basename(telgrid), e))
+            _telluric_grid_stores[key] = None
+    return _telluric_grid_stores[key]
+
+
+def telluric_grid_index(theta, tell_dict):
+    """
+    Return the indices of the grid point nearest to the specified location
+    in parameter space.
+
+    Args:
+        theta (`numpy.ndarray`_):
+            A 4-element vector with the telluric model parameters: pressure,
+            temperature, humidity, and airmass.  Can also be a 2D array with
+            shape :math:`(N_{\rm vec}, 4)` to get the indices of a set of
+            parameter vectors.
+        tell_dict (dict):
+            Dictionary containing the telluric grid. See
+            :func:`read_telluric_grid`.
+
+    Returns:
+        :obj:`tuple`: The pressure, temperature, humidity, and airmass
+        indices.  For a 2D ``theta``, each is an integer array with one
+        element per parameter vector.
+    """
+    if np.shape(theta)[-1] != 4:
+        msgs.error('Input parameter vector must have 4 and only 4 values.')
+    pg = tell_dict['pressure_grid']
+    tg = tell_dict['temp_grid']
+    hg = tell_dict['h2o_grid']
+    ag = tell_dict['airmass_grid']
+    if np.ndim(theta) > 1:
+        return tuple(np.round((x-g[0])/(g[1]-g[0])).astype(int) if len(g) > 1
+                        else np.zeros(x.size, dtype=int)
+                     for x, g in zip(np.asarray(theta).T, [pg, tg, hg, ag]))
+    p, t, h, a = theta
+    pi = int(np.round((p-pg[0])/(pg[1]-pg[0]))) if len(pg) > 1 else 0
+    ti = int(np.round((t-tg[0])/(tg[1]-tg[0]))) if len(tg) > 1 else 0
+    hi = int(np.round((h-hg[0])/(hg[1]-hg[0]))) if len(hg) > 1 else 0
+    ai = int(np.round((a-ag[0])/(ag[1]-ag[0]))) if len(ag) > 1 else 0
+    return pi, ti, hi, ai
 
 
 def interp_telluric_grid(theta, tell_dict):
@@ -214,18 +602,49 @@ def interp_telluric_grid(theta, tell_dict):
         position in parameter space. The telluric model is provided over all
         available wavelengths in ``tell_dict``.
     """
-    if len(theta) != 4:
-        msgs.error('Input parameter vector must have 4 and only 4 values.')
-    pg = tell_dict['pressure_grid']
-    tg = tell_dict['temp_grid']
-    hg = tell_dict['h2o_grid']
-    ag = tell_dict['airmass_grid']
-    p, t, h, a = theta
-    pi = int(np.round((p-pg[0])/(pg[1]-pg[0]))) if len(pg) > 1 else 0
-    ti = int(np.round((t-tg[0])/(tg[1]-tg[0]))) if len(tg) > 1 else 0
-    hi = int(np.round((h-hg[0])/(hg[1]-hg[0]))) if len(hg) > 1 else 0
-    ai = int(np.round((a-ag[0])/(ag[1]-ag[0]))) if len(ag) > 1 else 0
-    return tell_dict['tell_grid'][pi,ti,hi,ai]
+    return tell_dict['tell_grid'][telluric_grid_index(theta, tell_dict)]
+
+
+def interp_telluric_ladder(theta, tell_dict, ind_lower, ind_upper):
+    """
+    Evaluate the resolution-convolved telluric model using the grid
+    preconvolved to a ladder of resolutions.
+
+    The model is taken from the nearest grid point in pressure,
+    temperature, humidity, and airmass (see :func:`interp_telluric_grid`)
+    and linearly interpolated between the two bracketing resolutions of the
+    ladder.  The interpolation is linear in :math:`R^{-2}`, which is
+    proportional to the variance of the convolution kernel; for closely
+    spaced resolutions, this closely approximates the convolution of the
+    model at the requested resolution (see :func:`conv_telluric`).
+
+    Args:
+        theta (`numpy.ndarray`_):
+            A 5-element vector with the telluric model parameters: pressure,
+            temperature, humidity, airmass, and resolution.  The resolution
+            must be within the range of the ladder.  Can also be a 2D array
+            with shape :math:`(N_{\rm vec}, 5)` to evaluate a set of
+            parameter vectors.
+        tell_dict (dict):
+            Dictionary containing the telluric grid and the preconvolved
+            grid. See :func:`read_telluric_grid`.
+        ind_lower (:obj:`int`):
+            The index of the first pixel to include in the model.
+        ind_upper (:obj:`int`):
+            The index (inclusive) of the last pixel to include in the model.
+
+    Returns:
+        `numpy.ndarray`_: The convolved telluric model.  For a 2D
+        ``theta``, the shape is :math:`(N_{\rm vec}, N_{\rm pix})`.
+    """
+    ladder = tell_dict['resln_ladder']
+    theta = np.asarray(theta)
+    indx = telluric_grid_index(theta[...,:4], tell_dict)
+    k = np.clip(np.searchsorted(ladder, theta[...,4]) - 1, 0, ladder.size-2)
+    frac = (theta[...,4]**-2 - ladder[k]**-2)/(ladder[k+1]**-2 - ladder[k]**-2)
+    model_lo = tell_dict['tell_grid_conv'][(k,)+indx+(slice(ind_lower,ind_upper+1),)]
+    model_hi = tell_dict['tell_grid_conv'][(k+1,)+indx+(slice(ind_lower,ind_upper+1),)]
+    return model_lo + np.expand_dims(frac, -1)*(model_hi - model_lo)
 
 
 def conv_telluric(tell_model, dloglam, res):
@@ -236,29 +655,86 @@ def conv_telluric(tell_model, dloglam, res):
         tell_model (`numpy.ndarray`_):
             Input telluric model at the native resolution of the telluric model grid. The shape of this input is in
             general  different from the size of the telluric grid (read in by read_telluric_grid above) because it is
-            trimmed to relevant wavelenghts using ind_lower, ind_upper. See eval_telluric below.
+            trimmed to relevant wavelenghts using ind_lower, ind_upper. See eval_telluric below.  Can also be a 2D
+            array with one model per row, each convolved to the corresponding resolution in ``res``.
         dloglam (float):
             Wavelength spacing of the telluric grid expressed as a a dlog10(lambda), i.e. stored in the
             tell_dict as tell_dict['dloglam']
-        res (float):
+        res (float, `numpy.ndarray`_):
             Desired resolution expressed as lambda/dlambda. Note that here dlambda is linear, whereas dloglam is
-            the delta of the log10.
+            the delta of the log10.  Must be an array with one element per row for a 2D ``tell_model``.
 
     Returns:
         convolved_model (`numpy.ndarray`_):
             Resolution convolved telluric model. Shape = same size as input tell_model.
 
     """
+    if tell_model.ndim > 1:
+        # Place the kernels in a common array, offset such that the 'same'
+        # convolution with the padded kernel selects the same pixels as with
+        # the original kernel, and convolve all the models at once
+        kernels = [conv_telluric_kernel(dloglam, r) for r in res]
+        nkern = max(g.size for g in kernels)
+        g = np.zeros((len(kernels), nkern), dtype=float)
+        for i, _g in enumerate(kernels):
+            offset = (nkern-1)//2 - (_g.size-1)//2
+            g[i,offset:offset+_g.size] = _g
+        return scipy.signal.fftconvolve(tell_model, g, mode='same', axes=-1)
+    conv_model = scipy.signal.convolve(tell_model,conv_telluric_kernel(dloglam, res),mode='same')
+    return conv_model
+
 
+def conv_telluric_kernel(dloglam, res):
+    """
+    Construct the Gaussian kernel used by :func:`conv_telluric`.
+
+    Args:
+        dloglam (float):
+            Wavelength spacing of the telluric grid expressed as a a
+            dlog10(lambda).
+        res (float):
+            Desired resolution expressed as lambda/dlambda.
+
+    Returns:
+        `numpy.ndarray`_: The kernel, which extends to 4 sigma on either
+        side of its center.
+    """
     pix_per_sigma = 1.0/res/(dloglam*np.log(10.0))/(2.0 * np.sqrt(2.0 * np.log(2))) # number of dloglam pixels per 1 sigma dispersion
     sig2pix = 1.0/pix_per_sigma # number of sigma per 1 pix
     #conv_model = scipy.ndimage.filters.gaussian_filter1d(tell_model, pix)
     # x = loglam/sigma on the wavelength grid from -4 to 4, symmetric, centered about zero.
     x = np.hstack([-1*np.flip(np.arange(sig2pix,4,sig2pix)),np.arange(0,4,sig2pix)])
     # g = Gaussian evaluated at x, sig2pix multiplied in to properly normalize the convolution
-    g = (1.0/(np.sqrt(2*np.pi)))*np.exp(-0.5*(x)**2)*sig2pix
-    conv_model = scipy.signal.convolve(tell_model,g,mode='same')
-    return conv_model
+    return (1.0/(np.sqrt(2*np.pi)))*np.exp(-0.5*(x)**2)*sig2pix
+
+def preconvolve_telluric_grid(tell_grid, dloglam, resln_ladder, out=None):
+    """
+    Convolve all the models in a telluric grid to a set of resolutions.
+
+    Args:
+        tell_grid (`numpy.ndarray`_):
+            The telluric model grid, with the wavelength along the last axis.
+        dloglam (float):
+            Wavelength spacing of the telluric grid expressed as a a
+            dlog10(lambda).
+        resln_ladder (`numpy.ndarray`_):
+            The resolutions, expressed as lambda/dlambda.
+        out (`numpy.ndarray`_, optional):
+            Array for the result, e.g., a memory-mapped array.  Shape must be
+            ``(resln_ladder.size,) + tell_grid.shape``.
+
+    Returns:
+        `numpy.ndarray`_: The convolved grids, with one grid per
+        resolution along the first axis.
+    """
+    if out is None:
+        out = np.empty((len(resln_ladder),)+tell_grid.shape, dtype=tell_grid.dtype)
+    nspec = tell_grid.shape[-1]
+    for i, res in enumerate(resln_ladder):
+        _out = out[i].reshape(-1, nspec)
+        for j, tell_model in enumerate(tell_grid.reshape(-1, nspec)):
+            _out[j] = conv_telluric(tell_model, dloglam, res)
+    return out
 
 def shift_telluric(tell_model, loglam, dloglam, shift, stretch):
     """
@@ -279,11 +755,28 @@ def shift_telluric(tell_model, loglam, dloglam, shift, stretch):
             Desired shift.  Note that this shift can be sub-pixel.
         stretch (float):
             Desired stretch.
+
+    If ``tell_model`` is a 2D array with one model per row, ``shift`` and
+    ``stretch`` must be arrays with one element per row.
+
     Returns:
         shifted_model (`numpy.ndarray`_):
             Shifted telluric model. Shape = same size as input tell_model.
 
     """
+    if tell_model.ndim > 1:
+        # Linearly interpolate all the models at once, as done by np.interp
+        # for a single model.  The grid is uniform in loglam, such that the
+        # shifted pixel coordinates give the interpolation interval directly.
+        nspec = loglam.size
+        pix_shift = np.arange(nspec) * stretch[:,None] + shift[:,None]
+        pix_shift = np.clip(pix_shift, 0, nspec-1)
+        j = np.fmin(pix_shift.astype(int), nspec-2)
+        frac = pix_shift - j
+        j += nspec * np.arange(tell_model.shape[0])[:,None]
+        flat_model = tell_model.ravel()
+        model_lo = flat_model[j]
+        return model_lo + (flat_model[j+1] - model_lo) * frac
     loglam_shift = loglam[0] + np.arange(len(loglam)) * dloglam * stretch + shift * dloglam
     #loglam_shift = loglam + shift*dloglam
     tell_model_shift = np.interp(loglam_shift, loglam, tell_model)
@@ -309,14 +802,20 @@ def eval_telluric(theta_tell, tell_dict, ind_lower=None, ind_upper=None):
           humidity, airmass)
 
        2. convolution of the atmosphere model to the resolution set by
-          the spectral resolution.
+          the spectral resolution.  If ``tell_dict`` includes a grid
+          preconvolved to a ladder of resolutions that brackets the
+          requested one, the convolution is replaced by an interpolation
+          between the preconvolved models (see
+          :func:`interp_telluric_ladder`).
 
        3. (Optional) shift and stretch the telluric model.
 
     Args:
         theta_tell (`numpy.ndarray`_):
             Vector with the telluric model parameters. Must be 5 or 7
-            elements long. See method description.
+            elements long. See method description.  Can also be a 2D array
+            with shape :math:`(N_{\rm vec}, 5)` or :math:`(N_{\rm vec}, 7)`
+            to evaluate the model for a set of parameter vectors at once.
         tell_dict (:obj:`dict`):
             Dictionary containing the telluric grid data. See
             :func:`read_telluric_grid`.
@@ -333,14 +832,14 @@ def eval_telluric(theta_tell, tell_dict, ind_lower=None, ind_upper=None):
 
     Returns:
         `numpy.ndarray`_: Telluric model evaluated at the desired location
-        theta_tell in model atmosphere parameter space.
+        theta_tell in model atmosphere parameter space.  For a 2D
+        ``theta_tell``, the shape is :math:`(N_{\rm vec}, N_{\rm pix})`.
     """
-    ntheta = len(theta_tell)
+    theta_tell = np.asarray(theta_tell)
+    ntheta = theta_tell.shape[-1]
     if ntheta not in [5, 7]:
         msgs.error('Input model atmosphere parameters must have length 5 or 7.')
 
-    tellmodel_hires = interp_telluric_grid(theta_tell[:4], tell_dict)
-
     # Set the wavelength range if not provided
     ind_lower = 0 if ind_lower is None else ind_lower
     ind_upper = tell_dict['wave_grid'].size - 1 if ind_upper is None else ind_upper
@@ -351,15 +850,36 @@ def eval_telluric(theta_tell, tell_dict, ind_lower=None, ind_upper=None):
     ## FW: There is an extreme case with ind_upper == ind_upper_pad, the previous -0 won't work
     ind_lower_final = ind_lower_pad if ind_lower_pad == ind_lower else ind_lower - ind_lower_pad
     ind_upper_final = ind_upper_pad if ind_upper_pad == ind_upper else ind_upper - ind_upper_pad
-    tellmodel_conv = conv_telluric(tellmodel_hires[ind_lower_pad:ind_upper_pad+1],
-                                   tell_dict['dloglam'], theta_tell[4])
+    ladder = tell_dict.get('resln_ladder')
+    in_ladder = np.zeros(theta_tell.shape[:-1], dtype=bool) \
+                    if ladder is None or ladder.size < 2 \
+                    else (theta_tell[...,4] >= ladder[0]) & (theta_tell[...,4] <= ladder[-1])
+    if theta_tell.ndim > 1:
+        tellmodel_conv = np.empty((theta_tell.shape[0], ind_upper_pad-ind_lower_pad+1),
+                                  dtype=float)
+        if np.any(in_ladder):
+            tellmodel_conv[in_ladder] = interp_telluric_ladder(theta_tell[in_ladder,:5], tell_dict,
+                                                               ind_lower_pad, ind_upper_pad)
+        convolve = np.logical_not(in_ladder)
+        if np.any(convolve):
+            indx = telluric_grid_index(theta_tell[convolve,:4], tell_dict)
+            tellmodel_hires = tell_dict['tell_grid'][indx+(slice(ind_lower_pad,ind_upper_pad+1),)]
+            tellmodel_conv[convolve] = conv_telluric(tellmodel_hires, tell_dict['dloglam'],
+                                                     theta_tell[convolve,4])
+    elif in_ladder:
+        tellmodel_conv = interp_telluric_ladder(theta_tell[:5], tell_dict, ind_lower_pad,
+                                                ind_upper_pad)
+    else:
+        tellmodel_hires = interp_telluric_grid(theta_tell[:4], tell_dict)
+        tellmodel_conv = conv_telluric(tellmodel_hires[ind_lower_pad:ind_upper_pad+1],
+                                       tell_dict['dloglam'], theta_tell[4])
     if ntheta == 5:
-        return tellmodel_conv[ind_lower_final:ind_upper_final]
+        return tellmodel_conv[...,ind_lower_final:ind_upper_final]
 
     tellmodel_out = shift_telluric(tellmodel_conv,
                                    np.log10(tell_dict['wave_grid'][ind_lower_pad:ind_upper_pad+1]),
-                                   tell_dict['dloglam'], theta_tell[5], theta_tell[6])
-    return tellmodel_out[ind_lower_final:ind_upper_final]
+                                   tell_dict['dloglam'], theta_tell[...,5], theta_tell[...,6])
+    return tellmodel_out[...,ind_lower_final:ind_upper_final]
 
 
 ############################
@@ -375,6 +895,10 @@ def tellfit_chi2(theta, flux, thismask, arg_dict):
     Args:
         theta (`numpy.ndarray`_):
            Parameter vector for the object + telluric model. See documentation of tellfit for a detailed description.
+           Can also be a 2D array with shape (nparams, nvec), i.e. one parameter vector per column as for the
+           vectorized evaluation of `scipy.optimize.differential_evolution`_, to evaluate the loss function for a full
+           population at once.  This requires the object model function to accept a 2D array of parameter vectors (see
+           :func:`tellfit`).
         flux (`numpy.ndarray`_):
            The flux of the object being fit
         thismask (`numpy.ndarray`_, boolean):
@@ -385,13 +909,29 @@ def tellfit_chi2(theta, flux, thismask, arg_dict):
     Returns:
         loss_function (float):
            The value of the loss function at the location in parameter space theta. This is loss function is the thing
-           that is minimized to perform the fit.
+           that is minimized to perform the fit.  For a 2D theta, this is an array with one value per parameter
+           vector.
 
     """
 
     obj_model_func = arg_dict['obj_model_func']
     flux_ivar = arg_dict['ivar']
 
+    if np.ndim(theta) > 1:
+        # Evaluate all the parameter vectors at once
+        theta_obj = theta[:-7].T
+        theta_tell = theta[-7:].T
+        tell_model = eval_telluric(theta_tell, arg_dict['tell_dict'],
+                                   ind_lower=arg_dict['ind_lower'], ind_upper=arg_dict['ind_upper'])
+        obj_model, model_gpm = obj_model_func(theta_obj, arg_dict['obj_dict'])
+        totalmask = thismask & model_gpm
+        chi_vec = totalmask * (flux - tell_model*obj_model) * np.sqrt(flux_ivar)
+        robust_scale = 2.0
+        huber_vec = scipy.special.huber(robust_scale, chi_vec)
+        loss_function = np.sum(huber_vec * totalmask, axis=-1)
+        # If everyting is masked return infinity
+        return np.where(np.any(totalmask, axis=-1), loss_function, np.inf)
+
     theta_obj = theta[:-7]
     theta_tell = theta[-7:]
     tell_model = eval_telluric(theta_tell, arg_dict['tell_dict'],
@@ -408,6 +948,45 @@ def tellfit_chi2(theta, flux, thismask, arg_dict):
         loss_function = np.sum(huber_vec * totalmask)
         return loss_function
 
+def tellfit_population(func, population, flux, thismask, arg_dict, chunk_pix=2**18):
+    """
+    Evaluate :func:`tellfit_chi2` for a full population of parameter vectors.
+
+    This is used as the map-like ``workers`` callable of
+    `scipy.optimize.differential_evolution`_ when the fit is vectorized
+    (see :func:`tellfit`).  The population is evaluated in chunks, such
+    that the intermediate models of each chunk stay small enough to be
+    cached by the CPU.
+
+    Args:
+        func (callable):
+            The function that the optimizer would map over the population.
+            Ignored; the loss function is computed by :func:`tellfit_chi2`.
+        population (iterable):
+            The parameter vectors.
+        flux (`numpy.ndarray`_):
+            The flux of the object being fit
+        thismask (`numpy.ndarray`_, boolean):
+            A mask indicating which values are to be fit.
+        arg_dict (dict):
+            A dictionary containing the parameters needed to evaluate the
+            telluric model and the object model.
+        chunk_pix (:obj:`int`, optional):
+            Approximate number of model pixels evaluated at once, i.e. the
+            number of parameter vectors per chunk times the number of
+            spectral pixels.
+
+    Returns:
+        `numpy.ndarray`_: The loss function for each parameter vector.
+    """
+    population = np.array(list(population))
+    if population.size == 0:
+        return np.array([])
+    nvec = max(chunk_pix // flux.size, 1)
+    return np.concatenate([tellfit_chi2(population[i:i+nvec].T, flux, thismask, arg_dict)
+                           for i in range(0, population.shape[0], nvec)])
+
+
 def tellfit(flux, thismask, arg_dict, init_from_last=None):
     """
     Routine to perform the object + telluric model fitting for telluric
@@ -459,6 +1038,16 @@ def tellfit(flux, thismask, arg_dict, init_from_last=None):
                 - ``arg_dict['obj_dict']``:  Dictionary containing the
                   object model arguments which is passed to the
                   obj_model_func
+                - ``arg_dict['vectorize']``: Optional.  If True, the
+                  loss function is evaluated for the full population of
+                  the differential evolution optimizer at once, and the
+                  population is updated once per generation
+                  (``updating='deferred'``).  This is much faster but the
+                  optimization follows a different path than with the
+                  default (``updating='immediate'``).  The obj_model_func
+                  must accept a 2D array of parameter vectors with shape
+                  (nvec, ntheta_obj) and return arrays with shape (nvec,
+                  nspec); all the object models in this module do.
 
         init_from_last (object):
              Optional. Result object returned by the differential
@@ -515,10 +1104,18 @@ def tellfit(flux, thismask, arg_dict, init_from_last=None):
         # If this is the first iteration and no object model optimum is presented, use a latin hypercube which is the default
         init = 'latinhypercube'
 
+    if arg_dict.get('vectorize', False):
+        # Use a map-like callable that evaluates the whole population at once
+        updating = 'deferred'
+        workers = functools.partial(tellfit_population, flux=flux, thismask=thismask,
+                                    arg_dict=arg_dict)
+    else:
+        updating = 'immediate'
+        workers = 1
     result = scipy.optimize.differential_evolution(tellfit_chi2, bounds, args=(flux, thismask, arg_dict,), seed=rng,
-                                                   init = init, updating='immediate', popsize=popsize,
+                                                   init = init, updating=updating, popsize=popsize,
                                                    recombination=arg_dict['recombination'], maxiter=arg_dict['diff_evol_maxiter'],
-                                                   polish=arg_dict['polish'], disp=arg_dict['disp'])
+                                                   polish=arg_dict['polish'], disp=arg_dict['disp'], workers=workers)
     theta_obj  = result.x[:-7]
     theta_tell = result.x[-7:]
     tell_model = eval_telluric(theta_tell, arg_dict['tell_dict'],
@@ -792,7 +1389,9 @@ def eval_sensfunc_model(theta, obj_dict):
     Parameters
     ----------
     theta : `numpy.ndarray`_, shape is (ntheta,)
-        Array containing the parameters that describe the model
+        Array containing the parameters that describe the model.  Can also have
+        shape (nvec, ntheta) to evaluate a set of models at once, in which case
+        the returned model has shape (nvec, nspec).
     obj_dict : :obj:`dict`
         Dictionary containing additional arguments needed to evaluate the model
 
@@ -812,7 +1411,7 @@ def eval_sensfunc_model(theta, obj_dict):
     gpm : `numpy.ndarray`_, bool, shape is the same as obj_dict['wave_star']
         Good pixel mask indicating where the model is valid
     """
-    zeropoint = fitting.evaluate_fit(theta, obj_dict['func'], obj_dict['wave'],
+    zeropoint = fitting.evaluate_fit(np.asarray(theta).T, obj_dict['func'], obj_dict['wave'],
                                      minx=obj_dict['wave_min'], maxx=obj_dict['wave_max'])
     counts_per_angstrom_model = obj_dict['exptime'] \
                                     * flux_calib.Flam_to_Nlam(obj_dict['wave'],zeropoint) \
@@ -899,7 +1498,9 @@ def eval_qso_model(theta, obj_dict):
     Parameters
     ----------
     theta : array shape (ntheta,)
-       Array containing the PCA coefficients
+       Array containing the PCA coefficients.  Can also have shape (nvec,
+       ntheta) to evaluate a set of models at once, in which case the returned
+       arrays have shape (nvec, nspec).
 
     obj_dict : dict
        Dictionary containing additional arguments needed to evaluate the PCA model
@@ -1013,7 +1614,9 @@ def eval_star_model(theta, obj_dict):
     Parameters
     ----------
     theta : array shape (ntheta,)
-       Array containing the polynomial coefficients
+       Array containing the polynomial coefficients.  Can also have shape (nvec,
+       ntheta) to evaluate a set of models at once, in which case the returned
+       arrays have shape (nvec, nspec).
 
     obj_dict : dict
        Dictionary containing additional arguments needed to evaluate the star model.
@@ -1034,7 +1637,7 @@ def eval_star_model(theta, obj_dict):
     flam_true = obj_dict['flam_true']
     func = obj_dict['func']
     model = obj_dict['model']
-    ymult = coadd.poly_model_eval(theta, func, model, wave_star, wave_min, wave_max)
+    ymult = coadd.poly_model_eval(np.asarray(theta).T, func, model, wave_star, wave_min, wave_max)
     star_model = ymult*flam_true
 
     return star_model, (star_model > 0.0)
@@ -1133,7 +1736,9 @@ def eval_poly_model(theta, obj_dict):
     Parameters
     ----------
     theta : array shape (ntheta,)
-       Array containing the polynomial coefficients
+       Array containing the polynomial coefficients.  Can also have shape (nvec,
+       ntheta) to evaluate a set of models at once, in which case the returned
+       arrays have shape (nvec, nspec).
 
     obj_dict : dict
        Dictionary containing additional arguments needed to evaluate the star model.
@@ -1146,7 +1751,7 @@ def eval_poly_model(theta, obj_dict):
        Good pixel mask indicating where the model is valid
 
     """
-    polymodel = coadd.poly_model_eval(theta, obj_dict['func'], obj_dict['model'],
+    polymodel = coadd.poly_model_eval(np.asarray(theta).T, obj_dict['func'], obj_dict['model'],
                                       obj_dict['wave'], obj_dict['wave_min'], obj_dict['wave_max'])
 
     return polymodel, (polymodel > 0.0)
@@ -1208,8 +1813,9 @@ def sensfunc_telluric(wave, counts, counts_ivar, counts_mask, exptime, airmass,
                       telgridfile, ech_orders=None, polyorder=8, mask_abs_lines=True,
                       delta_coeff_bounds=(-20.0, 20.0), minmax_coeff_bounds=(-5.0, 5.0),
                       sn_clip=30.0, ballsize=5e-4, only_orders=None, maxiter=3, lower=3.0,
-                      upper=3.0, tol=1e-3, popsize=30, recombination=0.7, polish=True, disp=False,
-                      debug_init=False, debug=False):
+                      upper=3.0, tol=1e-3, popsize=30, recombination=0.7, polish=True,
+                      nresln_ladder=0, vectorize=False, nproc=1, disp=False, debug_init=False,
+                      debug=False):
     """
     Compute a sensitivity function from a standard star spectrum by
     simultaneously fitting a polynomial sensitivity function and a telluric
@@ -1289,6 +1895,18 @@ def sensfunc_telluric(wave, counts, counts_ivar, counts_mask, exptime, airmass,
         optimization at the end to polish the best fit, which can improve the
         optimization slightly. See `scipy.optimize.differential_evolution`_ for
         details.
+    nresln_ladder : :obj:`int`, optional, default = 0
+        Number of resolutions at which the telluric grid is preconvolved, such
+        that the telluric model is interpolated instead of convolved during the
+        optimization.  Values smaller than 2 disable the preconvolution.  See
+        :class:`Telluric`.
+    vectorize : :obj:`bool`, optional, default = False
+        Evaluate the models for the full differential evolution population at
+        once, updating the population once per generation.  See
+        :class:`Telluric`.
+    nproc : :obj:`int`, optional, default = 1
+        Number of processes used to fit the orders/slits in parallel.  See
+        :class:`Telluric`.
     disp : :obj:`bool`, optional, default=True
         Argument for `scipy.optimize.differential_evolution`_, which will
         display status messages to the screen indicating the status of the
@@ -1340,7 +1958,8 @@ def sensfunc_telluric(wave, counts, counts_ivar, counts_mask, exptime, airmass,
                       init_sensfunc_model, eval_sensfunc_model, ech_orders=ech_orders,
                       sn_clip=sn_clip, maxiter=maxiter, lower=lower, upper=upper, tol=tol,
                       popsize=popsize, recombination=recombination, polish=polish, disp=disp,
-                      sensfunc=True, debug=debug)
+                      sensfunc=True, debug=debug, nresln_ladder=nresln_ladder,
+                      vectorize=vectorize, nproc=nproc)
     TelObj.run(only_orders=only_orders)
 
     return TelObj
@@ -1380,8 +1999,9 @@ def create_bal_mask(wave, bal_wv_min_max):
 def qso_telluric(spec1dfile, telgridfile, pca_file, z_qso, telloutfile, outfile, npca=8,
                  pca_lower=1220.0, pca_upper=3100.0, bal_wv_min_max=None, delta_zqso=0.1,
                  bounds_norm=(0.1, 3.0), tell_norm_thresh=0.9, sn_clip=30.0, only_orders=None,
-                 maxiter=3, tol=1e-3, popsize=30, recombination=0.7, polish=True, disp=False,
-                 debug_init=False, debug=False, show=False):
+                 maxiter=3, tol=1e-3, popsize=30, recombination=0.7, polish=True,
+                 nresln_ladder=0, vectorize=False, nproc=1, disp=False, debug_init=False,
+                 debug=False, show=False):
     """
     Fit and correct a QSO spectrum for telluric absorption.
 
@@ -1454,6 +2074,18 @@ def qso_telluric(spec1dfile, telgridfile, pca_file, z_qso, telloutfile, outfile,
         optimizatino at the end to polish the best fit at the end, which can
         improve the optimization slightly. See
         `scipy.optimize.differential_evolution`_ for details.
+    nresln_ladder : :obj:`int`, optional, default = 0
+        Number of resolutions at which the telluric grid is preconvolved, such
+        that the telluric model is interpolated instead of convolved during the
+        optimization.  Values smaller than 2 disable the preconvolution.  See
+        :class:`Telluric`.
+    vectorize : :obj:`bool`, optional, default = False
+        Evaluate the models for the full differential evolution population at
+        once, updating the population once per generation.  See
+        :class:`Telluric`.
+    nproc : :obj:`int`, optional, default = 1
+        Number of processes used to fit the orders/slits in parallel.  See
+        :class:`Telluric`.
     disp : :obj:`bool`, optional, default=True
         Argument for `scipy.optimize.differential_evolution`_ that will display
         status messages to the screen indicating the status of the optimization.
@@ -1497,7 +2129,8 @@ def qso_telluric(spec1dfile, telgridfile, pca_file, z_qso, telloutfile, outfile,
     # parameters lowered for testing
     TelObj = Telluric(wave, flux, ivar, mask_tot, telgridfile, obj_params, init_qso_model,
                       eval_qso_model, sn_clip=sn_clip, maxiter=maxiter, tol=tol, popsize=popsize,
-                      recombination=recombination, polish=polish, disp=disp, debug=debug)
+                      recombination=recombination, polish=polish, disp=disp, debug=debug,
+                      nresln_ladder=nresln_ladder, vectorize=vectorize, nproc=nproc)
     TelObj.run(only_orders=only_orders)
     TelObj.to_file(telloutfile, overwrite=True)
 
@@ -1544,8 +2177,9 @@ def star_telluric(spec1dfile, telgridfile, telloutfile, outfile, star_type=None,
                   star_ra=None, star_dec=None, func='legendre', model='exp', polyorder=5,
                   mask_abs_lines=True, delta_coeff_bounds=(-20.0, 20.0),
                   minmax_coeff_bounds=(-5.0, 5.0), only_orders=None, sn_clip=30.0, maxiter=3,
-                  tol=1e-3, popsize=30, recombination=0.7, polish=True, disp=False,
-                  debug_init=False, debug=False, show=False):
+                  tol=1e-3, popsize=30, recombination=0.7, polish=True, nresln_ladder=0,
+                  vectorize=False, nproc=1, disp=False, debug_init=False, debug=False,
+                  show=False):
     """
     This needs a doc string.
     """
@@ -1596,7 +2230,8 @@ def star_telluric(spec1dfile, telgridfile, telloutfile, outfile, star_type=None,
     # parameters lowered for testing
     TelObj = Telluric(wave, flux, ivar, mask_tot, telgridfile, obj_params, init_star_model,
                       eval_star_model,  sn_clip=sn_clip, tol=tol, popsize=popsize,
-                      recombination=recombination, polish=polish, disp=disp, debug=debug)
+                      recombination=recombination, polish=polish, disp=disp, debug=debug,
+                      nresln_ladder=nresln_ladder, vectorize=vectorize, nproc=nproc)
     TelObj.run(only_orders=only_orders)
     TelObj.to_file(telloutfile, overwrite=True)
 
@@ -1643,8 +2278,8 @@ def poly_telluric(spec1dfile, telgridfile, telloutfile, outfile, z_obj=0.0, func
                   model='exp', polyorder=3, fit_wv_min_max=None, mask_lyman_a=True,
                   delta_coeff_bounds=(-20.0, 20.0), minmax_coeff_bounds=(-5.0, 5.0),
                   only_orders=None, sn_clip=30.0, maxiter=3, tol=1e-3, popsize=30,
-                  recombination=0.7, polish=True, disp=False, debug_init=False, debug=False,
-                  show=False):
+                  recombination=0.7, polish=True, nresln_ladder=0, vectorize=False, nproc=1,
+                  disp=False, debug_init=False, debug=False, show=False):
     """
     This needs a doc string.
     """
@@ -1690,7 +2325,8 @@ def poly_telluric(spec1dfile, telgridfile, telloutfile, outfile, z_obj=0.0, func
     # parameters lowered for testing
     TelObj = Telluric(wave, flux, ivar, mask_tot, telgridfile, obj_params, init_poly_model,
                       eval_poly_model, sn_clip=sn_clip, maxiter=maxiter, tol=tol, popsize=popsize,
-                      recombination=recombination, polish=polish, disp=disp, debug=debug)
+                      recombination=recombination, polish=polish, disp=disp, debug=debug,
+                      nresln_ladder=nresln_ladder, vectorize=vectorize, nproc=nproc)
     TelObj.run(only_orders=only_orders)
     TelObj.to_file(telloutfile, overwrite=True)
 
@@ -1733,6 +2369,43 @@ def poly_telluric(spec1dfile, telgridfile, telloutfile, outfile, z_obj=0.0, func
 
 
 
+def tellfit_order(flux, arg_dict, inmask, maxiter, lower, upper, sticky):
+    """
+    Perform the robust object + telluric model fit for one order/slit.
+
+    This is the task executed by the worker processes of
+    :func:`~pypeit.utils.parallel_map` when fitting the orders/slits of a
+    :class:`Telluric` object in parallel.  The telluric grid is not part of
+    ``arg_dict``; it is reassembled from the objects shared by
+    :func:`~pypeit.utils.parallel_map` (see :func:`~pypeit.utils.shared_data`).
+
+    Args:
+        flux (`numpy.ndarray`_):
+            The flux of the object being fit
+        arg_dict (:obj:`dict`):
+            The arguments for :func:`tellfit`, without the telluric grid.
+        inmask (`numpy.ndarray`_):
+            Good pixel mask for the flux.
+        maxiter (:obj:`int`):
+            Maximum number of rejection iterations.
+        lower (:obj:`float`):
+            Lower rejection threshold.
+        upper (:obj:`float`):
+            Upper rejection threshold.
+        sticky (:obj:`bool`):
+            Keep rejected pixels rejected in subsequent iterations.
+
+    Returns:
+        :obj:`tuple`: The result of :func:`~pypeit.core.fitting.robust_optimize`.
+    """
+    tell_dict = dict(utils.shared_data('tell_dict'))
+    for key in utils.shared_data('grid_keys'):
+        tell_dict[key] = utils.shared_data(key)
+    return fitting.robust_optimize(flux, tellfit, dict(arg_dict, tell_dict=tell_dict),
+                                   inmask=inmask, maxiter=maxiter, lower=lower, upper=upper,
+                                   sticky=sticky)
+
+
 class Telluric(datamodel.DataContainer):
     """
     Simultaneously fit model object and telluric spectra to an observed
@@ -1983,6 +2656,31 @@ class Telluric(datamodel.DataContainer):
             for fitting multi-order echelle data, it will require lots of
             clicking to close interactive matplotlib windows which halt code
             flow.
+        nresln_ladder (:obj:`int`, optional):
+            Number of resolutions, geometrically spaced over the bounds set
+            by ``resln_frac_bounds``, at which the telluric grid is
+            preconvolved. The telluric model is then interpolated between
+            the preconvolved models instead of being convolved at every
+            evaluation (see :func:`eval_telluric`), which is much faster but
+            approximate. The preconvolved grid is saved to the memory-mapped
+            store of the telluric grid (see :class:`TelluricGridStore`). Must
+            be at least 2 to be used; otherwise, the model is convolved
+            directly.
+        vectorize (:obj:`bool`, optional):
+            Evaluate the models for the full population of the differential
+            evolution optimizer at once, updating the population once per
+            generation (see :func:`tellfit`).  This is much faster, but the
+            optimization follows a different path than the default
+            element-by-element updates, such that the results are not
+            identical.  The object model functions must accept a 2D array of
+            parameter vectors, as all the object models in this module do.
+        nproc (:obj:`int`, optional):
+            Number of processes used to fit the orders/slits in parallel; see
+            :func:`~pypeit.utils.get_nproc`.  When fitting in parallel, each
+            order/slit uses its own random number generator seeded by
+            ``seed`` and the order/slit index, such that the results do not
+            depend on the number of processes but are different from the
+            serial fit.
 
     """
     version = '1.0.0'
@@ -2092,7 +2790,8 @@ class Telluric(datamodel.DataContainer):
                  resln_guess=None, resln_frac_bounds=(0.5, 1.5), pix_shift_bounds=(-5.0, 5.0),
                  pix_stretch_bounds=(0.9,1.1), maxiter=2, sticky=True, lower=3.0, upper=3.0,
                  seed=777, ballsize = 5e-4, tol=1e-3, diff_evol_maxiter=1000,  popsize=30,
-                 recombination=0.7, polish=True, disp=False, sensfunc=False, debug=False):
+                 recombination=0.7, polish=True, disp=False, sensfunc=False, debug=False,
+                 nresln_ladder=0, vectorize=False, nproc=1):
 
         # Instantiate as an empty DataContainer
         super().__init__()
@@ -2134,6 +2833,9 @@ class Telluric(datamodel.DataContainer):
         self.disp = disp or debug
         self.sensfunc = sensfunc
         self.debug = debug
+        self.nresln_ladder = nresln_ladder
+        self.vectorize = vectorize
+        self.nproc = nproc
 
         # 2) Reshape all spectra to be (nspec, norders)
         self.wave_in_arr, self.flux_in_arr, self.ivar_in_arr, self.mask_in_arr, self.nspec_in, \
@@ -2141,12 +2843,16 @@ class Telluric(datamodel.DataContainer):
 
         # 3) Read the telluric grid and initalize associated parameters
         wv_gpm = self.wave_in_arr > 1.0
+        self.resln_guess = wvutils.get_sampling(self.wave_in_arr)[2] \
+                                if resln_guess is None else resln_guess
+        resln_ladder = np.geomspace(self.resln_guess*self.resln_frac_bounds[0],
+                                    self.resln_guess*self.resln_frac_bounds[1],
+                                    self.nresln_ladder) if self.nresln_ladder > 1 else None
         self.tell_dict = read_telluric_grid(self.telgrid, wave_min=self.wave_in_arr[wv_gpm].min(),
-                                            wave_max=self.wave_in_arr[wv_gpm].max())
+                                            wave_max=self.wave_in_arr[wv_gpm].max(),
+                                            resln_ladder=resln_ladder)
         self.wave_grid = self.tell_dict['wave_grid']
         self.ngrid = self.wave_grid.size
-        self.resln_guess = wvutils.get_sampling(self.wave_in_arr)[2] \
-                                if resln_guess is None else resln_guess
         # Model parameter guess for determining the bounds with the init_obj_model function
         self.tell_guess = self.get_tell_guess()
         # Set the bounds for the telluric optimization
@@ -2205,7 +2911,8 @@ class Telluric(datamodel.DataContainer):
                                  ballsize=self.ballsize, bounds=bounds_iord, rng=self.rng,
                                  diff_evol_maxiter=self.diff_evol_maxiter, tol=self.tol,
                                  popsize=self.popsize, recombination=self.recombination,
-                                 polish=self.polish, disp=self.disp, debug=debug)
+                                 polish=self.polish, disp=self.disp, debug=debug,
+                                 vectorize=self.vectorize)
             self.arg_dict_list[iord] = arg_dict_iord
 
         # 6) Initalize the output tables
@@ -2221,6 +2928,9 @@ class Telluric(datamodel.DataContainer):
         self.ech_orders = None
         self.sn_clip = None
         self.resln_frac_bounds = None
+        self.nresln_ladder = None
+        self.vectorize = None
+        self.nproc = None
         self.pix_shift_bounds = None
         self.pix_stretch_bounds = None
         self.maxiter = None
@@ -2296,17 +3006,41 @@ class Telluric(datamodel.DataContainer):
         self.tellmodel_list = [None]*self.norders
         self.theta_obj_list = [None]*self.norders
         self.theta_tell_list = [None]*self.norders
+        fit_orders = [iord for iord in self.srt_order_tell if iord in good_orders]
+        nproc = utils.get_nproc(self.nproc, ntasks=len(fit_orders))
+        if nproc > 1:
+            msgs.info(f'Fitting object + telluric model for {len(fit_orders)} orders using '
+                      f'{nproc} processes with user supplied function: '
+                      f'{self.init_obj_model.__name__}')
+            # The telluric grid is shared with the worker processes; each
+            # order gets its own random number generator
+            grid_keys = [key for key in ['tell_grid', 'tell_grid_conv'] if key in self.tell_dict]
+            shared = {key: np.asarray(self.tell_dict[key]) for key in grid_keys}
+            shared['tell_dict'] = {key: value for key, value in self.tell_dict.items()
+                                   if key not in grid_keys}
+            shared['grid_keys'] = grid_keys
+            arglist = [(self.flux_arr[self.ind_lower[iord]:self.ind_upper[iord]+1,iord],
+                        dict(self.arg_dict_list[iord], tell_dict=None,
+                             rng=np.random.default_rng([self.seed, iord])),
+                        self.mask_arr[self.ind_lower[iord]:self.ind_upper[iord]+1,iord],
+                        self.maxiter, self.lower, self.upper, self.sticky)
+                       for iord in fit_orders]
+            fits = dict(zip(fit_orders, utils.parallel_map(tellfit_order, arglist, nproc=nproc,
+                                                           shared=shared)))
         for counter, iord in enumerate(self.srt_order_tell):
             if iord not in good_orders:
                 continue
-            msgs.info(f'Fitting object + telluric model for order: {iord}, {counter}/{self.norders}'
-                      + f' with user supplied function: {self.init_obj_model.__name__}')
-            self.result_list[iord], ymodel, ivartot, self.outmask_list[iord] \
-                    = fitting.robust_optimize(self.flux_arr[self.ind_lower[iord]:self.ind_upper[iord]+1,iord],
-                                              tellfit, self.arg_dict_list[iord],
-                                              inmask=self.mask_arr[self.ind_lower[iord]:self.ind_upper[iord]+1,iord],
-                                              maxiter=self.maxiter, lower=self.lower,
-                                              upper=self.upper, sticky=self.sticky)
+            if nproc > 1:
+                self.result_list[iord], ymodel, ivartot, self.outmask_list[iord] = fits[iord]
+            else:
+                msgs.info(f'Fitting object + telluric model for order: {iord}, {counter}/{self.norders}'
+                          + f' with user supplied function: {self.init_obj_model.__name__}')
+                self.result_list[iord], ymodel, ivartot, self.outmask_list[iord] \
+                        = fitting.robust_optimize(self.flux_arr[self.ind_lower[iord]:self.ind_upper[iord]+1,iord],
+                                                  tellfit, self.arg_dict_list[iord],
+                                                  inmask=self.mask_arr[self.ind_lower[iord]:self.ind_upper[iord]+1,iord],
+                                                  maxiter=self.maxiter, lower=self.lower,
+                                                  upper=self.upper, sticky=self.sticky)
             self.theta_obj_list[iord] = self.result_list[iord].x[:-7]
             self.theta_tell_list[iord] = self.result_list[iord].x[-7:]
             self.obj_model_list[iord], modelmask \
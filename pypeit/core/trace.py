@@ -536,7 +536,14 @@ def follow_centroid(flux, start_row, start_cen, ivar=None, bpm=None, fwgt=None,
     result from the previous row. The only independent measurement is
     the one performed at the input `start_row`. This function is much
     slower than :func:`masked_centroid` because of this introduced
-    dependency.
+    dependency.  However, all features are followed together: each step
+    away from the starting row(s) recenters all features, toward both
+    higher and lower rows, in a single call to :func:`masked_centroid`.
+
+    The features can also be followed in a stack of images, one feature
+    per image.  Each feature is then followed independently within its own
+    image, such that the result is identical to calling this function
+    separately for each image.
 
     .. note::
         - This is an adaptation of ``trace_crude`` from ``idlspec2d``.
@@ -556,16 +563,22 @@ def follow_centroid(flux, start_row, start_cen, ivar=None, bpm=None, fwgt=None,
             smoothing; see :func:`prepare_sobel_for_trace`. In any
             case, consider that this image may need to be smoothed
             for robust output from this function. See
-            :func:`pypeit.utils.boxcar_smooth_rows`.
-        start_row (:obj:`int`):
+            :func:`pypeit.utils.boxcar_smooth_rows`.  If 3D, this is
+            a stack of images with shape :math:`(N_{\rm feature}, N_{\rm
+            row}, N_{\rm col})`, and each feature is followed in its own
+            image.
+        start_row (:obj:`int`, `numpy.ndarray`_):
             Row at which to start the calculation. The function
-            begins with this row and then continues first to higher
-            indices and then to lower indices.
+            begins with this row and then continues to higher and
+            lower indices.  If an array, this provides the starting
+            row for each coordinate in ``start_cen``.
         start_cen (:obj:`int`, `numpy.ndarray`_, optional):
             One or more coordinates to recenter. If an array, must be
-            1D.
+            1D.  If ``flux`` is a stack of images, this must provide
+            one coordinate per image.
         ivar (`numpy.ndarray`_, optional):
-            Inverse variance in the image. If not provided, unity
+            Inverse variance in the image. Shape must match ``flux``.
+            If not provided, unity
             variance is assumed. Used for the calculation of the
             errors in the moment analysis. If this is not provided,
             be careful with the value set for `maxerror` (see below).
@@ -605,10 +618,18 @@ def follow_centroid(flux, start_row, start_cen, ivar=None, bpm=None, fwgt=None,
         estimate of the error, and a bad-pixel mask (masked values
         are True).
     """
-    if flux.ndim != 2:
-        raise ValueError('Input image must be 2D.')
+    if flux.ndim not in [2, 3]:
+        raise ValueError('Input image must be 2D or a 3D stack of images.')
     # Shape of the image with pixel weights
-    nr, nc = flux.shape
+    nr, nc = flux.shape[-2:]
+    # Stack the images along the first axis so that each row of each image
+    # is a row of a single image
+    nimg = None if flux.ndim == 2 else flux.shape[0]
+    if nimg is not None:
+        flux = flux.reshape(nimg*nr, nc)
+        ivar = None if ivar is None else ivar.reshape(nimg*nr, nc)
+        bpm = None if bpm is None else bpm.reshape(nimg*nr, nc)
+        fwgt = None if fwgt is None else fwgt.reshape(nimg*nr, nc)
 
     # Instantiate theses supplementary arrays here to speed things up
     # in iterative calling of moment1d. moment1d will check the array
@@ -621,12 +642,21 @@ def follow_centroid(flux, start_row, start_cen, ivar=None, bpm=None, fwgt=None,
     # Number of starting coordinates
     _cen = np.atleast_1d(start_cen)
     nt = _cen.size
+    # Starting row for each coordinate
+    _start = np.full(nt, start_row, dtype=int) if np.ndim(start_row) == 0 \
+                else np.atleast_1d(start_row).astype(int)
     # Check coordinates are within the image
-    if np.any((_cen > nc-1) | (_cen < 0)) or start_row < 0 or start_row > nr-1:
+    if np.any((_cen > nc-1) | (_cen < 0)) or np.any(_start < 0) or np.any(_start > nr-1):
         raise ValueError('Starting coordinates incompatible with input image!')
     # Check the dimensionality
     if _cen.ndim != 1:
         raise ValueError('Input coordinates to be at most 1D.')
+    if _start.shape != _cen.shape:
+        raise ValueError('Must provide one starting row or one per starting coordinate.')
+    if nimg is not None and nt != nimg:
+        raise ValueError('Must provide one starting coordinate per image.')
+    # Offset of the first row of the image of each feature
+    offset = np.zeros(nt, dtype=int) if nimg is None else np.arange(nt)*nr
 
     # Instantiate output; just repeat input for all image rows.
     xc = np.tile(_cen, (nr,1)).astype(float)
@@ -637,24 +667,26 @@ def follow_centroid(flux, start_row, start_cen, ivar=None, bpm=None, fwgt=None,
     # NOTE: This is effectively the old trace_crude_init
 
     # Recenter the starting row
-    i = start_row
-    xc[i,:], xe[i,:], xm[i,:] = masked_centroid(flux, xc[i,:], width, ivar=_ivar, bpm=_bpm,
-                                                fwgt=_fwgt, row=i, maxshift=maxshift_start,
-                                                maxerror=maxerror, bitmask=bitmask, fill='bound')
-
-    # Go to higher indices using the result from the previous row
-    for i in range(start_row+1,nr):
-        xc[i,:], xe[i,:], xm[i,:] = masked_centroid(flux, xc[i-1,:], width, ivar=_ivar, bpm=_bpm,
-                                                    fwgt=_fwgt, row=i, maxshift=maxshift_follow,
-                                                    maxerror=maxerror, bitmask=bitmask,
-                                                    fill='bound')
-
-    # Go to lower indices using the result from the previous row
-    for i in range(start_row-1,-1,-1):
-        xc[i,:], xe[i,:], xm[i,:] = masked_centroid(flux, xc[i+1,:], width, ivar=_ivar, bpm=_bpm,
-                                                    fwgt=_fwgt, row=i, maxshift=maxshift_follow,
-                                                    maxerror=maxerror, bitmask=bitmask,
-                                                    fill='bound')
+    t = np.arange(nt)
+    _width = np.asarray(width, dtype=float)
+    xc[_start,t], xe[_start,t], xm[_start,t] \
+            = masked_centroid(flux, xc[_start,t], width, ivar=_ivar, bpm=_bpm, fwgt=_fwgt,
+                              row=offset+_start, maxshift=maxshift_start, maxerror=maxerror,
+                              bitmask=bitmask, fill='bound')
+
+    # Go to higher and lower indices at the same time, using the result
+    # from the previous row
+    for k in range(1, max(nr-1-np.amin(_start), np.amax(_start))+1):
+        up = np.where(_start + k < nr)[0]
+        down = np.where(_start - k >= 0)[0]
+        t = np.append(up, down)
+        row = np.append(_start[up] + k, _start[down] - k)
+        prev = np.append(row[:up.size] - 1, row[up.size:] + 1)
+        xc[row,t], xe[row,t], xm[row,t] \
+                = masked_centroid(flux, xc[prev,t], width if _width.ndim == 0 else _width[t],
+                                  ivar=_ivar, bpm=_bpm, fwgt=_fwgt, row=offset[t]+row,
+                                  maxshift=maxshift_follow, maxerror=maxerror, bitmask=bitmask,
+                                  fill='bound')
 
     # NOTE: In edgearr_tcrude, skip_bad (roughly opposite of continuous
     # here) was True by default, meaning continuous would be False by
@@ -672,11 +704,11 @@ def follow_centroid(flux, start_row, start_cen, ivar=None, bpm=None, fwgt=None,
     bad = xm > 0
     p = np.arange(nr)
     for i in range(nt):
-        indx = bad[:,i] & (p > start_row)
+        indx = bad[:,i] & (p > _start[i])
         if np.any(indx):
             s = np.amin(p[indx])
             xm[s:,i] = True if bitmask is None else bitmask.turn_on(xm[s:,i], 'DISCONTINUOUS')
-        indx = bad[:,i] & (p < start_row)
+        indx = bad[:,i] & (p < _start[i])
         if np.any(indx):
             e = np.amax(p[indx])-1
             xm[:e,i] = True if bitmask is None else bitmask.turn_on(xm[:e,i], 'DISCONTINUOUS')
@@ -731,10 +763,13 @@ def masked_centroid(flux, cen, width, ivar=None, bpm=None, fwgt=None, row=None,
         fwgt (`numpy.ndarray`_, optional):
             A weight to apply to each pixel in `flux`; passed
             directly to :func:`pypeit.core.moment.moment1d`.
-        row (:obj:`int`, optional):
+        row (:obj:`int`, `numpy.ndarray`_, optional):
             Row (index along the first axis; spectral position) in
             `flux` at which to recenter the trace position. See
-            `row` in :func:`pypeit.core.moment.moment1d`.
+            `row` in :func:`pypeit.core.moment.moment1d`.  If this is
+            a single row or one row per center in a 1D ``cen`` array
+            and the weighting is uniform, the centroids are computed
+            using :func:`pypeit.core.moment.centroid1d`.
         weighting (:obj:`str`, optional):
             Passed directly to :func:`pypeit.core.moment.moment1d`;
             see the documentation there.
@@ -780,9 +815,17 @@ def masked_centroid(flux, cen, width, ivar=None, bpm=None, fwgt=None, row=None,
     """
     # Calculate the moments
     radius = width/2
-    xfit, xerr, matherr = moment.moment1d(flux, cen, width, ivar=ivar, bpm=bpm, fwgt=fwgt,
-                                          row=row, weighting=weighting, order=1,
-                                          fill_error=fill_error)
+    if weighting == 'uniform' and isinstance(cen, np.ndarray) and cen.ndim == 1 \
+            and np.isscalar(width) and row is not None \
+            and (np.ndim(row) == 0 or np.shape(row) == cen.shape):
+        # One aperture per row, so use the faster (but otherwise
+        # identical) calculation
+        xfit, xerr, matherr = moment.centroid1d(flux, cen, width, row, ivar=ivar, bpm=bpm,
+                                                fwgt=fwgt, fill_error=fill_error)
+    else:
+        xfit, xerr, matherr = moment.moment1d(flux, cen, width, ivar=ivar, bpm=bpm, fwgt=fwgt,
+                                              row=row, weighting=weighting, order=1,
+                                              fill_error=fill_error)
 
     # Flag centroids outide the aperture and too close to the image edge
     outside_ap = (np.absolute(xfit - cen) > radius + 0.5)
@@ -815,13 +858,17 @@ def masked_centroid(flux, cen, width, ivar=None, bpm=None, fwgt=None, row=None,
     # Toggle the mask bits
     if bitmask is not None:
         xmsk = np.zeros_like(xfit, dtype=bitmask.minimum_dtype())
-        xmsk[matherr] = bitmask.turn_on(xmsk[matherr], 'MATHERROR')
-        xmsk[outside_ap] = bitmask.turn_on(xmsk[outside_ap], 'OUTSIDEAPERTURE')
-        xmsk[edge_buffer] = bitmask.turn_on(xmsk[edge_buffer], 'EDGEBUFFER')
+        flags = [(matherr, 'MATHERROR'), (outside_ap, 'OUTSIDEAPERTURE'),
+                 (edge_buffer, 'EDGEBUFFER')]
         if maxerror is not None:
-            xmsk[large_error] = bitmask.turn_on(xmsk[large_error], 'MOMENTERROR')
+            flags += [(large_error, 'MOMENTERROR')]
         if maxshift is not None:
-            xmsk[large_shift] = bitmask.turn_on(xmsk[large_shift], 'LARGESHIFT')
+            flags += [(large_shift, 'LARGESHIFT')]
+        for flagged, flag in flags:
+            # Only toggle the bits if necessary; this function is called
+            # many times when following traces.
+            if np.any(flagged):
+                xmsk[flagged] = bitmask.turn_on(xmsk[flagged], flag)
 
     # Return the new centers, errors, and flags
     return xfit, xerr, indx if bitmask is None else xmsk
@@ -139,6 +139,89 @@ def tilts_find_lines(arc_spec, slit_cen, tracethresh=10.0, sig_neigh=5.0, nfwhm_
 
 
 # TODO: Change "mask" to "gpm"...
+def follow_tilts_crude(arcimg_trans, inmask_trans, lines_spec, min_spat, max_spat, nsub,
+                       nave=5, width=12.0, maxshift_start=4.0, maxshift_follow=3.0,
+                       maxerror=1.0, max_stack_size=2**23):
+    """
+    Follow the spectral centroids of a set of arc lines as a function of
+    spatial position to construct the crude traces of the line tilts.
+
+    Each line is followed in the boxcar-smoothed sub-image of the
+    transposed arc image between its ``min_spat`` and ``max_spat`` spatial
+    pixels, exactly as done by calling :func:`~pypeit.core.trace.follow_centroid`
+    for each line.  However, the sub-images are stacked and all the lines are
+    followed together in a single call to
+    :func:`~pypeit.core.trace.follow_centroid`.
+    To limit the size of the stack, each sub-image is restricted to a
+    window in the spectral direction that is large enough to include any
+    centroid allowed by the maximum shifts.
+
+    Args:
+        arcimg_trans (`numpy.ndarray`_):
+            Transposed arc image, masked by the slit; shape is (nspat, nspec).
+        inmask_trans (`numpy.ndarray`_):
+            Transposed, floating-point good-pixel mask for the arc image.
+        lines_spec (`numpy.ndarray`_):
+            Spectral position of each line at the slit center.
+        min_spat (`numpy.ndarray`_):
+            First spatial pixel of the sub-image of each line.
+        max_spat (`numpy.ndarray`_):
+            Spatial pixel just beyond the sub-image of each line.
+        nsub (:obj:`int`):
+            Maximum number of spatial pixels in the sub-images.
+        nave (:obj:`int`, optional):
+            Number of spatial pixels in the boxcar smoothing; see
+            :func:`~pypeit.utils.boxcar_smooth_rows`.
+        width (:obj:`float`, optional):
+            Width of the centroiding window; see
+            :func:`~pypeit.core.trace.follow_centroid`.
+        maxshift_start (:obj:`float`, optional):
+            Maximum shift at the starting spatial pixel.
+        maxshift_follow (:obj:`float`, optional):
+            Maximum shift between adjacent spatial pixels.
+        maxerror (:obj:`float`, optional):
+            Maximum centroid error.
+        max_stack_size (:obj:`int`, optional):
+            Maximum number of pixels in each stack of sub-images.  Lines
+            are followed in batches to limit the memory use.
+
+    Returns:
+        `numpy.ndarray`_: The spectral centroids of each line as a function
+        of spatial position in its sub-image; shape is (nsub, nlines).  Rows
+        beyond the number of spatial pixels in the sub-image of a line are
+        meaningless.
+    """
+    nspec = arcimg_trans.shape[1]
+    nlines = lines_spec.size
+    nrow = max_spat - min_spat
+    start_row = (nrow - 1) // 2
+    # Spectral window of each sub-image.  The centroid can move by at most
+    # maxshift_start + trace_int*maxshift_follow from the starting position,
+    # and the window must also contain the centroiding aperture and the
+    # edge buffer of trace.masked_centroid.
+    half = int(np.ceil(maxshift_start + (nsub // 2) * maxshift_follow + width)) + 4
+    ncol = min(2 * half + 1, nspec)
+    col_min = np.clip(np.round(lines_spec).astype(int) - half, 0, nspec - ncol)
+
+    tilts_crude = np.zeros((nsub, nlines), dtype=float)
+    nbatch = max(max_stack_size // (nsub * ncol), 1)
+    for i0 in range(0, nlines, nbatch):
+        lines = np.arange(i0, min(i0 + nbatch, nlines))
+        stack = np.zeros((lines.size, nsub, ncol), dtype=float)
+        stack_bpm = np.ones((lines.size, nsub, ncol), dtype=bool)
+        for i, iline in enumerate(lines):
+            sub = np.s_[min_spat[iline]:max_spat[iline], col_min[iline]:col_min[iline] + ncol]
+            stack[i,:nrow[iline]] = utils.boxcar_smooth_rows(arcimg_trans[sub], nave,
+                                                             wgt=inmask_trans[sub])
+            stack_bpm[i,:nrow[iline]] = np.invert(inmask_trans[sub].astype(bool))
+        tilts_crude[:,lines] = trace.follow_centroid(
+                                    stack, start_row[lines], lines_spec[lines] - col_min[lines],
+                                    bpm=stack_bpm, width=width, maxshift_start=maxshift_start,
+                                    maxshift_follow=maxshift_follow, maxerror=maxerror,
+                                    continuous=False)[0] + col_min[None,lines]
+    return tilts_crude
+
+
 def trace_tilts_work(arcimg, lines_spec, lines_spat, thismask, slit_cen, inmask=None, gauss=False,
                      tilts_guess=None, fwhm=4.0, spat_order=3, maxdev_tracefit=0.02,
                      sigrej_trace=3.0, max_badpix_frac=0.30, tcrude_maxerr=1.0,
@@ -214,8 +297,15 @@ def trace_tilts_work(arcimg, lines_spec, lines_spat, thismask, slit_cen, inmask=
 
     lines_spat_int = np.round(lines_spat).astype(int)
 
-    spat_min = np.zeros(nlines, dtype=int)
-    spat_max = np.zeros(nlines, dtype=int)
+    # We sub-image each tilt using a symmetric window about the (integer)
+    # spatial location of each line, which is the slitcen evaluated at the
+    # line spectral position.  spat_min and spat_max are the minimum and
+    # maximum location of the sub-image, and min_spat and max_spat prevent
+    # leaving the image.
+    spat_min = lines_spat_int - trace_int
+    spat_max = lines_spat_int + trace_int + 1
+    min_spat = np.fmax(spat_min, 0)
+    max_spat = np.fmin(spat_max, nspat - 1)
 
     if inmask is None:
         inmask = thismask
@@ -254,41 +344,33 @@ def trace_tilts_work(arcimg, lines_spec, lines_spat, thismask, slit_cen, inmask=
     thismask_trans = thismask.T
 
     # 1) Trace the tilts from a guess. If no guess is provided from a previous iteration use trace_crude
+    if do_crude:
+        # First time tracing, do a trace crude
+        # NOTE: follow_centroid behaves differently from the old
+        # trace_crude_init within 2-4 pixels at the trace edge
+
+        # Construct the line traces by following the line centroids as
+        # a function of spatial position along the slit.
+        # TODO: This also returns error estimates and a mask, but
+        # those weren't used in the previous version of the code.
+        tilts_crude = follow_tilts_crude(arcimg_trans, inmask_trans, lines_spec, min_spat,
+                                         max_spat, nsub, nave=tcrude_nave, width=3 * fwhm,
+                                         maxshift_start=tcrude_maxshift0,
+                                         maxshift_follow=tcrude_maxshift,
+                                         maxerror=tcrude_maxerr)
+
     for iline in range(nlines):
-        # We sub-image each tilt using a symmetric window about the (integer) spatial location of each line,
-        # which is the slitcen evaluated at the line spectral position.
-        spat_min[iline] = lines_spat_int[iline] - trace_int  # spat_min is the minium location of the sub-image
-        spat_max[iline] = lines_spat_int[iline] + trace_int + 1  # spat_max is the maximum location of the sub-image
-        min_spat = np.fmax(spat_min[iline], 0)  # These min_spat and max_spat are to prevent leaving the image
-        max_spat = np.fmin(spat_max[iline], nspat - 1)
-        sub_img = arcimg_trans[min_spat:max_spat, :]
-        sub_inmask = inmask_trans[min_spat:max_spat, :]
-        sub_thismask = thismask_trans[min_spat:max_spat, :]
-        if do_crude:  # First time tracing, do a trace crude
-            # NOTE: follow_centroid behaves differently from the old
-            # trace_crude_init within 2-4 pixels at the trace edge
-
-            # Construct the line trace by following the line centroid as
-            # a function of spatial position along the slit.
-            # TODO: This also returns error estimates and a mask, but
-            # those weren't used in the previous version of the code.
-            smsub_img = utils.boxcar_smooth_rows(sub_img, tcrude_nave, wgt=sub_inmask)
-            #            ivar = np.sqrt(smsub_img)
-            ivar = None
-            tilts_guess_now, tge, tgm \
-                = trace.follow_centroid(smsub_img,
-                                        (sub_img.shape[0] - 1) // 2, lines_spec[iline], ivar=ivar,
-                                        bpm=np.invert(sub_inmask.astype(bool)), width=3 * fwhm,
-                                        maxshift_start=tcrude_maxshift0,
-                                        maxshift_follow=tcrude_maxshift,
-                                        maxerror=tcrude_maxerr, continuous=False)
-            tilts_guess_now = tilts_guess_now.flatten()
+        sub_img = arcimg_trans[min_spat[iline]:max_spat[iline], :]
+        sub_inmask = inmask_trans[min_spat[iline]:max_spat[iline], :]
+        sub_thismask = thismask_trans[min_spat[iline]:max_spat[iline], :]
+        if do_crude:
+            tilts_guess_now = tilts_crude[:max_spat[iline] - min_spat[iline], iline]
         else:
             # A guess was provided, use that as the crutch, but
             # determine if it is a full trace or a sub-trace
             if tilts_guess.shape[0] == nspat:
                 # This is full image size tilt trace, sub-window it
-                tilts_guess_now = tilts_guess[min_spat:max_spat, iline]
+                tilts_guess_now = tilts_guess[min_spat[iline]:max_spat[iline], iline]
             else:
                 # If it is a sub-trace, deal with falling off the image
                 if spat_min[iline] < 0:
@@ -364,37 +446,37 @@ def trace_tilts_work(arcimg, lines_spec, lines_spat, thismask, slit_cen, inmask=
             # tilts_sub[      -spat_min[iline]:,iline] = tilts_sub_out.flatten()
             # tilts_sub_err[  -spat_min[iline]:,iline] = tilts_sub_err_out.flatten()
             # tilts_sub_mask[ -spat_min[iline]:,iline] = tilts_sub_mask_box.flatten()
-            # tilts_sub_dspat[-spat_min[iline]:,iline] = tilts_dspat[min_spat:max_spat,iline]
-            tilts[min_spat:max_spat, iline] = tilts_sub_out.flatten()  # tilts_sub[     -spat_min[iline]:,iline]
-            tilts_fit[min_spat:max_spat, iline] = tilts_sub_fit[-spat_min[iline]:, iline]
-            tilts_err[min_spat:max_spat, iline] = tilts_sub_err_out.flatten()  # tilts_sub_err[ -spat_min[iline]:,iline]
-            tilts_bpm[min_spat:max_spat, iline] = tilts_sub_bpm_out.flatten()
-            tilts_mask[min_spat:max_spat,
+            # tilts_sub_dspat[-spat_min[iline]:,iline] = tilts_dspat[min_spat[iline]:max_spat[iline],iline]
+            tilts[min_spat[iline]:max_spat[iline], iline] = tilts_sub_out.flatten()  # tilts_sub[     -spat_min[iline]:,iline]
+            tilts_fit[min_spat[iline]:max_spat[iline], iline] = tilts_sub_fit[-spat_min[iline]:, iline]
+            tilts_err[min_spat[iline]:max_spat[iline], iline] = tilts_sub_err_out.flatten()  # tilts_sub_err[ -spat_min[iline]:,iline]
+            tilts_bpm[min_spat[iline]:max_spat[iline], iline] = tilts_sub_bpm_out.flatten()
+            tilts_mask[min_spat[iline]:max_spat[iline],
             iline] = tilts_sub_mask_box.flatten()  # tilts_sub_mask[-spat_min[iline]:,iline]
         elif spat_max[iline] > (nspat - 1):
             # tilts_sub[      :-(spat_max[iline] - nspat + 1),iline] = tilts_sub_out.flatten()
             # tilts_sub_err[  :-(spat_max[iline] - nspat + 1),iline] = tilts_sub_err_out.flatten()
             # tilts_sub_mask[ :-(spat_max[iline] - nspat + 1),iline] = tilts_sub_mask_box.flatten()
-            # tilts_sub_dspat[:-(spat_max[iline] - nspat + 1),iline] = tilts_dspat[min_spat:max_spat,iline]
-            tilts[min_spat:max_spat,
+            # tilts_sub_dspat[:-(spat_max[iline] - nspat + 1),iline] = tilts_dspat[min_spat[iline]:max_spat[iline],iline]
+            tilts[min_spat[iline]:max_spat[iline],
             iline] = tilts_sub_out.flatten()  # tilts_sub[     :-(spat_max[iline] - nspat + 1),iline]
-            tilts_fit[min_spat:max_spat, iline] = tilts_sub_fit[:-(spat_max[iline] - nspat + 1), iline]
-            tilts_err[min_spat:max_spat,
+            tilts_fit[min_spat[iline]:max_spat[iline], iline] = tilts_sub_fit[:-(spat_max[iline] - nspat + 1), iline]
+            tilts_err[min_spat[iline]:max_spat[iline],
             iline] = tilts_sub_err_out.flatten()  # tilts_sub_err[ :-(spat_max[iline] - nspat + 1),iline]
-            tilts_bpm[min_spat:max_spat,
+            tilts_bpm[min_spat[iline]:max_spat[iline],
             iline] = tilts_sub_bpm_out.flatten()  # tilts_sub_err[ :-(spat_max[iline] - nspat + 1),iline]
-            tilts_mask[min_spat:max_spat,
+            tilts_mask[min_spat[iline]:max_spat[iline],
             iline] = tilts_sub_mask_box.flatten()  # tilts_sub_mask[:-(spat_max[iline] - nspat + 1),iline]
         else:
             # tilts_sub[      :,iline] = tilts_sub_out.flatten()
             # tilts_sub_err[  :,iline] = tilts_sub_err_out.flatten()
             # tilts_sub_mask[ :,iline] = tilts_sub_mask_box.flatten()
-            # tilts_sub_dspat[:,iline] = tilts_dspat[min_spat:max_spat,iline]
-            tilts[min_spat:max_spat, iline] = tilts_sub_out.flatten()  # tilts_sub[     :,iline]
-            tilts_fit[min_spat:max_spat, iline] = tilts_sub_fit[:, iline]
-            tilts_err[min_spat:max_spat, iline] = tilts_sub_err_out.flatten()  # tilts_sub_err[ :,iline]
-            tilts_bpm[min_spat:max_spat, iline] = tilts_sub_bpm_out.flatten()  # tilts_sub_err[ :,iline]
-            tilts_mask[min_spat:max_spat, iline] = tilts_sub_mask_box.flatten()  # tilts_sub_mask[:,iline]
+            # tilts_sub_dspat[:,iline] = tilts_dspat[min_spat[iline]:max_spat[iline],iline]
+            tilts[min_spat[iline]:max_spat[iline], iline] = tilts_sub_out.flatten()  # tilts_sub[     :,iline]
+            tilts_fit[min_spat[iline]:max_spat[iline], iline] = tilts_sub_fit[:, iline]
+            tilts_err[min_spat[iline]:max_spat[iline], iline] = tilts_sub_err_out.flatten()  # tilts_sub_err[ :,iline]
+            tilts_bpm[min_spat[iline]:max_spat[iline], iline] = tilts_sub_bpm_out.flatten()  # tilts_sub_err[ :,iline]
+            tilts_mask[min_spat[iline]:max_spat[iline], iline] = tilts_sub_mask_box.flatten()  # tilts_sub_mask[:,iline]
 
         # Now use these fits to the traces to get a more robust value
         # of the tilt spectral position and spatial offset from the
@@ -709,9 +791,16 @@ def fit_tilts(trc_tilt_dict, thismask, slit_cen, spat_order=3, spec_order=4, max
     spec_img_nrm = spec_img_pad / xnspecmin1
     # Embed the old thismask in the new larger padded thismask
     thismask_pad[ind_spec + pad_spec, ind_spat + pad_spat] = thismask[ind_spec, ind_spat]
-    # Now grow the thismask_pad
+    # Now grow the thismask_pad.  The convolution is only performed within
+    # the bounding box of the slit, extended by the size of the kernel;
+    # all pixels beyond are not grown.
     kernel = np.ones((2 * pad_spec, 2 * pad_spat)) / float(4 * pad_spec * pad_spat)
-    thismask_grow = ndimage.convolve(thismask_pad.astype(float), kernel, mode='nearest') > 0.0
+    thismask_grow = np.zeros_like(thismask_pad)
+    if ind_spec.size > 0:
+        box = np.s_[max(ind_spec.min() - pad_spec + 1, 0):ind_spec.max() + 3 * pad_spec + 1,
+                    max(ind_spat.min() - pad_spat + 1, 0):ind_spat.max() + 3 * pad_spat + 1]
+        thismask_grow[box] = ndimage.convolve(thismask_pad[box].astype(float), kernel,
+                                              mode='nearest') > 0.0
     # Evaluate the tilts on the padded image grid
     tiltpix = spec_img_pad[thismask_grow] + xnspecmin1 \
               * pypeitFit.eval(spec_img_nrm[thismask_grow], x2=dspat_img_nrm[thismask_grow])
@@ -795,7 +884,7 @@ def fit_tilts(trc_tilt_dict, thismask, slit_cen, spat_order=3, spec_order=4, max
     # msgs.info("RMS/FWHM: {}".format(rms_real/fwhm))
 
 
-def fit2tilts(shape, coeff2, func2d, spat_shift=None):
+def fit2tilts(shape, coeff2, func2d, spat_shift=None, gpm=None):
     """
     Evaluate the wavelength tilt model over the full image.
 
@@ -811,6 +900,11 @@ def fit2tilts(shape, coeff2, func2d, spat_shift=None):
         Spatial shift to be added to image pixels before evaluation
         If you are accounting for flexure, then you probably wish to
         input -1*flexure_shift into this parameter.
+    gpm : ndarray, bool, optional
+        Boolean image with the same shape as the tilts image selecting
+        the pixels where the model should be evaluated, e.g. the pixels
+        in one slit.  Pixels that are not selected are set to 0.  If
+        None, the model is evaluated for all pixels.
 
     Returns
     -------
@@ -819,24 +913,69 @@ def fit2tilts(shape, coeff2, func2d, spat_shift=None):
         image. This output is used in the pipeline.
 
     """
+    if gpm is not None:
+        # Only evaluate the selected pixels
+        spec_img, spat_img = np.where(gpm)
+        tilts = np.zeros(shape, dtype=float)
+        tilts[spec_img, spat_img] = fit2tilts_pix(spec_img, spat_img, shape, coeff2, func2d,
+                                                  spat_shift=spat_shift)
+        return tilts
     # Init
     _spat_shift = 0. if spat_shift is None else spat_shift
     # Compute the tilts image
     nspec, nspat = shape
     xnspecmin1 = float(nspec - 1)
     xnspatmin1 = float(nspat - 1)
+    pypeitFit = fitting.PypeItFit(fitc=coeff2, minx=0.0, maxx=1.0,
+                                  minx2=0.0, maxx2=1.0, func=func2d)
     spec_vec = np.arange(nspec)
     spat_vec = np.arange(nspat) - _spat_shift
     spat_img, spec_img = np.meshgrid(spat_vec, spec_vec)
     #
-    pypeitFit = fitting.PypeItFit(fitc=coeff2, minx=0.0, maxx=1.0,
-                                  minx2=0.0, maxx2=1.0, func=func2d)
     tilts = pypeitFit.eval(spec_img / xnspecmin1, x2=spat_img / xnspatmin1)
     # Added this to ensure that tilts are never crazy values due to extrapolation of fits which can break
     # wavelength solution fitting
     return np.fmax(np.fmin(tilts, 1.2), -0.2)
 
 
+def fit2tilts_pix(spec, spat, shape, coeff2, func2d, spat_shift=None):
+    """
+    Evaluate the wavelength tilt model at a set of image pixels.
+
+    This is the same as :func:`fit2tilts`, but only for the provided
+    pixels, e.g. the pixels of one slit.
+
+    Parameters
+    ----------
+    spec: ndarray, int
+        Spectral pixel coordinates
+    spat: ndarray, int
+        Spatial pixel coordinates; must have the same shape as ``spec``.
+    shape: tuple of ints,
+        shape of image
+    coeff2: ndarray, float
+        result of griddata tilt fit
+    func2d: str
+        the 2d function used to fit the tilts
+    spat_shift : float, optional
+        Spatial shift to be added to image pixels before evaluation
+        If you are accounting for flexure, then you probably wish to
+        input -1*flexure_shift into this parameter.
+
+    Returns
+    -------
+    tilts: ndarray, float
+        Tilts at the provided pixels, with the same shape as ``spec``.
+
+    """
+    _spat_shift = 0. if spat_shift is None else spat_shift
+    nspec, nspat = shape
+    pypeitFit = fitting.PypeItFit(fitc=coeff2, minx=0.0, maxx=1.0,
+                                  minx2=0.0, maxx2=1.0, func=func2d)
+    tilts = pypeitFit.eval(spec / float(nspec - 1), x2=(spat - _spat_shift) / float(nspat - 1))
+    return np.fmax(np.fmin(tilts, 1.2), -0.2)
+
+
 # This method needs to match the name in pypeit.core.qa.set_qa_filename()
 def arc_tilts_2d_qa(tilts_dspat, tilts, tilts_model, tot_mask, rej_mask, spat_order, spec_order, rms, fwhm,
                  slitord_id=0, setup='A', outfile=None, show_QA=False, out_dir=None):
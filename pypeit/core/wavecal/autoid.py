@@ -3,6 +3,7 @@
 from scipy.ndimage.filters import gaussian_filter
 from scipy.spatial import cKDTree
 import itertools
+import time
 import scipy
 from linetools import utils as ltu
 from astropy import table, stats
@@ -541,9 +542,41 @@ def match_qa(arc_spec, tcent, line_list, IDs, scores, outfile = None, title=None
 #    return best_dict, final_fit
 
 
+def arxiv_lines(spec_arxiv, sigdetect=5.0, nonlinear_counts=1e10, fwhm=4.0, debug=False):
+    """
+    Detect the arc lines in a set of archived arc spectra.
+
+    Args:
+        spec_arxiv (`numpy.ndarray`_):
+            Archived arc spectra.  Shape must be (nspec, narxiv).
+        sigdetect (:obj:`float`, optional):
+            Detection threshold; see
+            :func:`~pypeit.core.wavecal.wvutils.arc_lines_from_spec`.
+        nonlinear_counts (:obj:`float`, optional):
+            Saturation threshold; see
+            :func:`~pypeit.core.wavecal.wvutils.arc_lines_from_spec`.
+        fwhm (:obj:`float`, optional):
+            Line FWHM in pixels; see
+            :func:`~pypeit.core.wavecal.wvutils.arc_lines_from_spec`.
+        debug (:obj:`bool`, optional):
+            Show the line detection plots.
+
+    Returns:
+        :obj:`list`: The pixel centroids of the lines detected in each
+        archived spectrum.
+    """
+    lines = []
+    for iarxiv in range(spec_arxiv.shape[1]):
+        tcent, _, _, icut, _ = wvutils.arc_lines_from_spec(
+                np.array(spec_arxiv[:,iarxiv], dtype=float), sigdetect=sigdetect,
+                nonlinear_counts=nonlinear_counts, fwhm=fwhm, debug=debug)
+        lines.append(tcent[icut])
+    return lines
+
+
 def reidentify(spec, spec_arxiv_in, wave_soln_arxiv_in, line_list, nreid_min, det_arxiv=None, detections=None, cc_thresh=0.8,cc_local_thresh = 0.8,
                match_toler=2.0, nlocal_cc=11, nonlinear_counts=1e10,sigdetect=5.0,fwhm=4.0,
-               debug_xcorr=False, debug_reid=False, debug_peaks = False):
+               xcorr_method='fft', debug_xcorr=False, debug_reid=False, debug_peaks = False):
     """ Determine  a wavelength solution for a set of spectra based on archival wavelength solutions
 
     Parameters
@@ -600,6 +633,10 @@ def reidentify(spec, spec_arxiv_in, wave_soln_arxiv_in, line_list, nreid_min, de
        Size of pixel window used for local cross-correlation computation for each arc line. If not an odd number one will
        be added to it to make it odd.
 
+    xcorr_method: str, default = 'fft'
+       Method used to determine the shift and stretch of the archive spectra. 'fft' uses
+       wvutils.xcorr_shift_stretch_fft to match all the archive spectra in a single call,
+       'differential_evolution' uses wvutils.xcorr_shift_stretch for each archive spectrum.
 
     debug_xcorr: bool, default = False
        Show plots useful for debugging the cross-correlation used for shift/stretch computation
@@ -675,19 +712,12 @@ def reidentify(spec, spec_arxiv_in, wave_soln_arxiv_in, line_list, nreid_min, de
     if detections is None:
         detections = tcent[icut]
 
-    spec_arxiv_cont_sub = np.zeros_like(spec_arxiv)
-
-    # Search for lines no matter what to continuum subtract the arxiv arc, also determine the central wavelength and
-    # dispersion of wavelength arxiv
-    det_arxiv1 = {}
-    for iarxiv in range(narxiv):
-        tcent_arxiv, ecent_arxiv, cut_tcent_arxiv, icut_arxiv, spec_cont_sub_now = wvutils.arc_lines_from_spec(
-            spec_arxiv[:,iarxiv], sigdetect=sigdetect,nonlinear_counts=nonlinear_counts, fwhm = fwhm, debug = debug_peaks)
-        spec_arxiv_cont_sub[:,iarxiv] = spec_cont_sub_now
-        det_arxiv1[str(iarxiv)] = tcent_arxiv[icut_arxiv]
-
+    # If the arxiv lines were not passed in measure them
     if det_arxiv is None:
-        det_arxiv = det_arxiv1
+        det_arxiv = {str(iarxiv): lines for iarxiv, lines
+                        in enumerate(arxiv_lines(spec_arxiv, sigdetect=sigdetect,
+                                                 nonlinear_counts=nonlinear_counts, fwhm=fwhm,
+                                                 debug=debug_peaks))}
 
     wvc_arxiv = np.zeros(narxiv, dtype=float)
     disp_arxiv = np.zeros(narxiv, dtype=float)
@@ -712,16 +742,26 @@ def reidentify(spec, spec_arxiv_in, wave_soln_arxiv_in, line_list, nreid_min, de
     shift_vec = np.zeros(narxiv)
     stretch_vec = np.zeros(narxiv)
     ccorr_vec = np.zeros(narxiv)
+    success_vec = np.zeros(narxiv, dtype=int)
+    if xcorr_method == 'fft':
+        # Match all the arxiv spectra at once
+        msgs.info('Cross-correlating with {:d} arxiv slits'.format(narxiv))
+        success_vec, shift_vec, stretch_vec, ccorr_vec, _, _ = \
+            wvutils.xcorr_shift_stretch_fft(spec_cont_sub, spec_arxiv, cc_thresh=cc_thresh,
+                                            fwhm=fwhm, debug=debug_xcorr)
+    elif xcorr_method != 'differential_evolution':
+        msgs.error('Unknown cross-correlation method: {0}'.format(xcorr_method))
     for iarxiv in range(narxiv):
-        msgs.info('Cross-correlating with arxiv slit # {:d}'.format(iarxiv))
         this_det_arxiv = det_arxiv[str(iarxiv)]
-        # Match the peaks between the two spectra. This code attempts to compute the stretch if cc > cc_thresh
-        success, shift_vec[iarxiv], stretch_vec[iarxiv], ccorr_vec[iarxiv], _, _ = \
-            wvutils.xcorr_shift_stretch(spec_cont_sub, spec_arxiv[:, iarxiv],
-                                        cc_thresh=cc_thresh, fwhm=fwhm, seed=random_state,
-                                        debug=debug_xcorr)
+        if xcorr_method == 'differential_evolution':
+            msgs.info('Cross-correlating with arxiv slit # {:d}'.format(iarxiv))
+            # Match the peaks between the two spectra. This code attempts to compute the stretch if cc > cc_thresh
+            success_vec[iarxiv], shift_vec[iarxiv], stretch_vec[iarxiv], ccorr_vec[iarxiv], _, _ = \
+                wvutils.xcorr_shift_stretch(spec_cont_sub, spec_arxiv[:, iarxiv],
+                                            cc_thresh=cc_thresh, fwhm=fwhm, seed=random_state,
+                                            debug=debug_xcorr)
         # If cc < cc_thresh or if this optimization failed, don't reidentify from this arxiv spectrum
-        if success != 1:
+        if success_vec[iarxiv] != 1:
             continue
         # Estimate wcen and disp for this slit based on its shift/stretch relative to the archive slit
         disp[iarxiv] = disp_arxiv[iarxiv] / stretch_vec[iarxiv]
@@ -847,7 +887,7 @@ def reidentify(spec, spec_arxiv_in, wave_soln_arxiv_in, line_list, nreid_min, de
 def full_template(spec, lamps, par, ok_mask, det, binspectral, nsnippet=2, 
                   debug_xcorr=False, debug_reid=False,
                   x_percentile=50., template_dict=None, debug=False, 
-                  nonlinear_counts=1e10):
+                  nonlinear_counts=1e10, nproc=1):
     """
     Method of wavelength calibration using a single, comprehensive template spectrum
 
@@ -878,6 +918,10 @@ def full_template(spec, lamps, par, ok_mask, det, binspectral, nsnippet=2,
         x_percentile: float, optional
           Passed to reidentify to reduce the dynamic range of arc line amplitudes
         template_dict (dict, optional): Dict containing tempmlate items, largely for development
+        nproc (int, optional):
+          Number of processes used to calibrate the slits; see
+          :func:`~pypeit.utils.get_nproc`.  The slits are calibrated
+          independently, so the result does not depend on this number.
 
     Returns:
         wvcalib: dict
@@ -895,7 +939,9 @@ def full_template(spec, lamps, par, ok_mask, det, binspectral, nsnippet=2,
     if template_dict is None:
         temp_wv, temp_spec, temp_bin = waveio.load_template(
             par['reid_arxiv'], det, wvrng=par['wvrng_arxiv'])
+        store = waveio.get_reid_arxiv_store(par['reid_arxiv'])
     else:
+        store = None
         temp_wv = template_dict['wave']
         temp_spec = template_dict['spec']
         temp_bin = template_dict['bin']
@@ -907,6 +953,17 @@ def full_template(spec, lamps, par, ok_mask, det, binspectral, nsnippet=2,
         temp_wv = arc.resize_spec(temp_wv, new_npix)
         temp_spec = arc.resize_spec(temp_spec, new_npix)
 
+    # Remove the continuum of the template; this is the same for all slits
+    # and saved in the arxiv store, if available.
+    if store is None:
+        tspec_cont_sub = wvutils.arc_lines_from_spec(temp_spec)[4]
+    else:
+        tspec_cont_sub = store.feature(
+                'template_cont_sub',
+                lambda: dict(tspec_cont_sub=wvutils.arc_lines_from_spec(temp_spec)[4]),
+                det=det, wvrng=None if par['wvrng_arxiv'] is None else list(par['wvrng_arxiv']),
+                binspectral=int(binspectral))['tspec_cont_sub']
+
     # Dimensions
     if spec.ndim == 2:
         nspec, nslits = spec.shape
@@ -915,155 +972,208 @@ def full_template(spec, lamps, par, ok_mask, det, binspectral, nsnippet=2,
         nslits = 1
         spec = np.reshape(spec, (nspec,1))
 
+    # Template and line list used by all slits
+    shared = dict(line_lists=line_lists, temp_wv=temp_wv, temp_spec=temp_spec,
+                  tspec_cont_sub=tspec_cont_sub)
+    kwargs = dict(par=par, binspectral=binspectral, nsnippet=nsnippet, debug_xcorr=debug_xcorr,
+                  debug_reid=debug_reid, x_percentile=x_percentile, debug=debug,
+                  nonlinear_counts=nonlinear_counts)
+    good_slits = [slit for slit in range(nslits) if slit in ok_mask]
+    arglist = [(slit, spec[:,slit], kwargs) for slit in good_slits]
+    # NOTE: The debugging plots cannot be shown by the worker processes
+    _nproc = 1 if debug or debug_xcorr or debug_reid else nproc
+    if utils.get_nproc(_nproc, ntasks=len(arglist)) > 1:
+        msgs.info(f'Wavelength calibration of {len(arglist)} slits using '
+                  f'{utils.get_nproc(_nproc, ntasks=len(arglist))} processes.')
+
     # Loop on slits
-    wvcalib = {}
-    for slit in range(nslits):
-        # Sigdetect
-        sigdetect = wvutils.parse_param(par, 'sigdetect', slit)
-        # Check
-        if slit not in ok_mask:
-            wvcalib[str(slit)] = None
-            continue
-        msgs.info("Processing slit {}".format(slit))
-        msgs.info("Using sigdetect = {}".format(sigdetect))
-        # Grab the observed arc spectrum
-        ispec = spec[:,slit]
-
-        # Find the shift
-        ncomb = temp_spec.size
-        # Remove the continuum before adding the padding to ispec
-        _, _, _, _, ispec_cont_sub = wvutils.arc_lines_from_spec(ispec)
-        _, _, _, _, tspec_cont_sub = wvutils.arc_lines_from_spec(temp_spec)
-        # Pad
-        pspec = np.zeros_like(temp_spec)
-        nspec = len(ispec)
-        npad = ncomb - nspec
-        if npad > 0:    # Pad the input spectrum
-            pspec[npad // 2:npad // 2 + len(ispec)] = ispec_cont_sub
-            tspec = tspec_cont_sub
-        elif npad < 0:  # Pad the template!
-            pspec = ispec_cont_sub
-            npad *= -1
-            tspec = np.zeros(nspec)
-            tspec[npad // 2:npad // 2 + ncomb] = tspec_cont_sub
-        else:  # No padding necessary
-            pspec = ispec_cont_sub
-            tspec = tspec_cont_sub
-        # Cross-correlate
-        shift_cc, corr_cc = wvutils.xcorr_shift(tspec, pspec, debug=debug, fwhm=par['fwhm'], percent_ceil=x_percentile)
-        #shift_cc, corr_cc = wvutils.xcorr_shift(temp_spec, pspec, debug=debug, percent_ceil=x_percentile)
-        msgs.info("Shift = {}; cc = {}".format(shift_cc, corr_cc))
-        if debug:
-            xvals = np.arange(tspec.size)
-            plt.clf()
-            ax = plt.gca()
-            #
-            ax.plot(xvals, tspec, label='template')  # Template
-            ax.plot(xvals, np.roll(pspec, int(shift_cc)), 'k', label='input')  # Input
-            ax.legend()
-            plt.show()
-            #embed(header='909 autoid')
-        i0 = npad // 2 + int(shift_cc)
-
-        # Generate the template snippet
-        if i0 < 0: # Pad?
-            mspec = np.concatenate([np.zeros(-1*i0), temp_spec[0:i0+nspec]])
-            mwv = np.concatenate([np.zeros(-1*i0), temp_wv[0:i0+nspec]])
-        elif (i0+nspec) > temp_spec.size: # Pad?
-            mspec = np.concatenate([temp_spec[i0:], np.zeros(nspec-temp_spec.size+i0)])
-            mwv = np.concatenate([temp_wv[i0:], np.zeros(nspec-temp_spec.size+i0)])
-        else: # Don't pad
-            mspec = temp_spec[i0:i0 + nspec]
-            mwv = temp_wv[i0:i0 + nspec]
-
-        if par['fwhm_fromlines'] is False:
-            fwhm = par['fwhm']
+    wvcalib = {str(slit): None for slit in range(nslits)}
+    for slit, (final_fit, elapsed) \
+            in zip(good_slits, utils.parallel_map(full_template_slit, arglist, nproc=_nproc,
+                                                  shared=shared)):
+        msgs.info(f'Wavelength calibration of slit {slit} took {elapsed:.1f} s')
+        wvcalib[str(slit)] = final_fit
+    # Finish
+    return wvcalib
+
+
+def full_template_slit(slit, ispec, kwargs):
+    """
+    Wavelength calibrate a single slit using the full template; see
+    :func:`full_template`.
+
+    This is executed by :func:`~pypeit.utils.parallel_map`; the line list and
+    the (rebinned) template must be available via
+    :func:`~pypeit.utils.shared_data` using the keys ``line_lists``,
+    ``temp_wv``, ``temp_spec``, and ``tspec_cont_sub``; the latter is the
+    continuum-subtracted template.
+
+    Args:
+        slit (:obj:`int`):
+            Index of the slit; used to select slit-dependent parameters.
+        ispec (`numpy.ndarray`_):
+            Arc spectrum of the slit.
+        kwargs (:obj:`dict`):
+            The ``par``, ``binspectral``, ``nsnippet``, ``debug_xcorr``,
+            ``debug_reid``, ``x_percentile``, ``debug``, and
+            ``nonlinear_counts`` arguments of :func:`full_template`.
+
+    Returns:
+        :obj:`tuple`: The :class:`~pypeit.core.wavecal.wv_fitting.WaveFit`
+        result, or None if the calibration failed, and the execution time in
+        seconds.
+    """
+    start = time.perf_counter()
+    # Shared template and line list
+    line_lists = utils.shared_data('line_lists')
+    temp_wv = utils.shared_data('temp_wv')
+    temp_spec = utils.shared_data('temp_spec')
+    tspec_cont_sub = utils.shared_data('tspec_cont_sub')
+    # Parameters
+    par = kwargs['par']
+    binspectral = kwargs['binspectral']
+    nsnippet = kwargs['nsnippet']
+    debug_xcorr = kwargs['debug_xcorr']
+    debug_reid = kwargs['debug_reid']
+    x_percentile = kwargs['x_percentile']
+    debug = kwargs['debug']
+    nonlinear_counts = kwargs['nonlinear_counts']
+    # Sigdetect
+    sigdetect = wvutils.parse_param(par, 'sigdetect', slit)
+    msgs.info("Processing slit {}".format(slit))
+    msgs.info("Using sigdetect = {}".format(sigdetect))
+
+    # Find the shift
+    ncomb = temp_spec.size
+    # Remove the continuum before adding the padding to ispec
+    _, _, _, _, ispec_cont_sub = wvutils.arc_lines_from_spec(ispec)
+    # Pad
+    pspec = np.zeros_like(temp_spec)
+    nspec = len(ispec)
+    npad = ncomb - nspec
+    if npad > 0:    # Pad the input spectrum
+        pspec[npad // 2:npad // 2 + len(ispec)] = ispec_cont_sub
+        tspec = tspec_cont_sub
+    elif npad < 0:  # Pad the template!
+        pspec = ispec_cont_sub
+        npad *= -1
+        tspec = np.zeros(nspec)
+        tspec[npad // 2:npad // 2 + ncomb] = tspec_cont_sub
+    else:  # No padding necessary
+        pspec = ispec_cont_sub
+        tspec = tspec_cont_sub
+    # Cross-correlate
+    shift_cc, corr_cc = wvutils.xcorr_shift(tspec, pspec, debug=debug, fwhm=par['fwhm'], percent_ceil=x_percentile)
+    #shift_cc, corr_cc = wvutils.xcorr_shift(temp_spec, pspec, debug=debug, percent_ceil=x_percentile)
+    msgs.info("Shift = {}; cc = {}".format(shift_cc, corr_cc))
+    if debug:
+        xvals = np.arange(tspec.size)
+        plt.clf()
+        ax = plt.gca()
+        #
+        ax.plot(xvals, tspec, label='template')  # Template
+        ax.plot(xvals, np.roll(pspec, int(shift_cc)), 'k', label='input')  # Input
+        ax.legend()
+        plt.show()
+        #embed(header='909 autoid')
+    i0 = npad // 2 + int(shift_cc)
+
+    # Generate the template snippet
+    if i0 < 0: # Pad?
+        mspec = np.concatenate([np.zeros(-1*i0), temp_spec[0:i0+nspec]])
+        mwv = np.concatenate([np.zeros(-1*i0), temp_wv[0:i0+nspec]])
+    elif (i0+nspec) > temp_spec.size: # Pad?
+        mspec = np.concatenate([temp_spec[i0:], np.zeros(nspec-temp_spec.size+i0)])
+        mwv = np.concatenate([temp_wv[i0:], np.zeros(nspec-temp_spec.size+i0)])
+    else: # Don't pad
+        mspec = temp_spec[i0:i0 + nspec]
+        mwv = temp_wv[i0:i0 + nspec]
+
+    if par['fwhm_fromlines'] is False:
+        fwhm = par['fwhm']
+    else:
+        # Determine the lines FWHM, i.e, approximate spectral resolution
+        _, _, _, wdth, _, best, _, nsig = arc.detect_lines(ispec, sigdetect=10., fwhm=5.)
+        # 1sigma Gaussian widths of the line detections
+        wdth = wdth[best]
+        # significance of each line detected
+        nsig = nsig[best]
+        # Nsigma (significance) threshold. We use only lines that have the highest significance
+        # We start with nsig_thrshd of 500 and iteratively reduce it if there are not more than 6 lines
+        nsig_thrshd = 500.
+        while nsig_thrshd > 10.:
+            if wdth[nsig > nsig_thrshd].size > 6:
+                # compute average `wdth`
+                mean, med, _ = stats.sigma_clipped_stats(wdth[nsig > nsig_thrshd], sigma_lower=2.0, sigma_upper=2.0)
+                # FWHM in pixels
+                fwhm = np.ceil(med * 2.35482) / binspectral
+                msgs.info("Measured arc lines FWHM: {} pixels".format(fwhm))
+                break
+            nsig_thrshd -= 5
         else:
-            # Determine the lines FWHM, i.e, approximate spectral resolution
-            _, _, _, wdth, _, best, _, nsig = arc.detect_lines(ispec, sigdetect=10., fwhm=5.)
-            # 1sigma Gaussian widths of the line detections
-            wdth = wdth[best]
-            # significance of each line detected
-            nsig = nsig[best]
-            # Nsigma (significance) threshold. We use only lines that have the highest significance
-            # We start with nsig_thrshd of 500 and iteratively reduce it if there are not more than 6 lines
-            nsig_thrshd = 500.
-            while nsig_thrshd > 10.:
-                if wdth[nsig > nsig_thrshd].size > 6:
-                    # compute average `wdth`
-                    mean, med, _ = stats.sigma_clipped_stats(wdth[nsig > nsig_thrshd], sigma_lower=2.0, sigma_upper=2.0)
-                    # FWHM in pixels
-                    fwhm = np.ceil(med * 2.35482) / binspectral
-                    msgs.info("Measured arc lines FWHM: {} pixels".format(fwhm))
-                    break
-                nsig_thrshd -= 5
-            else:
-                fwhm = par['fwhm']
-                msgs.warn("Assumed arc lines FWHM: {}".format(fwhm))
-
-        # Loop on snippets
-        nsub = ispec.size // nsnippet
-        sv_det, sv_IDs = [], []
-        for kk in range(nsnippet):
-            # Construct
-            j0 = nsub * kk
-            j1 = min(nsub*(kk+1), ispec.size)
-            tsnippet = ispec[j0:j1]
-            msnippet = mspec[j0:j1]
-            mwvsnippet = mwv[j0:j1]
-            # TODO: JFH This continue statement deals with the case when the msnippet derives from *entirely* zero-padded
-            #  pixels, and allows the code to continue with crashing. This code is constantly causing reidentify to crash
-            #  by passing in these junk snippets that are almost entirely zero-padded for large shifts. We should
-            #  be checking for this intelligently rather than constantly calling reidentify with basically junk arxiv
-            #  spectral snippets.
-            if not np.any(msnippet):
-                continue
-            # TODO -- JXP
-            #  should we use par['cc_thresh'] instead of hard-coding cc_thresh??
-            # Run reidentify
-            detections, spec_cont_sub, patt_dict = reidentify(tsnippet, msnippet, mwvsnippet,
-                                                              line_lists, 1, debug_xcorr=debug_xcorr,
-                                                              sigdetect=sigdetect,
-                                                              nonlinear_counts=nonlinear_counts,
-                                                              debug_reid=debug_reid,  # verbose=True,
-                                                              match_toler=par['match_toler'],
-                                                              cc_thresh=0.1, fwhm=fwhm)
-            # Deal with IDs
-            sv_det.append(j0 + detections)
-            try:
-                sv_IDs.append(patt_dict['IDs'])
-            except KeyError:
-                msgs.warn("Failed to perform wavelength calibration in reidentify..")
-                sv_IDs.append(np.zeros_like(detections))
-            else:
-                # Save now in case the next one barfs
-                bdisp = patt_dict['bdisp']
-
-        # Collate and proceed
-        dets = np.concatenate(sv_det)
-        IDs = np.concatenate(sv_IDs)
-        gd_det = np.where(IDs > 0.)[0]
-        if len(gd_det) < 4:
-            msgs.warn("Not enough useful IDs")
-            wvcalib[str(slit)] = None
+            fwhm = par['fwhm']
+            msgs.warn("Assumed arc lines FWHM: {}".format(fwhm))
+
+    # Loop on snippets
+    nsub = ispec.size // nsnippet
+    sv_det, sv_IDs = [], []
+    for kk in range(nsnippet):
+        # Construct
+        j0 = nsub * kk
+        j1 = min(nsub*(kk+1), ispec.size)
+        tsnippet = ispec[j0:j1]
+        msnippet = mspec[j0:j1]
+        mwvsnippet = mwv[j0:j1]
+        # TODO: JFH This continue statement deals with the case when the msnippet derives from *entirely* zero-padded
+        #  pixels, and allows the code to continue with crashing. This code is constantly causing reidentify to crash
+        #  by passing in these junk snippets that are almost entirely zero-padded for large shifts. We should
+        #  be checking for this intelligently rather than constantly calling reidentify with basically junk arxiv
+        #  spectral snippets.
+        if not np.any(msnippet):
             continue
-        # Fit
+        # TODO -- JXP
+        #  should we use par['cc_thresh'] instead of hard-coding cc_thresh??
+        # Run reidentify
+        detections, spec_cont_sub, patt_dict = reidentify(tsnippet, msnippet, mwvsnippet,
+                                                          line_lists, 1, debug_xcorr=debug_xcorr,
+                                                          sigdetect=sigdetect,
+                                                          nonlinear_counts=nonlinear_counts,
+                                                          debug_reid=debug_reid,  # verbose=True,
+                                                          match_toler=par['match_toler'],
+                                                          cc_thresh=0.1, fwhm=fwhm,
+                                                          xcorr_method=par['xcorr_method'])
+        # Deal with IDs
+        sv_det.append(j0 + detections)
         try:
-            final_fit = wv_fitting.iterative_fitting(ispec, dets, gd_det,
-                                              IDs[gd_det], line_lists, bdisp,
-                                              verbose=False, n_first=par['n_first'],
-                                              match_toler=par['match_toler'],
-                                              func=par['func'],
-                                              n_final=par['n_final'],
-                                              sigrej_first=par['sigrej_first'],
-                                              sigrej_final=par['sigrej_final'])
-        except TypeError:
-            #embed(header='974 of autoid')
-            wvcalib[str(slit)] = None
+            sv_IDs.append(patt_dict['IDs'])
+        except KeyError:
+            msgs.warn("Failed to perform wavelength calibration in reidentify..")
+            sv_IDs.append(np.zeros_like(detections))
         else:
-            wvcalib[str(slit)] = copy.deepcopy(final_fit)
-    # Finish
-    return wvcalib
+            # Save now in case the next one barfs
+            bdisp = patt_dict['bdisp']
+
+    # Collate and proceed
+    dets = np.concatenate(sv_det)
+    IDs = np.concatenate(sv_IDs)
+    gd_det = np.where(IDs > 0.)[0]
+    if len(gd_det) < 4:
+        msgs.warn("Not enough useful IDs")
+        return None, time.perf_counter() - start
+    # Fit
+    try:
+        final_fit = wv_fitting.iterative_fitting(ispec, dets, gd_det,
+                                          IDs[gd_det], line_lists, bdisp,
+                                          verbose=False, n_first=par['n_first'],
+                                          match_toler=par['match_toler'],
+                                          func=par['func'],
+                                          n_final=par['n_final'],
+                                          sigrej_first=par['sigrej_first'],
+                                          sigrej_final=par['sigrej_final'])
+    except TypeError:
+        #embed(header='974 of autoid')
+        return None, time.perf_counter() - start
+    return copy.deepcopy(final_fit), time.perf_counter() - start
 
 
 class ArchiveReid:
@@ -1116,6 +1226,10 @@ class ArchiveReid:
         For arc line detection: Arc lines above this saturation
         threshold are not used in wavelength solution fits because
         they cannot be accurately centroided
+    nproc : :obj:`int`, optional
+        Number of processes used to reidentify the slits; see
+        :func:`~pypeit.utils.get_nproc`.  The slits are reidentified
+        independently, so the result does not depend on this number.
 
     Attributes
     ----------
@@ -1129,7 +1243,7 @@ class ArchiveReid:
     # TODO: Because we're passing orders directly, we no longer need spectrograph...
     def __init__(self, spec, spectrograph, lamps, par, ok_mask=None, use_unknowns=True, debug_all=False,
                  debug_peaks=False, debug_xcorr=False, debug_reid=False, debug_fits=False,
-                 orders=None, nonlinear_counts=1e10):
+                 orders=None, nonlinear_counts=1e10, nproc=1):
 
         # TODO: Perform detailed checking of the input
 
@@ -1208,18 +1322,24 @@ class ArchiveReid:
         self.tot_line_list = table.vstack([self.line_lists, self.unknwns]) if self.use_unknowns \
                                 else self.line_lists
 
-        # Read in the wv_calib_arxiv and pull out some relevant quantities
+        # Read in the arxiv spectra and wavelength solutions, using the
+        # memory-mapped store if possible
         # ToDO deal with different binnings!
-        self.wv_calib_arxiv, self.par_arxiv = waveio.load_reid_arxiv(self.reid_arxiv)
+        store = waveio.get_reid_arxiv_store(self.reid_arxiv)
+        if store is None:
+            wv_calib_arxiv, _ = waveio.load_reid_arxiv(self.reid_arxiv)
+            keys = [str(i) for i in range(np.sum([k.isdigit() for k in wv_calib_arxiv.keys()]))]
+            wave_arxiv = np.stack([wv_calib_arxiv[k]['wave_soln'] for k in keys])
+            flux_arxiv = np.stack([wv_calib_arxiv[k]['spec'] for k in keys])
+            arxiv_orders = [wv_calib_arxiv[k]['order'] for k in keys] \
+                                if self.ech_fix_format else None
+        else:
+            wave_arxiv = store['wave']
+            flux_arxiv = store['flux']
+            arxiv_orders = store['order'].tolist() if self.ech_fix_format else None
 
-        # Determine the number of spectra in the arxiv, check that it
-        # matches nslits if this is fixed format.
-        narxiv = len(self.wv_calib_arxiv)
-        for key in self.wv_calib_arxiv.keys():
-            try:
-                test = int(key)
-            except ValueError:
-                narxiv -=1
+        # Determine the number of spectra in the arxiv
+        narxiv = flux_arxiv.shape[0]
 
         #if self.ech_fix_format and (self.nslits != narxiv):
         #    msgs.error('You have set ech_fix_format = True, but nslits={:d} != narxiv={:d}'.format(self.nslits,narxiv) + '.' +
@@ -1229,19 +1349,28 @@ class ArchiveReid:
         # Array to hold continuum subtracted arcs
         self.spec_cont_sub = np.zeros_like(self.spec)
 
-        nspec_arxiv = self.wv_calib_arxiv['0']['spec'].size
-        self.spec_arxiv = np.zeros((nspec_arxiv, narxiv))
-        self.wave_soln_arxiv = np.zeros((nspec_arxiv, narxiv))
+        self.spec_arxiv = np.asarray(flux_arxiv.T, dtype=float)
+        self.wave_soln_arxiv = np.asarray(wave_arxiv.T, dtype=float)
+
+        # Detect the lines in the arxiv spectra, resized to match the input
+        # spectra, for each detection threshold.  These are the same for
+        # all slits, and saved in the arxiv store, if available.
         self.det_arxiv = {}
-        for iarxiv in range(narxiv):
-            self.spec_arxiv[:, iarxiv] = self.wv_calib_arxiv[str(iarxiv)]['spec']
-            self.wave_soln_arxiv[:, iarxiv] = self.wv_calib_arxiv[str(iarxiv)]['wave_soln']
-        # arxiv orders (echelle only)
-        if self.ech_fix_format:
-            arxiv_orders = []
-            for iarxiv in range(narxiv):
-                arxiv_orders.append(self.wv_calib_arxiv[str(iarxiv)]['order'])
-#            orders, _ = self.spectrograph.slit2order(slit_spat_pos)
+        for sigdetect in np.unique([wvutils.parse_param(self.par, 'sigdetect', slit)
+                                    for slit in range(self.nslits) if slit in self.ok_mask]):
+            def _lines(sigdetect=sigdetect):
+                lines = arxiv_lines(arc.resize_spec(self.spec_arxiv, self.nspec),
+                                    sigdetect=sigdetect, nonlinear_counts=self.nonlinear_counts,
+                                    fwhm=self.fwhm)
+                return dict(tcent=np.concatenate(lines),
+                            nlines=np.array([l.size for l in lines], dtype=int))
+            _det = _lines() if store is None \
+                        else store.feature('arxiv_lines', _lines, nspec=int(self.nspec),
+                                           sigdetect=float(sigdetect),
+                                           nonlinear_counts=float(self.nonlinear_counts),
+                                           fwhm=float(self.fwhm))
+            self.det_arxiv[sigdetect] = np.split(np.asarray(_det['tcent']),
+                                                 np.cumsum(_det['nlines'])[:-1])
 
         ind_arxiv = np.arange(narxiv, dtype=int)
         # These are the final outputs
@@ -1249,47 +1378,41 @@ class ArchiveReid:
         self.detections = {}
         self.wv_calib = {}
         self.bad_slits = np.array([], dtype=np.int)
-        # Reidentify each slit, and perform a fit
-        for slit in range(self.nslits):
-            # ToDO should we still be populating wave_calib with an empty dict here?
-            if slit not in self.ok_mask:
-                self.wv_calib[str(slit)] = None
-                continue
-            msgs.info('Reidentifying and fitting slit # {0:d}/{1:d}'.format(slit,self.nslits-1))
-            # If this is a fixed format echelle, arxiv has exactly the same orders as the data and so
-            # we only pass in the relevant arxiv spectrum to make this much faster
-            ind_sp = arxiv_orders.index(orders[slit]) if self.ech_fix_format else ind_arxiv
-            sigdetect = wvutils.parse_param(self.par, 'sigdetect', slit)
-            cc_thresh = wvutils.parse_param(self.par, 'cc_thresh', slit)
-            rms_threshold = wvutils.parse_param(self.par, 'rms_threshold', slit)
-            msgs.info("Using sigdetect =  {}".format(sigdetect))
-            msgs.info("Using rms_threshold =  {}".format(rms_threshold))
-            self.detections[str(slit)], self.spec_cont_sub[:,slit], self.all_patt_dict[str(slit)] = \
-                reidentify(self.spec[:,slit], self.spec_arxiv[:,ind_sp], self.wave_soln_arxiv[:,ind_sp],
-                           self.tot_line_list, self.nreid_min, cc_thresh=cc_thresh, match_toler=self.match_toler,
-                           cc_local_thresh=self.cc_local_thresh, nlocal_cc=self.nlocal_cc, nonlinear_counts=self.nonlinear_counts,
-                           sigdetect=sigdetect, fwhm=self.fwhm, debug_peaks=self.debug_peaks, debug_xcorr=self.debug_xcorr,
-                           debug_reid=self.debug_reid)
-            # Check if an acceptable reidentification solution was found
-            if not self.all_patt_dict[str(slit)]['acceptable']:
-                self.wv_calib[str(slit)] = None
-                self.bad_slits = np.append(self.bad_slits, slit)
-                continue
-
-            # Perform the fit
-            n_final = wvutils.parse_param(self.par, 'n_final', slit)
-            final_fit = wv_fitting.fit_slit(self.spec_cont_sub[:, slit], self.all_patt_dict[str(slit)],
-                                         self.detections[str(slit)],
-                                         self.tot_line_list, match_toler=self.match_toler,func=self.func, n_first=self.n_first,
-                                         sigrej_first=self.sigrej_first, n_final=n_final,sigrej_final=self.sigrej_final)
+        # Line list and arxiv spectra used by all slits
+        shared = dict(line_list=self.tot_line_list, spec_arxiv=self.spec_arxiv,
+                      wave_soln_arxiv=self.wave_soln_arxiv, det_arxiv=self.det_arxiv)
+        kwargs = dict(par=self.par, nreid_min=self.nreid_min, match_toler=self.match_toler,
+                      cc_local_thresh=self.cc_local_thresh, nlocal_cc=self.nlocal_cc,
+                      nonlinear_counts=self.nonlinear_counts, fwhm=self.fwhm,
+                      debug_peaks=self.debug_peaks, debug_xcorr=self.debug_xcorr,
+                      debug_reid=self.debug_reid)
+        good_slits = [slit for slit in range(self.nslits) if slit in self.ok_mask]
+        # If this is a fixed format echelle, arxiv has exactly the same orders as the data and so
+        # we only pass in the relevant arxiv spectrum to make this much faster
+        arglist = [(slit, self.spec[:,slit],
+                    arxiv_orders.index(orders[slit]) if self.ech_fix_format else ind_arxiv,
+                    kwargs) for slit in good_slits]
+        # NOTE: The debugging plots cannot be shown by the worker processes
+        _nproc = 1 if self.debug_peaks or self.debug_xcorr or self.debug_reid else nproc
+        if utils.get_nproc(_nproc, ntasks=len(arglist)) > 1:
+            msgs.info(f'Reidentification of {len(arglist)} slits using '
+                      f'{utils.get_nproc(_nproc, ntasks=len(arglist))} processes.')
 
-            # Did the fit succeed?
+        # Reidentify each slit, and perform a fit
+        # ToDO should we still be populating wave_calib with an empty dict here?
+        self.wv_calib = {str(slit): None for slit in range(self.nslits)}
+        for slit, (detections, spec_cont_sub, patt_dict, final_fit) \
+                in zip(good_slits, utils.parallel_map(archive_reid_slit, arglist, nproc=_nproc,
+                                                      shared=shared)):
+            self.detections[str(slit)] = detections
+            self.spec_cont_sub[:,slit] = spec_cont_sub
+            self.all_patt_dict[str(slit)] = patt_dict
+            # Did the reidentification or the fit fail?
             if final_fit is None:
-                # This pattern wasn't good enough
-                self.wv_calib[str(slit)] = None
                 self.bad_slits = np.append(self.bad_slits, slit)
                 continue
             # Is the RMS below the threshold?
+            rms_threshold = wvutils.parse_param(self.par, 'rms_threshold', slit)
             if final_fit['rms'] > rms_threshold:
                 msgs.warn('---------------------------------------------------' + msgs.newline() +
                           'Reidentify report for slit {0:d}/{1:d}:'.format(slit, self.nslits-1) + msgs.newline() +
@@ -1300,7 +1423,7 @@ class ArchiveReid:
                 # Note this result in new_bad_slits, but store the solution since this might be the best possible
 
             # Add the patt_dict and wv_calib to the output dicts
-            self.wv_calib[str(slit)] = copy.deepcopy(final_fit)
+            self.wv_calib[str(slit)] = final_fit
             if self.debug_fits:
                 arc_fit_qa(self.wv_calib[str(slit)], title='Silt: {}'.format(str(slit)))
 
@@ -1347,6 +1470,114 @@ class ArchiveReid:
 
 
 
+def holy_grail_brute_slit(slit, min_nlines):
+    """
+    Detect the arc lines in a single slit and run the brute-force pattern
+    matching; see :func:`HolyGrail.run_brute`.
+
+    This is executed by :func:`~pypeit.utils.parallel_map`; the
+    :class:`HolyGrail` object must be available via
+    :func:`~pypeit.utils.shared_data` using the key ``arcfitter``.
+
+    Args:
+        slit (:obj:`int`):
+            Index of the slit.
+        min_nlines (:obj:`int`):
+            Minimum number of detected lines required to attempt the pattern
+            matching.
+
+    Returns:
+        :obj:`tuple`: The weak and strong line detections, and the best
+        pattern dictionary and fit.  All are None if fewer than
+        ``min_nlines`` lines are detected.
+    """
+    arcfitter = utils.shared_data('arcfitter')
+    # TODO Pass in all the possible params for detect_lines to arc_lines_from_spec, and update the parset
+    # Detect lines, and decide which tcent to use
+    sigdetect = wvutils.parse_param(arcfitter._par, 'sigdetect', slit)
+    msgs.info("Using sigdetect =  {}".format(sigdetect))
+    # NOTE: These attributes are scratch space used by the pattern matching
+    arcfitter._all_tcent, arcfitter._all_ecent, arcfitter._cut_tcent, arcfitter._icut, _ = \
+        wvutils.arc_lines_from_spec(arcfitter._spec[:, slit].copy(), sigdetect=sigdetect,
+                                    nonlinear_counts=arcfitter._nonlinear_counts)
+    arcfitter._all_tcent_weak, arcfitter._all_ecent_weak, arcfitter._cut_tcent_weak, \
+            arcfitter._icut_weak, _ = \
+        wvutils.arc_lines_from_spec(arcfitter._spec[:, slit].copy(), sigdetect=sigdetect,
+                                    nonlinear_counts=arcfitter._nonlinear_counts)
+    # Were there enough lines?  This mainly deals with junk slits
+    if arcfitter._all_tcent.size < min_nlines:
+        return None, None, None, None
+    det_weak = [arcfitter._all_tcent_weak[arcfitter._icut_weak].copy(),
+                arcfitter._all_ecent_weak[arcfitter._icut_weak].copy()]
+    det_stro = [arcfitter._all_tcent[arcfitter._icut].copy(),
+                arcfitter._all_ecent[arcfitter._icut].copy()]
+    # Run brute force algorithm on the weak lines
+    best_patt_dict, best_final_fit = arcfitter.run_brute_loop(slit, det_weak)
+    return det_weak, det_stro, best_patt_dict, best_final_fit
+
+
+def archive_reid_slit(slit, spec, ind_sp, kwargs):
+    """
+    Reidentify the arc lines in a single slit and fit the wavelength
+    solution; see :class:`ArchiveReid`.
+
+    This is executed by :func:`~pypeit.utils.parallel_map`; the line list,
+    the arxiv spectra, and the lines detected in the arxiv spectra must be
+    available via :func:`~pypeit.utils.shared_data` using the keys
+    ``line_list``, ``spec_arxiv``, ``wave_soln_arxiv``, and ``det_arxiv``.
+    The latter is a dictionary with the lists of the lines detected in each
+    arxiv spectrum, keyed by the detection threshold.
+
+    Args:
+        slit (:obj:`int`):
+            Index of the slit; used to select slit-dependent parameters.
+        spec (`numpy.ndarray`_):
+            Arc spectrum of the slit.
+        ind_sp (:obj:`int`, `numpy.ndarray`_):
+            Index or indices of the arxiv spectra to use.
+        kwargs (:obj:`dict`):
+            Parameters of the reidentification and the fit; see
+            :class:`ArchiveReid`.
+
+    Returns:
+        :obj:`tuple`: The detected lines, the continuum-subtracted spectrum,
+        the pattern dictionary returned by :func:`reidentify`, and the
+        :class:`~pypeit.core.wavecal.wv_fitting.WaveFit` result.  The latter
+        is None if the reidentification or the fit failed.
+    """
+    par = kwargs['par']
+    line_list = utils.shared_data('line_list')
+    msgs.info('Reidentifying and fitting slit # {0:d}'.format(slit))
+    sigdetect = wvutils.parse_param(par, 'sigdetect', slit)
+    cc_thresh = wvutils.parse_param(par, 'cc_thresh', slit)
+    rms_threshold = wvutils.parse_param(par, 'rms_threshold', slit)
+    msgs.info("Using sigdetect =  {}".format(sigdetect))
+    msgs.info("Using rms_threshold =  {}".format(rms_threshold))
+    det_arxiv = utils.shared_data('det_arxiv')[sigdetect]
+    det_arxiv = {str(i): det_arxiv[j] for i, j in enumerate(np.atleast_1d(ind_sp))}
+    detections, spec_cont_sub, patt_dict = \
+        reidentify(spec, utils.shared_data('spec_arxiv')[:,ind_sp],
+                   utils.shared_data('wave_soln_arxiv')[:,ind_sp], line_list, kwargs['nreid_min'],
+                   det_arxiv=det_arxiv,
+                   cc_thresh=cc_thresh, match_toler=kwargs['match_toler'],
+                   cc_local_thresh=kwargs['cc_local_thresh'], nlocal_cc=kwargs['nlocal_cc'],
+                   nonlinear_counts=kwargs['nonlinear_counts'], sigdetect=sigdetect,
+                   fwhm=kwargs['fwhm'], xcorr_method=par['xcorr_method'],
+                   debug_peaks=kwargs['debug_peaks'], debug_xcorr=kwargs['debug_xcorr'],
+                   debug_reid=kwargs['debug_reid'])
+    # Check if an acceptable reidentification solution was found
+    if not patt_dict['acceptable']:
+        return detections, spec_cont_sub, patt_dict, None
+
+    # Perform the fit
+    n_final = wvutils.parse_param(par, 'n_final', slit)
+    final_fit = wv_fitting.fit_slit(spec_cont_sub, patt_dict, detections, line_list,
+                                    match_toler=kwargs['match_toler'], func=par['func'],
+                                    n_first=par['n_first'], sigrej_first=par['sigrej_first'],
+                                    n_final=n_final, sigrej_final=par['sigrej_final'])
+    return detections, spec_cont_sub, patt_dict, copy.deepcopy(final_fit)
+
+
 class HolyGrail:
     """ General algorithm to wavelength calibrate spectroscopic data
 
@@ -1384,6 +1615,10 @@ class HolyGrail:
         in the fit.
     spectrograph : str, optional
         Spectrograph name
+    nproc : int, optional
+        Number of processes used for the pattern matching of the
+        individual slits by the brute force algorithm; see
+        :func:`~pypeit.utils.get_nproc`.
 
     Returns
     -------
@@ -1400,7 +1635,7 @@ class HolyGrail:
     def __init__(self, spec, lamps, par=None, ok_mask=None, islinelist=False,
                  outroot=None, debug=False, verbose=False,
                  binw=None, bind=None, nstore=1, use_unknowns=True, 
-                 nonlinear_counts=None, spectrograph=None):
+                 nonlinear_counts=None, spectrograph=None, nproc=1):
 
         # Set some default parameters
         self._spec = spec
@@ -1434,6 +1669,7 @@ class HolyGrail:
 
         self._debug = debug
         self._verbose = verbose
+        self._nproc = nproc
 
         # Load the linelist to be used for pattern matching
         if self._islinelist:
@@ -1553,22 +1789,26 @@ class HolyGrail:
         good_fit = np.zeros(self._nslit, dtype=np.bool)
         self._det_weak = {}
         self._det_stro = {}
+        good_slits = [slit for slit in range(self._nslit) if slit in self._ok_mask]
+        # NOTE: The debugging plots cannot be shown by the worker processes
+        nproc = 1 if self._debug else self._nproc
+        if utils.get_nproc(nproc, ntasks=len(good_slits)) > 1:
+            msgs.info(f'Pattern matching of {len(good_slits)} slits using '
+                      f'{utils.get_nproc(nproc, ntasks=len(good_slits))} processes.')
+        # The pattern matching for each slit only reads the attributes of this
+        # object, which is sent once to each worker process.
+        results = utils.parallel_map(holy_grail_brute_slit, [(slit, min_nlines) for slit in good_slits],
+                                     nproc=nproc, shared=dict(arcfitter=self))
+        results = dict(zip(good_slits, results))
         for slit in range(self._nslit):
             msgs.info("Working on slit: {}".format(slit))
-            if slit not in self._ok_mask:
+            if slit not in results or slit not in self._ok_mask:
                 self._all_final_fit[str(slit)] = None
                 continue
-            # TODO Pass in all the possible params for detect_lines to arc_lines_from_spec, and update the parset
-            # Detect lines, and decide which tcent to use
-            sigdetect = wvutils.parse_param(self._par, 'sigdetect', slit)
-            msgs.info("Using sigdetect =  {}".format(sigdetect))
-            self._all_tcent, self._all_ecent, self._cut_tcent, self._icut, _  =\
-                wvutils.arc_lines_from_spec(self._spec[:, slit].copy(), sigdetect=sigdetect, nonlinear_counts = self._nonlinear_counts)
-            self._all_tcent_weak, self._all_ecent_weak, self._cut_tcent_weak, self._icut_weak, _  =\
-                wvutils.arc_lines_from_spec(self._spec[:, slit].copy(), sigdetect=sigdetect, nonlinear_counts = self._nonlinear_counts)
+            det_weak, det_stro, best_patt_dict, best_final_fit = results[slit]
 
             # Were there enough lines?  This mainly deals with junk slits
-            if self._all_tcent.size < min_nlines:
+            if det_weak is None:
                 msgs.warn("Not enough lines to identify in slit {0:d}!".format(slit))
                 self._det_weak[str(slit)] = [None,None]
                 self._det_stro[str(slit)] = [None,None]
@@ -1579,11 +1819,8 @@ class HolyGrail:
                 self._all_final_fit[str(slit)] = None
                 continue
             # Setup up the line detection dicts
-            self._det_weak[str(slit)] = [self._all_tcent_weak[self._icut_weak].copy(),self._all_ecent_weak[self._icut_weak].copy()]
-            self._det_stro[str(slit)] = [self._all_tcent[self._icut].copy(),self._all_ecent[self._icut].copy()]
-
-            # Run brute force algorithm on the weak lines
-            best_patt_dict, best_final_fit = self.run_brute_loop(slit, self._det_weak[str(slit)])
+            self._det_weak[str(slit)] = det_weak
+            self._det_stro[str(slit)] = det_stro
 
             # Print preliminary report
             good_fit[slit] = self.report_prelim(slit, best_patt_dict, best_final_fit)
@@ -1895,13 +2132,25 @@ class HolyGrail:
             shift_vec = np.zeros(good_slits.size)
             stretch_vec = np.zeros(good_slits.size)
             ccorr_vec = np.zeros(good_slits.size)
+            success_vec = np.zeros(good_slits.size, dtype=int)
+            if self._par['xcorr_method'] == 'fft':
+                # Match all the good slits at once
+                msgs.info('Cross-correlating bad slit # {:d}'.format(bs + 1) + ' with all good slits')
+                success_vec, shift_vec, stretch_vec, ccorr_vec, _, _ = \
+                    wvutils.xcorr_shift_stretch_fft(self._spec[:, bs], self._spec[:, good_slits],
+                                                    debug=self._debug)
+            # Seed the optimizer using the bad slit spectrum, as in reidentify()
+            spec_bs = self._spec[:, bs]
+            seed = np.fmin(int(np.abs(np.sum(spec_bs[np.isfinite(spec_bs)]))), 2**32-1)
             for cntr, gs in enumerate(good_slits):
-                msgs.info('Cross-correlating bad slit # {:d}'.format(bs + 1) + ' with good slit # {:d}'.format(gs + 1))
-                # Match the peaks between the two spectra.
-                # spec_gs_adj is the stretched spectrum
-                success, shift_vec[cntr], stretch_vec[cntr], ccorr_vec[cntr], _, _ =  \
-                    wvutils.xcorr_shift_stretch(self._spec[:, bs],self._spec[:, gs], debug = self._debug)
-                if not success:
+                if self._par['xcorr_method'] != 'fft':
+                    msgs.info('Cross-correlating bad slit # {:d}'.format(bs + 1) + ' with good slit # {:d}'.format(gs + 1))
+                    # Match the peaks between the two spectra.
+                    # spec_gs_adj is the stretched spectrum
+                    success_vec[cntr], shift_vec[cntr], stretch_vec[cntr], ccorr_vec[cntr], _, _ =  \
+                        wvutils.xcorr_shift_stretch(self._spec[:, bs],self._spec[:, gs], seed=seed,
+                                                    debug = self._debug)
+                if not success_vec[cntr]:
                     continue
                 # ToDo Put in a cut on the cross-correlation value here in this logic so that we only consider slits that are sufficiently similar
 
@@ -3,6 +3,10 @@
 import glob
 import os
 import datetime
+import hashlib
+import json
+import shutil
+import tempfile
 from astropy.io.fits import header
 from pkg_resources import resource_filename
 from collections import OrderedDict
@@ -15,6 +19,7 @@ import linetools.utils
 
 import pypeit  # For path
 from pypeit import msgs
+from pypeit import io
 from pypeit.core.wavecal import defs
 
 from IPython import embed
@@ -23,6 +28,7 @@ from IPython import embed
 line_path = resource_filename('pypeit', '/data/arc_lines/lists/')
 nist_path = resource_filename('pypeit','/data/arc_lines/NIST/')
 reid_arxiv_path = resource_filename('pypeit','/data/arc_lines/reid_arxiv/')
+reid_arxiv_store_path = os.path.join(reid_arxiv_path, 'store')
 
 
 # TODO -- Move this to the WaveCalib object
@@ -81,15 +87,16 @@ def load_template(arxiv_file, det, wvrng=None):
         calibfile = os.path.join(reid_arxiv_path, arxiv_file)
     else:
         calibfile = arxiv_file
-    # Read me
-    tbl = Table.read(calibfile)
+    # Read me, using the memory-mapped store if possible
+    store = get_reid_arxiv_store(calibfile)
+    tbl = Table.read(calibfile) if store is None else store
     # Parse on detector?
     if 'det' in tbl.keys():
-        idx = np.where(tbl['det'].data & 2**det)[0]
+        idx = np.where(np.asarray(tbl['det']) & 2**det)[0]
     else:
-        idx = np.arange(len(tbl)).astype(int)
-    tbl_wv = tbl['wave'].data[idx]
-    tbl_fx = tbl['flux'].data[idx] 
+        idx = np.arange(len(tbl['wave'])).astype(int)
+    tbl_wv = np.asarray(tbl['wave'])[idx]
+    tbl_fx = np.asarray(tbl['flux'])[idx]
 
     # Cut down?
     if wvrng is not None:
@@ -98,7 +105,7 @@ def load_template(arxiv_file, det, wvrng=None):
         tbl_fx = tbl_fx[gd_wv]
 
     # Return
-    return tbl_wv, tbl_fx, tbl.meta['BINSPEC']
+    return tbl_wv, tbl_fx, (tbl.meta if store is None else store.meta['table_meta'])['BINSPEC']
 
 
 def load_reid_arxiv(arxiv_file):
@@ -144,6 +151,265 @@ def load_reid_arxiv(arxiv_file):
 
     return wv_calib_arxiv, par
 
+
+def file_checksum(filename, blocksize=2**20):
+    """
+    Compute the SHA-256 checksum of a file.
+
+    Args:
+        filename (:obj:`str`):
+            Name of the file.
+        blocksize (:obj:`int`, optional):
+            Number of bytes read at a time.
+
+    Returns:
+        :obj:`str`: The hexadecimal digest of the file contents.
+    """
+    sha = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(blocksize), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+class ReidArxivStore:
+    """
+    Memory-mappable store of the spectra in a ``reid_arxiv`` file and of
+    features derived from them.
+
+    The arrays in the arxiv file are written to a directory of ``.npy``
+    files that are read with ``mmap_mode='r'``, such that all processes
+    reading the store share the same (page-cached) data instead of parsing
+    the fits or json file and holding their own copy.  Quantities derived
+    from the arxiv spectra (e.g., the detected arc lines) can be added to the
+    store with :func:`feature`; they are computed once and then read from
+    disk by any later call, in any process.
+
+    For ``fits`` files, the store holds one array per table column and the
+    table metadata.  For ``json`` files (see :func:`load_reid_arxiv`), the
+    spectra are stacked into the same format as the ``fits`` files: the
+    ``wave`` and ``flux`` columns have shape :math:`(N_{\rm arxiv}, N_{\rm
+    spec})`, and an ``order`` column is included if the solutions provide
+    one.
+
+    The store records the SHA-256 checksum of the arxiv file it was built
+    from, and it is rebuilt (discarding all features) if the arxiv file
+    changes.
+
+    Args:
+        arxiv_file (:obj:`str`):
+            Name of the arxiv file.  If the name does not include a path, the
+            file is assumed to be in the PypeIt ``reid_arxiv`` directory.
+        store_path (:obj:`str`, optional):
+            Directory with the stores of all arxiv files.  If None, use
+            :attr:`reid_arxiv_store_path`.
+        checksum (:obj:`str`, optional):
+            Checksum of the arxiv file, if already known.  If None, it is
+            computed by :func:`file_checksum`.
+        force (:obj:`bool`, optional):
+            Rebuild the store even if it is up to date.
+
+    Attributes:
+        arxiv_file (:obj:`str`):
+            Full path to the arxiv file.
+        directory (:obj:`str`):
+            Directory with the store for this arxiv file.
+        checksum (:obj:`str`):
+            Checksum of the arxiv file.
+        meta (:obj:`dict`):
+            Metadata of the store, including the table metadata of ``fits``
+            arxiv files.
+    """
+    version = 1
+    """
+    Version of the store format.  Stores with a different version are rebuilt.
+    """
+
+    def __init__(self, arxiv_file, store_path=None, checksum=None, force=False):
+        self.arxiv_file = os.path.abspath(os.path.join(reid_arxiv_path, arxiv_file)
+                                          if os.path.basename(arxiv_file) == arxiv_file
+                                          else arxiv_file)
+        if not os.path.isfile(self.arxiv_file):
+            msgs.error('File does not exist: {0}'.format(self.arxiv_file))
+        self.directory = os.path.join(reid_arxiv_store_path if store_path is None
+                                      else os.path.abspath(store_path),
+                                      os.path.basename(self.arxiv_file))
+        self.checksum = file_checksum(self.arxiv_file) if checksum is None else checksum
+        self.meta = self._read_meta()
+        if force or not self.is_current():
+            self.build()
+        self._arrays = {}
+
+    def _read_meta(self):
+        """Read the metadata of the store; returns None if there is none."""
+        try:
+            with open(os.path.join(self.directory, 'meta.json'), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_current(self):
+        """
+        Check that the store exists and was built from the current version
+        of the arxiv file.
+        """
+        return self.meta is not None and self.meta['version'] == self.version \
+                and self.meta['checksum'] == self.checksum
+
+    def _read_arxiv(self):
+        """
+        Read the arrays and metadata of the arxiv file.
+
+        Returns:
+            :obj:`tuple`: Dictionary with the arrays and dictionary with the
+            metadata.
+        """
+        if self.arxiv_file.endswith('.json'):
+            wv_calib_arxiv, _ = load_reid_arxiv(self.arxiv_file)
+            keys = [str(i) for i in range(np.sum([k.isdigit() for k in wv_calib_arxiv.keys()]))]
+            arrays = dict(wave=np.stack([wv_calib_arxiv[k]['wave_soln'] for k in keys]),
+                          flux=np.stack([wv_calib_arxiv[k]['spec'] for k in keys]))
+            if all('order' in wv_calib_arxiv[k] for k in keys):
+                arrays['order'] = np.array([wv_calib_arxiv[k]['order'] for k in keys])
+            return arrays, {}
+        if not self.arxiv_file.endswith('.fits'):
+            msgs.error("Not ready for this extension!")
+        tbl = Table.read(self.arxiv_file)
+        arrays = {key: np.asarray(tbl[key].data) for key in tbl.keys()}
+        meta = {key: value for key, value in tbl.meta.items()
+                if isinstance(value, (str, int, float, bool))}
+        return arrays, meta
+
+    def build(self):
+        """
+        (Re)build the store from the arxiv file.
+
+        The store is written to a temporary directory that then replaces any
+        existing store, such that processes reading the store never see a
+        partially written one.
+        """
+        msgs.info('Building the memory-mapped store of {0}'.format(
+                  os.path.basename(self.arxiv_file)))
+        parent = os.path.dirname(self.directory)
+        os.makedirs(parent, exist_ok=True)
+        arrays, table_meta = self._read_arxiv()
+        tmpdir = tempfile.mkdtemp(dir=parent, prefix='.build_')
+        try:
+            for key, value in arrays.items():
+                np.save(os.path.join(tmpdir, '{0}.npy'.format(key)), value)
+            os.makedirs(os.path.join(tmpdir, 'features'))
+            meta = dict(version=self.version, checksum=self.checksum,
+                        arxiv_file=os.path.basename(self.arxiv_file),
+                        columns=list(arrays.keys()), table_meta=table_meta)
+            with open(os.path.join(tmpdir, 'meta.json'), 'w') as f:
+                json.dump(meta, f)
+            if os.path.isdir(self.directory):
+                shutil.rmtree(self.directory, ignore_errors=True)
+            try:
+                os.rename(tmpdir, self.directory)
+            except OSError:
+                # Another process built the store first
+                if self._read_meta() != meta:
+                    raise
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+        self.meta = self._read_meta()
+        self._arrays = {}
+
+    def keys(self):
+        """Return the names of the arxiv file columns in the store."""
+        return self.meta['columns']
+
+    def __getitem__(self, key):
+        """Return the memory-mapped array of an arxiv file column."""
+        if key not in self.keys():
+            raise KeyError('{0} is not a column of {1}.'.format(key, self.meta['arxiv_file']))
+        if key not in self._arrays:
+            self._arrays[key] = np.load(os.path.join(self.directory, '{0}.npy'.format(key)),
+                                        mmap_mode='r')
+        return self._arrays[key]
+
+    def feature(self, name, func, **params):
+        """
+        Return a set of arrays derived from the arxiv file, computing and
+        saving them to the store if they're not already available.
+
+        Features are saved separately for each PypeIt version, such that
+        arrays computed by a different version of the code are never used.
+        If the feature cannot be saved (e.g., the store is read-only), it is
+        computed and returned without saving it.
+
+        Args:
+            name (:obj:`str`):
+                Name of the feature.
+            func (callable):
+                Function that computes the feature.  It is called without
+                arguments and must return a :obj:`dict` of `numpy.ndarray`_
+                objects.
+            **params:
+                Parameters used to compute the feature.  Features with the
+                same name computed with different parameters are saved
+                separately.  The values must be serializable to json.
+
+        Returns:
+            :obj:`dict`: Dictionary with the memory-mapped arrays, or the
+            arrays returned by ``func`` if the feature could not be saved.
+        """
+        _params = dict(params, pypeit_version=pypeit.__version__)
+        key = hashlib.sha1(json.dumps(_params, sort_keys=True).encode()).hexdigest()[:16]
+
+        arrays = {}
+        def build(tmpdir):
+            arrays.update(func())
+            for akey, value in arrays.items():
+                np.save(os.path.join(tmpdir, '{0}.npy'.format(akey)), value)
+
+        try:
+            return io.load_npy_dir(os.path.join(self.directory, 'features',
+                                                '{0}_{1}'.format(name, key)), build, _params)
+        except OSError as e:
+            msgs.warn('Unable to save the {0} feature of {1}: {2}'.format(
+                      name, self.meta['arxiv_file'], e))
+            return arrays if len(arrays) > 0 else func()
+
+
+_reid_arxiv_stores = {}
+
+
+def get_reid_arxiv_store(arxiv_file, store_path=None):
+    """
+    Return the memory-mapped store of a ``reid_arxiv`` file; see
+    :class:`ReidArxivStore`.
+
+    The stores are cached for each process and only re-validated against
+    the checksum of the arxiv file if its size or modification time change.
+
+    Args:
+        arxiv_file (:obj:`str`):
+            Name of the arxiv file.  If the name does not include a path, the
+            file is assumed to be in the PypeIt ``reid_arxiv`` directory.
+        store_path (:obj:`str`, optional):
+            Directory with the stores of all arxiv files.  If None, use
+            :attr:`reid_arxiv_store_path`.
+
+    Returns:
+        :class:`ReidArxivStore`: The store, or None if it cannot be built
+        (e.g., because the store directory is not writeable).  In the latter
+        case, the arxiv file must be read directly.
+    """
+    calibfile = os.path.abspath(os.path.join(reid_arxiv_path, arxiv_file)
+                                if os.path.basename(arxiv_file) == arxiv_file else arxiv_file)
+    stat = os.stat(calibfile)
+    key = (calibfile, store_path, stat.st_size, stat.st_mtime_ns)
+    if key not in _reid_arxiv_stores:
+        try:
+            _reid_arxiv_stores[key] = ReidArxivStore(calibfile, store_path=store_path)
+        except OSError as e:
+            msgs.warn('Unable to use the memory-mapped store of {0}: {1}'.format(
+                      os.path.basename(calibfile), e))
+            _reid_arxiv_stores[key] = None
+    return _reid_arxiv_stores[key]
+
 def load_by_hand():
     """
     By-hand line list
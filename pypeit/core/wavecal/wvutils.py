@@ -12,6 +12,7 @@ from matplotlib import pyplot as plt
 
 from scipy.ndimage.filters import gaussian_filter
 from scipy.signal import resample
+from scipy.fft import next_fast_len
 import scipy
 from scipy.optimize import curve_fit
 
@@ -638,6 +639,251 @@ def xcorr_shift_stretch(inspec1, inspec2, cc_thresh=-1.0, smooth=1.0, percent_ce
 
 
 
+def xcorr_shift_stretch_fft(inspec1, inspec2, cc_thresh=-1.0, smooth=1.0, percent_ceil=80.0,
+                            use_raw_arc=False, shift_mnmx=(-0.05,0.05), stretch_mnmx=(0.95,1.05),
+                            sigdetect=10.0, fwhm=4.0, max_batch=256, debug=False):
+
+    """ Determine the shift and stretch of one or more spectra relative to a reference spectrum.
+
+    This is a faster alternative to :func:`xcorr_shift_stretch`, which
+    optimizes the same zero lag cross-correlation coefficient (see
+    :func:`zerolag_shift_stretch`), but replaces the differential
+    evolution optimizer with a deterministic two-step search:
+
+        1. The initial shift of each spectrum is determined from its full
+           cross-correlation with the reference spectrum, computed using
+           FFTs.
+        2. Each spectrum is stretched by all values on a grid spanning
+           ``stretch_mnmx`` (using linear interpolation), and the
+           cross-correlation of all the stretched spectra with the
+           reference spectrum is computed using batches of FFTs.  The
+           grid includes every stretched size (in integer pixels; see
+           :func:`shift_and_stretch`) in the search range.  The best
+           shift on this grid, restricted to the shift window about the
+           initial shift (see ``shift_mnmx``), is then refined by a
+           bounded one-dimensional optimization of
+           :func:`zerolag_shift_stretch` for the best stretch and its
+           neighbors.
+
+    All the spectra in ``inspec2`` are treated by the same vectorized
+    calls, such that matching one arc spectrum against many arxiv spectra
+    costs little more than matching against one.  The sign conventions for
+    the shift and stretch are the same as for :func:`xcorr_shift_stretch`.
+
+    Parameters
+    ----------
+    inspec1 : `numpy.ndarray`_
+        Reference spectrum, shape (nspec,).
+    inspec2 : `numpy.ndarray`_
+        Spectrum or spectra for which the shift and stretch are computed
+        such that they match inspec1, shape (nspec,) or (nspec, narxiv).
+    cc_thresh : float, default = -1.0
+        Threshold on the initial cross-correlation coefficient; the
+        shift/stretch search is not performed for spectra below this
+        threshold.  See :func:`xcorr_shift_stretch`.
+    smooth : float, default = 1.0
+        Gaussian smoothing in pixels applied to all spectra.
+    percent_ceil : float, default = 80.0
+        Apply a ceiling to the input spectra at this percentile of the
+        distribution of the peak amplitudes.  See
+        :func:`xcorr_shift_stretch`.
+    use_raw_arc : bool, default = False
+        If True, the raw arc will be used rather than the continuum
+        subtracted arc.
+    shift_mnmx : tuple of floats, default = (-0.05,0.05)
+        Range to search for the shift about the initial estimate, in units
+        of the number of spectral pixels.
+    stretch_mnmx : tuple of floats, default = (0.95,1.05)
+        Range to search for the stretch.
+    sigdetect : float, default = 10.0
+        Detection threshold for the lines used to continuum subtract the
+        spectra.
+    fwhm : float, default = 4.0
+        FWHM of the arc lines in pixels.
+    max_batch : int, default = 256
+        Maximum number of stretched spectra in each batch of FFTs.  This
+        limits the memory used.
+    debug : bool, default = False
+        Show plots of the cross-correlation of each spectrum.
+
+    Returns
+    -------
+    success: int or `numpy.ndarray`_
+        Exit status for each spectrum, as returned by
+        :func:`xcorr_shift_stretch`.
+    shift: float or `numpy.ndarray`_
+        The optimal shift.
+    stretch: float or `numpy.ndarray`_
+        The optimal stretch.
+    cross_corr: float or `numpy.ndarray`_
+        The cross-correlation coefficient at the optimal shift and stretch.
+    shift_init: float or `numpy.ndarray`_
+        The initial shift determined without allowing for a stretch.
+    cross_corr_init: float or `numpy.ndarray`_
+        The maximum of the initial cross-correlation coefficient.
+
+    The returned objects are scalars if ``inspec2`` is one-dimensional.
+    """
+    if inspec2.ndim not in [1, 2]:
+        msgs.error('inspec2 must be a one or two dimensional numpy array.')
+    _inspec2 = inspec2.reshape(-1, 1) if inspec2.ndim == 1 else inspec2
+    nspec, narxiv = _inspec2.shape
+    if inspec1.size != nspec:
+        msgs.error('The spectra to cross-correlate must have the same size.')
+    if narxiv == 0:
+        # Nothing to match
+        return (np.zeros(0, dtype=int),) + tuple(np.zeros(0, dtype=float) for _ in range(5))
+
+    y1 = smooth_ceil_cont(inspec1, smooth, percent_ceil=percent_ceil, use_raw_arc=use_raw_arc,
+                          sigdetect=sigdetect, fwhm=fwhm)
+    y2 = np.array([smooth_ceil_cont(_inspec2[:,i], smooth, percent_ceil=percent_ceil,
+                                    use_raw_arc=use_raw_arc, sigdetect=sigdetect, fwhm=fwhm)
+                   for i in range(narxiv)])
+    # Normalization of the cross-correlation; this is the same as used by
+    # zerolag_shift_stretch, i.e., it ignores the change in the norm of the
+    # stretched spectra.
+    denom = np.sqrt(np.sum(y1*y1)*np.sum(y2*y2, axis=1))
+    denom[denom == 0] = np.inf
+
+    # The stretched spectra are sampled on the longest stretched grid
+    nstretch_pix = int(nspec*stretch_mnmx[1])
+    nfft = next_fast_len(nspec + max(nspec, nstretch_pix) - 1)
+    fft_y1 = np.fft.rfft(y1, n=nfft)
+
+    def _xcorr(y):
+        # Cross-correlation of y1 with each row of y, such that the lag of
+        # the peak is the shift of y that matches y1.  Lags are returned in
+        # the range [-nfft//2, nfft//2).
+        corr = np.fft.irfft(fft_y1 * np.conj(np.fft.rfft(y, n=nfft, axis=-1)), n=nfft, axis=-1)
+        return np.fft.fftshift(corr, axes=-1)
+    lags = np.arange(nfft) - nfft//2
+
+    # Initial shifts
+    corr = _xcorr(y2) / denom[:,None]
+    imax = np.argmax(corr, axis=1)
+    shift_cc = lags[imax] + _parabola_peak(corr, imax)
+    corr_cc = np.array([np.interp(s, lags, c) for s, c in zip(shift_cc, corr)])
+
+    success = np.full(narxiv, -1, dtype=int)
+    shift = shift_cc.copy()
+    stretch = np.ones(narxiv, dtype=float)
+    corr_out = corr_cc.copy()
+    indx = np.where(corr_cc >= cc_thresh)[0]
+    if indx.size == 0:
+        return _xcorr_shift_stretch_return(inspec2, success, shift, stretch, corr_out, shift_cc,
+                                           corr_cc)
+
+    # Grid of stretch values.  Because shift_and_stretch resamples the
+    # stretched spectrum onto an integer number of pixels, the zero lag
+    # cross-correlation only depends on this number, not the exact stretch.
+    # The grid therefore includes all the distinct stretched sizes in the
+    # search range.
+    nstretched = np.arange(int(np.ceil(nspec*stretch_mnmx[0])), nstretch_pix+1)
+    # NOTE: The small offset ensures int(nspec*stretch) recovers nstretched
+    stretch_grid = (nstretched + 1e-6)/nspec
+    # Fractional pixel in the input spectrum sampled by each pixel of the
+    # stretched spectra
+    pix = np.arange(nstretch_pix)[None,:] * nspec / nstretched[:,None]
+    i0 = np.floor(pix).astype(int)
+    frac = pix - i0
+    valid = (np.arange(nstretch_pix)[None,:] < nstretched[:,None]) & (i0 < nspec-1)
+    i0[np.logical_not(valid)] = 0
+    frac[np.logical_not(valid)] = 0.
+    weight0 = np.where(valid, 1-frac, 0.)
+
+    # Search the shift/stretch grid, in batches to limit the memory
+    best_corr = np.full(indx.size, -np.inf)
+    best_shift = np.zeros(indx.size, dtype=float)
+    best_istr = np.zeros(indx.size, dtype=int)
+    # Lag window about the initial shift
+    lag_lo = shift_cc[indx] + nspec*shift_mnmx[0]
+    lag_hi = shift_cc[indx] + nspec*shift_mnmx[1]
+    in_window = (lags[None,:] >= lag_lo[:,None]) & (lags[None,:] <= lag_hi[:,None])
+    nbatch = max(max_batch // indx.size, 1)
+    for s in range(0, stretch_grid.size, nbatch):
+        _s = slice(s, s+nbatch)
+        # Stretched spectra with shape (narxiv, nbatch, nstretch_pix)
+        y2_str = y2[indx][:,i0[_s]] * weight0[_s] + y2[indx][:,i0[_s]+1] * frac[_s]
+        corr = _xcorr(y2_str) / denom[indx,None,None]
+        corr[np.logical_not(np.broadcast_to(in_window[:,None,:], corr.shape))] = -np.inf
+        flat_max = np.argmax(corr.reshape(indx.size, -1), axis=1)
+        istr, ilag = np.unravel_index(flat_max, corr.shape[1:])
+        this_corr = corr[np.arange(indx.size),istr,ilag]
+        better = this_corr > best_corr
+        if not np.any(better):
+            continue
+        _corr = corr[better,istr[better]]
+        best_corr[better] = this_corr[better]
+        best_shift[better] = lags[ilag[better]] + _parabola_peak(_corr, ilag[better])
+        best_istr[better] = s + istr[better]
+
+    # Refine the shift for the best stretch on the grid and its neighbors,
+    # using the same (quadratic) interpolation as xcorr_shift_stretch.
+    for j, i in enumerate(indx):
+        corr_ss, shift_ss, stretch_ss = -np.inf, best_shift[j], stretch_grid[best_istr[j]]
+        for istr in range(max(best_istr[j]-2, 0), min(best_istr[j]+3, stretch_grid.size)):
+            result = scipy.optimize.minimize_scalar(
+                        lambda x: zerolag_shift_stretch((x, stretch_grid[istr]), y1, y2[i]),
+                        bounds=(max(best_shift[j]-2, lag_lo[j]), min(best_shift[j]+2, lag_hi[j])),
+                        method='bounded', options=dict(xatol=1e-3))
+            if -result.fun > corr_ss:
+                corr_ss, shift_ss, stretch_ss = -result.fun, result.x, stretch_grid[istr]
+        if corr_ss < corr_cc[i]:
+            # The shift/stretch solution is worse than the simple x-correlation
+            msgs.warn('Shift/Stretch search performed worse than simple x-correlation.' +
+                      'Returning simple x-correlation shift and no stretch:' + msgs.newline() +
+                      '   Search : corr={:5.3f}, shift={:5.3f}, stretch={:7.5f}'.format(
+                          corr_ss, shift_ss, stretch_ss) + msgs.newline() +
+                      '   X-corr : corr={:5.3f}, shift={:5.3f}'.format(corr_cc[i], shift_cc[i]))
+            success[i] = 1
+            continue
+        success[i] = 1
+        shift[i] = shift_ss
+        stretch[i] = stretch_ss
+        corr_out[i] = corr_ss
+
+        if debug:
+            x1 = np.arange(nspec)
+            y2_trans = shift_and_stretch(y2[i], shift[i], stretch[i])
+            plt.figure(figsize=(14, 6))
+            plt.plot(x1, y1, 'k-', drawstyle='steps', label ='inspec1, input spectrum')
+            plt.plot(x1, y2_trans, 'r-', drawstyle='steps',
+                     label = 'inspec2, reference shift & stretch')
+            plt.title('shift= {:5.3f}'.format(shift[i]) +
+                      ',  stretch = {:7.5f}'.format(stretch[i]) +
+                      ', corr = {:5.3f}'.format(corr_out[i]))
+            plt.legend()
+            plt.show()
+
+    return _xcorr_shift_stretch_return(inspec2, success, shift, stretch, corr_out, shift_cc,
+                                       corr_cc)
+
+
+def _parabola_peak(corr, imax):
+    """
+    Sub-pixel offset of the peak of each row of ``corr`` from ``imax``,
+    using a parabola through the peak and its two neighbors.
+    """
+    rows = np.arange(corr.shape[0])
+    lo = corr[rows, np.clip(imax-1, 0, corr.shape[1]-1)]
+    hi = corr[rows, np.clip(imax+1, 0, corr.shape[1]-1)]
+    mid = corr[rows, imax]
+    denom = lo - 2*mid + hi
+    good = np.isfinite(lo) & np.isfinite(hi) & (denom < 0)
+    offset = np.zeros(corr.shape[0], dtype=float)
+    offset[good] = 0.5*(lo[good] - hi[good])/denom[good]
+    return offset
+
+
+def _xcorr_shift_stretch_return(inspec2, *args):
+    """
+    Return scalars instead of single-element arrays if ``inspec2`` is 1D.
+    """
+    if inspec2.ndim == 1:
+        return tuple(a[0].item() for a in args)
+    return args
+
+
 def wavegrid(wave_min, wave_max, dwave, spec_samp_fact=1.0, log10=False):
     """
 
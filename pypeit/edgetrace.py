@@ -1729,7 +1729,8 @@ class EdgeTraceSet(DataContainer):
         spectral row instead of providing it directly. If left to its
         own devices, it will iterate through all the traces
         collecting those that all cross a specific spectral row into
-        groups that it can follow simultaneously. If a starting
+        groups, each starting from its own spectral row; all groups
+        on one side are then followed simultaneously. If a starting
         specral row is provided directly, all traces must cross that
         row.
 
@@ -1850,6 +1851,8 @@ class EdgeTraceSet(DataContainer):
             if follow:
                 # Find the bad trace positions
                 bad_trace_pixels = self.bitmask.flagged(self.edge_msk, flag=self.bitmask.bad_flags)
+                # Find the starting row for each trace
+                trace_start = np.zeros(self.ntrace, dtype=int)
                 untraced = indx.copy()
                 while np.any(untraced):
                     # Get the starting row
@@ -1868,17 +1871,19 @@ class EdgeTraceSet(DataContainer):
                     msgs.info('Following {0} {1} edge(s) '.format(np.sum(to_trace), side)
                               + 'from row {0}; '.format(_start_indx)
                               + '{0} trace(s) remain.'.format(np.sum(untraced)-np.sum(to_trace)))
-                    # Follow the centroid of the Sobel-filtered image
-                    cen[:,to_trace], err[:,to_trace], msk[:,to_trace] \
-                            = trace.follow_centroid(_sobelsig, _start_indx,
-                                                    spat[_start_indx,to_trace],
-                                                    ivar=ivar, bpm=_bpm, fwgt=fwgt, width=width,
-                                                    maxshift_start=maxshift_start,
-                                                    maxshift_follow=maxshift_follow,
-                                                    maxerror=maxerror, continuous=continuous,
-                                                    bitmask=self.bitmask)
+                    trace_start[to_trace] = _start_indx
                     # Update untraced
                     untraced[to_trace] = False
+                # Follow the centroid of the Sobel-filtered image for
+                # all traces at once
+                cen[:,indx], err[:,indx], msk[:,indx] \
+                        = trace.follow_centroid(_sobelsig, trace_start[indx],
+                                                spat[trace_start[indx],indx],
+                                                ivar=ivar, bpm=_bpm, fwgt=fwgt, width=width,
+                                                maxshift_start=maxshift_start,
+                                                maxshift_follow=maxshift_follow,
+                                                maxerror=maxerror, continuous=continuous,
+                                                bitmask=self.bitmask)
             else:
                 cen[:,indx], err[:,indx], msk[:,indx] \
                         = trace.masked_centroid(_sobelsig, spat[:,indx], width, ivar=ivar,
@@ -7,9 +7,11 @@ Main driver class for skysubtraction and extraction
 """
 
 import inspect
+import time
 import numpy as np
 import os
 
+from scipy import ndimage
 from astropy import stats
 from abc import ABCMeta
 
@@ -440,18 +442,28 @@ class Extract:
             # TODO :: Need to think about spatial flexure - is the appropriate spatial flexure already included in trace_spat via left/right slits?
             trace_spat = 0.5 * (self.slits_left + self.slits_right)
             trace_spec = np.arange(self.slits.nspec)
+            # Only use the columns spanned by each slit; all other pixels
+            # are masked, so this does not change the extracted spectra
+            slit_boxes = ndimage.find_objects(self.slitmask + 1)
             slit_specs = []
             for ss in range(self.slits.nslits):
                 if not gd_slits[ss]:
                     slit_specs.append(None)
                     continue
                 slit_spat = self.slits.spat_id[ss]
-                thismask = (self.slitmask == slit_spat)
-                box_denom = moment1d(self.waveimg * thismask > 0.0, trace_spat[:, ss], 2, row=trace_spec)[0]
+                cols = slit_boxes[slit_spat][1] \
+                        if slit_spat < len(slit_boxes) and slit_boxes[slit_spat] is not None \
+                        else slice(0, self.slitmask.shape[1])
+                thismask = (self.slitmask[:, cols] == slit_spat)
+                slit_trace = trace_spat[:, ss] - cols.start
+                box_denom = moment1d(self.waveimg[:, cols] * thismask > 0.0, slit_trace, 2,
+                                     row=trace_spec)[0]
                 wghts = (box_denom + (box_denom == 0.0))
-                slit_sky = moment1d(self.global_sky * thismask, trace_spat[:, ss], 2, row=trace_spec)[0] / wghts
+                slit_sky = moment1d(self.global_sky[:, cols] * thismask, slit_trace, 2,
+                                    row=trace_spec)[0] / wghts
                 # Denom is computed in case the trace goes off the edge of the image
-                slit_wave = moment1d(self.waveimg * thismask, trace_spat[:, ss], 2, row=trace_spec)[0] / wghts
+                slit_wave = moment1d(self.waveimg[:, cols] * thismask, slit_trace, 2,
+                                     row=trace_spec)[0] / wghts
                 # TODO :: Need to remove this XSpectrum1D dependency - it is required in:  flexure.spec_flex_shift
                 slit_specs.append(xspectrum1d.XSpectrum1D.from_tuple((slit_wave, slit_sky)))
 
@@ -470,11 +482,15 @@ class Extract:
                 if (not gd_slits[islit]) or len(flex_list[islit]['shift']) == 0:
                     continue
                 self.slitshift[islit] = flex_list[islit]['shift'][0]
-            # Apply flexure to the new wavelength solution
+            # Apply flexure to the new wavelength solution.  The wavelength
+            # image is otherwise unchanged since prepare_extraction, so only
+            # the slits with a shift are re-evaluated, in place.
             msgs.info("Regenerating wavelength image")
-            self.waveimg = self.wv_calib.build_waveimg(self.tilts, self.slits,
-                                                       spat_flexure=self.spat_flexure_shift,
-                                                       spec_flexure=self.slitshift)
+            waveimg = self.wv_calib.build_waveimg(self.tilts, self.slits,
+                                                  spat_flexure=self.spat_flexure_shift,
+                                                  spec_flexure=self.slitshift, lazy=True,
+                                                  dtype=self.waveimg.dtype, cache_size=0)
+            waveimg.fill(self.waveimg, spat_id=self.slits.spat_id[self.slitshift != 0])
         elif mode == "local":
             # Measure flexure:
             # If mode == local: specobjs != None and slitspecs = None
@@ -741,46 +757,51 @@ class MultiSlitExtract(Extract):
 
         base_gpm = self.sciImg.select_flag(invert=True)
 
+        # Parameters for the local sky subtraction and extraction
+        kwargs = dict(model_full_slit=self.par['reduce']['extraction']['model_full_slit'],
+                      sigrej=self.par['reduce']['skysub']['sky_sigrej'],
+                      model_noise=model_noise, std=self.std_redux,
+                      bsp=self.par['reduce']['skysub']['bspline_spacing'],
+                      force_gauss=self.par['reduce']['extraction']['use_user_fwhm'],
+                      sn_gauss=self.par['reduce']['extraction']['sn_gauss'],
+                      show_profile=show_profile,
+                      use_2dmodel_mask=self.par['reduce']['extraction']['use_2dmodel_mask'],
+                      no_local_sky=self.par['reduce']['skysub']['no_local_sky'],
+                      adderr=self.sciImg.noise_floor,
+                      batch=self.par['reduce']['extraction']['batch_extract'])
+
+        # Slits with objects to extract
+        slit_indx = [slit_idx for slit_idx in gdslits
+                        if np.any(self.sobjs.SLITID == self.slits.spat_id[slit_idx])]
+        arglist = [(self.slits.spat_id[slit_idx], self.slits_left[:,slit_idx],
+                    self.slits_right[:,slit_idx],
+                    self.sobjs[self.sobjs.SLITID == self.slits.spat_id[slit_idx]], kwargs)
+                        for slit_idx in slit_indx]
+        # Images used by all slits
+        shared = dict(sciimg=self.sciImg.image, sciivar=self.sciImg.ivar, tilts=self.tilts,
+                      waveimg=self.waveimg, global_sky=self.global_sky,
+                      slitmask=self.slitmask, base_gpm=base_gpm, spat_pix=spat_pix,
+                      base_var=self.sciImg.base_var, count_scale=self.sciImg.img_scale)
+        # NOTE: The interactive displays cannot be used by the worker processes
+        nproc = 1 if show_profile else self.par['rdx']['slit_nproc']
+        if utils.get_nproc(nproc, ntasks=len(arglist)) > 1:
+            msgs.info(f'Local sky subtraction and extraction of {len(arglist)} slits using '
+                      f'{utils.get_nproc(nproc, ntasks=len(arglist))} processes.')
+
         # Loop on slits
-        for slit_idx in gdslits:
+        for slit_idx, (skymodel, objmodel, ivarmodel, extractmask, sobjs_slit, elapsed) \
+                in zip(slit_indx, utils.parallel_map(local_skysub_extract_slit, arglist,
+                                                     nproc=nproc, shared=shared)):
             slit_spat = self.slits.spat_id[slit_idx]
-            msgs.info("Local sky subtraction and extraction for slit: {:d}".format(slit_spat))
-            thisobj = self.sobjs.SLITID == slit_spat    # indices of objects for this slit
-            if not np.any(thisobj):
-                continue
-            # Setup to run local skysub
             thismask = self.slitmask == slit_spat   # pixels for this slit
-            # True  = Good, False = Bad for inmask
-            ingpm = base_gpm & thismask
-
-            # ... Just for readability
-            model_full_slit = self.par['reduce']['extraction']['model_full_slit']
-            sigrej = self.par['reduce']['skysub']['sky_sigrej']
-            bsp = self.par['reduce']['skysub']['bspline_spacing']
-            force_gauss = self.par['reduce']['extraction']['use_user_fwhm']
-            sn_gauss = self.par['reduce']['extraction']['sn_gauss']
-            use_2dmodel_mask = self.par['reduce']['extraction']['use_2dmodel_mask']
-            no_local_sky = self.par['reduce']['skysub']['no_local_sky']
-
-            # Local sky subtraction and extraction
-            self.skymodel[thismask], self.objmodel[thismask], self.ivarmodel[thismask], \
-                self.extractmask[thismask] \
-                    = skysub.local_skysub_extract(self.sciImg.image, self.sciImg.ivar,
-                                                  self.tilts, self.waveimg, self.global_sky,
-                                                  thismask, self.slits_left[:,slit_idx],
-                                                  self.slits_right[:, slit_idx],
-                                                  self.sobjs[thisobj], ingpm=ingpm,
-                                                  spat_pix=spat_pix,
-                                                  model_full_slit=model_full_slit,
-                                                  sigrej=sigrej, model_noise=model_noise,
-                                                  std=self.std_redux, bsp=bsp,
-                                                  force_gauss=force_gauss, sn_gauss=sn_gauss,
-                                                  show_profile=show_profile,
-                                                  use_2dmodel_mask=use_2dmodel_mask,
-                                                  no_local_sky=no_local_sky,
-                                                  base_var=self.sciImg.base_var,
-                                                  count_scale=self.sciImg.img_scale,
-                                                  adderr=self.sciImg.noise_floor)
+            self.skymodel[thismask] = skymodel
+            self.objmodel[thismask] = objmodel
+            self.ivarmodel[thismask] = ivarmodel
+            self.extractmask[thismask] = extractmask
+            # Objects extracted by worker processes are copies
+            self.sobjs[self.sobjs.SLITID == slit_spat] = sobjs_slit
+            msgs.info(f'Local sky subtraction and extraction of {len(sobjs_slit)} object(s) on '
+                      f'slit {slit_spat} took {elapsed:.1f} s')
 
         # Set the bit for pixels which were masked by the extraction.
         # For extractmask, True = Good, False = Bad
@@ -898,7 +919,8 @@ class EchelleExtract(Extract):
                                                   show_resids=show_resids, show_fwhm=show_fwhm,
                                                   base_var=self.sciImg.base_var,
                                                   count_scale=self.sciImg.img_scale,
-                                                  adderr=self.sciImg.noise_floor)
+                                                  adderr=self.sciImg.noise_floor,
+                                                  batch=self.par['reduce']['extraction']['batch_extract'])
         # Step
         self.steps.append(inspect.stack()[0][3])
 
@@ -921,3 +943,46 @@ class IFUExtract(MultiSlitExtract):
         self.initialise_slits(initial=True)
 
 
+def local_skysub_extract_slit(slit_spat, slit_left, slit_righ, sobjs, kwargs):
+    """
+    Perform the local sky subtraction and extraction for a single slit.
+
+    This is a wrapper to :func:`~pypeit.core.skysub.local_skysub_extract` that
+    is executed by :func:`~pypeit.utils.parallel_map`; the full-detector
+    images must be available via :func:`~pypeit.utils.shared_data` (see
+    :func:`MultiSlitExtract.local_skysub_extract`).
+
+    Args:
+        slit_spat (:obj:`int`):
+            Spatial ID of the slit in the slit mask image.
+        slit_left (`numpy.ndarray`_):
+            Left slit boundary in floating point pixels.
+        slit_righ (`numpy.ndarray`_):
+            Right slit boundary in floating point pixels.
+        sobjs (:class:`~pypeit.specobjs.SpecObjs`):
+            Objects on this slit.  These are altered in place.
+        kwargs (:obj:`dict`):
+            Additional keyword arguments passed to
+            :func:`~pypeit.core.skysub.local_skysub_extract`.
+
+    Returns:
+        :obj:`tuple`: The model sky, object, inverse variance, and mask for
+        the pixels on the slit, the extracted objects, and the execution time
+        in seconds.
+    """
+    start = time.perf_counter()
+    msgs.info("Local sky subtraction and extraction for slit: {:d}".format(slit_spat))
+    thismask = utils.shared_data('slitmask') == slit_spat
+    ingpm = utils.shared_data('base_gpm') & thismask
+    skymodel, objmodel, ivarmodel, extractmask \
+            = skysub.local_skysub_extract(utils.shared_data('sciimg'),
+                                          utils.shared_data('sciivar'),
+                                          utils.shared_data('tilts'),
+                                          utils.shared_data('waveimg'),
+                                          utils.shared_data('global_sky'), thismask,
+                                          slit_left, slit_righ, sobjs, ingpm=ingpm,
+                                          spat_pix=utils.shared_data('spat_pix'),
+                                          base_var=utils.shared_data('base_var'),
+                                          count_scale=utils.shared_data('count_scale'),
+                                          **kwargs)
+    return skymodel, objmodel, ivarmodel, extractmask, sobjs, time.perf_counter() - start
@@ -7,6 +7,7 @@ Main driver class for object finding, global skysubtraction and skymask construc
 """
 
 import inspect
+import time
 import numpy as np
 import os
 
@@ -495,29 +496,45 @@ class FindObjects:
             skysub_ivar = self.sciImg.ivar
 
 
-        # Loop on slits
+        # Pixels that can be used to fit the sky
+        sky_gpm = self.sciImg.select_flag(invert=True) & skymask_now
+
+        # Select the slits to fit
+        fit_slits = []
         for slit_idx in gdslits:
             slit_spat = self.slits.spat_id[slit_idx]
-            msgs.info("Global sky subtraction for slit: {:d}".format(slit_spat))
-            thismask = self.slitmask == slit_spat
-            inmask = self.sciImg.select_flag(invert=True) & thismask & skymask_now
             # All masked?
-            if not np.any(inmask):
+            if not np.any(sky_gpm[self.slitmask == slit_spat]):
                 msgs.warn("No pixels for fitting sky.  If you are using mask_by_boxcar=True, your radius may be too large.")
                 self.reduce_bpm[slit_idx] = True
                 continue
+            fit_slits += [slit_idx]
+
+        # Parameters for the global sky subtraction
+        kwargs = dict(sigrej=sigrej, bsp=self.par['reduce']['skysub']['bspline_spacing'],
+                      no_poly=self.par['reduce']['skysub']['no_poly'],
+                      pos_mask=(not self.bkg_redux), show_fit=show_fit)
+        arglist = [(self.slits.spat_id[slit_idx], self.slits_left[:,slit_idx],
+                    self.slits_right[:,slit_idx], kwargs) for slit_idx in fit_slits]
+        # Images used by all slits
+        shared = dict(image=self.sciImg.image, ivar=skysub_ivar, tilts=self.tilts,
+                      slitmask=self.slitmask, sky_gpm=sky_gpm)
+        # NOTE: The interactive displays cannot be used by the worker processes
+        nproc = 1 if show_fit else self.par['rdx']['slit_nproc']
+        if utils.get_nproc(nproc, ntasks=len(arglist)) > 1:
+            msgs.info(f'Global sky subtraction of {len(arglist)} slits using '
+                      f'{utils.get_nproc(nproc, ntasks=len(arglist))} processes.')
 
-            # Find sky
-            global_sky[thismask] = skysub.global_skysub(
-                self.sciImg.image, skysub_ivar, self.tilts, thismask,
-                self.slits_left[:,slit_idx], self.slits_right[:,slit_idx],
-                inmask=inmask, sigrej=sigrej,
-                bsp=self.par['reduce']['skysub']['bspline_spacing'],
-                no_poly=self.par['reduce']['skysub']['no_poly'],
-                pos_mask=(not self.bkg_redux), show_fit=show_fit)
+        # Loop on slits
+        for slit_idx, (slit_sky, elapsed) \
+                in zip(fit_slits, utils.parallel_map(global_skysub_slit, arglist, nproc=nproc,
+                                                     shared=shared)):
+            slit_spat = self.slits.spat_id[slit_idx]
+            global_sky[self.slitmask == slit_spat] = slit_sky
+            msgs.info(f'Global sky subtraction for slit {slit_spat} took {elapsed:.1f} s')
 
             # Mask if something went wrong
-            if np.sum(global_sky[thismask]) == 0.:
+            if np.sum(slit_sky) == 0.:
                 msgs.warn("Bad fit to sky.  Rejecting slit: {:d}".format(slit_idx))
                 self.reduce_bpm[slit_idx] = True
 
@@ -526,7 +543,7 @@ class FindObjects:
             # TODO: Shouldn't the saturation flagging account for the
             # subtraction of the sky?
             self.sciImg.build_crmask(self.par['scienceframe']['process'],
-                                     subtract_img=global_sky)
+                                     subtract_img=global_sky, slitmask=self.slitmask)
             # Update the fullmask
             self.sciImg.update_mask_cr(self.sciImg.crmask)
 
@@ -1190,7 +1207,7 @@ class IFUFindObjects(MultiSlitFindObjects):
         if update_crmask:
             # Find CRs with sky subtraction
             self.sciImg.build_crmask(self.par['scienceframe']['process'],
-                                     subtract_img=global_sky)
+                                     subtract_img=global_sky, slitmask=self.slitmask)
             # Update the fullmask
             self.sciImg.update_mask_cr(self.sciImg.crmask)
 
@@ -1289,4 +1306,35 @@ class IFUFindObjects(MultiSlitFindObjects):
         return global_sky
 
 
+def global_skysub_slit(slit_spat, slit_left, slit_righ, kwargs):
+    """
+    Perform the global sky subtraction for a single slit.
+
+    This is a wrapper to :func:`~pypeit.core.skysub.global_skysub` that is
+    executed by :func:`~pypeit.utils.parallel_map`; the full-detector images
+    must be available via :func:`~pypeit.utils.shared_data` (see
+    :func:`FindObjects.global_skysub`).
 
+    Args:
+        slit_spat (:obj:`int`):
+            Spatial ID of the slit in the slit mask image.
+        slit_left (`numpy.ndarray`_):
+            Left slit boundary in floating point pixels.
+        slit_righ (`numpy.ndarray`_):
+            Right slit boundary in floating point pixels.
+        kwargs (:obj:`dict`):
+            Additional keyword arguments passed to
+            :func:`~pypeit.core.skysub.global_skysub`.
+
+    Returns:
+        :obj:`tuple`: The model sky for the pixels on the slit and the
+        execution time in seconds.
+    """
+    start = time.perf_counter()
+    msgs.info("Global sky subtraction for slit: {:d}".format(slit_spat))
+    thismask = utils.shared_data('slitmask') == slit_spat
+    inmask = utils.shared_data('sky_gpm') & thismask
+    slit_sky = skysub.global_skysub(utils.shared_data('image'), utils.shared_data('ivar'),
+                                    utils.shared_data('tilts'), thismask, slit_left, slit_righ,
+                                    inmask=inmask, **kwargs)
+    return slit_sky, time.perf_counter() - start
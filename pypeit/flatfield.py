@@ -355,6 +355,14 @@ class FlatField:
             simultaneously generate a pixel flat and a spatial
             illumination profile from the same input, this should be
             False (which is the default).
+        nproc (:obj:`int`, optional):
+            Number of processes used to model the flat-field response of
+            the slits; see :func:`~pypeit.utils.get_nproc`.  If rejected
+            pixels are propagated between the fits (``rej_sticky``), each
+            slit modeled by a worker process starts from the input
+            good-pixel mask, instead of the mask updated by the fits to the
+            preceding slits, which can slightly change the result in the
+            padded regions shared by adjacent slits.
 
     Attributes:
         rawflatimg (:class:`pypeit.images.pypeitimage.PypeItImage`):
@@ -376,7 +384,7 @@ class FlatField:
 
 
     def __init__(self, rawflatimg, spectrograph, flatpar, slits, wavetilts, wv_calib,
-                 spat_illum_only=False):
+                 spat_illum_only=False, nproc=1):
 
         # Defaults
         self.spectrograph = spectrograph
@@ -398,6 +406,7 @@ class FlatField:
         self.flat_model = None      # Model flat
         self.list_of_spat_bsplines = None
         self.spat_illum_only = spat_illum_only
+        self.nproc = nproc
         self.spec_illum = None      # Relative spectral illumination image
         self.waveimg = None
 
@@ -510,7 +519,9 @@ class FlatField:
 
         The method loops through all slits provided by the :attr:`slits`
         object, except those that have been masked (i.e., slits with
-        ``self.slits.mask == True`` are skipped).  For each slit:
+        ``self.slits.mask == True`` are skipped).  The slits are modeled
+        independently by :func:`model_flat_slit`, optionally using multiple
+        processes (see ``nproc``).  For each slit:
 
             - Collapse the flat-field data spatially using the
               wavelength coordinates provided by the fit to the arc-line
@@ -607,14 +618,7 @@ class FlatField:
             self.list_of_spat_bsplines = [bspline.bspline(None) for all in self.slits.spat_id]
 
         # Set parameters (for convenience;
-        spec_samp_fine = self.flatpar['spec_samp_fine']
-        spec_samp_coarse = self.flatpar['spec_samp_coarse']
         tweak_slits = self.flatpar['tweak_slits']
-        tweak_slits_thresh = self.flatpar['tweak_slits_thresh']
-        tweak_slits_maxfrac = self.flatpar['tweak_slits_maxfrac']
-        # If sticky, points rejected at each stage (spec, spat, 2d) are
-        # propagated to the next stage
-        sticky = self.flatpar['rej_sticky']
         trim = self.flatpar['slit_trim']
         pad = self.flatpar['slit_illum_pad']
         # Iteratively construct the illumination profile by rejecting outliers
@@ -680,16 +684,11 @@ class FlatField:
         self.mspixelflat = np.ones_like(rawflat)
         self.msillumflat = np.ones_like(rawflat)
         self.flat_model = np.zeros_like(rawflat)
-
-        # Allocate work arrays only once
-        spec_model = np.ones_like(rawflat)
-        norm_spec = np.ones_like(rawflat)
-        norm_spec_spat = np.ones_like(rawflat)
-        twod_model = np.ones_like(rawflat)
         twod_gpm_out = np.ones_like(rawflat, dtype=np.bool)
 
         # #################################################
-        # Model each slit independently
+        # Select the slits to model
+        fit_slits = []
         for slit_idx, slit_spat in enumerate(self.slits.spat_id):
             # Is this a good slit??
             if self.slits.bitmask.flagged(self.slits.mask[slit_idx], flag=['SHORTSLIT', 'USERIGNORE', 'BADTILTCALIB']):
@@ -705,9 +704,6 @@ class FlatField:
                 self.slits.mask[slit_idx] = self.slits.bitmask.turn_on(self.slits.mask[slit_idx], 'BADFLATCALIB')
                 continue
 
-            msgs.info('Modeling the flat-field response for slit spat_id={}: {}/{}'.format(
-                        slit_spat, slit_idx+1, self.slits.nslits))
-
             # Find the pixels on the initial slit
             onslit_init = slitid_img_init == slit_spat
 
@@ -762,336 +758,53 @@ class FlatField:
             #  user if npoly is provided but higher than the nominal
             #  calculation?
 
-            # Create an image with the spatial coordinates relative to the left edge of this slit
-            spat_coo_init = self.slits.spatial_coordinate_image(slitidx=slit_idx, full=True, initial=True)
-
-            # Find pixels on the padded and trimmed slit coordinates
-            onslit_padded = padded_slitid_img == slit_spat
-            onslit_trimmed = trimmed_slitid_img == slit_spat
-
-            # ----------------------------------------------------------
-            # Collapse the slit spatially and fit the spectral function
-            # TODO: Put this stuff in a self.spectral_fit method?
-
-            # Create the tilts image for this slit
-            # TODO -- JFH Confirm the sign of this shift is correct!
-            _flexure = 0. if self.wavetilts.spat_flexure is None else self.wavetilts.spat_flexure
-            tilts = tracewave.fit2tilts(rawflat.shape, self.wavetilts['coeffs'][:,:,slit_idx],
-                                        self.wavetilts['func2d'], spat_shift=-1*_flexure)
-            # Convert the tilt image to an image with the spectral pixel index
-            spec_coo = tilts * (nspec-1)
-
-            # Only include the trimmed set of pixels in the flat-field
-            # fit along the spectral direction.
-            spec_gpm = onslit_trimmed & gpm_log  # & (rawflat < nonlinear_counts)
-            spec_nfit = np.sum(spec_gpm)
-            spec_ntot = np.sum(onslit_init)
-            msgs.info('Spectral fit of flatfield for {0}/{1} '.format(spec_nfit, spec_ntot)
-                      + ' pixels in the slit.')
-            # Set this to a parameter?
-            if spec_nfit/spec_ntot < 0.5:
-                # TODO: Shouldn't this raise an exception or continue to the next slit instead?
-                msgs.warn('Spectral fit includes only {:.1f}'.format(100*spec_nfit/spec_ntot)
-                          + '% of the pixels on this slit.' + msgs.newline()
-                          + '          Either the slit has many bad pixels or the number of '
-                            'trimmed pixels is too large.')
-
-            # Sort the pixels by their spectral coordinate.
-            # TODO: Include ivar and sorted gpm in outputs?
-            spec_gpm, spec_srt, spec_coo_data, spec_flat_data \
-                    = flat.sorted_flat_data(flat_log, spec_coo, gpm=spec_gpm)
-            # NOTE: By default np.argsort sorts the data over the last
-            # axis. Just to avoid the possibility (however unlikely) of
-            # spec_coo[spec_gpm] returning an array, all the arrays are
-            # explicitly flattened.
-            spec_ivar_data = ivar_log[spec_gpm].ravel()[spec_srt]
-            spec_gpm_data = gpm_log[spec_gpm].ravel()[spec_srt]
-
-            # Rejection threshold for spectral fit in log(image)
-            # TODO: Make this a parameter?
-            logrej = 0.5
-
-            # Fit the spectral direction of the blaze.
-            # TODO: Figure out how to deal with the fits going crazy at
-            #  the edges of the chip in spec direction
-            # TODO: Can we add defaults to bspline_profile so that we
-            #  don't have to instantiate invvar and profile_basis
-            spec_bspl, spec_gpm_fit, spec_flat_fit, _, exit_status \
-                    = fitting.bspline_profile(spec_coo_data, spec_flat_data, spec_ivar_data,
-                                            np.ones_like(spec_coo_data), ingpm=spec_gpm_data,
-                                            nord=4, upper=logrej, lower=logrej,
-                                            kwargs_bspline={'bkspace': spec_samp_fine},
-                                            kwargs_reject={'groupbadpix': True, 'maxrej': 5})
-
-            if exit_status > 1:
-                # TODO -- MAKE A FUNCTION
-                msgs.warn('Flat-field spectral response bspline fit failed!  Not flat-fielding '
-                          'slit {0} and continuing!'.format(slit_spat))
-                self.slits.mask[slit_idx] = self.slits.bitmask.turn_on(self.slits.mask[slit_idx], 'BADFLATCALIB')
-                continue
+            fit_slits += [slit_idx]
 
-            # Debugging/checking spectral fit
-            if debug:
-                fitting.bspline_qa(spec_coo_data, spec_flat_data, spec_bspl, spec_gpm_fit,
-                                 spec_flat_fit, xlabel='Spectral Pixel', ylabel='log(flat counts)',
-                                 title='Spectral Fit for slit={:d}'.format(slit_spat))
-
-            if sticky:
-                # Add rejected pixels to gpm
-                gpm[spec_gpm] = (spec_gpm_fit & spec_gpm_data)[np.argsort(spec_srt)]
-
-            # Construct the model of the flat-field spectral shape
-            # including padding on either side of the slit.
-            spec_model[...] = 1.
-            spec_model[onslit_padded] = np.exp(spec_bspl.value(spec_coo[onslit_padded])[0])
-            # ----------------------------------------------------------
-
-            # ----------------------------------------------------------
-            # To fit the spatial response, first normalize out the
-            # spectral response, and then collapse the slit spectrally.
-
-            # Normalize out the spectral shape of the flat
-            norm_spec[...] = 1.
-            norm_spec[onslit_padded] = rawflat[onslit_padded] \
-                                            / np.fmax(spec_model[onslit_padded],1.0)
-
-            # Find pixels fot fit in the spatial direction:
-            #   - Fit pixels in the padded slit that haven't been masked
-            #     by the BPM
-            spat_gpm = onslit_padded & gpm #& (rawflat < nonlinear_counts)
-            #   - Fit pixels with non-zero flux and less than 70% above
-            #     the average spectral profile.
-            spat_gpm &= (norm_spec > 0.0) & (norm_spec < 1.7)
-            #   - Determine maximum counts in median filtered flat
-            #     spectrum model.
-            spec_interp = interpolate.interp1d(spec_coo_data, spec_flat_fit, kind='linear',
-                                               assume_sorted=True, bounds_error=False,
-                                               fill_value=-np.inf)
-            spec_sm = utils.fast_running_median(np.exp(spec_interp(np.arange(nspec))),
-                                                np.fmax(np.ceil(0.10*nspec).astype(int),10))
-            #   - Only fit pixels with at least values > 10% of this maximum and no less than 1.
-            spat_gpm &= (spec_model > 0.1*np.amax(spec_sm)) & (spec_model > 1.0)
-
-            # Report
-            spat_nfit = np.sum(spat_gpm)
-            spat_ntot = np.sum(onslit_padded)
-            msgs.info('Spatial fit of flatfield for {0}/{1} '.format(spat_nfit, spat_ntot)
-                      + ' pixels in the slit.')
-            if spat_nfit/spat_ntot < 0.5:
-                # TODO: Shouldn't this raise an exception or continue to the next slit instead?
-                msgs.warn('Spatial fit includes only {:.1f}'.format(100*spat_nfit/spat_ntot)
-                          + '% of the pixels on this slit.' + msgs.newline()
-                          + '          Either the slit has many bad pixels, the model of the '
-                          'spectral shape is poor, or the illumination profile is very irregular.')
-
-            # First fit -- With initial slits
-            exit_status, spat_coo_data,  spat_flat_data, spat_bspl, spat_gpm_fit, \
-                spat_flat_fit, spat_flat_data_raw \
-                        = self.spatial_fit(norm_spec, spat_coo_init, median_slit_widths[slit_idx],
-                                           spat_gpm, gpm, debug=debug)
-
-            if tweak_slits:
-                # TODO: Should the tweak be based on the bspline fit?
-                # TODO: Will this break if
-                left_thresh, left_shift, self.slits.left_tweak[:,slit_idx], right_thresh, \
-                    right_shift, self.slits.right_tweak[:,slit_idx] \
-                        = flat.tweak_slit_edges(self.slits.left_init[:,slit_idx],
-                                                self.slits.right_init[:,slit_idx],
-                                                spat_coo_data, spat_flat_data,
-                                                thresh=tweak_slits_thresh,
-                                                maxfrac=tweak_slits_maxfrac, debug=debug)
-                # TODO: Because the padding doesn't consider adjacent
-                #  slits, calling slit_img for individual slits can be
-                #  different from the result when you construct the
-                #  image for all slits. Fix this...
-
-                # Update the onslit mask
-                _slitid_img = self.slits.slit_img(slitidx=slit_idx, initial=False)
-                onslit_tweak = _slitid_img == slit_spat
-                spat_coo_tweak = self.slits.spatial_coordinate_image(slitidx=slit_idx,
-                                                               slitid_img=_slitid_img)
-
-                # Construct the empirical illumination profile
-                # TODO This is extremely inefficient, because we only need to re-fit the illumflat, but
-                #  spatial_fit does both the reconstruction of the illumination function and the bspline fitting.
-                #  Only the b-spline fitting needs be reddone with the new tweaked spatial coordinates, so that would
-                #  save a ton of runtime. It is not a trivial change becauase the coords are sorted, etc.
-                exit_status, spat_coo_data, spat_flat_data, spat_bspl, spat_gpm_fit, \
-                    spat_flat_fit, spat_flat_data_raw = self.spatial_fit(
-                    norm_spec, spat_coo_tweak, median_slit_widths[slit_idx], spat_gpm, gpm, debug=False)
-
-                spat_coo_final = spat_coo_tweak
-            else:
-                _slitid_img = slitid_img_init
-                spat_coo_final = spat_coo_init
-                onslit_tweak = onslit_init
-
-            # Add an approximate pixel axis at the top
-            if debug:
-                # TODO: Move this into a qa plot that gets saved
-                ax = fitting.bspline_qa(spat_coo_data, spat_flat_data, spat_bspl, spat_gpm_fit,
-                                      spat_flat_fit, show=False)
-                ax.scatter(spat_coo_data, spat_flat_data_raw, marker='.', s=1, zorder=0, color='k',
-                           label='raw data')
-                # Force the center of the slit to be at the center of the plot for the hline
-                ax.set_xlim(-0.1,1.1)
-                ax.axvline(0.0, color='lightgreen', linestyle=':', linewidth=2.0,
-                           label='original left edge', zorder=8)
-                ax.axvline(1.0, color='red', linestyle=':', linewidth=2.0,
-                           label='original right edge', zorder=8)
-                if tweak_slits and left_shift > 0:
-                    label = 'threshold = {:5.2f}'.format(tweak_slits_thresh) \
-                                + ' % of max of left illumprofile'
-                    ax.axhline(left_thresh, xmax=0.5, color='lightgreen', linewidth=3.0,
-                               label=label, zorder=10)
-                    ax.axvline(left_shift, color='lightgreen', linestyle='--', linewidth=3.0,
-                               label='tweaked left edge', zorder=11)
-                if tweak_slits and right_shift > 0:
-                    label = 'threshold = {:5.2f}'.format(tweak_slits_thresh) \
-                                + ' % of max of right illumprofile'
-                    ax.axhline(right_thresh, xmin=0.5, color='red', linewidth=3.0, label=label,
-                               zorder=10)
-                    ax.axvline(1-right_shift, color='red', linestyle='--', linewidth=3.0,
-                               label='tweaked right edge', zorder=20)
-                ax.legend()
-                ax.set_xlabel('Normalized Slit Position')
-                ax.set_ylabel('Normflat Spatial Profile')
-                ax.set_title('Illumination Function Fit for slit={:d}'.format(slit_spat))
-                plt.show()
-
-            # ----------------------------------------------------------
-            # Construct the illumination profile with the tweaked edges
-            # of the slit
-            if exit_status <= 1:
-                # TODO -- JFH -- Check this is ok for flexure!!
-                self.msillumflat[onslit_tweak] = spat_bspl.value(spat_coo_final[onslit_tweak])[0]
-                self.list_of_spat_bsplines[slit_idx] = spat_bspl
-                # No need to proceed further if we just need the illumination profile
-                if spat_illum_only:
-                    continue
-            else:
-                # Save the nada
-                msgs.warn('Slit illumination profile bspline fit failed!  Spatial profile not '
-                          'included in flat-field model for slit {0}!'.format(slit_spat))
-                self.slits.mask[slit_idx] = self.slits.bitmask.turn_on(self.slits.mask[slit_idx], 'BADFLATCALIB')
+        # #################################################
+        # Model each slit independently
+        kwargs = dict(npoly=npoly, spat_illum_only=spat_illum_only,
+                      func2d=self.wavetilts['func2d'], spat_flexure=self.wavetilts.spat_flexure,
+                      debug=debug)
+        arglist = [(slit_idx, kwargs) for slit_idx in fit_slits]
+        # Images used by all slits
+        shared = dict(flatpar=self.flatpar, slits=self.slits, tilt_coeffs=self.wavetilts['coeffs'],
+                      median_slit_widths=median_slit_widths, rawflat=rawflat, flat_log=flat_log,
+                      ivar_log=ivar_log, gpm_log=gpm_log, gpm=gpm, waveimg=waveimg,
+                      slitid_img_init=slitid_img_init, padded_slitid_img=padded_slitid_img,
+                      trimmed_slitid_img=trimmed_slitid_img)
+        # NOTE: The debugging plots cannot be shown by the worker processes
+        _nproc = 1 if debug else self.nproc
+        if utils.get_nproc(_nproc, ntasks=len(arglist)) > 1:
+            msgs.info(f'Modeling the flat-field response of {len(arglist)} slits using '
+                      f'{utils.get_nproc(_nproc, ntasks=len(arglist))} processes.')
+        # NOTE: The results are merged in the order of the slits.  When
+        # executed serially, the merging of each slit is done before the next
+        # slit is modeled, such that the rejected pixels are propagated
+        # between adjacent slits.
+        for slit_idx, result in zip(fit_slits, utils.parallel_map(model_flat_slit, arglist,
+                                                                  nproc=_nproc, shared=shared)):
+            box = result['box']
+            gpm[box][result['gpm_update']] = result['gpm']
+            if result['left_tweak'] is not None:
+                self.slits.left_tweak[:,slit_idx] = result['left_tweak']
+                self.slits.right_tweak[:,slit_idx] = result['right_tweak']
+            if result['flag'] is not None:
+                self.slits.mask[slit_idx] = self.slits.bitmask.turn_on(self.slits.mask[slit_idx],
+                                                                       result['flag'])
+            onslit = result['onslit']
+            if result['spat_bspl'] is None:
                 continue
-
-            # ----------------------------------------------------------
-            # Fit the 2D residuals of the 1D spectral and spatial fits.
-            msgs.info('Performing 2D illumination + scattered light flat field fit')
-
-            # Construct the spectrally and spatially normalized flat
-            norm_spec_spat[...] = 1.
-            norm_spec_spat[onslit_tweak] = rawflat[onslit_tweak] / np.fmax(spec_model[onslit_tweak], 1.0) \
-                                                    / np.fmax(self.msillumflat[onslit_tweak], 0.01)
-
-            # Sort the pixels by their spectral coordinate. The mask
-            # uses the nominal padding defined by the slits object.
-            twod_gpm, twod_srt, twod_spec_coo_data, twod_flat_data \
-                    = flat.sorted_flat_data(norm_spec_spat, spec_coo, gpm=onslit_tweak)
-            # Also apply the sorting to the spatial coordinates
-            twod_spat_coo_data = spat_coo_final[twod_gpm].ravel()[twod_srt]
-            # TODO: Reset back to origin gpm if sticky is true?
-            twod_gpm_data = gpm[twod_gpm].ravel()[twod_srt]
-            # Only fit data with less than 30% variations
-            # TODO: Make 30% a parameter?
-            twod_gpm_data &= np.absolute(twod_flat_data - 1) < 0.3
-            # Here we ignore the formal photon counting errors and
-            # simply assume that a typical error per pixel. This guess
-            # is somewhat aribtrary. We then set the rejection
-            # threshold with sigrej_twod
-            # TODO: Make twod_sig and twod_sigrej parameters?
-            twod_sig = 0.01
-            twod_ivar_data = twod_gpm_data.astype(float)/(twod_sig**2)
-            twod_sigrej = 4.0
-
-            poly_basis = basis.fpoly(2.0*twod_spat_coo_data - 1.0, npoly)
-
-            # Perform the full 2d fit
-            twod_bspl, twod_gpm_fit, twod_flat_fit, _, exit_status \
-                    = fitting.bspline_profile(twod_spec_coo_data, twod_flat_data, twod_ivar_data,
-                                            poly_basis, ingpm=twod_gpm_data, nord=4,
-                                            upper=twod_sigrej, lower=twod_sigrej,
-                                            kwargs_bspline={'bkspace': spec_samp_coarse},
-                                            kwargs_reject={'groupbadpix': True, 'maxrej': 10})
-            if debug:
-                # TODO: Make a plot that shows the residuals in the 2D
-                # image
-                resid = twod_flat_data - twod_flat_fit
-                goodpix = twod_gpm_fit & twod_gpm_data
-                badpix = np.invert(twod_gpm_fit) & twod_gpm_data
-
-                plt.clf()
-                ax = plt.gca()
-                ax.plot(twod_spec_coo_data[goodpix], resid[goodpix], color='k', marker='o',
-                        markersize=0.2, mfc='k', fillstyle='full', linestyle='None',
-                        label='good points')
-                ax.plot(twod_spec_coo_data[badpix], resid[badpix], color='red', marker='+',
-                        markersize=0.5, mfc='red', fillstyle='full', linestyle='None',
-                        label='masked')
-                ax.axhline(twod_sigrej*twod_sig, color='lawngreen', linestyle='--',
-                           label='rejection thresholds', zorder=10, linewidth=2.0)
-                ax.axhline(-twod_sigrej*twod_sig, color='lawngreen', linestyle='--', zorder=10,
-                           linewidth=2.0)
-#                ax.set_ylim(-0.05, 0.05)
-                ax.legend()
-                ax.set_xlabel('Spectral Pixel')
-                ax.set_ylabel('Residuals from pixelflat 2-d fit')
-                ax.set_title('Spectral Residuals for slit={:d}'.format(slit_spat))
-                plt.show()
-
-                plt.clf()
-                ax = plt.gca()
-                ax.plot(twod_spat_coo_data[goodpix], resid[goodpix], color='k', marker='o',
-                        markersize=0.2, mfc='k', fillstyle='full', linestyle='None',
-                        label='good points')
-                ax.plot(twod_spat_coo_data[badpix], resid[badpix], color='red', marker='+',
-                        markersize=0.5, mfc='red', fillstyle='full', linestyle='None',
-                        label='masked')
-                ax.axhline(twod_sigrej*twod_sig, color='lawngreen', linestyle='--',
-                           label='rejection thresholds', zorder=10, linewidth=2.0)
-                ax.axhline(-twod_sigrej*twod_sig, color='lawngreen', linestyle='--', zorder=10,
-                           linewidth=2.0)
-#                ax.set_ylim((-0.05, 0.05))
-#                ax.set_xlim(-0.02, 1.02)
-                ax.legend()
-                ax.set_xlabel('Normalized Slit Position')
-                ax.set_ylabel('Residuals from pixelflat 2-d fit')
-                ax.set_title('Spatial Residuals for slit={:d}'.format(slit_spat))
-                plt.show()
-
-            # Save the 2D residual model
-            twod_model[...] = 1.
-            if exit_status > 1:
-                msgs.warn('Two-dimensional fit to flat-field data failed!  No higher order '
-                          'flat-field corrections included in model of slit {0}!'.format(slit_spat))
-                self.slits.mask[slit_idx] = self.slits.bitmask.turn_on(self.slits.mask[slit_idx], 'BADFLATCALIB')
-            else:
-                twod_model[twod_gpm] = twod_flat_fit[np.argsort(twod_srt)]
-                twod_gpm_out[twod_gpm] = twod_gpm_fit[np.argsort(twod_srt)]
-
-
-            # Construct the full flat-field model
-            # TODO: Why is the 0.05 here for the illumflat compared to the 0.01 above?
-            self.flat_model[onslit_tweak] = twod_model[onslit_tweak] \
-                                        * np.fmax(self.msillumflat[onslit_tweak], 0.05) \
-                                        * np.fmax(spec_model[onslit_tweak], 1.0)
-
-            # Construct the pixel flat
-            #trimmed_slitid_img_anew = self.slits.slit_img(pad=-trim, slitidx=slit_idx)
-            #onslit_trimmed_anew = trimmed_slitid_img_anew == slit_spat
-            self.mspixelflat[onslit_tweak] = rawflat[onslit_tweak]/self.flat_model[onslit_tweak]
-            # TODO: Add some code here to treat the edges and places where fits
-            #  go bad?
-
-            # Minimum wavelength?
-            if self.flatpar['pixelflat_min_wave'] is not None:
-                bad_wv = waveimg[onslit_tweak] < self.flatpar['pixelflat_min_wave'] 
-                self.mspixelflat[np.where(onslit_tweak)[0][bad_wv]] = 1.
-            # Maximum wavelength?
-            if self.flatpar['pixelflat_max_wave'] is not None:
-                bad_wv = waveimg[onslit_tweak] > self.flatpar['pixelflat_max_wave'] 
-                self.mspixelflat[np.where(onslit_tweak)[0][bad_wv]] = 1.
+            self.msillumflat[box][onslit] = result['illumflat']
+            self.list_of_spat_bsplines[slit_idx] = result['spat_bspl']
+            if result['flat_model'] is None:
+                continue
+            if result['twod_gpm'] is not None:
+                twod_gpm_out[box][onslit] = result['twod_gpm']
+            self.flat_model[box][onslit] = result['flat_model']
+            self.mspixelflat[box][onslit] = result['pixelflat']
+            # NOTE: This sets the full detector rows of the pixels outside
+            # the allowed wavelength range.
+            self.mspixelflat[result['bad_wave_rows']] = 1.
 
         # No need to continue if we're just doing the spatial illumination
         if spat_illum_only:
@@ -1138,41 +851,8 @@ class FlatField:
                  - spat_flat_data_raw
         """
 
-        # Construct the empirical illumination profile
-        _spat_gpm, spat_srt, spat_coo_data, spat_flat_data_raw, spat_flat_data \
-            = flat.construct_illum_profile(norm_spec, spat_coo, median_slit_width,
-                                           spat_gpm=spat_gpm,
-                                           spat_samp=self.flatpar['spat_samp'],
-                                           illum_iter=self.flatpar['illum_iter'],
-                                           illum_rej=self.flatpar['illum_rej'],
-                                           debug=debug)
-
-        if self.flatpar['rej_sticky']:
-            # Add rejected pixels to gpm
-            gpm[spat_gpm] &= (spat_gpm & _spat_gpm)[spat_gpm]
-
-        # Make sure that the normalized and filtered flat is finite!
-        if np.any(np.invert(np.isfinite(spat_flat_data))):
-            msgs.error('Inifinities in slit illumination function computation!')
-
-        # Determine the breakpoint spacing from the sampling of the
-        # spatial coordinates. Use breakpoints at a spacing of a
-        # 1/10th of a pixel, but do not allow a bsp smaller than
-        # the typical sampling. Use the bspline class to determine
-        # the breakpoints:
-        spat_bspl = bspline.bspline(spat_coo_data, nord=4,
-                                    bkspace=np.fmax(1.0 / median_slit_width / 10.0,
-                                                    1.2 * np.median(np.diff(spat_coo_data))))
-        # TODO: Can we add defaults to bspline_profile so that we
-        #  don't have to instantiate invvar and profile_basis
-        spat_bspl, spat_gpm_fit, spat_flat_fit, _, exit_status \
-            = fitting.bspline_profile(spat_coo_data, spat_flat_data,
-                                    np.ones_like(spat_flat_data),
-                                    np.ones_like(spat_flat_data), nord=4, upper=5.0,
-                                    lower=5.0, fullbkpt=spat_bspl.breakpoints)
-        # Return
-        return exit_status, spat_coo_data, spat_flat_data, spat_bspl, spat_gpm_fit, \
-               spat_flat_fit, spat_flat_data_raw
+        return spatial_fit(norm_spec, spat_coo, median_slit_width, spat_gpm, gpm, self.flatpar,
+                           debug=debug)
 
     def spectral_illumination(self, gpm=None, debug=False):
         """
@@ -1223,6 +903,514 @@ class FlatField:
                                       flexure=flex)
 
 
+def spatial_fit(norm_spec, spat_coo, median_slit_width, spat_gpm, gpm, flatpar, debug=False):
+    """
+    Perform the spatial fit; see :func:`FlatField.spatial_fit`.
+
+    Args:
+        norm_spec (`numpy.ndarray`_):
+        spat_coo (`numpy.ndarray`_):
+            Spatial coordinate array
+        median_slit_width (:obj:`float`):
+        spat_gpm (`numpy.ndarray`_):
+        gpm (`numpy.ndarray`_):
+            Good-pixel mask.  If ``rej_sticky`` is set in ``flatpar``, this
+            is altered to include the rejected pixels.
+        flatpar (:class:`pypeit.par.pypeitpar.FlatFieldPar`):
+            Flat-field parameters
+        debug (bool, optional):
+
+    Returns:
+        tuple: 7 objects
+             - exit_status (int):
+             - spat_coo_data
+             - spat_flat_data
+             - spat_bspl (:class:`pypeit.bspline.bspline.bspline`): Bspline model of the spatial fit.  Used for illumflat
+             - spat_gpm_fit
+             - spat_flat_fit
+             - spat_flat_data_raw
+    """
+
+    # Construct the empirical illumination profile
+    _spat_gpm, spat_srt, spat_coo_data, spat_flat_data_raw, spat_flat_data \
+        = flat.construct_illum_profile(norm_spec, spat_coo, median_slit_width,
+                                       spat_gpm=spat_gpm,
+                                       spat_samp=flatpar['spat_samp'],
+                                       illum_iter=flatpar['illum_iter'],
+                                       illum_rej=flatpar['illum_rej'],
+                                       debug=debug)
+
+    if flatpar['rej_sticky']:
+        # Add rejected pixels to gpm
+        gpm[spat_gpm] &= (spat_gpm & _spat_gpm)[spat_gpm]
+
+    # Make sure that the normalized and filtered flat is finite!
+    if np.any(np.invert(np.isfinite(spat_flat_data))):
+        msgs.error('Inifinities in slit illumination function computation!')
+
+    # Determine the breakpoint spacing from the sampling of the
+    # spatial coordinates. Use breakpoints at a spacing of a
+    # 1/10th of a pixel, but do not allow a bsp smaller than
+    # the typical sampling. Use the bspline class to determine
+    # the breakpoints:
+    spat_bspl = bspline.bspline(spat_coo_data, nord=4,
+                                bkspace=np.fmax(1.0 / median_slit_width / 10.0,
+                                                1.2 * np.median(np.diff(spat_coo_data))))
+    # TODO: Can we add defaults to bspline_profile so that we
+    #  don't have to instantiate invvar and profile_basis
+    spat_bspl, spat_gpm_fit, spat_flat_fit, _, exit_status \
+        = fitting.bspline_profile(spat_coo_data, spat_flat_data,
+                                np.ones_like(spat_flat_data),
+                                np.ones_like(spat_flat_data), nord=4, upper=5.0,
+                                lower=5.0, fullbkpt=spat_bspl.breakpoints)
+    # Return
+    return exit_status, spat_coo_data, spat_flat_data, spat_bspl, spat_gpm_fit, \
+           spat_flat_fit, spat_flat_data_raw
+
+
+def model_flat_slit(slit_idx, kwargs):
+    """
+    Model the flat-field response of a single slit; see :func:`FlatField.fit`.
+
+    This is executed by :func:`~pypeit.utils.parallel_map`.  The following
+    objects must be available via :func:`~pypeit.utils.shared_data`: the
+    flat-field parameters (``flatpar``), the slit edges (``slits``), the tilt
+    coefficients (``tilt_coeffs``), the median width of each slit
+    (``median_slit_widths``), the flat-field image and its logarithm
+    (``rawflat``, ``flat_log``, ``ivar_log``, ``gpm_log``), the good-pixel
+    mask (``gpm``), the wavelength image (``waveimg``), and the slit ID images
+    with the nominal, padded, and trimmed slits (``slitid_img_init``,
+    ``padded_slitid_img``, ``trimmed_slitid_img``).
+
+    The slit is modeled within the bounding box of the image columns that
+    can be part of the (padded, trimmed, or tweaked) slit, and the tilts are
+    only evaluated for the pixels in this box.
+
+    Args:
+        slit_idx (:obj:`int`):
+            Zero-based index of the slit.
+        kwargs (:obj:`dict`):
+            Keyword arguments common to all slits: the order of the
+            polynomial used in the 2D fit (``npoly``), whether to only model
+            the illumination profile (``spat_illum_only``), the function and
+            spatial flexure of the tilts (``func2d``, ``spat_flexure``), and
+            whether to show the debugging plots (``debug``).
+
+    Returns:
+        :obj:`dict`: The results for the slit:
+
+            - ``box``: The slices selecting the bounding box in the image.
+              All the other images are for the pixels in this box.
+            - ``gpm_update``, ``gpm``: The pixels in the good-pixel mask
+              updated by the rejections in the fits, and their new values.
+            - ``left_tweak``, ``right_tweak``: The tweaked slit edges, or
+              None if the edges were not tweaked.
+            - ``flag``: The flag to set for the slit if a fit failed, or
+              None.
+            - ``onslit``: The pixels in the (tweaked) slit.
+            - ``spat_bspl``, ``illumflat``: The bspline fit to the
+              illumination profile and the illumination flat for the pixels
+              in the slit, or None if the fit failed.
+            - ``flat_model``, ``pixelflat``: The flat-field model and the
+              pixel flat for the pixels in the slit, or None if they were
+              not constructed.
+            - ``twod_gpm``: The good-pixel mask from the 2D fit for the
+              pixels in the slit, or None if the 2D fit failed.
+            - ``bad_wave_rows``: The image rows where the pixel flat is set
+              to unity because of the allowed wavelength range.
+    """
+    flatpar = utils.shared_data('flatpar')
+    slits = utils.shared_data('slits')
+    rawflat = utils.shared_data('rawflat')
+    slit_spat = slits.spat_id[slit_idx]
+    debug = kwargs['debug']
+
+    # Set parameters (for convenience;
+    spec_samp_fine = flatpar['spec_samp_fine']
+    spec_samp_coarse = flatpar['spec_samp_coarse']
+    tweak_slits = flatpar['tweak_slits']
+    tweak_slits_thresh = flatpar['tweak_slits_thresh']
+    tweak_slits_maxfrac = flatpar['tweak_slits_maxfrac']
+    # If sticky, points rejected at each stage (spec, spat, 2d) are
+    # propagated to the next stage
+    sticky = flatpar['rej_sticky']
+    npoly = kwargs['npoly']
+
+    msgs.info('Modeling the flat-field response for slit spat_id={}: {}/{}'.format(
+                slit_spat, slit_idx+1, slits.nslits))
+
+    # Columns that can be part of the slit.  The tweaked edges are at most
+    # shifted outward to the edge of the padded slit.
+    nspec, nspat = rawflat.shape
+    left_init, right_init = slits.left_init[:,slit_idx], slits.right_init[:,slit_idx]
+    width = right_init - left_init
+    margin = np.amax(np.absolute(flatpar['slit_illum_pad'])) * np.amax(width) \
+                / max(np.amin(width), 1.) + np.amax(np.absolute(flatpar['slit_trim'])) \
+                + np.absolute(slits.pad) + 2
+    box = (slice(0, nspec), slice(int(max(np.floor(np.amin(left_init) - margin), 0)),
+                                  int(min(np.ceil(np.amax(right_init) + margin), nspat))))
+    spec = np.arange(nspec)
+    spat = np.arange(box[1].start, box[1].stop)
+
+    # Images in the box
+    rawflat = rawflat[box]
+    flat_log = utils.shared_data('flat_log')[box]
+    ivar_log = utils.shared_data('ivar_log')[box]
+    gpm_log = utils.shared_data('gpm_log')[box]
+    gpm = utils.shared_data('gpm')[box].copy()
+    gpm_update = np.zeros_like(gpm)
+
+    # Find the pixels on the initial, padded, and trimmed slits
+    onslit_init = utils.shared_data('slitid_img_init')[box] == slit_spat
+    onslit_padded = utils.shared_data('padded_slitid_img')[box] == slit_spat
+    onslit_trimmed = utils.shared_data('trimmed_slitid_img')[box] == slit_spat
+
+    result = dict(box=box, gpm_update=gpm_update, gpm=np.array([], dtype=bool), left_tweak=None,
+                  right_tweak=None, flag=None, onslit=onslit_init, spat_bspl=None, illumflat=None,
+                  flat_model=None, pixelflat=None, twod_gpm=None,
+                  bad_wave_rows=np.array([], dtype=int))
+
+    # Create an image with the spatial coordinates relative to the left edge of this slit
+    spat_coo_init = (spat[None,:] - left_init[:,None])/width[:,None]
+
+    # ----------------------------------------------------------
+    # Collapse the slit spatially and fit the spectral function
+    # TODO: Put this stuff in a self.spectral_fit method?
+
+    # Create the tilts image for this slit
+    # TODO -- JFH Confirm the sign of this shift is correct!
+    _flexure = 0. if kwargs['spat_flexure'] is None else kwargs['spat_flexure']
+    spec_img, spat_img = np.meshgrid(spec, spat, indexing='ij')
+    tilts = tracewave.fit2tilts_pix(spec_img, spat_img, (nspec, nspat),
+                                    utils.shared_data('tilt_coeffs')[:,:,slit_idx],
+                                    kwargs['func2d'], spat_shift=-1*_flexure)
+    # Convert the tilt image to an image with the spectral pixel index
+    spec_coo = tilts * (nspec-1)
+
+    # Only include the trimmed set of pixels in the flat-field
+    # fit along the spectral direction.
+    spec_gpm = onslit_trimmed & gpm_log  # & (rawflat < nonlinear_counts)
+    spec_nfit = np.sum(spec_gpm)
+    spec_ntot = np.sum(onslit_init)
+    msgs.info('Spectral fit of flatfield for {0}/{1} '.format(spec_nfit, spec_ntot)
+              + ' pixels in the slit.')
+    # Set this to a parameter?
+    if spec_nfit/spec_ntot < 0.5:
+        # TODO: Shouldn't this raise an exception or continue to the next slit instead?
+        msgs.warn('Spectral fit includes only {:.1f}'.format(100*spec_nfit/spec_ntot)
+                  + '% of the pixels on this slit.' + msgs.newline()
+                  + '          Either the slit has many bad pixels or the number of '
+                    'trimmed pixels is too large.')
+
+    # Sort the pixels by their spectral coordinate.
+    # TODO: Include ivar and sorted gpm in outputs?
+    spec_gpm, spec_srt, spec_coo_data, spec_flat_data \
+            = flat.sorted_flat_data(flat_log, spec_coo, gpm=spec_gpm)
+    # NOTE: By default np.argsort sorts the data over the last
+    # axis. Just to avoid the possibility (however unlikely) of
+    # spec_coo[spec_gpm] returning an array, all the arrays are
+    # explicitly flattened.
+    spec_ivar_data = ivar_log[spec_gpm].ravel()[spec_srt]
+    spec_gpm_data = gpm_log[spec_gpm].ravel()[spec_srt]
+
+    # Rejection threshold for spectral fit in log(image)
+    # TODO: Make this a parameter?
+    logrej = 0.5
+
+    # Fit the spectral direction of the blaze.
+    # TODO: Figure out how to deal with the fits going crazy at
+    #  the edges of the chip in spec direction
+    # TODO: Can we add defaults to bspline_profile so that we
+    #  don't have to instantiate invvar and profile_basis
+    spec_bspl, spec_gpm_fit, spec_flat_fit, _, exit_status \
+            = fitting.bspline_profile(spec_coo_data, spec_flat_data, spec_ivar_data,
+                                    np.ones_like(spec_coo_data), ingpm=spec_gpm_data,
+                                    nord=4, upper=logrej, lower=logrej,
+                                    kwargs_bspline={'bkspace': spec_samp_fine},
+                                    kwargs_reject={'groupbadpix': True, 'maxrej': 5})
+
+    if exit_status > 1:
+        # TODO -- MAKE A FUNCTION
+        msgs.warn('Flat-field spectral response bspline fit failed!  Not flat-fielding '
+                  'slit {0} and continuing!'.format(slit_spat))
+        result['flag'] = 'BADFLATCALIB'
+        return result
+
+    # Debugging/checking spectral fit
+    if debug:
+        fitting.bspline_qa(spec_coo_data, spec_flat_data, spec_bspl, spec_gpm_fit,
+                         spec_flat_fit, xlabel='Spectral Pixel', ylabel='log(flat counts)',
+                         title='Spectral Fit for slit={:d}'.format(slit_spat))
+
+    if sticky:
+        # Add rejected pixels to gpm
+        gpm[spec_gpm] = (spec_gpm_fit & spec_gpm_data)[np.argsort(spec_srt)]
+        gpm_update |= spec_gpm
+
+    # Construct the model of the flat-field spectral shape
+    # including padding on either side of the slit.
+    spec_model = np.ones_like(rawflat)
+    spec_model[onslit_padded] = np.exp(spec_bspl.value(spec_coo[onslit_padded])[0])
+    # ----------------------------------------------------------
+
+    # ----------------------------------------------------------
+    # To fit the spatial response, first normalize out the
+    # spectral response, and then collapse the slit spectrally.
+
+    # Normalize out the spectral shape of the flat
+    norm_spec = np.ones_like(rawflat)
+    norm_spec[onslit_padded] = rawflat[onslit_padded] \
+                                    / np.fmax(spec_model[onslit_padded],1.0)
+
+    # Find pixels fot fit in the spatial direction:
+    #   - Fit pixels in the padded slit that haven't been masked
+    #     by the BPM
+    spat_gpm = onslit_padded & gpm #& (rawflat < nonlinear_counts)
+    #   - Fit pixels with non-zero flux and less than 70% above
+    #     the average spectral profile.
+    spat_gpm &= (norm_spec > 0.0) & (norm_spec < 1.7)
+    #   - Determine maximum counts in median filtered flat
+    #     spectrum model.
+    spec_interp = interpolate.interp1d(spec_coo_data, spec_flat_fit, kind='linear',
+                                       assume_sorted=True, bounds_error=False,
+                                       fill_value=-np.inf)
+    spec_sm = utils.fast_running_median(np.exp(spec_interp(np.arange(nspec))),
+                                        np.fmax(np.ceil(0.10*nspec).astype(int),10))
+    #   - Only fit pixels with at least values > 10% of this maximum and no less than 1.
+    spat_gpm &= (spec_model > 0.1*np.amax(spec_sm)) & (spec_model > 1.0)
+    if sticky:
+        gpm_update |= spat_gpm
+
+    # Report
+    spat_nfit = np.sum(spat_gpm)
+    spat_ntot = np.sum(onslit_padded)
+    msgs.info('Spatial fit of flatfield for {0}/{1} '.format(spat_nfit, spat_ntot)
+              + ' pixels in the slit.')
+    if spat_nfit/spat_ntot < 0.5:
+        # TODO: Shouldn't this raise an exception or continue to the next slit instead?
+        msgs.warn('Spatial fit includes only {:.1f}'.format(100*spat_nfit/spat_ntot)
+                  + '% of the pixels on this slit.' + msgs.newline()
+                  + '          Either the slit has many bad pixels, the model of the '
+                  'spectral shape is poor, or the illumination profile is very irregular.')
+
+    # First fit -- With initial slits
+    median_slit_width = utils.shared_data('median_slit_widths')[slit_idx]
+    exit_status, spat_coo_data,  spat_flat_data, spat_bspl, spat_gpm_fit, \
+        spat_flat_fit, spat_flat_data_raw \
+                = spatial_fit(norm_spec, spat_coo_init, median_slit_width, spat_gpm, gpm, flatpar,
+                              debug=debug)
+
+    if tweak_slits:
+        # TODO: Should the tweak be based on the bspline fit?
+        # TODO: Will this break if
+        left_thresh, left_shift, left_tweak, right_thresh, right_shift, right_tweak \
+                = flat.tweak_slit_edges(left_init, right_init, spat_coo_data, spat_flat_data,
+                                        thresh=tweak_slits_thresh,
+                                        maxfrac=tweak_slits_maxfrac, debug=debug)
+        result['left_tweak'], result['right_tweak'] = left_tweak, right_tweak
+        # TODO: Because the padding doesn't consider adjacent
+        #  slits, calling slit_img for individual slits can be
+        #  different from the result when you construct the
+        #  image for all slits. Fix this...
+
+        # Update the onslit mask; this is the same as
+        # slits.slit_img(slitidx=slit_idx, initial=False) for the tweaked
+        # edges
+        onslit_tweak = (spat[None,:] > left_tweak[:,None] - slits.pad) \
+                        & (spat[None,:] < right_tweak[:,None] + slits.pad) \
+                        & ((spec > slits.specmin[slit_idx]) & (spec < slits.specmax[slit_idx]))[:,None]
+        spat_coo_tweak = np.zeros_like(rawflat)
+        spat_coo_tweak[onslit_tweak] = ((spat[None,:] - left_tweak[:,None])
+                                        / (right_tweak - left_tweak)[:,None])[onslit_tweak]
+
+        # Construct the empirical illumination profile
+        # TODO This is extremely inefficient, because we only need to re-fit the illumflat, but
+        #  spatial_fit does both the reconstruction of the illumination function and the bspline fitting.
+        #  Only the b-spline fitting needs be reddone with the new tweaked spatial coordinates, so that would
+        #  save a ton of runtime. It is not a trivial change becauase the coords are sorted, etc.
+        exit_status, spat_coo_data, spat_flat_data, spat_bspl, spat_gpm_fit, \
+            spat_flat_fit, spat_flat_data_raw = spatial_fit(
+            norm_spec, spat_coo_tweak, median_slit_width, spat_gpm, gpm, flatpar, debug=False)
+
+        spat_coo_final = spat_coo_tweak
+    else:
+        spat_coo_final = spat_coo_init
+        onslit_tweak = onslit_init
+    result['onslit'] = onslit_tweak
+
+    # Add an approximate pixel axis at the top
+    if debug:
+        # TODO: Move this into a qa plot that gets saved
+        ax = fitting.bspline_qa(spat_coo_data, spat_flat_data, spat_bspl, spat_gpm_fit,
+                              spat_flat_fit, show=False)
+        ax.scatter(spat_coo_data, spat_flat_data_raw, marker='.', s=1, zorder=0, color='k',
+                   label='raw data')
+        # Force the center of the slit to be at the center of the plot for the hline
+        ax.set_xlim(-0.1,1.1)
+        ax.axvline(0.0, color='lightgreen', linestyle=':', linewidth=2.0,
+                   label='original left edge', zorder=8)
+        ax.axvline(1.0, color='red', linestyle=':', linewidth=2.0,
+                   label='original right edge', zorder=8)
+        if tweak_slits and left_shift > 0:
+            label = 'threshold = {:5.2f}'.format(tweak_slits_thresh) \
+                        + ' % of max of left illumprofile'
+            ax.axhline(left_thresh, xmax=0.5, color='lightgreen', linewidth=3.0,
+                       label=label, zorder=10)
+            ax.axvline(left_shift, color='lightgreen', linestyle='--', linewidth=3.0,
+                       label='tweaked left edge', zorder=11)
+        if tweak_slits and right_shift > 0:
+            label = 'threshold = {:5.2f}'.format(tweak_slits_thresh) \
+                        + ' % of max of right illumprofile'
+            ax.axhline(right_thresh, xmin=0.5, color='red', linewidth=3.0, label=label,
+                       zorder=10)
+            ax.axvline(1-right_shift, color='red', linestyle='--', linewidth=3.0,
+                       label='tweaked right edge', zorder=20)
+        ax.legend()
+        ax.set_xlabel('Normalized Slit Position')
+        ax.set_ylabel('Normflat Spatial Profile')
+        ax.set_title('Illumination Function Fit for slit={:d}'.format(slit_spat))
+        plt.show()
+
+    result['gpm'] = gpm[gpm_update]
+
+    # ----------------------------------------------------------
+    # Construct the illumination profile with the tweaked edges
+    # of the slit
+    if exit_status > 1:
+        # Save the nada
+        msgs.warn('Slit illumination profile bspline fit failed!  Spatial profile not '
+                  'included in flat-field model for slit {0}!'.format(slit_spat))
+        result['flag'] = 'BADFLATCALIB'
+        return result
+
+    # TODO -- JFH -- Check this is ok for flexure!!
+    illumflat = np.ones_like(rawflat)
+    illumflat[onslit_tweak] = spat_bspl.value(spat_coo_final[onslit_tweak])[0]
+    result['spat_bspl'] = spat_bspl
+    result['illumflat'] = illumflat[onslit_tweak]
+    # No need to proceed further if we just need the illumination profile
+    if kwargs['spat_illum_only']:
+        return result
+
+    # ----------------------------------------------------------
+    # Fit the 2D residuals of the 1D spectral and spatial fits.
+    msgs.info('Performing 2D illumination + scattered light flat field fit')
+
+    # Construct the spectrally and spatially normalized flat
+    norm_spec_spat = np.ones_like(rawflat)
+    norm_spec_spat[onslit_tweak] = rawflat[onslit_tweak] / np.fmax(spec_model[onslit_tweak], 1.0) \
+                                            / np.fmax(illumflat[onslit_tweak], 0.01)
+
+    # Sort the pixels by their spectral coordinate. The mask
+    # uses the nominal padding defined by the slits object.
+    twod_gpm, twod_srt, twod_spec_coo_data, twod_flat_data \
+            = flat.sorted_flat_data(norm_spec_spat, spec_coo, gpm=onslit_tweak)
+    # Also apply the sorting to the spatial coordinates
+    twod_spat_coo_data = spat_coo_final[twod_gpm].ravel()[twod_srt]
+    # TODO: Reset back to origin gpm if sticky is true?
+    twod_gpm_data = gpm[twod_gpm].ravel()[twod_srt]
+    # Only fit data with less than 30% variations
+    # TODO: Make 30% a parameter?
+    twod_gpm_data &= np.absolute(twod_flat_data - 1) < 0.3
+    # Here we ignore the formal photon counting errors and
+    # simply assume that a typical error per pixel. This guess
+    # is somewhat aribtrary. We then set the rejection
+    # threshold with sigrej_twod
+    # TODO: Make twod_sig and twod_sigrej parameters?
+    twod_sig = 0.01
+    twod_ivar_data = twod_gpm_data.astype(float)/(twod_sig**2)
+    twod_sigrej = 4.0
+
+    poly_basis = basis.fpoly(2.0*twod_spat_coo_data - 1.0, npoly)
+
+    # Perform the full 2d fit
+    twod_bspl, twod_gpm_fit, twod_flat_fit, _, exit_status \
+            = fitting.bspline_profile(twod_spec_coo_data, twod_flat_data, twod_ivar_data,
+                                    poly_basis, ingpm=twod_gpm_data, nord=4,
+                                    upper=twod_sigrej, lower=twod_sigrej,
+                                    kwargs_bspline={'bkspace': spec_samp_coarse},
+                                    kwargs_reject={'groupbadpix': True, 'maxrej': 10})
+    if debug:
+        # TODO: Make a plot that shows the residuals in the 2D
+        # image
+        resid = twod_flat_data - twod_flat_fit
+        goodpix = twod_gpm_fit & twod_gpm_data
+        badpix = np.invert(twod_gpm_fit) & twod_gpm_data
+
+        plt.clf()
+        ax = plt.gca()
+        ax.plot(twod_spec_coo_data[goodpix], resid[goodpix], color='k', marker='o',
+                markersize=0.2, mfc='k', fillstyle='full', linestyle='None',
+                label='good points')
+        ax.plot(twod_spec_coo_data[badpix], resid[badpix], color='red', marker='+',
+                markersize=0.5, mfc='red', fillstyle='full', linestyle='None',
+                label='masked')
+        ax.axhline(twod_sigrej*twod_sig, color='lawngreen', linestyle='--',
+                   label='rejection thresholds', zorder=10, linewidth=2.0)
+        ax.axhline(-twod_sigrej*twod_sig, color='lawngreen', linestyle='--', zorder=10,
+                   linewidth=2.0)
+#        ax.set_ylim(-0.05, 0.05)
+        ax.legend()
+        ax.set_xlabel('Spectral Pixel')
+        ax.set_ylabel('Residuals from pixelflat 2-d fit')
+        ax.set_title('Spectral Residuals for slit={:d}'.format(slit_spat))
+        plt.show()
+
+        plt.clf()
+        ax = plt.gca()
+        ax.plot(twod_spat_coo_data[goodpix], resid[goodpix], color='k', marker='o',
+                markersize=0.2, mfc='k', fillstyle='full', linestyle='None',
+                label='good points')
+        ax.plot(twod_spat_coo_data[badpix], resid[badpix], color='red', marker='+',
+                markersize=0.5, mfc='red', fillstyle='full', linestyle='None',
+                label='masked')
+        ax.axhline(twod_sigrej*twod_sig, color='lawngreen', linestyle='--',
+                   label='rejection thresholds', zorder=10, linewidth=2.0)
+        ax.axhline(-twod_sigrej*twod_sig, color='lawngreen', linestyle='--', zorder=10,
+                   linewidth=2.0)
+#        ax.set_ylim((-0.05, 0.05))
+#        ax.set_xlim(-0.02, 1.02)
+        ax.legend()
+        ax.set_xlabel('Normalized Slit Position')
+        ax.set_ylabel('Residuals from pixelflat 2-d fit')
+        ax.set_title('Spatial Residuals for slit={:d}'.format(slit_spat))
+        plt.show()
+
+    # Save the 2D residual model
+    twod_model = np.ones_like(rawflat)
+    if exit_status > 1:
+        msgs.warn('Two-dimensional fit to flat-field data failed!  No higher order '
+                  'flat-field corrections included in model of slit {0}!'.format(slit_spat))
+        result['flag'] = 'BADFLATCALIB'
+    else:
+        twod_model[twod_gpm] = twod_flat_fit[np.argsort(twod_srt)]
+        result['twod_gpm'] = twod_gpm_fit[np.argsort(twod_srt)]
+
+    # Construct the full flat-field model
+    # TODO: Why is the 0.05 here for the illumflat compared to the 0.01 above?
+    flat_model = twod_model[onslit_tweak] * np.fmax(illumflat[onslit_tweak], 0.05) \
+                    * np.fmax(spec_model[onslit_tweak], 1.0)
+    result['flat_model'] = flat_model
+
+    # Construct the pixel flat
+    #trimmed_slitid_img_anew = self.slits.slit_img(pad=-trim, slitidx=slit_idx)
+    #onslit_trimmed_anew = trimmed_slitid_img_anew == slit_spat
+    result['pixelflat'] = rawflat[onslit_tweak]/flat_model
+    # TODO: Add some code here to treat the edges and places where fits
+    #  go bad?
+
+    # Minimum and maximum wavelength?
+    if flatpar['pixelflat_min_wave'] is not None or flatpar['pixelflat_max_wave'] is not None:
+        waveimg = utils.shared_data('waveimg')[box][onslit_tweak]
+        bad_wv = np.zeros(waveimg.size, dtype=bool)
+        if flatpar['pixelflat_min_wave'] is not None:
+            bad_wv |= waveimg < flatpar['pixelflat_min_wave']
+        if flatpar['pixelflat_max_wave'] is not None:
+            bad_wv |= waveimg > flatpar['pixelflat_max_wave']
+        result['bad_wave_rows'] = np.unique(np.where(onslit_tweak)[0][bad_wv]) + box[0].start
+    return result
+
+
 def show_flats(image_list, wcs_match=True, slits=None, waveimg=None):
     """
     Interface to ginga to show a set of flat images
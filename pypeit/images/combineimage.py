@@ -5,6 +5,7 @@
 """
 
 import os
+import tempfile
 
 from IPython import embed
 
@@ -61,6 +62,8 @@ class CombineImage:
         # before this check!
         if self.nfiles == 0:
             msgs.error('CombineImage requires a list of files to instantiate')
+        # Scratch directory used for memory-mapped image stacks
+        self._scratch = None
 
     def run(self, bias=None, flatimages=None, ignore_saturation=False, sigma_clip=True,
             bpm=None, sigrej=None, maxiters=5, slits=None, dark=None, combine_method='mean',
@@ -197,14 +200,10 @@ class CombineImage:
 #        if bpm is None:
 #            bpm = self.spectrograph.bpm(self.files[0], self.det)
 
-        # Loop on the files
-        for kk, ifile in enumerate(self.files):
-            # Load raw image
-            rawImage = rawimage.RawImage(ifile, self.spectrograph, self.det)
-            # Process
-            pypeitImage = rawImage.process(self.par, bias=bias, bpm=bpm, dark=dark,
-                                           flatimages=flatimages, slits=slits, mosaic=mosaic)
-
+        # Loop on the processed files
+        for kk, pypeitImage in enumerate(self.process_files(bias=bias, bpm=bpm, dark=dark,
+                                                             flatimages=flatimages, slits=slits,
+                                                             mosaic=mosaic)):
             if self.nfiles == 1:
                 # Only 1 file, so we're done
                 pypeitImage.files = self.files
@@ -212,11 +211,11 @@ class CombineImage:
             elif kk == 0:
                 # Allocate arrays to collect data for each frame
                 shape = (self.nfiles,) + pypeitImage.shape
-                img_stack = np.zeros(shape, dtype=float)
-                scl_stack = np.ones(shape, dtype=float)
-                rn2img_stack = np.zeros(shape, dtype=float)
-                basev_stack = np.zeros(shape, dtype=float)
-                gpm_stack = np.zeros(shape, dtype=bool)
+                img_stack = self._init_stack('img', shape, float)
+                scl_stack = self._init_stack('scl', shape, float, fill=1.)
+                rn2img_stack = self._init_stack('rn2img', shape, float)
+                basev_stack = self._init_stack('basev', shape, float)
+                gpm_stack = self._init_stack('gpm', shape, bool)
                 lampstat = [None]*self.nfiles
                 exptime = np.zeros(self.nfiles, dtype=float)
 
@@ -270,39 +269,30 @@ class CombineImage:
             comb_texp = exptime[0]
 
         # Coadd them
-        if combine_method == 'mean':
-            weights = np.ones(self.nfiles, dtype=float)/self.nfiles
-            img_list_out, var_list_out, gpm, nstack \
-                    = combine.weighted_combine(weights,
-                                               [img_stack, scl_stack],  # images to stack
-                                               [rn2img_stack, basev_stack], # variances to stack
-                                               gpm_stack, sigma_clip=sigma_clip,
-                                               sigma_clip_stack=img_stack,  # clipping based on img
-                                               sigrej=sigrej, maxiters=maxiters)
-            comb_img, comb_scl = img_list_out
-            comb_rn2, comb_basev = var_list_out
-            comb_rn2[gpm] /= comb_scl[gpm]**2
-            comb_basev[gpm] /= comb_scl[gpm]**2
-        elif combine_method == 'median':
-            bpm_stack = np.logical_not(gpm_stack)
-            nstack = np.sum(gpm_stack, axis=0)
-            gpm = nstack > 0
-            comb_img = np.ma.median(np.ma.MaskedArray(img_stack, mask=bpm_stack),axis=0).filled(0.)
-            # TODO: I'm not sure if this is right.  Maybe we should just take
-            # the masked average scale instead?
-            comb_scl = np.ma.median(np.ma.MaskedArray(scl_stack, mask=bpm_stack),axis=0).filled(0.)
-            # First calculate the error in the sum.  The variance is set to 0
-            # for pixels masked in all images.
-            comb_rn2 = np.ma.sum(np.ma.MaskedArray(rn2img_stack, mask=bpm_stack),axis=0).filled(0.)
-            comb_basev = np.ma.sum(np.ma.MaskedArray(basev_stack, mask=bpm_stack),axis=0).filled(0.)
-            # Convert to standard error in the median (pi/2 factor relates standard variance
-            # in mean (sum(variance_i)/n^2) to standard variance in median)
-            comb_rn2[gpm] *= np.pi/2/nstack[gpm]**2/comb_scl[gpm]**2
-            comb_basev[gpm] *= np.pi/2/nstack[gpm]**2/comb_scl[gpm]**2
-        else:
-            # NOTE: Given the check at the beginning of the function, the code
-            # should *never* make it here.
-            msgs.error("Bad choice for combine.  Allowed options are 'median', 'mean'.")
+        nspec = shape[1]
+        tile = min(self.par['stack_tile_nspec'], nspec) if self.par['stack_memmap'] else nspec
+        comb_img = np.zeros(shape[1:], dtype=float)
+        comb_scl = np.zeros(shape[1:], dtype=float)
+        comb_rn2 = np.zeros(shape[1:], dtype=float)
+        comb_basev = np.zeros(shape[1:], dtype=float)
+        gpm = np.zeros(shape[1:], dtype=bool)
+        nstack = np.zeros(shape[1:], dtype=int)
+        for i in range(0, nspec, tile):
+            # NOTE: All the combination operations are pixel-by-pixel, meaning
+            # the result is independent of the tiling.
+            indx = slice(i, i+tile)
+            comb_img[indx], comb_scl[indx], comb_rn2[indx], comb_basev[indx], gpm[indx], \
+                    nstack[indx] = combine_stacks(np.asarray(img_stack[:,indx]),
+                                                  np.asarray(scl_stack[:,indx]),
+                                                  np.asarray(rn2img_stack[:,indx]),
+                                                  np.asarray(basev_stack[:,indx]),
+                                                  np.asarray(gpm_stack[:,indx]),
+                                                  combine_method=combine_method,
+                                                  sigma_clip=sigma_clip, sigrej=sigrej,
+                                                  maxiters=maxiters)
+        # Remove any scratch files
+        del img_stack, scl_stack, rn2img_stack, basev_stack, gpm_stack
+        self._clean_scratch()
 
         # Recompute the inverse variance using the combined image
         comb_var = procimg.variance_model(comb_basev,
@@ -338,6 +328,86 @@ class CombineImage:
         # Return
         return comb
 
+    def process_files(self, **kwargs):
+        """
+        Process each file in :attr:`files`.
+
+        If ``nproc`` in :attr:`par` is larger than 1, the files are processed
+        concurrently by a pool of processes; see
+        :func:`~pypeit.utils.parallel_map`.  The calibration images in
+        ``kwargs`` are sent once to each process, not with each file.  To
+        limit the memory footprint, at most ``nproc`` files are processed
+        ahead of the one that is returned next.  Regardless, the processed
+        images are always returned in the same order as :attr:`files`.
+
+        Args:
+            **kwargs:
+                Passed directly to
+                :func:`~pypeit.images.rawimage.RawImage.process`.
+
+        Yields:
+            :class:`~pypeit.images.pypeitimage.PypeItImage`: The processed
+            image for each file.
+        """
+        nproc = utils.get_nproc(self.par['nproc'], ntasks=self.nfiles)
+        if nproc > 1:
+            msgs.info(f'Processing {self.nfiles} files using {nproc} processes.')
+        # NOTE: The keyword arguments are shared as a single dictionary, such
+        # that any arrays are copied to the worker processes instead of being
+        # provided as read-only shared memory.
+        shared = dict(spectrograph=self.spectrograph, det=self.det, par=self.par,
+                      kwargs=kwargs)
+        yield from utils.parallel_map(process_shared_raw_file, [(f,) for f in self.files],
+                                      nproc=nproc, shared=shared, nahead=nproc)
+
+    def _init_stack(self, name, shape, dtype, fill=None):
+        """
+        Allocate an array used to stack the processed images.
+
+        If ``stack_memmap`` is True in :attr:`par`, the array is a
+        `numpy.memmap`_ object backed by a scratch file in a temporary
+        directory; see ``stack_scratch_dir`` in
+        :class:`~pypeit.par.pypeitpar.ProcessImagesPar`.  Otherwise, the array
+        is held in memory.
+
+        Args:
+            name (:obj:`str`):
+                Name for the stack, used to construct the name of the scratch
+                file.
+            shape (:obj:`tuple`):
+                Shape of the stack.
+            dtype (data-type):
+                Data type of the stack.
+            fill (scalar, optional):
+                Value used to initialize the array.  If None, the array is
+                initialized to 0.
+
+        Returns:
+            `numpy.ndarray`_: The allocated array.
+        """
+        if not self.par['stack_memmap']:
+            return np.zeros(shape, dtype=dtype) if fill is None \
+                        else np.full(shape, fill, dtype=dtype)
+
+        if self._scratch is None:
+            self._scratch = tempfile.TemporaryDirectory(prefix='pypeit_stack_',
+                                                        dir=self.par['stack_scratch_dir'])
+            msgs.info(f'Stacking images in scratch files in {self._scratch.name}')
+        # NOTE: The file is initialized to 0
+        stack = np.memmap(os.path.join(self._scratch.name, f'{name}_stack.dat'), dtype=dtype,
+                          mode='w+', shape=shape)
+        if fill is not None:
+            stack[...] = fill
+        return stack
+
+    def _clean_scratch(self):
+        """
+        Remove the scratch directory, if one exists.
+        """
+        if self._scratch is not None:
+            self._scratch.cleanup()
+            self._scratch = None
+
     @property
     def nfiles(self):
         """
@@ -346,3 +416,124 @@ class CombineImage:
         return len(self.files) if isinstance(self.files, (np.ndarray, list)) else 0
 
 
+def process_raw_file(ifile, spectrograph, det, par, **kwargs):
+    """
+    Load and process a single raw file.
+
+    Args:
+        ifile (:obj:`str`):
+            Raw file to process.
+        spectrograph (:class:`~pypeit.spectrographs.spectrograph.Spectrograph`):
+            Spectrograph used to take the data.
+        det (:obj:`int`, :obj:`tuple`):
+            The 1-indexed detector number(s) to process.
+        par (:class:`~pypeit.par.pypeitpar.ProcessImagesPar`):
+            Parameters that dictate the processing of the images.
+        **kwargs:
+            Passed directly to
+            :func:`~pypeit.images.rawimage.RawImage.process`.
+
+    Returns:
+        :class:`~pypeit.images.pypeitimage.PypeItImage`: The processed image.
+    """
+    # Load raw image
+    rawImage = rawimage.RawImage(ifile, spectrograph, det)
+    # Process
+    return rawImage.process(par, **kwargs)
+
+
+def process_shared_raw_file(ifile):
+    """
+    Load and process a single raw file for
+    :func:`CombineImage.process_files`.
+
+    This is executed by :func:`~pypeit.utils.parallel_map`; the spectrograph,
+    detector, parameters, and processing keyword arguments are provided by
+    :func:`~pypeit.utils.shared_data`.
+
+    Args:
+        ifile (:obj:`str`):
+            Raw file to process.
+
+    Returns:
+        :class:`~pypeit.images.pypeitimage.PypeItImage`: The processed image.
+    """
+    return process_raw_file(ifile, utils.shared_data('spectrograph'), utils.shared_data('det'),
+                            utils.shared_data('par'), **utils.shared_data('kwargs'))
+
+
+def combine_stacks(img_stack, scl_stack, rn2img_stack, basev_stack, gpm_stack,
+                   combine_method='mean', sigma_clip=True, sigrej=None, maxiters=5):
+    """
+    Combine stacks of processed images and propagate their variance.
+
+    This is the combination step of :func:`CombineImage.run`; see there for
+    a description of the combination methods and the error propagation.  All
+    operations are pixel-by-pixel, meaning this can be applied to any subset
+    of the image pixels (e.g., a tile of spectral rows) with identical
+    results.
+
+    Args:
+        img_stack (`numpy.ndarray`_):
+            Stack of processed images, shape ``(nimgs, ...)``.
+        scl_stack (`numpy.ndarray`_):
+            Stack of image scaling arrays.  Same shape as ``img_stack``.
+        rn2img_stack (`numpy.ndarray`_):
+            Stack of scaled readnoise variance images.  Same shape as
+            ``img_stack``.
+        basev_stack (`numpy.ndarray`_):
+            Stack of scaled processing variance images.  Same shape as
+            ``img_stack``.
+        gpm_stack (`numpy.ndarray`_):
+            Stack of good-pixel masks.  Same shape as ``img_stack``.
+        combine_method (:obj:`str`, optional):
+            Method used to combine images.  Must be ``'mean'`` or
+            ``'median'``.
+        sigma_clip (:obj:`bool`, optional):
+            When ``combine_method='mean'``, perform a sigma-clip the data; see
+            :func:`~pypeit.core.combine.weighted_combine`.
+        sigrej (:obj:`float`, optional):
+            Sigma-rejection threshold; see
+            :func:`~pypeit.core.combine.weighted_combine`.
+        maxiters (:obj:`int`, optional):
+            Maximum number of rejection iterations; see
+            :func:`~pypeit.core.combine.weighted_combine`.
+
+    Returns:
+        :obj:`tuple`: The combined image, image scaling, readnoise variance,
+        processing variance, good-pixel mask, and number of images combined
+        at each pixel.
+    """
+    nimgs = img_stack.shape[0]
+    if combine_method == 'mean':
+        weights = np.ones(nimgs, dtype=float)/nimgs
+        img_list_out, var_list_out, gpm, nstack \
+                = combine.weighted_combine(weights,
+                                           [img_stack, scl_stack],  # images to stack
+                                           [rn2img_stack, basev_stack], # variances to stack
+                                           gpm_stack, sigma_clip=sigma_clip,
+                                           sigma_clip_stack=img_stack,  # clipping based on img
+                                           sigrej=sigrej, maxiters=maxiters)
+        comb_img, comb_scl = img_list_out
+        comb_rn2, comb_basev = var_list_out
+        comb_rn2[gpm] /= comb_scl[gpm]**2
+        comb_basev[gpm] /= comb_scl[gpm]**2
+    elif combine_method == 'median':
+        bpm_stack = np.logical_not(gpm_stack)
+        nstack = np.sum(gpm_stack, axis=0)
+        gpm = nstack > 0
+        comb_img = np.ma.median(np.ma.MaskedArray(img_stack, mask=bpm_stack),axis=0).filled(0.)
+        # TODO: I'm not sure if this is right.  Maybe we should just take
+        # the masked average scale instead?
+        comb_scl = np.ma.median(np.ma.MaskedArray(scl_stack, mask=bpm_stack),axis=0).filled(0.)
+        # First calculate the error in the sum.  The variance is set to 0
+        # for pixels masked in all images.
+        comb_rn2 = np.ma.sum(np.ma.MaskedArray(rn2img_stack, mask=bpm_stack),axis=0).filled(0.)
+        comb_basev = np.ma.sum(np.ma.MaskedArray(basev_stack, mask=bpm_stack),axis=0).filled(0.)
+        # Convert to standard error in the median (pi/2 factor relates standard variance
+        # in mean (sum(variance_i)/n^2) to standard variance in median)
+        comb_rn2[gpm] *= np.pi/2/nstack[gpm]**2/comb_scl[gpm]**2
+        comb_basev[gpm] *= np.pi/2/nstack[gpm]**2/comb_scl[gpm]**2
+    else:
+        msgs.error("Bad choice for combine.  Allowed options are 'median', 'mean'.")
+    return comb_img, comb_scl, comb_rn2, comb_basev, gpm, nstack
@@ -295,7 +295,7 @@ class PypeItImage(datamodel.DataContainer):
         """
         return isinstance(self.detector, Mosaic) and self.image.ndim == 2
 
-    def build_crmask(self, par, subtract_img=None):
+    def build_crmask(self, par, subtract_img=None, slitmask=None):
         """
         Identify and flag cosmic rays in the image.
 
@@ -311,12 +311,20 @@ class PypeItImage(datamodel.DataContainer):
                 An image to subtract from the primary image *before* executing
                 the cosmic-ray detection algorithm.  If provided, it must have
                 the correct shape (see :func:`shape`).
+            slitmask (`numpy.ndarray`_, optional):
+                Slit mask image; pixels not on a slit have a value of -1.  If
+                provided and ``par['cr_onslit']`` is True, the search for
+                cosmic rays is restricted to pixels on the slits.  Must have
+                the correct shape (see :func:`shape`).
 
         Returns:
             `numpy.ndarray`_: Copy of :attr:`crmask`.
         """
         if subtract_img is not None and subtract_img.shape != self.shape:
             msgs.error('In cosmic-ray detection, image to subtract has incorrect shape.')
+        if slitmask is not None and slitmask.shape != self.shape:
+            msgs.error('In cosmic-ray detection, slit mask has incorrect shape.')
+        onslit = slitmask > -1 if slitmask is not None and par['cr_onslit'] else None
 
         # Image to flag
         use_img = self.image if subtract_img is None else self.image - subtract_img
@@ -342,7 +350,10 @@ class PypeItImage(datamodel.DataContainer):
                                                   grow=par['grow'],
                                                   remove_compact_obj=par['rmcompact'],
                                                   sigclip=par['sigclip'], sigfrac=par['sigfrac'],
-                                                  objlim=par['objlim'])
+                                                  objlim=par['objlim'],
+                                                  onslit=None if onslit is None else onslit[i],
+                                                  nproc=par['cr_nthreads'],
+                                                  tile_nspec=par['cr_tile_nspec'])
             self.crmask = np.array(self.crmask)
             return self.crmask.copy()
 
@@ -352,7 +363,8 @@ class PypeItImage(datamodel.DataContainer):
                                        bpm=_bpm, varframe=var, maxiter=par['lamaxiter'],
                                        grow=par['grow'], remove_compact_obj=par['rmcompact'],
                                        sigclip=par['sigclip'], sigfrac=par['sigfrac'],
-                                       objlim=par['objlim'])
+                                       objlim=par['objlim'], onslit=onslit,
+                                       nproc=par['cr_nthreads'], tile_nspec=par['cr_tile_nspec'])
         return self.crmask.copy()
 
     def map_detector_value(self, attr):
@@ -11,7 +11,11 @@ import os
 import sys
 import warnings
 import gzip
+import bz2
 import shutil
+import tempfile
+import json
+import sqlite3
 from packaging import version
 
 from IPython import embed
@@ -846,6 +850,194 @@ def fits_open(filename, **kwargs):
         return fits.open(filename, ignore_missing_end=True, **kwargs)
 
 
+def _fits_data_size(hdr):
+    """
+    Return the size in bytes of the data block described by a fits header,
+    including the padding to a full fits block.
+    """
+    naxis = hdr.get('NAXIS', 0)
+    if naxis == 0:
+        return 0
+    shape = [hdr.get(f'NAXIS{i+1}', 0) for i in range(naxis)]
+    if hdr.get('GROUPS', False) and shape[0] == 0:
+        # Random groups
+        shape = shape[1:]
+    size = abs(hdr['BITPIX']) // 8 * hdr.get('GCOUNT', 1) \
+                * (hdr.get('PCOUNT', 0) + int(numpy.prod(shape)))
+    return size + (-size) % 2880
+
+
+def read_fits_headers(filename):
+    """
+    Read the headers of all the extensions in a fits file.
+
+    In contrast to opening the file with `astropy.io.fits.open`_, this only
+    parses the header blocks: the data blocks are skipped using the size
+    defined by each header.  Gzip- and bzip2-compressed files are read
+    directly.  If the file has tile-compressed image extensions (for which
+    `astropy.io.fits.open`_ does not return the raw header) or if the fast
+    read fails for any reason, the headers are read using :func:`fits_open`.
+
+    Args:
+        filename (:obj:`str`):
+            Name of the fits file.
+
+    Returns:
+        :obj:`list`: A list of `astropy.io.fits.Header`_ objects with the
+        extension headers.
+    """
+    with open(filename, 'rb') as f:
+        magic = f.read(3)
+    _open = gzip.open if magic[:2] == b'\x1f\x8b' else (bz2.open if magic == b'BZh' else open)
+    headers = []
+    try:
+        with _open(filename, 'rb') as f:
+            while True:
+                try:
+                    hdr = fits.Header.fromfile(f, padding=True)
+                except EOFError:
+                    break
+                if hdr.get('ZIMAGE', False):
+                    raise ValueError('Tile-compressed image.')
+                headers += [hdr]
+                f.seek(_fits_data_size(hdr), 1)
+        if len(headers) == 0:
+            raise ValueError('No headers found.')
+        return headers
+    except Exception:
+        # Fall back to using astropy
+        with fits_open(filename) as hdu:
+            return [h.header for h in hdu]
+
+
+class FitsHeaderCache:
+    """
+    Persistent, on-disk cache of the headers of a set of fits files.
+
+    The headers of each file are stored in an SQLite database, keyed by the
+    absolute path to the file, its size, and its modification time.  Cached
+    headers are only returned if the file has not changed since its headers
+    were added to the cache.
+
+    Args:
+        filename (:obj:`str`):
+            Name of the SQLite database file.  The file (and its parent
+            directory) is created if it doesn't exist.
+    """
+    def __init__(self, filename):
+        self.filename = os.path.abspath(filename)
+        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+        self.db = sqlite3.connect(self.filename, timeout=60)
+        self.db.execute('CREATE TABLE IF NOT EXISTS headers '
+                        '(path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, headers TEXT)')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def file_key(filename):
+        """
+        Return the path, size, and modification time (in ns) used to identify
+        a file in the cache.
+        """
+        stat = os.stat(filename)
+        return os.path.abspath(filename), stat.st_size, stat.st_mtime_ns
+
+    def get(self, filename):
+        """
+        Return the cached headers of a file.
+
+        Args:
+            filename (:obj:`str`):
+                Name of the fits file.
+
+        Returns:
+            :obj:`list`: The list of `astropy.io.fits.Header`_ objects with
+            the extension headers, or None if the file is not in the cache or
+            has changed since its headers were cached.
+        """
+        try:
+            key = self.file_key(filename)
+        except OSError:
+            return None
+        row = self.db.execute('SELECT headers FROM headers WHERE path=? AND size=? AND mtime=?',
+                              key).fetchone()
+        return None if row is None else [fits.Header.fromstring(h) for h in json.loads(row[0])]
+
+    def put(self, filename, headers):
+        """
+        Add or replace the headers of a file in the cache.
+
+        The changes are only saved to disk by :func:`commit` or
+        :func:`close`.
+
+        Args:
+            filename (:obj:`str`):
+                Name of the fits file.
+            headers (:obj:`list`):
+                The list of `astropy.io.fits.Header`_ objects with the
+                extension headers.
+        """
+        self.db.execute('INSERT OR REPLACE INTO headers VALUES (?, ?, ?, ?)',
+                        self.file_key(filename) + (json.dumps([h.tostring() for h in headers]),))
+
+    def commit(self):
+        """Save any changes to disk."""
+        self.db.commit()
+
+    def close(self):
+        """Save any changes and close the database."""
+        self.db.commit()
+        self.db.close()
+
+
+def load_npy_dir(path, build, params):
+    """
+    Memory-map the arrays in a directory of ``.npy`` files, building the
+    directory first if it doesn't exist.
+
+    The directory is built in a temporary directory that is then renamed, and
+    a ``params.json`` file is written last to mark it as complete.  Processes
+    reading the directory therefore never see a partially written one, and
+    if several processes build the same directory at the same time, the first
+    to finish is kept.
+
+    Args:
+        path (:obj:`str`):
+            Name of the directory.  Its parent directory must exist.
+        build (callable):
+            Function that writes the ``.npy`` files.  It is called with the
+            name of the temporary directory as its only argument.
+        params (:obj:`dict`):
+            Parameters used to build the arrays, written to ``params.json``.
+            The values must be serializable to json.
+
+    Returns:
+        :obj:`dict`: Dictionary with the memory-mapped arrays, keyed by the
+        file names without the ``.npy`` extension.
+    """
+    if not os.path.isfile(os.path.join(path, 'params.json')):
+        tmpdir = tempfile.mkdtemp(dir=os.path.dirname(path), prefix='.build_')
+        try:
+            build(tmpdir)
+            # Written last; marks the directory as complete
+            with open(os.path.join(tmpdir, 'params.json'), 'w') as f:
+                json.dump(params, f)
+            try:
+                os.rename(tmpdir, path)
+            except OSError:
+                # Another process built the directory first
+                if not os.path.isfile(os.path.join(path, 'params.json')):
+                    raise
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+    return {os.path.splitext(f)[0]: numpy.load(os.path.join(path, f), mmap_mode='r')
+            for f in os.listdir(path) if f.endswith('.npy')}
+
+
 def create_symlink(filename, symlink_dir, relative_symlink=False, overwrite=False, quiet=False):
     """
     Create a symlink to the input file in the provided directory.
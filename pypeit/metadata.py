@@ -9,6 +9,9 @@ import io
 import string
 from copy import deepcopy
 import datetime
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 
 from IPython import embed
 
@@ -23,7 +26,7 @@ from pypeit.core import framematch
 from pypeit.core import flux_calib
 from pypeit.core import parse
 from pypeit.core import meta
-from pypeit.io import dict_to_lines
+from pypeit.io import dict_to_lines, FitsHeaderCache
 from pypeit.par import PypeItPar
 from pypeit.par.util import make_pypeit_file
 from pypeit.bitmask import BitMask
@@ -94,6 +97,10 @@ class PypeItMetaData:
         table (:class:`astropy.table.Table`):
             The table with the relevant metadata for each fits file to
             use in the data reduction.
+        index_file (:obj:`str`):
+            The SQLite file with the persistent metadata index (see
+            :class:`MetadataIndex`) used to build the table.  None if the
+            index is not used.
     """
     def __init__(self, spectrograph, par, files=None, data=None, usrdata=None, 
                  strict=True):
@@ -110,6 +117,11 @@ class PypeItMetaData:
             raise TypeError('Input parameter set must be of type PypeItPar.')
         self.type_bitmask = framematch.FrameTypeBitMask()
 
+        # The persistent metadata index and the index entries of the frames
+        # restored from it; see _build
+        self.index_file = None
+        self._indexed = {}
+
         # Build table
         self.table = table.Table(data if files is None 
                                  else self._build(files, strict=strict, 
@@ -175,6 +187,26 @@ class PypeItMetaData:
         data['directory'] = ['None']*len(_files)
         data['filename'] = ['None']*len(_files)
 
+        # Restore the metadata of unchanged frames from the persistent
+        # index; the user data can alter the metadata, so the index is not
+        # used in that case
+        indexed = [None]*len(_files)
+        if usrdata is None and self.par['rdx']['metadata_index'] is not None:
+            self.index_file = self.par['rdx']['metadata_index']
+            with MetadataIndex(self.index_file, self.spectrograph, self.par) as index:
+                indexed = [index.get(f) for f in _files]
+            self._indexed = {os.path.abspath(f): row for f, row in zip(_files, indexed)
+                                if row is not None}
+            msgs.info('Found {0}/{1} frames in the metadata index.'.format(len(self._indexed),
+                                                                          len(_files)))
+
+        # Read the fits headers of the remaining frames
+        read = [i for i in range(len(_files)) if indexed[i] is None]
+        headarrs = [None]*len(_files)
+        for i, headarr in zip(read, self._read_headarrs([_files[i] for i in read],
+                                                          strict=strict)):
+            headarrs[i] = headarr
+
         # Build the table
         for idx, ifile in enumerate(_files):
             # User data (for frame type)
@@ -193,12 +225,14 @@ class PypeItMetaData:
             if not data['directory'][idx]:
                 data['directory'][idx] = '.'
 
-            # Read the fits headers
-            headarr = self.spectrograph.get_headarr(ifile, strict=strict)
+            if indexed[idx] is not None:
+                for meta_key in self.spectrograph.meta.keys():
+                    data[meta_key].append(indexed[idx]['meta'][meta_key])
+                continue
 
             # Grab Meta
             for meta_key in self.spectrograph.meta.keys():
-                value = self.spectrograph.get_meta_value(headarr, meta_key, 
+                value = self.spectrograph.get_meta_value(headarrs[idx], meta_key, 
                                                          required=strict,
                                                          usr_row=usr_row, 
                         ignore_bad_header = self.par['rdx']['ignore_bad_headers'])
@@ -230,6 +264,92 @@ class PypeItMetaData:
         # Return
         return data
 
+    def _read_headarrs(self, files, strict=True):
+        """
+        Read the fits headers of all the files used to build the table.
+
+        Headers are taken from the cache set by the ``header_cache`` reduction
+        parameter, if possible.  The headers of the remaining files are read
+        using :func:`~pypeit.spectrographs.spectrograph.Spectrograph.get_headarr`
+        by the number of threads set by the ``header_nproc`` reduction
+        parameter, and they are added to the cache.
+
+        Args:
+            files (:obj:`list`):
+                The list of files to read.
+            strict (:obj:`bool`, optional):
+                Function will fault if any of the headers cannot be read.  Set
+                to False to report a warning and continue.
+
+        Returns:
+            :obj:`list`: The list of headers read for each file.
+        """
+        cache = None if self.par['rdx']['header_cache'] is None \
+                    else FitsHeaderCache(self.par['rdx']['header_cache'])
+        headarrs = [None]*len(files) if cache is None else [cache.get(f) for f in files]
+        read = [i for i, h in enumerate(headarrs) if h is None]
+        if cache is not None:
+            msgs.info('Found cached headers for {0}/{1} files.'.format(len(files)-len(read),
+                                                                       len(files)))
+
+        get_headarr = lambda f: self.spectrograph.get_headarr(f, strict=strict)
+        nproc = utils.get_nproc(self.par['rdx']['header_nproc'], len(read))
+        if nproc > 1:
+            with ThreadPoolExecutor(max_workers=nproc) as executor:
+                _headarrs = list(executor.map(get_headarr, [files[i] for i in read]))
+        else:
+            _headarrs = [get_headarr(files[i]) for i in read]
+
+        for i, headarr in zip(read, _headarrs):
+            headarrs[i] = headarr
+            # Only cache headers that were successfully read
+            if cache is not None and not isinstance(headarr[0], str):
+                cache.put(files[i], headarr)
+        if cache is not None:
+            cache.close()
+        return headarrs
+
+    def _indexed_values(self, key):
+        """
+        Return the values restored from the persistent metadata index for each
+        row in the table.
+
+        Args:
+            key (:obj:`str`):
+                The index entry to return; either ``'framebit'`` or
+                ``'setup'``.
+
+        Returns:
+            :obj:`list`: The indexed value for each row; None for frames that
+            were not restored from the index or have no value for ``key``.
+        """
+        if len(self._indexed) == 0:
+            return [None]*len(self)
+        return [self._indexed.get(os.path.abspath(f), {}).get(key)
+                    for f in self.frame_paths(np.arange(len(self)))]
+
+    def write_index(self):
+        """
+        Save the metadata, frame types, and configurations of all frames to the
+        persistent metadata index.
+
+        This does nothing if the table was not built using an index (see the
+        ``metadata_index`` reduction parameter).
+        """
+        if self.index_file is None:
+            return
+        framebits = self['framebit'] if 'framebit' in self.keys() else [None]*len(self)
+        setups = self['setup'] if 'setup' in self.keys() else [None]*len(self)
+        with MetadataIndex(self.index_file, self.spectrograph, self.par) as index:
+            for i, f in enumerate(self.frame_paths(np.arange(len(self)))):
+                index.put(f, {k: self[k][i] for k in self.spectrograph.meta.keys()},
+                          framebit=framebits[i], setup=setups[i])
+            if self.configs is not None:
+                # Keep the indexed configurations that are not used by the
+                # frames in this table
+                index.set_configs({**index.get_configs(), **self.configs})
+        msgs.info('Saved the metadata of {0} frames to {1}.'.format(len(self), self.index_file))
+
     # TODO:  In this implementation, slicing the PypeItMetaData object
     # will return an astropy.table.Table, not a PypeItMetaData object.
     def __getitem__(self, item):
@@ -723,14 +843,27 @@ class PypeItMetaData:
             msgs.info('All files assumed to be from a single configuration.')
             return self._get_cfgs(copy=copy, rm_none=rm_none)
 
-        # Use the first file to set the first unique configuration
+        # Start from the configurations in the persistent metadata index,
+        # and only check the frames that have not yet been assigned to one
+        # of them.
         self.configs = {}
-        self.configs[cfg_iter[cfg_indx]] = self.get_configuration(indx[0], cfg_keys=cfg_keys)
-        cfg_indx += 1
-
-        # Check if any of the other files show a different
-        # configuration.
-        for i in indx[1:]:
+        # Configurations used by the frames in the table
+        used = set()
+        if self.index_file is not None:
+            with MetadataIndex(self.index_file, self.spectrograph, self.par) as index:
+                self.configs = index.get_configs()
+            setups = self._indexed_values('setup')
+            indexed = np.array([s in self.configs for s in setups])
+            used = set([setups[i] for i in indx[indexed[indx]]])
+            indx = indx[np.logical_not(indexed[indx])]
+            msgs.info('Using {0} configurations from the metadata index; checking {1} '
+                      'new frames.'.format(len(self.configs), len(indx)))
+            if len(self.configs) > 0:
+                cfg_indx = cfg_iter.index(list(self.configs.keys())[-1]) + 1
+
+        # Check if any of the files show a different configuration.  The
+        # first file sets the first unique configuration.
+        for i in indx:
             j = 0
             for c in self.configs.values():
                 if row_match_config(self.table[i], c, self.spectrograph):
@@ -742,6 +875,11 @@ class PypeItMetaData:
                     msgs.error('Cannot assign more than {0} configurations!'.format(len(cfg_iter)))
                 self.configs[cfg_iter[cfg_indx]] = self.get_configuration(i, cfg_keys=cfg_keys)
                 cfg_indx += 1
+            used.add(list(self.configs.keys())[j])
+
+        # Remove any indexed configurations that are not used by the frames in
+        # this table.  They remain in the index; see write_index.
+        self.configs = {k: v for k, v in self.configs.items() if k in used}
 
         msgs.info('Found {0} unique configurations.'.format(len(self.configs)))
         return self._get_cfgs(copy=copy, rm_none=rm_none)
@@ -797,7 +935,12 @@ class PypeItMetaData:
 
         self.table['setup'] = 'None'
         nrows = len(self)
+        indexed = self._indexed_values('setup')
         for i in range(nrows):
+            if indexed[i] in _configs:
+                # Configuration restored from the metadata index
+                self.table['setup'][i] = indexed[i]
+                continue
             for d, cfg in _configs.items():
                 if row_match_config(self.table[i], cfg, self.spectrograph):
                     self.table['setup'][i] = d
@@ -1243,8 +1386,19 @@ class PypeItMetaData:
                 type_bits[indx] = self.type_bitmask.turn_on(type_bits[indx], flag=ftypes.split(','))
             return self.set_frame_types(type_bits, merge=merge)
     
+        # Use the types restored from the metadata index, and only type the
+        # remaining frames
+        indexed = np.array([-1 if b is None else b for b in self._indexed_values('framebit')])
+        new = indexed < 0
+        type_bits[np.logical_not(new)] = indexed[np.logical_not(new)]
+        rows = np.where(new)[0]
+        tbl = self.table if np.all(new) else self.table[rows]
+        if not np.all(new):
+            msgs.info('Using frame types from the metadata index; typing {0} new '
+                      'frames.'.format(rows.size))
+
         # Loop over the frame types
-        for i, ftype in enumerate(self.type_bitmask.keys()):
+        for i, ftype in enumerate(self.type_bitmask.keys() if rows.size > 0 else []):
     
 #            # Initialize: Flag frames with the correct ID name or start by
 #            # flagging all as true
@@ -1258,7 +1412,7 @@ class PypeItMetaData:
             # TODO: Use & or | ?  Using idname above gets overwritten by
             # this if the frames to meet the other checks in this call.
 #            indx &= self.spectrograph.check_frame_type(ftype, self.table, exprng=exprng)
-            indx = self.spectrograph.check_frame_type(ftype, self.table, exprng=exprng)
+            indx = rows[self.spectrograph.check_frame_type(ftype, tbl, exprng=exprng)]
             # Turn on the relevant bits
             type_bits[indx] = self.type_bitmask.turn_on(type_bits[indx], flag=ftype)
     
@@ -1268,7 +1422,7 @@ class PypeItMetaData:
             msgs.warn('Cannot associate standard with science frames without sky coordinates.')
         else:
             # TODO: Do we want to do this here?
-            indx = self.type_bitmask.flagged(type_bits, flag='standard')
+            indx = self.type_bitmask.flagged(type_bits, flag='standard') & new
             for b, f, ra, dec in zip(type_bits[indx], self['filename'][indx], self['ra'][indx],
                                      self['dec'][indx]):
                 if ra == 'None' or dec == 'None':
@@ -1801,6 +1955,62 @@ class PypeItMetaData:
         """
         return self.calib_bitmask.flagged_bits(self['calibbit'][row])
 
+    def independent_calib_groups(self):
+        """
+        Find the sets of calibration groups that can be reduced
+        independently of one another.
+
+        Two calibration groups are dependent if they share any frames
+        (e.g., bias frames assigned to all groups), meaning that they share
+        master frames, or if they include frames that are combined with or
+        used as the background for each other, based on the ``comb_id`` and
+        ``bkg_id`` columns.  The independent sets are the connected
+        components of the graph with the calibration groups as its vertices
+        and these dependencies as its edges.
+
+        Returns:
+            :obj:`list`: A list of sorted lists with the 0-indexed calibration
+            groups in each independent set, ordered by the first group in
+            each set.
+
+        Raises:
+            PypeItError:
+                Raised if the 'calibbit' column is not defined.
+        """
+        if 'calibbit' not in self.keys():
+            msgs.error('Calibration groups are not set.  First run set_calibration_groups.')
+        ngroups = self.n_calib_groups
+        adj = np.identity(ngroups, dtype=bool)
+
+        # Connect the groups associated with each frame
+        frame_groups = [np.array(self.find_frame_calib_groups(i), dtype=int)
+                            for i in range(len(self))]
+        for grp in frame_groups:
+            adj[np.ix_(grp, grp)] = True
+
+        # Connect the groups of frames combined with or used as the background
+        # for each other
+        if 'comb_id' in self.keys():
+            bkg_id = self['bkg_id'].data if 'bkg_id' in self.keys() \
+                        else np.full(len(self), -1, dtype=int)
+            for comb_id in np.unique(self['comb_id'].data):
+                if comb_id < 0:
+                    continue
+                indx = np.where((self['comb_id'].data == comb_id) | (bkg_id == comb_id))[0]
+                grp = np.unique(np.concatenate([frame_groups[i] for i in indx]))
+                adj[np.ix_(grp, grp)] = True
+
+        # Find the connected components
+        visited = [False]*ngroups
+        independent = []
+        for i in range(ngroups):
+            if visited[i]:
+                continue
+            group = []
+            utils.DFS(i, visited, group, adj)
+            independent += [sorted(group)]
+        return independent
+
 
 # TODO: Is there a reason why this is not an attribute of
 # PypeItMetaData?
@@ -1836,3 +2046,139 @@ def row_match_config(row, config, spectrograph):
     # Check
     return np.all(match)
 
+
+
+class MetadataIndex:
+    """
+    Persistent, on-disk index of the metadata of a set of raw frames.
+
+    The index is an SQLite database with the metadata, frame type bits, and
+    configuration of each frame, keyed by the absolute path to the file, its
+    size, and its modification time, as well as the unique configurations
+    found so far.  It is used by :class:`PypeItMetaData` to only read, type,
+    and match to the known configurations the frames that have been added or
+    changed since the index was last saved.
+
+    The index can only be used for a single spectrograph.  The frame types
+    and configurations are discarded if the parameters used to type the
+    frames (i.e., the exposure time ranges) change.
+
+    Args:
+        filename (:obj:`str`):
+            Name of the SQLite database file.  The file (and its parent
+            directory) is created if it doesn't exist.
+        spectrograph (:class:`~pypeit.spectrographs.spectrograph.Spectrograph`):
+            The spectrograph used to collect the data.
+        par (:class:`~pypeit.par.pypeitpar.PypeItPar`):
+            PypeIt parameters used to type the frames.
+    """
+    def __init__(self, filename, spectrograph, par):
+        self.filename = os.path.abspath(filename)
+        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+        self.db = sqlite3.connect(self.filename, timeout=60)
+        self.db.execute('CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT)')
+        self.db.execute('CREATE TABLE IF NOT EXISTS frames (path TEXT PRIMARY KEY, size INTEGER, '
+                        'mtime INTEGER, meta TEXT, framebit INTEGER, setup TEXT)')
+        self.db.execute('CREATE TABLE IF NOT EXISTS configs (setup TEXT PRIMARY KEY, config TEXT)')
+
+        info = dict(self.db.execute('SELECT key, value FROM info').fetchall())
+        if info.get('spectrograph', spectrograph.name) != spectrograph.name:
+            msgs.error('The metadata index {0} was built for {1}, not {2}.'.format(
+                       self.filename, info['spectrograph'], spectrograph.name))
+        typing = json.dumps([par['scienceframe']['exprng'] if ftype == 'science'
+                             else par['calibrations']['{0}frame'.format(ftype)]['exprng']
+                             for ftype in framematch.FrameTypeBitMask().keys()])
+        if info.get('typing', typing) != typing:
+            msgs.warn('Frame-typing parameters have changed; the frame types and configurations '
+                      'in the metadata index will be redetermined.')
+            self.db.execute('UPDATE frames SET framebit=NULL, setup=NULL')
+            self.db.execute('DELETE FROM configs')
+        self.db.execute('INSERT OR REPLACE INTO info VALUES (?, ?)',
+                        ('spectrograph', spectrograph.name))
+        self.db.execute('INSERT OR REPLACE INTO info VALUES (?, ?)', ('typing', typing))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _to_json(obj):
+        """Convert numpy scalars for serialization."""
+        if isinstance(obj, np.generic):
+            return obj.item()
+        raise TypeError('Cannot serialize metadata of type {0}.'.format(type(obj)))
+
+    def get(self, filename):
+        """
+        Return the indexed entry of a frame.
+
+        Args:
+            filename (:obj:`str`):
+                Name of the raw file.
+
+        Returns:
+            :obj:`dict`: A dictionary with the metadata (``'meta'``), frame
+            type bits (``'framebit'``), and configuration (``'setup'``) of the
+            frame, where the latter two can be None.  None is returned if the
+            frame is not in the index or has changed since it was indexed.
+        """
+        try:
+            key = FitsHeaderCache.file_key(filename)
+        except OSError:
+            return None
+        row = self.db.execute('SELECT meta, framebit, setup FROM frames WHERE path=? AND size=? '
+                              'AND mtime=?', key).fetchone()
+        return None if row is None else dict(meta=json.loads(row[0]), framebit=row[1],
+                                             setup=row[2])
+
+    def put(self, filename, meta, framebit=None, setup=None):
+        """
+        Add or replace the entry of a frame.
+
+        Args:
+            filename (:obj:`str`):
+                Name of the raw file.
+            meta (:obj:`dict`):
+                The metadata of the frame.
+            framebit (:obj:`int`, optional):
+                The frame type bits.
+            setup (:obj:`str`, optional):
+                The configuration identifier.
+        """
+        self.db.execute('INSERT OR REPLACE INTO frames VALUES (?, ?, ?, ?, ?, ?)',
+                        FitsHeaderCache.file_key(filename)
+                        + (json.dumps(meta, default=self._to_json),
+                           None if framebit is None else int(framebit),
+                           None if setup is None else str(setup)))
+
+    def get_configs(self):
+        """
+        Return the indexed configurations, in the order they were added.
+
+        Returns:
+            :obj:`dict`: A nested dictionary, one dictionary per configuration
+            with the associated metadata for each.
+        """
+        return {setup: json.loads(config) for setup, config
+                    in self.db.execute('SELECT setup, config FROM configs ORDER BY rowid')}
+
+    def set_configs(self, configs):
+        """
+        Replace the indexed configurations.
+
+        Args:
+            configs (:obj:`dict`):
+                A nested dictionary, one dictionary per configuration with
+                the associated metadata for each.
+        """
+        self.db.execute('DELETE FROM configs')
+        for setup, config in configs.items():
+            self.db.execute('INSERT INTO configs VALUES (?, ?)',
+                            (setup, json.dumps(config, default=self._to_json)))
+
+    def close(self):
+        """Save any changes and close the database."""
+        self.db.commit()
+        self.db.close()
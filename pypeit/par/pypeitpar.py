@@ -218,7 +218,9 @@ class ProcessImagesPar(ParSet):
                  use_biasimage=None, use_overscan=None, use_darkimage=None,
                  empirical_rn=None, shot_noise=None, noise_floor=None,
                  use_pixelflat=None, use_illumflat=None, use_specillum=None,
-                 use_pattern=None, spat_flexure_correct=None):
+                 use_pattern=None, spat_flexure_correct=None, stack_memmap=None,
+                 stack_scratch_dir=None, stack_tile_nspec=None, nproc=None, cr_nthreads=None,
+                 cr_tile_nspec=None, cr_onslit=None):
 
         # Grab the parameter names and values from the function
         # arguments
@@ -338,6 +340,35 @@ class ProcessImagesPar(ParSet):
         descr['comb_sigrej'] = 'Sigma-clipping level for when clip=True; ' \
                            'Use None for automatic limit (recommended).  '
 
+        defaults['nproc'] = 1
+        dtypes['nproc'] = int
+        descr['nproc'] = 'Number of processes used to process the raw frames (overscan, ' \
+                         'pattern, bias, dark, and flat-field corrections, cosmic-ray ' \
+                         'masking) before they are combined.  If 1, the frames are processed ' \
+                         'serially; if 0, the number of available CPUs is used.  The frames ' \
+                         'are always combined in the order they are provided.'
+
+        defaults['stack_memmap'] = False
+        dtypes['stack_memmap'] = bool
+        descr['stack_memmap'] = 'When combining multiple frames, write the processed frames to ' \
+                                'memory-mapped scratch files instead of keeping them all in ' \
+                                'memory, and combine them in tiles of ``stack_tile_nspec`` ' \
+                                'spectral rows.  This bounds the memory needed to combine large ' \
+                                'numbers of frames, independent of the number of frames.  The ' \
+                                'result is identical to the in-memory combination.'
+
+        defaults['stack_scratch_dir'] = None
+        dtypes['stack_scratch_dir'] = str
+        descr['stack_scratch_dir'] = 'Directory used for the memory-mapped scratch files when ' \
+                                     '``stack_memmap`` is True.  If None, the default ' \
+                                     'temporary directory of the system is used.  The files ' \
+                                     'are removed once the frames are combined.'
+
+        defaults['stack_tile_nspec'] = 256
+        dtypes['stack_tile_nspec'] = int
+        descr['stack_tile_nspec'] = 'Number of spectral rows combined at a time when ' \
+                                    '``stack_memmap`` is True.'
+
         defaults['satpix'] = 'reject'
         options['satpix'] = ProcessImagesPar.valid_saturation_handling()
         dtypes['satpix'] = str
@@ -394,6 +425,25 @@ class ProcessImagesPar(ParSet):
         dtypes['objlim'] = [int, float]
         descr['objlim'] = 'Object detection limit in LA cosmics routine'
 
+        defaults['cr_nthreads'] = 1
+        dtypes['cr_nthreads'] = int
+        descr['cr_nthreads'] = 'Number of threads used to apply the image filters in the LA ' \
+                               'cosmics routine.  The filters are applied to overlapping ' \
+                               'blocks of spectral rows; the resulting cosmic-ray mask is ' \
+                               'identical to the single-threaded result.'
+
+        defaults['cr_tile_nspec'] = None
+        dtypes['cr_tile_nspec'] = int
+        descr['cr_tile_nspec'] = 'Number of spectral rows in each block filtered by the LA ' \
+                                 'cosmics routine.  If None, the image is split evenly among ' \
+                                 'the ``cr_nthreads`` threads.'
+
+        defaults['cr_onslit'] = False
+        dtypes['cr_onslit'] = bool
+        descr['cr_onslit'] = 'Only search for cosmic rays in pixels on the slits.  This is ' \
+                             'only applied when the slit traces are available (e.g., when ' \
+                             'masking cosmic rays after the global sky subtraction).'
+
         # Instantiate the parameter set
         super(ProcessImagesPar, self).__init__(list(pars.keys()),
                                                values=list(pars.values()),
@@ -415,7 +465,8 @@ class ProcessImagesPar(ParSet):
                    'n_lohi', 'mask_cr',
                    #'replace',
                    'lamaxiter', 'grow', 'clip', 'comb_sigrej', 'rmcompact', 'sigclip',
-                   'sigfrac', 'objlim']
+                   'sigfrac', 'objlim', 'nproc', 'stack_memmap', 'stack_scratch_dir',
+                   'stack_tile_nspec', 'cr_nthreads', 'cr_tile_nspec', 'cr_onslit']
 
         badkeys = np.array([pk not in parkeys for pk in k])
         if np.any(badkeys):
@@ -462,6 +513,12 @@ class ProcessImagesPar(ParSet):
         if self.data['n_lohi'] is not None and len(self.data['n_lohi']) != 2:
             raise ValueError('n_lohi must be a list of two numbers.')
 
+        if self.data['stack_tile_nspec'] is not None and self.data['stack_tile_nspec'] < 1:
+            raise ValueError('stack_tile_nspec must be a positive integer.')
+
+        if self.data['cr_tile_nspec'] is not None and self.data['cr_tile_nspec'] < 1:
+            raise ValueError('cr_tile_nspec must be a positive integer.')
+
         if not self.data['use_overscan']:
             return
         if self.data['overscan_par'] is None:
@@ -1226,7 +1283,7 @@ class CubePar(ParSet):
     def __init__(self, slit_spec=None, relative_weights=None, combine=None, output_filename=None,
                  standard_cube=None, flux_calibrate=None, reference_image=None, save_whitelight=None,
                  ra_min=None, ra_max=None, dec_min=None, dec_max=None, wave_min=None, wave_max=None,
-                 spatial_delta=None, wave_delta=None, astrometric=None):
+                 spatial_delta=None, wave_delta=None, astrometric=None, wave_chunk=None):
 
         # Grab the parameter names and values from the function
         # arguments
@@ -1334,6 +1391,16 @@ class CubePar(ParSet):
         dtypes['astrometric'] = bool
         descr['astrometric'] = 'If true, an astrometric correction will be applied using the alignment frames.'
 
+        defaults['wave_chunk'] = None
+        dtypes['wave_chunk'] = int
+        descr['wave_chunk'] = 'Number of wavelength channels of the datacube to construct at once. If None, ' \
+                              'all the pixels of the input spec2d files and the full datacube are held in ' \
+                              'memory. Otherwise, the pixels of each spec2d file are kept in memory-mapped ' \
+                              'scratch files (sorted by wavelength) in the directory of the output file, and ' \
+                              'the datacube is constructed in slabs of this many channels that are written ' \
+                              'directly to a memory-mapped output.  Use this for mosaics that are too large ' \
+                              'to be constructed in memory.'
+
         # Instantiate the parameter set
         super(CubePar, self).__init__(list(pars.keys()),
                                       values=list(pars.values()),
@@ -1350,7 +1417,8 @@ class CubePar(ParSet):
         # Basic keywords
         parkeys = ['slit_spec', 'output_filename', 'standard_cube', 'flux_calibrate', 'reference_image',
                    'save_whitelight', 'ra_min', 'ra_max', 'dec_min', 'dec_max', 'wave_min', 'wave_max',
-                   'spatial_delta', 'wave_delta', 'relative_weights', 'combine', 'astrometric']
+                   'spatial_delta', 'wave_delta', 'relative_weights', 'combine', 'astrometric',
+                   'wave_chunk']
 
         badkeys = np.array([pk not in parkeys for pk in k])
         if np.any(badkeys):
@@ -1362,7 +1430,9 @@ class CubePar(ParSet):
         return cls(**kwargs)
 
     def validate(self):
-        pass
+        if self.data['wave_chunk'] is not None and self.data['wave_chunk'] < 1:
+            raise ValueError('The number of wavelength channels in each datacube chunk must be '
+                             'at least 1.')
 
 
 class FluxCalibratePar(ParSet):
@@ -1824,7 +1894,7 @@ class TelluricPar(ParSet):
     def __init__(self, telgridfile=None, sn_clip=None, resln_guess=None, resln_frac_bounds=None, pix_shift_bounds=None,
                  delta_coeff_bounds=None, minmax_coeff_bounds=None, maxiter=None,
                  sticky=None, lower=None, upper=None, seed=None, tol=None, popsize=None, recombination=None, polish=None,
-                 disp=None, objmodel=None, redshift=None, delta_redshift=None, pca_file=None, npca=None,
+                 nresln_ladder=None, vectorize=None, nproc=None, disp=None, objmodel=None, redshift=None, delta_redshift=None, pca_file=None, npca=None,
                  bal_wv_min_max=None, bounds_norm=None, tell_norm_thresh=None, only_orders=None, pca_lower=None,
                  pca_upper=None, star_type=None, star_mag=None, star_ra=None, star_dec=None, mask_abs_lines=None,
                  func=None, model=None, polyorder=None, fit_wv_min_max=None, mask_lyman_a=None):
@@ -1963,6 +2033,27 @@ class TelluricPar(ParSet):
                           'polish the best fit at the end, which can improve the optimization slightly. See ' \
                           'scipy.optimize.differential_evolution for details.'
 
+        defaults['nresln_ladder'] = 0
+        dtypes['nresln_ladder'] = int
+        descr['nresln_ladder'] = 'Number of spectral resolutions, spanning the bounds set by resln_frac_bounds, ' \
+                                 'at which the telluric grid is preconvolved and cached.  The telluric model is ' \
+                                 'then interpolated between the preconvolved models instead of being convolved ' \
+                                 'at every step of the optimization, which is much faster but approximate.  ' \
+                                 'Values smaller than 2 disable the preconvolution.'
+
+        defaults['vectorize'] = False
+        dtypes['vectorize'] = bool
+        descr['vectorize'] = 'Evaluate the models for the full differential evolution population at once and ' \
+                             'update the population once per generation (updating=\'deferred\'), instead of ' \
+                             'one trial vector at a time.  This is much faster, but the optimization follows a ' \
+                             'different path, such that the results are not identical to the default.'
+
+        defaults['nproc'] = 1
+        dtypes['nproc'] = int
+        descr['nproc'] = 'Number of processes used to fit the orders/slits in parallel.  If 0 or negative, ' \
+                         'all available CPUs are used.  Parallel fits seed the random number generator of ' \
+                         'each order/slit separately, such that they differ from the serial fit.'
+
         defaults['disp'] = False
         dtypes['disp'] = bool
         descr['disp'] = 'Argument for scipy.optimize.differential_evolution which will  display status messages to the ' \
@@ -2081,7 +2172,8 @@ class TelluricPar(ParSet):
         parkeys = ['telgridfile', 'sn_clip', 'resln_guess', 'resln_frac_bounds',
                    'pix_shift_bounds', 'delta_coeff_bounds', 'minmax_coeff_bounds',
                    'maxiter', 'sticky', 'lower', 'upper', 'seed', 'tol',
-                   'popsize', 'recombination', 'polish', 'disp', 'objmodel','redshift', 'delta_redshift',
+                   'popsize', 'recombination', 'polish', 'nresln_ladder', 'vectorize', 'nproc',
+                   'disp', 'objmodel','redshift', 'delta_redshift',
                    'pca_file', 'npca', 'bal_wv_min_max', 'bounds_norm',
                    'tell_norm_thresh', 'only_orders', 'pca_lower', 'pca_upper',
                    'star_type','star_mag','star_ra','star_dec','mask_abs_lines',
@@ -2126,7 +2218,8 @@ class ReduxPar(ParSet):
     """
     def __init__(self, spectrograph=None, detnum=None, sortroot=None, calwin=None, scidir=None,
                  qadir=None, redux_path=None, ignore_bad_headers=None, slitspatnum=None,
-                 maskIDs=None):
+                 maskIDs=None, det_nproc=None, slit_nproc=None, header_nproc=None,
+                 header_cache=None, metadata_index=None, columnar_spec1d=None):
 
         # Grab the parameter names and values from the function
         # arguments
@@ -2197,6 +2290,69 @@ class ReduxPar(ParSet):
         descr['redux_path'] = 'Path to folder for performing reductions.  Default is the ' \
                               'current working directory.'
 
+        defaults['det_nproc'] = 1
+        dtypes['det_nproc'] = int
+        descr['det_nproc'] = 'Number of processes used to reduce the detectors of a single ' \
+                             'exposure.  If 1, the detectors are reduced serially; if 0, the ' \
+                             'number of available CPUs is used.  When larger than 1, the ' \
+                             'calibration, object finding, and extraction of each detector ' \
+                             'are run concurrently; steps that combine information from all ' \
+                             'detectors (e.g., the slitmask offsets and object assignment) ' \
+                             'are still performed after all detectors have finished, and the ' \
+                             'log of each detector is written to a separate file.  This is ' \
+                             'ignored if the reduction steps are shown.'
+
+        defaults['slit_nproc'] = 1
+        dtypes['slit_nproc'] = int
+        descr['slit_nproc'] = 'Number of processes used for the reduction steps that treat ' \
+                              'each slit independently (currently the wavelength ' \
+                              'calibration, the tracing of the arc line tilts, the ' \
+                              'flat-field modeling, the global sky subtraction, and the local sky ' \
+                              'subtraction and extraction of multi-slit data).  If 1, the ' \
+                              'slits are ' \
+                              'processed serially; if 0, the number of available CPUs is ' \
+                              'used.  When the detectors are reduced concurrently (see ' \
+                              'det_nproc), the number of processes used for each detector is ' \
+                              'limited such that the total does not exceed the number of ' \
+                              'available CPUs.  This is ignored if the sky or object profile ' \
+                              'fits are shown.'
+
+        defaults['header_nproc'] = 1
+        dtypes['header_nproc'] = int
+        descr['header_nproc'] = 'Number of threads used to read the fits headers of the raw ' \
+                                'files when building the metadata table.  If 1, the headers ' \
+                                'are read serially; if 0, the number of available CPUs is ' \
+                                'used.  Reading many headers concurrently is most useful for ' \
+                                'files on networked storage.'
+
+        dtypes['header_cache'] = str
+        descr['header_cache'] = 'Name of an SQLite database file used to cache the fits ' \
+                                'headers of the raw files, keyed by their path, size, and ' \
+                                'modification time.  Headers of unchanged files are taken ' \
+                                'from the cache instead of being read again; new or modified ' \
+                                'files are read and added to the cache.  If None, the headers ' \
+                                'are always read from the files.'
+
+        dtypes['metadata_index'] = str
+        descr['metadata_index'] = 'Name of an SQLite database file used as a persistent index ' \
+                                  'of the frame metadata, types, and instrument configurations ' \
+                                  'when setting up the reduction (e.g., using pypeit_setup).  ' \
+                                  'Only new or modified frames are read, typed, and matched to ' \
+                                  'the configurations, which makes repeated setups of a ' \
+                                  'growing set of frames incremental.  The index is ignored ' \
+                                  'if the metadata are read from a pypeit file.  If None, no ' \
+                                  'index is used.'
+
+        defaults['columnar_spec1d'] = False
+        dtypes['columnar_spec1d'] = bool
+        descr['columnar_spec1d'] = 'Write the spec1d files using the columnar layout: a table ' \
+                                   'with one row of scalar quantities per spectrum and a table ' \
+                                   'with the arrays of all spectra, instead of one extension ' \
+                                   'per spectrum.  Selected spectra (e.g., by name) can then be ' \
+                                   'read without parsing the rest of the file.  If False, ' \
+                                   'existing spec1d files that are updated (e.g., for a subset ' \
+                                   'of detectors) keep their layout.'
+
         # Instantiate the parameter set
         super(ReduxPar, self).__init__(list(pars.keys()),
                                         values=list(pars.values()),
@@ -2212,7 +2368,9 @@ class ReduxPar(ParSet):
 
         # Basic keywords
         parkeys = [ 'spectrograph', 'detnum', 'sortroot', 'calwin', 'scidir', 'qadir',
-                    'redux_path', 'ignore_bad_headers', 'slitspatnum', 'maskIDs']
+                    'redux_path', 'ignore_bad_headers', 'slitspatnum', 'maskIDs', 'det_nproc',
+                    'slit_nproc', 'header_nproc', 'header_cache', 'metadata_index',
+                    'columnar_spec1d']
 
         badkeys = np.array([pk not in parkeys for pk in k])
         if np.any(badkeys):
@@ -2257,7 +2415,7 @@ class WavelengthSolutionPar(ParSet):
                  rms_threshold=None, match_toler=None, func=None, n_first=None, n_final=None,
                  sigrej_first=None, sigrej_final=None, wv_cen=None, disp=None, numsearch=None,
                  nfitpix=None, IDpixels=None, IDwaves=None, refframe=None,
-                 nsnippet=None, use_instr_flag=None, wvrng_arxiv=None):
+                 nsnippet=None, use_instr_flag=None, wvrng_arxiv=None, xcorr_method=None):
 
         # Grab the parameter names and values from the function
         # arguments
@@ -2428,6 +2586,18 @@ class WavelengthSolutionPar(ParSet):
                              'computation for each arc line. If not an odd number one will ' \
                              'be added to it to make it odd.'
 
+        defaults['xcorr_method'] = 'fft'
+        options['xcorr_method'] = WavelengthSolutionPar.valid_xcorr_methods()
+        dtypes['xcorr_method'] = str
+        descr['xcorr_method'] = 'Method used to determine the shift and stretch between an ' \
+                                'input spectrum and the members of the archive.  ' \
+                                '\'fft\' searches a grid of stretches using batched FFT ' \
+                                'cross-correlations of all the archive spectra, followed by a ' \
+                                'local refinement; \'differential_evolution\' uses a ' \
+                                'global optimizer for each archive spectrum, which is ' \
+                                'significantly slower.  Options are: {0}'.format(
+                                    ', '.join(options['xcorr_method']))
+
         defaults['ech_fix_format'] = True
         dtypes['ech_fix_format'] = bool
         descr['ech_fix_format'] = 'Is this a fixed format echelle?  If so reidentification ' \
@@ -2530,7 +2700,7 @@ class WavelengthSolutionPar(ParSet):
                    'nlocal_cc', 'rms_threshold', 'match_toler', 'func', 'n_first','n_final',
                    'sigrej_first', 'sigrej_final', 'wv_cen', 'disp', 'numsearch', 'nfitpix',
                    'IDpixels', 'IDwaves', 'refframe', 'nsnippet', 'use_instr_flag',
-                   'wvrng_arxiv']
+                   'wvrng_arxiv', 'xcorr_method']
 
         badkeys = np.array([pk not in parkeys for pk in k])
         if np.any(badkeys):
@@ -2558,6 +2728,14 @@ class WavelengthSolutionPar(ParSet):
         return ['simple', 'semi-brute', 'basic', 'holy-grail', 'identify', 'reidentify',
                 'full_template']
 
+    @staticmethod
+    def valid_xcorr_methods():
+        """
+        Return the valid methods used to determine the shift and stretch of
+        the archived spectra.
+        """
+        return ['fft', 'differential_evolution']
+
     @staticmethod
     def valid_lamps():
         """
@@ -3628,7 +3806,7 @@ class ExtractionPar(ParSet):
 
     def __init__(self, boxcar_radius=None, std_prof_nsigma=None, sn_gauss=None,
                  model_full_slit=None, skip_extraction=None, skip_optimal=None,
-                 use_2dmodel_mask=None, use_user_fwhm=None):
+                 use_2dmodel_mask=None, use_user_fwhm=None, batch_extract=None):
 
         # Grab the parameter names and values from the function
         # arguments
@@ -3686,6 +3864,15 @@ class ExtractionPar(ParSet):
                                  'If this parameter is ``False`` (default), PypeIt estimates the FWHM for each ' \
                                  'detected object, and uses ``find_fwhm`` as initial guess.'
 
+        defaults['batch_extract'] = False
+        dtypes['batch_extract'] = bool
+        descr['batch_extract'] = 'Perform the optimal extractions of all objects that are ' \
+                                 'locally sky-subtracted together (i.e., objects with ' \
+                                 'overlapping extraction regions) simultaneously using array ' \
+                                 'operations, instead of one object at a time.  This is faster ' \
+                                 'for slits with many objects and gives the same result to ' \
+                                 'within numerical round-off.'
+
         # Instantiate the parameter set
         super(ExtractionPar, self).__init__(list(pars.keys()),
                                         values=list(pars.values()),
@@ -3701,7 +3888,8 @@ class ExtractionPar(ParSet):
 
         # Basic keywords
         parkeys = ['boxcar_radius', 'std_prof_nsigma', 'sn_gauss', 'model_full_slit',
-                   'skip_extraction', 'skip_optimal', 'use_2dmodel_mask', 'use_user_fwhm']
+                   'skip_extraction', 'skip_optimal', 'use_2dmodel_mask', 'use_user_fwhm',
+                   'batch_extract']
 
         badkeys = np.array([pk not in parkeys for pk in k])
         if np.any(badkeys):
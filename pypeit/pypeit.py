@@ -9,6 +9,8 @@ import time
 import os
 import copy
 import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 from IPython import embed
 
@@ -259,7 +261,7 @@ class PypeIt:
             msgs.error('Could not find standard file: {0}'.format(std_outfile))
         return std_outfile
 
-    def calib_all(self, run=True):
+    def calib_all(self, run=True, nproc=1):
         """
         Create calibrations for all setups
 
@@ -268,6 +270,9 @@ class PypeIt:
         Args:
             run (bool, optional): If False, only print the calib names and do
             not actually run.  Only used with the pypeit_parse_calib_id script
+            nproc (int, optional): Number of processes used to calibrate
+            independent sets of calibration groups concurrently; see
+            :func:`map_calib_groups`.
 
         Returns:
             dict: A simple dict summarizing the calibration names
@@ -276,9 +281,43 @@ class PypeIt:
 
         self.tstart = time.time()
 
+        for grp_dict in self.map_calib_groups('calib_groups', 'calib', nproc, run):
+            calib_dict.update(grp_dict)
+
+        # Print the results
+        print(json.dumps(calib_dict, sort_keys=True, indent=4))
+
+        # Write
+        msgs.info('Writing calib file')
+        calib_file = self.pypeit_file.replace('.pypeit', '.calib_ids')
+        ltu.savejson(calib_file, calib_dict, overwrite=True, easy_to_read=True)
+
+        # Finish
+        self.print_end_time()
+
+        # Return
+        return calib_dict
+
+    def calib_groups(self, calib_groups, run=True):
+        """
+        Create the calibrations for a set of calibration groups
+
+        Args:
+            calib_groups (:obj:`list`):
+                0-indexed calibration groups to process.
+            run (:obj:`bool`, optional):
+                If False, only collect the calib names and do not actually
+                run.
+
+        Returns:
+            :obj:`dict`: A simple dict summarizing the calibration names for
+            each calibration group
+        """
+        calib_dict = {}
+
         # Frame indices
         frame_indx = np.arange(len(self.fitstbl))
-        for i in range(self.fitstbl.n_calib_groups):
+        for i in calib_groups:
             # 1-indexed calib number
             calib_grp = str(i+1)
             # Find all the frames in this calibration group
@@ -298,7 +337,8 @@ class PypeIt:
                     self.calibrations_path, qadir=self.qa_path, reuse_masters=self.reuse_masters,
                     show=self.show,
                     user_slits=slittrace.merge_user_slit(self.par['rdx']['slitspatnum'],
-                                                         self.par['rdx']['maskIDs']))
+                                                         self.par['rdx']['maskIDs']),
+                    slit_nproc=self.par['rdx']['slit_nproc'])
                 # Do it
                 # TODO: Why isn't set_config part of the Calibrations.__init__ method?
                 self.caliBrate.set_config(grp_frames[0], self.det, self.par['calibrations'])
@@ -329,44 +369,54 @@ class PypeIt:
                         calib_dict[calib_grp][key][step]['master_name'] = os.path.basename(masterframe_name)
                         calib_dict[calib_grp][key][step]['raw_files'] = [os.path.basename(ifile) for ifile in raw_files]
 
-        # Print the results
-        print(json.dumps(calib_dict, sort_keys=True, indent=4))
-
-        # Write
-        msgs.info('Writing calib file')
-        calib_file = self.pypeit_file.replace('.pypeit', '.calib_ids')
-        ltu.savejson(calib_file, calib_dict, overwrite=True, easy_to_read=True)
-
-        # Finish
-        self.print_end_time()
-
-        # Return
         return calib_dict
 
-    def reduce_all(self):
+    def reduce_all(self, nproc=1):
         """
         Main driver of the entire reduction
 
         Calibration and extraction via a series of calls to reduce_exposure()
 
+        The standards for all calibration groups are reduced before any of
+        the science frames because the latter may use the former for their
+        object tracing.
+
+        Args:
+            nproc (:obj:`int`, optional):
+                Number of processes used to reduce independent sets of
+                calibration groups concurrently; see
+                :func:`map_calib_groups`.
         """
         # Validate the parameter set
         self.par.validate_keys(required=['rdx', 'calibrations', 'scienceframe', 'reduce',
                                          'flexure'])
         self.tstart = time.time()
 
+        # Standard Star(s)
+        self.map_calib_groups('reduce_standards', 'std', nproc)
+        # Science Frame(s)
+        self.map_calib_groups('reduce_science', 'sci', nproc)
+
+        # Finish
+        self.print_end_time()
+
+    def reduce_standards(self, calib_groups):
+        """
+        Reduce the standard frames in a set of calibration groups
+
+        Args:
+            calib_groups (:obj:`list`):
+                0-indexed calibration groups to process.
+        """
         # Find the standard frames
         is_standard = self.fitstbl.find_frames('standard')
 
-        # Find the science frames
-        is_science = self.fitstbl.find_frames('science')
-
         # Frame indices
         frame_indx = np.arange(len(self.fitstbl))
 
         # Standard Star(s) Loop
         # Iterate over each calibration group and reduce the standards
-        for i in range(self.fitstbl.n_calib_groups):
+        for i in calib_groups:
 
             # Find all the frames in this calibration group
             in_grp = self.fitstbl.find_calib_group(i)
@@ -393,9 +443,25 @@ class PypeIt:
                     msgs.info('Output file: {:s} already exists'.format(self.fitstbl.construct_basename(frames[0])) +
                               '. Set overwrite=True to recreate and overwrite.')
 
+    def reduce_science(self, calib_groups):
+        """
+        Reduce the science frames in a set of calibration groups
+
+        Args:
+            calib_groups (:obj:`list`):
+                0-indexed calibration groups to process.
+        """
+        # Find the science frames
+        is_science = self.fitstbl.find_frames('science')
+        # Find the standard frames
+        is_standard = self.fitstbl.find_frames('standard')
+
+        # Frame indices
+        frame_indx = np.arange(len(self.fitstbl))
+
         # Science Frame(s) Loop
         # Iterate over each calibration group again and reduce the science frames
-        for i in range(self.fitstbl.n_calib_groups):
+        for i in calib_groups:
             # Find all the frames in this calibration group
             in_grp = self.fitstbl.find_calib_group(i)
 
@@ -438,8 +504,120 @@ class PypeIt:
 
             msgs.info('Finished calibration group {0}'.format(i))
 
-        # Finish
-        self.print_end_time()
+    def map_calib_groups(self, method, logtag, nproc, *args):
+        """
+        Execute a method of this class that processes a list of calibration
+        groups for all calibration groups.
+
+        If more than one process is requested, the calibration groups are
+        split into sets that do not share any frames (see
+        :func:`~pypeit.metadata.PypeItMetaData.independent_calib_groups`)
+        and each set is processed by a copy of this object in a separate
+        process.  Each process writes a separate log file for each
+        calibration group; see :func:`calib_group_logname`.  Otherwise, the
+        method is executed by this object for all calibration groups.
+
+        Args:
+            method (:obj:`str`):
+                Name of the method to call.  The first argument of the method
+                must be the list of calibration groups to process.
+            logtag (:obj:`str`):
+                Tag added to the name of the log file for each calibration
+                group.
+            nproc (:obj:`int`):
+                Number of processes to use.  See
+                :func:`~pypeit.utils.get_nproc`.
+            *args:
+                Additional arguments passed to the method.
+
+        Returns:
+            :obj:`list`: The result of each method call, ordered by the first
+            calibration group in each set.
+        """
+        group_sets = self.fitstbl.independent_calib_groups()
+        _nproc = utils.get_nproc(nproc, ntasks=len(group_sets))
+        # NOTE: The interactive displays cannot be used by the worker processes
+        if _nproc == 1 or self.show:
+            return [getattr(self, method)(list(range(self.fitstbl.n_calib_groups)), *args)]
+
+        msgs.info(f'Processing {len(group_sets)} independent sets of calibration groups '
+                  f'using {_nproc} processes.')
+        worker = copy.copy(self)
+        worker.caliBrate = None
+        worker.exTract = None
+        # Limit the number of processes that each worker uses for the
+        # detectors and slits, such that the total does not exceed the number
+        # of CPUs
+        worker.par = copy.deepcopy(self.par)
+        det_nproc = utils.get_nproc(self.par['rdx']['det_nproc'], nworkers=_nproc)
+        worker.par['rdx']['det_nproc'] = det_nproc
+        worker.par['rdx']['slit_nproc'] = utils.get_nproc(self.par['rdx']['slit_nproc'],
+                                                          nworkers=_nproc*det_nproc)
+        # NOTE: Use spawn so that the workers do not inherit the open log file
+        with ProcessPoolExecutor(max_workers=_nproc,
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = [pool.submit(worker.run_calib_group_set, method, logtag, grps, *args)
+                        for grps in group_sets]
+            return [future.result() for future in futures]
+
+    def run_calib_group_set(self, method, logtag, calib_groups, *args):
+        """
+        Execute a method for each calibration group in a set, logging each
+        group to a separate file.
+
+        This is the function executed by each worker process in
+        :func:`map_calib_groups`.
+
+        Args:
+            method (:obj:`str`):
+                Name of the method to call.
+            logtag (:obj:`str`):
+                Tag added to the name of the log file for each calibration
+                group.
+            calib_groups (:obj:`list`):
+                0-indexed calibration groups to process.
+            *args:
+                Additional arguments passed to the method.
+
+        Returns:
+            The result of the method for all calibration groups.  If the
+            method returns a dictionary, the results for each group are
+            merged; otherwise, None is returned.
+        """
+        logname = self.logname
+        result = None
+        for grp in calib_groups:
+            self.logname = self.calib_group_logname(grp, logtag, logname=logname)
+            self.msgs_reset()
+            _result = getattr(self, method)([grp], *args)
+            if isinstance(_result, dict):
+                result = _result if result is None else {**result, **_result}
+        msgs.reset_log_file(None)
+        self.logname = logname
+        return result
+
+    def calib_group_logname(self, grp, logtag, logname=None):
+        """
+        Construct the name of the log file for a single calibration group.
+
+        Args:
+            grp (:obj:`int`):
+                0-indexed calibration group
+            logtag (:obj:`str`):
+                Tag identifying the processing step
+            logname (:obj:`str`, optional):
+                Name of the log file for the full reduction.  If None, use
+                :attr:`logname`.
+
+        Returns:
+            :obj:`str`: The name of the log file.  None if ``logname`` and
+            :attr:`logname` are None.
+        """
+        _logname = self.logname if logname is None else logname
+        if _logname is None:
+            return None
+        root, ext = os.path.splitext(_logname)
+        return f'{root}_calib{grp}_{logtag}{ext}'
 
     def reduce_exposure(self, frames, bg_frames=None, std_outfile=None):
         """
@@ -524,12 +702,13 @@ class PypeIt:
         msgs.info(f'Detectors to work on: {detectors}')
 
         # Loop on Detectors
-        # TODO: Attempt to put in a multiprocessing call here?
-        # objfind
-        for self.det in detectors:
-            msgs.info("Working on detector {0}".format(self.det))
-            # run calibration
-            self.caliBrate = self.calib_one(frames, self.det)
+        # calibrate and objfind; if requested, the detectors are processed
+        # concurrently
+        objfind_args = [(frames, det, bg_frames, std_outfile) for det in detectors]
+        for det, (caliBrate, objfind_out) \
+                in zip(detectors, self._map_detectors('calib_objfind_one', 'objfind', objfind_args)):
+            self.det = det
+            self.caliBrate = caliBrate
             if not self.caliBrate.success:
                 msgs.warn(f'Calibrations for detector {self.det} were unsuccessful!  The step '
                           f'that failed was {self.caliBrate.failed_step}.  Continuing by '
@@ -543,14 +722,18 @@ class PypeIt:
             # in the slitmask stuff in between the two loops
             calib_slits.append(self.caliBrate.slits)
             # global_sky, skymask and sciImg are needed in the extract loop
-            initial_sky, sobjs_obj, sciImg, objFind = self.objfind_one(frames, self.det, bg_frames,
-                                                                       std_outfile=std_outfile)
+            initial_sky, sobjs_obj, sciImg, objFind = objfind_out
             if len(sobjs_obj)>0:
                 all_specobjs_objfind.add_sobj(sobjs_obj)
             initial_sky_list.append(initial_sky)
             sciImg_list.append(sciImg)
             objFind_list.append(objFind)
 
+        if self._parallel_detectors(len(detectors)) and len(calibrated_det) > 0:
+            # The metadata attributes are set by the worker processes, not
+            # this one.
+            self.set_sci_metadata(frames[0], calibrated_det[-1])
+
         # slitmask stuff
         if self.par['reduce']['slitmask']['assign_obj']:
             # get object positions from slitmask design and slitmask offsets for all the detectors
@@ -578,13 +761,9 @@ class PypeIt:
                 self.par['reduce']['slitmask'], self.par['reduce']['findobj']['find_fwhm'])
 
         # Extract
-        for i, self.det in enumerate(calibrated_det):
-            # re-run (i.e., load) calibrations
-            self.caliBrate = self.calib_one(frames, self.det)
-            self.caliBrate.slits = calib_slits[i]
-
+        extract_args = []
+        for i, det in enumerate(calibrated_det):
             detname = sciImg_list[i].detector.name
-
             # TODO: pass back the background frame, pass in background
             # files as an argument. extract one takes a file list as an
             # argument and instantiates science within
@@ -592,12 +771,15 @@ class PypeIt:
                 all_specobjs_on_det = all_specobjs_objfind[all_specobjs_objfind.DET == detname]
             else:
                 all_specobjs_on_det = all_specobjs_objfind
+            extract_args += [(frames, det, calib_slits[i], sciImg_list[i], objFind_list[i],
+                              initial_sky_list[i], all_specobjs_on_det)]
 
-            # Extract
-            all_spec2d[detname], tmp_sobjs \
-                    = self.extract_one(frames, self.det, sciImg_list[i], objFind_list[i],
-                                       initial_sky_list[i], all_specobjs_on_det)
+        for i, (caliBrate, spec2DObj, tmp_sobjs) \
+                in enumerate(self._map_detectors('calib_extract_one', 'extract', extract_args)):
+            self.det = calibrated_det[i]
+            self.caliBrate = caliBrate
             # Hold em
+            all_spec2d[sciImg_list[i].detector.name] = spec2DObj
             if tmp_sobjs.nobj > 0:
                 all_specobjs_extract.add_sobj(tmp_sobjs)
             # JFH TODO write out the background frame?
@@ -607,6 +789,197 @@ class PypeIt:
         # Return
         return all_spec2d, all_specobjs_extract
 
+    def _parallel_detectors(self, ndet):
+        """
+        Determine if the detectors should be reduced using a pool of
+        processes.
+
+        Args:
+            ndet (:obj:`int`):
+                Number of detectors to reduce.
+
+        Returns:
+            :obj:`bool`: True if the detectors should be reduced concurrently.
+        """
+        # NOTE: The interactive displays cannot be used by the worker processes
+        return not self.show and utils.get_nproc(self.par['rdx']['det_nproc'], ntasks=ndet) > 1
+
+    def _map_detectors(self, method, logtag, arglist):
+        """
+        Execute one of the per-detector methods of this class for a list of
+        argument sets.
+
+        If :attr:`par` requests more than one process (see ``det_nproc`` in
+        :class:`~pypeit.par.pypeitpar.ReduxPar`), the calls are distributed
+        to a pool of processes, each operating on a copy of this object;
+        otherwise, they are executed serially by this object.  The worker
+        processes are spawned (not forked), and each detector is logged to a
+        separate file; see :func:`detector_logname`.  In either case, the
+        results are yielded in the same order as ``arglist``.
+
+        Args:
+            method (:obj:`str`):
+                Name of the method to call.
+            logtag (:obj:`str`):
+                Tag added to the name of the log file for each detector
+                when the detectors are reduced by separate processes.
+            arglist (:obj:`list`):
+                List of tuples with the positional arguments for each call.
+
+        Yields:
+            The result of each method call.
+        """
+        if not self._parallel_detectors(len(arglist)):
+            for args in arglist:
+                yield getattr(self, method)(*args)
+            return
+
+        nproc = utils.get_nproc(self.par['rdx']['det_nproc'], ntasks=len(arglist))
+        msgs.info(f'Reducing {len(arglist)} detectors using {nproc} processes.')
+        # Avoid sending the products of previous detectors to the workers
+        worker = copy.copy(self)
+        worker.caliBrate = None
+        worker.exTract = None
+        # Limit the number of processes that each worker uses for the
+        # slit-by-slit steps, such that the total does not exceed the number
+        # of CPUs
+        worker.par = copy.deepcopy(self.par)
+        worker.par['rdx']['slit_nproc'] = utils.get_nproc(self.par['rdx']['slit_nproc'],
+                                                          nworkers=nproc)
+        # NOTE: Use spawn so that the workers do not inherit the open log file
+        with ProcessPoolExecutor(max_workers=nproc,
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = [pool.submit(worker.run_detector, method, logtag, *args) for args in arglist]
+            for future in futures:
+                yield future.result()
+
+    def run_detector(self, method, logtag, *args):
+        """
+        Execute one of the per-detector methods of this class, logging the
+        detector to a separate file.
+
+        This is the function executed by each worker process in
+        :func:`_map_detectors`.
+
+        Args:
+            method (:obj:`str`):
+                Name of the method to call.
+            logtag (:obj:`str`):
+                Tag added to the name of the log file.
+            *args:
+                Positional arguments passed to the method.  The second
+                argument must be the 1-indexed detector(s) to process.
+
+        Returns:
+            The result of the method.
+        """
+        logname = self.logname
+        self.logname = self.detector_logname(args[1], logtag, logname=logname)
+        self.msgs_reset()
+        result = getattr(self, method)(*args)
+        msgs.reset_log_file(None)
+        self.logname = logname
+        return result
+
+    def detector_logname(self, det, logtag, logname=None):
+        """
+        Construct the name of the log file for a single detector.
+
+        Args:
+            det (:obj:`int`, :obj:`tuple`):
+                1-indexed detector(s)
+            logtag (:obj:`str`):
+                Tag identifying the processing step
+            logname (:obj:`str`, optional):
+                Name of the log file for the full reduction.  If None, use
+                :attr:`logname`.
+
+        Returns:
+            :obj:`str`: The name of the log file.  None if ``logname`` and
+            :attr:`logname` are None.
+        """
+        _logname = self.logname if logname is None else logname
+        if _logname is None:
+            return None
+        root, ext = os.path.splitext(_logname)
+        return f'{root}_{self.spectrograph.get_det_name(det)}_{logtag}{ext}'
+
+    def calib_objfind_one(self, frames, det, bg_frames, std_outfile=None):
+        """
+        Calibrate and find objects in a single exposure/detector pair.
+
+        Args:
+            frames (:obj:`list`):
+                List of frames to extract; stacked if more than one is
+                provided
+            det (:obj:`int`, :obj:`tuple`):
+                1-indexed detector(s) to process.
+            bg_frames (:obj:`list`):
+                List of frames to use as the background. Can be empty.
+            std_outfile (:obj:`str`, optional):
+                Filename for the standard star spec1d file.
+
+        Returns:
+            :obj:`tuple`: The :class:`~pypeit.calibrations.Calibrations`
+            object and the tuple returned by :func:`objfind_one`.  The
+            latter is None if the calibrations were unsuccessful.
+        """
+        self.det = det
+        self.caliBrate = self.calib_one(frames, det)
+        if not self.caliBrate.success:
+            return self.caliBrate, None
+        return self.caliBrate, self.objfind_one(frames, det, bg_frames, std_outfile=std_outfile)
+
+    def calib_extract_one(self, frames, det, slits, sciImg, objFind, initial_sky, sobjs_obj):
+        """
+        Load the calibrations and extract the objects in a single
+        exposure/detector pair.
+
+        Args:
+            frames (:obj:`list`):
+                List of frames to extract; stacked if more than one is
+                provided
+            det (:obj:`int`, :obj:`tuple`):
+                1-indexed detector(s) to process.
+            slits (:class:`~pypeit.slittrace.SlitTraceSet`):
+                Slits for this detector, as modified by the slitmask
+                matching.
+            sciImg (:class:`~pypeit.images.pypeitimage.PypeItImage`):
+                Science image
+            objFind (:class:`~pypeit.find_objects.FindObjects`):
+                Object finding object
+            initial_sky (`numpy.ndarray`_):
+                Initial global sky model
+            sobjs_obj (:class:`~pypeit.specobjs.SpecObjs`):
+                Objects found on this detector.
+
+        Returns:
+            :obj:`tuple`: The :class:`~pypeit.calibrations.Calibrations`
+            object and the two objects returned by :func:`extract_one`.
+        """
+        self.det = det
+        # re-run (i.e., load) calibrations
+        self.caliBrate = self.calib_one(frames, det)
+        self.caliBrate.slits = slits
+        return (self.caliBrate,) + self.extract_one(frames, det, sciImg, objFind, initial_sky,
+                                                    sobjs_obj)
+
+    def set_sci_metadata(self, frame, det):
+        """
+        Set the metadata attributes for a given science frame and detector.
+
+        See :func:`get_sci_metadata`.
+
+        Args:
+            frame (:obj:`int`):
+                Frame index
+            det (:obj:`int`, :obj:`tuple`):
+                1-indexed detector(s)
+        """
+        self.objtype, self.setup, self.obstime, self.basename, self.binning \
+                = self.get_sci_metadata(frame, det)
+        self.std_redux = 'standard' in self.objtype
+
     def get_sci_metadata(self, frame, det):
         """
         Grab the meta data for a given science frame and specific detector
@@ -714,7 +1087,8 @@ class PypeIt:
             reuse_masters=self.reuse_masters,
             show=self.show, 
             user_slits=slittrace.merge_user_slit(
-                self.par['rdx']['slitspatnum'], self.par['rdx']['maskIDs']))
+                self.par['rdx']['slitspatnum'], self.par['rdx']['maskIDs']),
+            slit_nproc=self.par['rdx']['slit_nproc'])
             #slitspat_num=self.par['rdx']['slitspatnum'])
         # These need to be separate to accomodate COADD2D
         caliBrate.set_config(frames[0], det, self.par['calibrations'])
@@ -986,10 +1360,13 @@ class PypeIt:
             outfile1d = os.path.join(self.science_path, 'spec1d_{:s}.fits'.format(basename))
             # TODO
             #embed(header='deal with the following for maskIDs;  713 of pypeit')
+            # NOTE: If columnar_spec1d is False, an existing file that is
+            # updated keeps its layout
             all_specobjs.write_to_fits(subheader, outfile1d,
                                        update_det=update_det,
                                        slitspatnum=self.par['rdx']['slitspatnum'],
-                                       history=history)
+                                       history=history,
+                                       columnar=True if self.par['rdx']['columnar_spec1d'] else None)
             # Info
             outfiletxt = os.path.join(self.science_path, 'spec1d_{:s}.txt'.format(basename))
             # TODO: Note we re-read in the specobjs from disk to deal with situations where
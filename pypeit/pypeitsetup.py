@@ -411,6 +411,10 @@ class PypeItSetup:
             # Set default comb_id
             self.fitstbl.set_combination_groups()
 
+        # Save the metadata, frame types, and configurations to the
+        # persistent index, if one is used
+        self.fitstbl.write_index()
+
 #        # TODO: Are we planning to do this?
 #        # Assign science IDs based on the calibrations groups (to be
 #        # deprecated)
@@ -4,6 +4,7 @@ from pypeit.scripts import scriptbase
 
 # The import of all the script modules here is what enables the dynamic
 # compiling of all the available scripts below
+from pypeit.scripts import build_arxiv_store
 from pypeit.scripts import chk_alignments
 from pypeit.scripts import chk_edges
 from pypeit.scripts import chk_flats
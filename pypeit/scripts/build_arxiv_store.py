@@ -0,0 +1,47 @@
+"""
+Script to build the memory-mapped store of the archived arc spectra used for
+wavelength calibration.
+
+.. include common links, assuming primary doc root is up one directory
+.. include:: ../include/links.rst
+"""
+
+from pypeit.scripts import scriptbase
+
+
+class BuildArxivStore(scriptbase.ScriptBase):
+
+    @classmethod
+    def get_parser(cls, width=None):
+        parser = super().get_parser(description='Build the memory-mapped store of the archived '
+                                                'arc spectra in pypeit/data/arc_lines/reid_arxiv',
+                                    width=width)
+        parser.add_argument('files', type=str, nargs='*',
+                            help='Arxiv files to include, e.g. gemini_gmos_r831_ham.fits.  If '
+                                 'none are provided, all the fits and json files in the PypeIt '
+                                 'reid_arxiv directory are included.')
+        parser.add_argument('--store_path', type=str, default=None,
+                            help='Directory for the store.  If not provided, the store is '
+                                 'built in pypeit/data/arc_lines/reid_arxiv/store.')
+        parser.add_argument('--force', default=False, action='store_true',
+                            help='Rebuild the store even if it is up to date')
+        return parser
+
+    @staticmethod
+    def main(args):
+        import os
+        import glob
+
+        from pypeit import msgs
+        from pypeit.core.wavecal import waveio
+
+        files = args.files
+        if len(files) == 0:
+            files = sorted(glob.glob(os.path.join(waveio.reid_arxiv_path, '*.fits'))
+                           + glob.glob(os.path.join(waveio.reid_arxiv_path, '*.json')))
+
+        for f in files:
+            try:
+                waveio.ReidArxivStore(f, store_path=args.store_path, force=args.force)
+            except Exception as e:
+                msgs.warn('Could not build the store of {0}: {1}'.format(f, e))
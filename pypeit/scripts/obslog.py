@@ -72,6 +72,18 @@ class ObsLog(scriptbase.ScriptBase):
                             help='Path to top-level output directory.')
         parser.add_argument('-o', '--overwrite', default=False, action='store_true',
                             help='Overwrite any existing files/directories')
+        parser.add_argument('--header_nproc', default=1, type=int,
+                            help='Number of threads used to read the fits headers.  If 0, the '
+                                 'number of available CPUs is used.')
+        parser.add_argument('--header_cache', default=None, type=str,
+                            help='SQLite database file used to cache the fits headers.  Headers '
+                                 'of files that have not changed since they were cached are not '
+                                 'read again.')
+        parser.add_argument('--metadata_index', default=None, type=str,
+                            help='SQLite database file used as a persistent index of the frame '
+                                 'metadata, types, and configurations.  Only frames that are new '
+                                 'or have changed since the previous run are read, typed, and '
+                                 'assigned to a configuration.')
         parser.add_argument('-f', '--file', default=None, type=str,
                             help='Name for the ascii output file.  Any leading directory path is '
                                  'stripped; use -d to set the output directory.  If None, the '
@@ -110,6 +122,9 @@ class ObsLog(scriptbase.ScriptBase):
         # Generate the metadata table
         ps = PypeItSetup.from_file_root(args.root, args.spec, 
                                         extension=args.extension)
+        ps.par['rdx']['header_nproc'] = args.header_nproc
+        ps.par['rdx']['header_cache'] = args.header_cache
+        ps.par['rdx']['metadata_index'] = args.metadata_index
         ps.run(setup_only=True,  # This allows for bad headers
                write_files=False, 
                groupings=args.groupings,
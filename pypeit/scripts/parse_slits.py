@@ -65,7 +65,8 @@ class ParseSlits(scriptbase.ScriptBase):
             print_slits(slits)
         elif file_type == 'AllSpec2D':
             # Load
-            allspec2D = spec2dobj.AllSpec2DObj.from_fits(pargs.input_file, chk_version=False)
+            allspec2D = spec2dobj.AllSpec2DObj.from_fits(pargs.input_file, chk_version=False,
+                                                         lazy=True, images=[])
             # Loop on Detectors
             for det in allspec2D.detectors:
                 print('='*30 + f'{det:^7}' + '='*30)
@@ -87,11 +87,15 @@ class RunPypeIt(scriptbase.ScriptBase):
                                  '-o is used, the outputs for the input detector will be replaced.')
         parser.add_argument('-c', '--calib_only', default=False, action='store_true',
                             help='Only run on calibrations')
+        parser.add_argument('-n', '--nproc', default=1, type=int,
+                            help='Number of processes used to reduce independent calibration '
+                                 'groups concurrently.  Calibration groups are independent if '
+                                 'they do not share any frames.  Each process writes a separate '
+                                 'log file for each calibration group.  If 0, the number of '
+                                 'available CPUs is used.')
 
     #    parser.add_argument('-q', '--quick', default=False, help='Quick reduction',
     #                        action='store_true')
-    #    parser.add_argument('-c', '--cpus', default=False, action='store_true',
-    #                         help='Number of CPUs for parallel processing')
     #    parser.print_help()
 
         return parser
@@ -137,9 +141,9 @@ class RunPypeIt(scriptbase.ScriptBase):
             pypeIt.par['rdx']['detnum'] = int(args.detector)
 
         if args.calib_only:
-            calib_dict = pypeIt.calib_all()
+            calib_dict = pypeIt.calib_all(nproc=args.nproc)
         else:
-            pypeIt.reduce_all()
+            pypeIt.reduce_all(nproc=args.nproc)
         msgs.info('Data reduction complete')
 
         # QA HTML
@@ -44,6 +44,18 @@ class Setup(scriptbase.ScriptBase):
                             help='Include the background-pair columns for the user to edit')
         parser.add_argument('-m', '--manual_extraction', default=False, action='store_true',
                             help='Include the manual extraction column for the user to edit')
+        parser.add_argument('--header_nproc', default=1, type=int,
+                            help='Number of threads used to read the fits headers.  If 0, the '
+                                 'number of available CPUs is used.')
+        parser.add_argument('--header_cache', default=None, type=str,
+                            help='SQLite database file used to cache the fits headers.  Headers '
+                                 'of files that have not changed since they were cached are not '
+                                 'read again.')
+        parser.add_argument('--metadata_index', default=None, type=str,
+                            help='SQLite database file used as a persistent index of the frame '
+                                 'metadata, types, and configurations.  Only frames that are new '
+                                 'or have changed since the previous run are read, typed, and '
+                                 'assigned to a configuration.')
         parser.add_argument('-v', '--verbosity', type=int, default=2,
                             help='Level of verbosity from 0 to 2.')
         return parser
@@ -72,6 +84,9 @@ class Setup(scriptbase.ScriptBase):
         # Initialize PypeItSetup based on the arguments
         ps = PypeItSetup.from_file_root(args.root, args.spectrograph, extension=args.extension,
                                         output_path=sort_dir)
+        ps.par['rdx']['header_nproc'] = args.header_nproc
+        ps.par['rdx']['header_cache'] = args.header_cache
+        ps.par['rdx']['metadata_index'] = args.metadata_index
         # Run the setup
         ps.run(setup_only=True, sort_dir=sort_dir, write_bkg_pairs=args.background, 
                write_manual=args.manual_extraction, obslog=True)
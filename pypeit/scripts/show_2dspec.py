@@ -123,7 +123,9 @@ class Show2DSpec(scriptbase.ScriptBase):
             detname = DetectorContainer.get_name(det)
 
         # Load it up -- NOTE WE ALLOW *OLD* VERSIONS TO GO FORTH
-        spec2DObj = spec2dobj.Spec2DObj.from_file(args.file, detname, chk_version=False)
+        spec2DObj = spec2dobj.Spec2DObj.from_file(args.file, detname, chk_version=False,
+                                                  images=['sciimg', 'skymodel', 'objmodel',
+                                                          'ivarmodel', 'bpmmask', 'waveimg'])
         # Use the appropriate class to get the "detector" number
         det = spec2DObj.detector.parse_name(detname)
 
@@ -150,6 +150,9 @@ class TellFit(scriptbase.ScriptBase):
                                            only_orders=par['telluric']['only_orders'],
                                            bal_wv_min_max=par['telluric']['bal_wv_min_max'],
                                            maxiter=par['telluric']['maxiter'],
+                                           nresln_ladder=par['telluric']['nresln_ladder'],
+                                           vectorize=par['telluric']['vectorize'],
+                                           nproc=par['telluric']['nproc'],
                                            debug_init=args.debug, disp=args.debug,
                                            debug=args.debug, show=args.plot)
         elif par['telluric']['objmodel']=='star':
@@ -167,6 +170,9 @@ class TellFit(scriptbase.ScriptBase):
                                              delta_coeff_bounds=par['telluric']['delta_coeff_bounds'],
                                              minmax_coeff_bounds=par['telluric']['minmax_coeff_bounds'],
                                              maxiter=par['telluric']['maxiter'],
+                                             nresln_ladder=par['telluric']['nresln_ladder'],
+                                             vectorize=par['telluric']['vectorize'],
+                                             nproc=par['telluric']['nproc'],
                                              debug_init=args.debug, disp=args.debug,
                                              debug=args.debug, show=args.plot)
         elif par['telluric']['objmodel']=='poly':
@@ -182,6 +188,9 @@ class TellFit(scriptbase.ScriptBase):
                                              minmax_coeff_bounds=par['telluric']['minmax_coeff_bounds'],
                                              only_orders=par['telluric']['only_orders'],
                                              maxiter=par['telluric']['maxiter'],
+                                             nresln_ladder=par['telluric']['nresln_ladder'],
+                                             vectorize=par['telluric']['vectorize'],
+                                             nproc=par['telluric']['nproc'],
                                              debug_init=args.debug, disp=args.debug,
                                              debug=args.debug, show=args.plot)
         else:
@@ -742,6 +742,9 @@ class IRSensFunc(SensFunc):
                                                    popsize=self.par['IR']['popsize'],
                                                    recombination=self.par['IR']['recombination'],
                                                    polish=self.par['IR']['polish'],
+                                                   nresln_ladder=self.par['IR']['nresln_ladder'],
+                                                   vectorize=self.par['IR']['vectorize'],
+                                                   nproc=self.par['IR']['nproc'],
                                                    disp=self.par['IR']['disp'], debug=self.debug,
                                                    debug_init=self.debug)
 
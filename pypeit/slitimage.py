@@ -0,0 +1,349 @@
+"""
+Images that are evaluated slit by slit on demand, such as the tilts and
+wavelength images.
+
+.. include common links, assuming primary doc root is up one directory
+.. include:: ../include/links.rst
+
+"""
+from collections import OrderedDict
+
+import numpy as np
+from scipy import ndimage
+
+from pypeit import msgs
+from pypeit.core import tracewave
+
+from IPython import embed
+
+
+class SlitImage:
+    """
+    Base class for an image that is defined slit by slit and only
+    evaluated for the slits that are requested.
+
+    The pixels of each slit are identified once from the bounding box of
+    the slit in the slit mask, and the values of the most recently used
+    slits are cached.  The full image is only constructed by
+    :func:`to_array` (or by `numpy.asarray`_).
+
+    Derived classes must define :func:`_evaluate`.
+
+    Args:
+        slitmask (`numpy.ndarray`_):
+            Integer image with the spatial ID of the slit that each pixel
+            belongs to, and -1 for pixels that do not belong to any slit.
+        spat_id (array-like, optional):
+            The spatial IDs of the slits to evaluate.  Pixels in other
+            slits are 0.  If None, all slits in ``slitmask`` are
+            evaluated.
+        dtype (`numpy.dtype`_, optional):
+            Data type used to store the evaluated values.  Use
+            ``np.float32`` to halve the memory footprint.
+        cache_size (:obj:`int`, optional):
+            Maximum number of slits with cached values.  If None, the
+            values of all evaluated slits are cached; if 0, nothing is
+            cached.
+
+    Attributes:
+        shape (:obj:`tuple`):
+            Shape of the image.
+        spat_id (`numpy.ndarray`_):
+            The spatial IDs of the evaluated slits.
+    """
+    def __init__(self, slitmask, spat_id=None, dtype=float, cache_size=None):
+        self.slitmask = np.asarray(slitmask).astype(int, copy=False)
+        self.shape = self.slitmask.shape
+        self.dtype = np.dtype(dtype)
+        self.cache_size = cache_size
+        # Bounding boxes of all slits; element i is for the slit with
+        # spatial ID i.
+        self._boxes = ndimage.find_objects(self.slitmask + 1)
+        present = np.array([i for i, box in enumerate(self._boxes) if box is not None], dtype=int)
+        self.spat_id = present if spat_id is None \
+                            else np.atleast_1d(spat_id).astype(int)[np.isin(spat_id, present)]
+        self._cache = OrderedDict()
+
+    def __array__(self, dtype=None, copy=None):
+        image = self.to_array()
+        return image if dtype is None else image.astype(dtype, copy=False)
+
+    def _evaluate(self, spat_id, spec, spat):
+        """
+        Evaluate the image for one slit.
+
+        Args:
+            spat_id (:obj:`int`):
+                Spatial ID of the slit.
+            spec (`numpy.ndarray`_):
+                Spectral coordinates of the pixels to evaluate.
+            spat (`numpy.ndarray`_):
+                Spatial coordinates of the pixels to evaluate.
+
+        Returns:
+            `numpy.ndarray`_: The image values at the provided pixels.
+        """
+        raise NotImplementedError('Must be defined by the derived class.')
+
+    def pixels(self, spat_id):
+        """
+        Return the pixels in a slit.
+
+        Args:
+            spat_id (:obj:`int`):
+                Spatial ID of the slit.
+
+        Returns:
+            :obj:`tuple`: The spectral and spatial coordinates of the
+            pixels in the slit; both are empty if the slit is not in
+            the slit mask.
+        """
+        box = self._boxes[spat_id] if 0 <= spat_id < len(self._boxes) else None
+        if box is None:
+            return np.array([], dtype=int), np.array([], dtype=int)
+        spec, spat = np.nonzero(self.slitmask[box] == spat_id)
+        return spec + box[0].start, spat + box[1].start
+
+    def slit(self, spat_id):
+        """
+        Return the image values in a slit.
+
+        The values are cached, such that repeated calls for the same
+        slit do not evaluate the image again.
+
+        Args:
+            spat_id (:obj:`int`):
+                Spatial ID of the slit.
+
+        Returns:
+            `numpy.ndarray`_: The image values at the pixels returned
+            by :func:`pixels`.
+        """
+        if spat_id in self._cache:
+            self._cache.move_to_end(spat_id)
+            return self._cache[spat_id]
+        values = self._evaluate_slit(spat_id)
+        if self.cache_size is None or self.cache_size > 0:
+            self._cache[spat_id] = values
+            if self.cache_size is not None and len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return values
+
+    def _evaluate_slit(self, spat_id):
+        """
+        Evaluate all pixels of a slit, without caching.
+        """
+        if spat_id not in self.spat_id:
+            return np.zeros(self.pixels(spat_id)[0].size, dtype=self.dtype)
+        return np.asarray(self._evaluate(spat_id, *self.pixels(spat_id)), dtype=self.dtype)
+
+    def slit_cutout(self, spat_id):
+        """
+        Return the image in the bounding box of a slit.
+
+        Args:
+            spat_id (:obj:`int`):
+                Spatial ID of the slit.
+
+        Returns:
+            :obj:`tuple`: The slices selecting the bounding box in the
+            full image and the image in the bounding box, which is 0 for
+            pixels outside the slit.  Both are None if the slit is not
+            in the slit mask.
+        """
+        box = self._boxes[spat_id] if 0 <= spat_id < len(self._boxes) else None
+        if box is None:
+            return None, None
+        cutout = np.zeros(self.slitmask[box].shape, dtype=self.dtype)
+        spec, spat = self.pixels(spat_id)
+        cutout[spec - box[0].start, spat - box[1].start] = self.slit(spat_id)
+        return box, cutout
+
+    def at(self, spec, spat):
+        """
+        Return the image values at a set of pixels.
+
+        Args:
+            spec (`numpy.ndarray`_):
+                Spectral pixel coordinates.
+            spat (`numpy.ndarray`_):
+                Spatial pixel coordinates.
+
+        Returns:
+            `numpy.ndarray`_: The image values; pixels outside the
+            evaluated slits are 0.
+        """
+        ids = self.slitmask[spec, spat]
+        values = np.zeros(ids.shape, dtype=self.dtype)
+        for spat_id in np.intersect1d(ids, self.spat_id):
+            indx = ids == spat_id
+            values[indx] = self._evaluate(spat_id, spec[indx], spat[indx])
+        return values
+
+    def to_array(self):
+        """
+        Construct the full image.
+
+        Slits that are not already cached are evaluated but not added to
+        the cache.
+
+        Returns:
+            `numpy.ndarray`_: The full image, with 0 for pixels outside
+            the evaluated slits.
+        """
+        return self.fill(np.zeros(self.shape, dtype=self.dtype))
+
+    def fill(self, image, spat_id=None):
+        """
+        Write the values of a set of slits into an existing image.
+
+        Slits that are not already cached are evaluated but not added to
+        the cache.
+
+        Args:
+            image (`numpy.ndarray`_):
+                Image to fill, with shape :attr:`shape`.  Modified in
+                place.
+            spat_id (array-like, optional):
+                The spatial IDs of the slits to write.  IDs that are not
+                evaluated by this object are ignored.  If None, write
+                all evaluated slits.
+
+        Returns:
+            `numpy.ndarray`_: The filled image; i.e., ``image``.
+        """
+        if image.shape != self.shape:
+            msgs.error(f'Image shape {image.shape} does not match {self.shape}.')
+        _spat_id = self.spat_id if spat_id is None \
+                        else np.intersect1d(np.atleast_1d(spat_id).astype(int), self.spat_id)
+        for _id in _spat_id:
+            values = self._cache[_id] if _id in self._cache else self._evaluate_slit(_id)
+            image[self.pixels(_id)] = values
+        return image
+
+    def clear_cache(self):
+        """
+        Remove all cached slit values.
+        """
+        self._cache.clear()
+
+
+class LazyTiltImage(SlitImage):
+    """
+    Tilts image evaluated slit by slit from the tilt fits.
+
+    Args:
+        waveTilts (:class:`pypeit.wavetilts.WaveTilts`):
+            The tilt fits.
+        slitmask (`numpy.ndarray`_):
+            Integer image with the spatial ID of the slit that each pixel
+            belongs to, and -1 for pixels that do not belong to any slit.
+        flexure (:obj:`float`, optional):
+            Spatial shift of the tilt image onto the desired frame
+            (typically a science image)
+        dtype (`numpy.dtype`_, optional):
+            Data type used to store the evaluated tilts.
+        cache_size (:obj:`int`, optional):
+            Maximum number of slits with cached tilts.  If None, all
+            evaluated slits are cached.
+    """
+    def __init__(self, waveTilts, slitmask, flexure=None, dtype=float, cache_size=None):
+        super().__init__(slitmask, dtype=dtype, cache_size=cache_size)
+        self.waveTilts = waveTilts
+        self.flexure = 0. if flexure is None else flexure
+
+    def _evaluate(self, spat_id, spec, spat):
+        slit_idx = self.waveTilts.spatid_to_zero(spat_id)
+        coeff_out = self.waveTilts.coeffs[:self.waveTilts.spec_order[slit_idx]+1,
+                                          :self.waveTilts.spat_order[slit_idx]+1, slit_idx]
+        return tracewave.fit2tilts_pix(spec, spat, self.shape, coeff_out, self.waveTilts.func2d,
+                                       spat_shift=-1*self.flexure)
+
+
+class LazyWaveImage(SlitImage):
+    """
+    Wavelength image evaluated slit by slit from the wavelength
+    solutions and the tilts.
+
+    Only good slits are evaluated, which means any non-flagged slit or
+    slit flagged in the ``exclude_for_reducing`` list.
+
+    Args:
+        wv_calib (:class:`pypeit.wavecalib.WaveCalib`):
+            The wavelength solutions.
+        tilts (`numpy.ndarray`_, :class:`LazyTiltImage`):
+            The tilts image.  If it is a :class:`LazyTiltImage` with the
+            same slit mask, its cached tilts are reused.
+        slits (:class:`pypeit.slittrace.SlitTraceSet`):
+            The slit edges.
+        spat_flexure (:obj:`float`, optional):
+            Spatial flexure correction in pixels.
+        spec_flexure (:obj:`float`, `numpy.ndarray`_, optional):
+            Spectral flexure correction in pixels. If a float,
+            the same spectral flexure correction will be applied
+            to all slits. If a numpy array, the length of the
+            array should be the same as the number of slits. The
+            value of each element is the spectral shift in pixels
+            to be applied to each slit.
+        dtype (`numpy.dtype`_, optional):
+            Data type used to store the evaluated wavelengths.  If None,
+            the data type of ``tilts`` is used.
+        cache_size (:obj:`int`, optional):
+            Maximum number of slits with cached wavelengths.  If None,
+            all evaluated slits are cached.
+    """
+    def __init__(self, wv_calib, tilts, slits, spat_flexure=None, spec_flexure=None, dtype=None,
+                 cache_size=None):
+        # Check spatial flexure type
+        if (spat_flexure is not None) and (not isinstance(spat_flexure, float)):
+            msgs.error("Spatial flexure must be None or float")
+        # Check spectral flexure type
+        if spec_flexure is None: spec_flex = np.zeros(slits.nslits)
+        elif isinstance(spec_flexure, float): spec_flex = spec_flexure*np.ones(slits.nslits)
+        elif isinstance(spec_flexure, np.ndarray):
+            spec_flex = spec_flexure.copy()
+            assert(spec_flexure.size == slits.nslits)
+        self.spec_flex = spec_flex / (slits.nspec - 1)
+
+        # Setup
+        bpm = slits.mask.astype(bool)
+        bpm &= np.logical_not(slits.bitmask.flagged(slits.mask, flag=slits.bitmask.exclude_for_reducing))
+        ok_slits = np.logical_not(bpm)
+        slitmask = slits.slit_img(flexure=spat_flexure, exclude_flag=slits.bitmask.exclude_for_reducing)
+        super().__init__(slitmask, spat_id=slits.spat_id[ok_slits],
+                         dtype=tilts.dtype if dtype is None else dtype, cache_size=cache_size)
+        if self.spat_id.size != np.sum(ok_slits):
+            msgs.error("Something failed in wavelengths or masking..")
+
+        self.wv_calib = wv_calib
+        self.tilts = tilts
+        self.slits = slits
+        self._same_slitmask = isinstance(tilts, SlitImage) \
+                                and np.array_equal(tilts.slitmask, self.slitmask)
+
+        # If this is echelle print out a status message and do some error checking
+        self.echelle = self.wv_calib.par['echelle']
+        if self.echelle:
+            msgs.info('Evaluating 2-d wavelength solution for echelle....')
+
+    def _evaluate_slit(self, spat_id):
+        if self._same_slitmask and spat_id in self.spat_id:
+            # Reuse the (cached) tilts of the slit
+            return np.asarray(self._wave(spat_id, self.tilts.slit(spat_id)), dtype=self.dtype)
+        return super()._evaluate_slit(spat_id)
+
+    def _evaluate(self, spat_id, spec, spat):
+        tilts = self.tilts.at(spec, spat) if isinstance(self.tilts, SlitImage) \
+                    else self.tilts[spec, spat]
+        return self._wave(spat_id, tilts)
+
+    def _wave(self, spat_id, tilts):
+        """
+        Evaluate the wavelength solution of a slit at the provided tilts.
+        """
+        islit = self.slits.spatid_to_zero(spat_id)
+        if self.echelle:
+            order = self.slits.ech_order[islit]
+            return self.wv_calib.wv_fit2d.eval(tilts + self.spec_flex[islit],
+                                               x2=np.full_like(tilts, order)) / order
+        return self.wv_calib.wv_fits[islit].pypeitfit.eval(tilts + self.spec_flex[islit])
@@ -101,7 +101,7 @@ class Spec2DObj(datamodel.DataContainer):
                                   descr='Detector or Mosaic metadata') }
 
     @classmethod
-    def from_file(cls, file, detname, chk_version=True):
+    def from_file(cls, file, detname, chk_version=True, images=None):
         """
         Overload :func:`pypeit.datamodel.DataContainer.from_file` to allow det
         input and to slurp the header
@@ -114,6 +114,8 @@ class Spec2DObj(datamodel.DataContainer):
                 the data that is read.
             chk_version (:obj:`bool`, optional):
                 If False, allow a mismatch in datamodel to proceed
+            images (:obj:`list`, optional):
+                The subset of images to read; see :func:`from_hdu`.
 
         Returns:
             :class:`~pypeit.spec2dobj.Spec2DObj`: 2D spectra object.
@@ -123,11 +125,51 @@ class Spec2DObj(datamodel.DataContainer):
         # Quick check on det
         if not np.any([detname in hdu.name for hdu in hdul]):
             msgs.error(f'{detname} not available in any extension of {file}')
-        slf = super().from_hdu(hdul, hdu_prefix=f'{detname}-', chk_version=chk_version)
+        slf = cls.from_hdu(hdul, hdu_prefix=f'{detname}-', chk_version=chk_version, images=images)
         slf.head0 = hdul[0].header
         slf.chk_version = chk_version
         return slf
 
+    @classmethod
+    def from_hdu(cls, hdu, ext=None, ext_pseudo=None, hdu_prefix=None, chk_version=True,
+                 allow_subclasses=False, images=None):
+        """
+        Overload :func:`pypeit.datamodel.DataContainer.from_hdu` to allow
+        only a subset of the images to be read.
+
+        The data of the images that are not requested are never accessed,
+        meaning that they are not read from disk if the file is
+        memory-mapped.  Their headers are still parsed, such that all the
+        scalar datamodel items are always read.
+
+        Args:
+            hdu (`astropy.io.fits.HDUList`_):
+                The HDUs with the data to use for instantiation.
+            ext, ext_pseudo, hdu_prefix, chk_version, allow_subclasses:
+                Passed to :func:`pypeit.datamodel.DataContainer.from_hdu`.
+            images (:obj:`list`, optional):
+                The names of the image datamodel items to read; e.g.,
+                ``['sciimg', 'waveimg']``.  All other images are None.  If
+                None, all images are read.
+
+        Returns:
+            :class:`~pypeit.spec2dobj.Spec2DObj`: 2D spectra object.
+        """
+        if images is not None:
+            all_images = [key for key in cls.datamodel.keys()
+                            if cls.datamodel[key]['otype'] == np.ndarray]
+            bad = [img for img in images if img not in all_images]
+            if len(bad) > 0:
+                msgs.error(f'Unknown {cls.__name__} images: {bad}.  Options are: {all_images}')
+            prefix = '' if hdu_prefix is None else hdu_prefix
+            skip = [prefix + key.upper() for key in all_images if key not in images]
+            # Replace the HDUs with the images that are not requested by
+            # header-only HDUs
+            hdu = fits.HDUList([fits.ImageHDU(header=h.header, name=h.name) if h.name in skip
+                                    else h for h in hdu])
+        return super().from_hdu(hdu, ext=ext, ext_pseudo=ext_pseudo, hdu_prefix=hdu_prefix,
+                                chk_version=chk_version, allow_subclasses=allow_subclasses)
+
     def __init__(self, sciimg, ivarraw, skymodel, objmodel, ivarmodel,
                  scaleimg, waveimg, bpmmask, detector, sci_spat_flexure, sci_spec_flexure,
                  vel_type, vel_corr, slits, tilts, maskdef_designtab):
@@ -317,10 +359,13 @@ class AllSpec2DObj:
     Restrict keys to be type int or 'meta'
     and items to be :class:`Spec2DObj`
 
+    When read lazily (see :func:`from_fits`), the :class:`Spec2DObj` of each
+    detector/mosaic is only parsed from the file when it is first accessed.
+
     """
     hdr_prefix = 'ALLSPEC2D_'
     @classmethod
-    def from_fits(cls, filename, chk_version=True):
+    def from_fits(cls, filename, chk_version=True, lazy=False, images=None):
         """
 
         Args:
@@ -329,6 +374,14 @@ class AllSpec2DObj:
             chk_version (:obj:`bool`, optional):
                 If True, demand the on-disk datamodel equals the current one.
                 Passed to from_hdu() of DataContainer.
+            lazy (:obj:`bool`, optional):
+                If True, the file is memory-mapped and only the primary
+                header is read.  The data for each detector/mosaic are read
+                when the detector is first accessed; see :func:`__getitem__`.
+                Otherwise, all the detectors are read immediately.
+            images (:obj:`list`, optional):
+                The subset of images to read for each detector; see
+                :func:`Spec2DObj.from_hdu`.  If None, all images are read.
 
         Returns:
             :class:`~pypeit.spec2dobj.AllSpec2DObj`: The constructed object.
@@ -336,7 +389,7 @@ class AllSpec2DObj:
         # Instantiate
         self = cls()
         # Open
-        hdul = io.fits_open(filename)
+        hdul = io.fits_open(filename, memmap=True) if lazy else io.fits_open(filename)
         # Meta
         for key in hdul[0].header.keys():
             if key == self.hdr_prefix+'DETS':
@@ -347,13 +400,23 @@ class AllSpec2DObj:
         # Detectors included
         detectors = hdul[0].header[self.hdr_prefix+'DETS']
         for detname in detectors.split(','):
+            if lazy:
+                # Placeholder until the detector is accessed
+                self.__dict__[detname] = None
+                continue
             self[detname] = Spec2DObj.from_hdu(hdul, hdu_prefix=f'{detname}-',
-                                               chk_version=chk_version)
+                                               chk_version=chk_version, images=images)
+        if lazy:
+            self._hdul = hdul
+            self._read_kwargs = dict(chk_version=chk_version, images=images)
         return self
 
     def __init__(self):
         # Init meta
         self['meta'] = {}
+        # Internals used for lazy reading
+        self._hdul = None
+        self._read_kwargs = None
 
     # TODO -- Turn off attribute setting
 
@@ -373,7 +436,7 @@ class AllSpec2DObj:
         """
         Return the list of attributes
         """
-        return list(self.__dict__.keys())
+        return [key for key in self.__dict__.keys() if not key.startswith('_')]
 
 #    def __setitem__(self, item, value):
 #        """
@@ -407,9 +470,38 @@ class AllSpec2DObj:
         self.__dict__[item] = value
 
     def __getitem__(self, item):
-        """Get an item directly from the internal dict."""
+        """
+        Get an item directly from the internal dict.
+
+        If the object was read lazily and the detector has not yet been
+        accessed, its :class:`Spec2DObj` is first parsed from the file.
+        """
+        if self.__dict__[item] is None and self._hdul is not None:
+            self.__dict__[item] = Spec2DObj.from_hdu(self._hdul, hdu_prefix=f'{item}-',
+                                                     **self._read_kwargs)
         return self.__dict__[item]
 
+    @property
+    def loaded(self):
+        """
+        Return the list of detector/mosaic names that have been read.
+        """
+        return [det for det in self.detectors if self.__dict__[det] is not None]
+
+    def close(self):
+        """
+        Close the file of a lazily read object.
+
+        Any detector that has not yet been accessed is removed.
+        """
+        if self._hdul is None:
+            return
+        for det in self.detectors:
+            if self.__dict__[det] is None:
+                del self.__dict__[det]
+        self._hdul.close()
+        self._hdul = None
+
     def build_primary_hdr(self, raw_header, spectrograph, master_key_dict=None, master_dir=None,
                           redux_path=None, subheader=None, history=None):
         """
@@ -222,6 +222,9 @@ class SpecObj(datamodel.DataContainer):
         return slf
 
     def _init_internals(self):
+        # Number of times an attribute has been set; see __setitem__
+        self._revision = 0
+
         # Object finding
         self.smash_peakflux = None
         self.smash_nsig = None
@@ -243,6 +246,16 @@ class SpecObj(datamodel.DataContainer):
         self.ech_frac_was_fit = None #
         self.ech_snr = None #
 
+    def __setitem__(self, item, value):
+        """
+        Overload the base class method to count the number of times the
+        attributes are set.  The count is used by
+        :class:`~pypeit.specobjs.SpecObjs` to check that its cached attribute
+        arrays are current.
+        """
+        super().__setitem__(item, value)
+        self.__dict__['_revision'] += 1
+
     def _validate(self):
         """
         Validate the object.
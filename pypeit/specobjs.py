@@ -14,7 +14,7 @@ import numpy as np
 
 from astropy import units
 from astropy.io import fits
-from astropy.table import Table
+from astropy.table import Table, MaskedColumn
 from astropy.time import Time
 
 from pypeit import msgs
@@ -35,10 +35,21 @@ class SpecObjs:
 
         - ``__getitem__`` to allow one to pull an attribute or a portion
           of the SpecObjs list
+        - ``__setitem__`` to allow one to replace a portion of the SpecObjs
+          list
         - ``__setattr__`` to force a custom assignment method
         - ``__getattr__`` to generate an array of attribute 'k' from the
           specobjs.
 
+    The arrays generated by ``__getattr__`` are cached, and they are only
+    regenerated after an attribute of one of the
+    :class:`~pypeit.specobj.SpecObj` objects in this set is set or the list
+    of objects is changed.  The cached arrays are returned read-only; copy
+    them to modify them.  The exceptions are the attributes in
+    :attr:`copied_attributes`.  The array with the
+    :class:`~pypeit.specobj.SpecObj` objects is also read-only; assign a new
+    array to change it.
+
     Args:
         specobjs (`numpy.ndarray`_, list, optional):
             One or more :class:`~pypeit.specobj.SpecObj`  objects
@@ -48,16 +59,30 @@ class SpecObjs:
     """
     version = '1.0.0'
 
+    copied_attributes = ['OPT_COUNTS', 'BOX_COUNTS']
+    """
+    Attributes with arrays that are modified in place (e.g., by
+    :func:`make_neg_pos`).  A writeable copy of the cached array is returned
+    for these attributes.
+    """
+
     #TODO JFH This method only populates some of the underlying specobj attributes, for example RA and DEC are not
     # getting set. We should do our best to populate everything that got written out to the file. This is part of having
     # a rigid data model.
     @classmethod
-    def from_fitsfile(cls, fits_file, det=None, chk_version=True):
+    def from_fitsfile(cls, fits_file, det=None, chk_version=True, names=None, slitids=None,
+                      maskdef_ids=None):
         """
         Instantiate from a spec1d FITS file
 
         Also tag on the Header
 
+        Both the default layout, with one extension per spectrum, and the
+        columnar layout (see :func:`write_to_fits`) can be read.  The
+        spectra can be selected by detector, name, slit, or slitmask ID; any
+        spectrum that does not match *all* the provided selection criteria
+        is not parsed.
+
         Args:
             fits_file (:obj:`str`):
                 The name of the fits file to read.
@@ -66,6 +91,15 @@ class SpecObjs:
                 the loaded spectra.  If None, all spectra are loaded.
             chk_version (:obj:`bool`, optional):
                 If False, allow a mismatch in datamodel to proceed
+            names (:obj:`str`, :obj:`list`, optional):
+                One or more object names (``NAME``) to load.  If None, the
+                names are not used to select the spectra.
+            slitids (:obj:`int`, :obj:`list`, optional):
+                One or more slit IDs (``SLITID``) to load.  If None, the slit
+                IDs are not used to select the spectra.
+            maskdef_ids (:obj:`int`, :obj:`list`, optional):
+                One or more slitmask IDs (``MASKDEF_ID``) to load.  If None,
+                the slitmask IDs are not used to select the spectra.
 
         Returns:
             :class:`~pypeit.specobjs.SpecObjs`: The loaded spectra from the
@@ -97,13 +131,20 @@ class SpecObjs:
             detector_hdus[_det] = dmodcls.from_hdu(hdu)
 
         # Now the objects
-        for hdu in hdul[1:]:
-            if 'DETECTOR' in hdu.name:
-                continue
-            sobj = specobj.SpecObj.from_hdu(hdu, chk_version=chk_version)
-            # Restrict on det?
-            if det is not None and sobj.DET != det:
-                continue
+        selection = dict(det=det, names=names, slitids=slitids, maskdef_ids=maskdef_ids)
+        if hdul[0].header.get('LAYOUT') == 'COLUMNAR':
+            sobjs = read_columnar_hdus(hdul, chk_version=chk_version, **selection)
+        else:
+            sobjs = []
+            for hdu in hdul[1:]:
+                if 'DETECTOR' in hdu.name:
+                    continue
+                # Restrict using the header, before parsing the data
+                if not select_specobjs([[hdu.header.get(key)] for key in _select_keys],
+                                       **selection)[0]:
+                    continue
+                sobjs += [specobj.SpecObj.from_hdu(hdu, chk_version=chk_version)]
+        for sobj in sobjs:
             # Check for detector
             if sobj.DET in detector_hdus.keys():
                 sobj.DETECTOR = detector_hdus[sobj.DET]
@@ -142,6 +183,13 @@ class SpecObjs:
                 Value of the item
 
         """
+        if item == 'specobjs':
+            # Objects can only be changed by assigning a new array, which
+            # resets the cached attribute arrays
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+            dict.__setattr__(self, '_columns', {})
+            return dict.__setattr__(self, item, value)
         if not '_SpecObjs__initialised' in self.__dict__:  # this test allows attributes to be set in the __init__ method
             return dict.__setattr__(self, item, value)
         elif item in self.__dict__:  # any normal attributes are handled normally
@@ -573,12 +621,28 @@ class SpecObjs:
             # For all, a new table is constructed with slice of all columns
             return SpecObjs(specobjs=self.specobjs[item], header=self.header)
 
+    def __setitem__(self, item, value):
+        """
+        Overload to allow one to replace a portion of the SpecObjs list
+
+        Args:
+            item (:obj:`int`, :obj:`slice`, `numpy.ndarray`_):
+                The objects to replace.
+            value (:class:`~pypeit.specobj.SpecObj`, :class:`SpecObjs`, :obj:`list`, `numpy.ndarray`_):
+                The replacement object(s).
+        """
+        specobjs = self.specobjs.copy()
+        specobjs[item] = value.specobjs if isinstance(value, SpecObjs) else value
+        self.specobjs = specobjs
+
     def __getattr__(self, attr):
         """
         Overloaded to generate an array of attribute 'k' from the
         :class:`pypeit.specobj.SpecObj` objects.
 
-        First attempts to grab data from the Summary table, then the list
+        The array is cached until an attribute of one of the
+        :class:`~pypeit.specobj.SpecObj` objects is set or the list of
+        objects is changed.
         """
         if len(self.specobjs) == 0:
             raise ValueError('SpecObjs is empty!')
@@ -589,7 +653,13 @@ class SpecObjs:
         except NameError:
             raise NameError(f'{attr} is not an attribute of SpecObjs or SpecObj.')
 
-        return lst_to_array([getattr(specobj, attr) for specobj in self.specobjs])
+        revisions = [sobj._revision for sobj in self.specobjs]
+        column, _revisions = self._columns.get(attr, (None, None))
+        if _revisions != revisions:
+            column = lst_to_array([getattr(sobj, attr) for sobj in self.specobjs])
+            column.flags.writeable = False
+            self._columns[attr] = (column, revisions)
+        return column.copy() if attr in self.copied_attributes else column
 
     # Printing
     def __repr__(self):
@@ -615,10 +685,19 @@ class SpecObjs:
         return self.specobjs.shape
 
     def write_to_fits(self, subheader, outfile, overwrite=True, update_det=None,
-                      slitspatnum=None, history=None, debug=False):
+                      slitspatnum=None, history=None, debug=False, columnar=None):
         """
         Write the set of SpecObj objects to one multi-extension FITS file
 
+        By default, each spectrum is written to its own extension.  In the
+        columnar layout, all spectra are written to two binary tables: an
+        ``INDEX`` table with one row per spectrum with all the scalar
+        datamodel items, and a ``SPECTRA`` table with the arrays of all
+        spectra packed one after the other.  The spectra to read can then be
+        selected from the index without parsing the rest of the file; see
+        :func:`from_fitsfile`.  The columnar layout requires all the arrays of
+        each spectrum to have the same length.
+
         Args:
             subheader (:obj:`dict`):
             outfile (str):
@@ -630,16 +709,29 @@ class SpecObjs:
             update_det (int or list, optional):
               If provided, do not clobber the existing file but only update
               the indicated detectors.  Useful for re-running on a subset of detectors
+            columnar (bool, optional):
+              Write the file using the columnar layout.  If None, the layout
+              is set by the ``LAYOUT`` keyword in ``subheader``, if present,
+              such that spectra read from a columnar file are written back
+              in the same layout.  Otherwise, if an existing file is updated
+              (see ``update_det`` and ``slitspatnum``), it keeps its
+              layout.
 
         """
         if os.path.isfile(outfile) and not overwrite:
             msgs.warn(f'{outfile} exits. Set overwrite=True to overwrite it.')
             return
+        update = os.path.isfile(outfile) and (update_det is not None or slitspatnum is not None)
+        if columnar is None:
+            layout = subheader.get('LAYOUT', None)
+            if layout is None and update:
+                layout = fits.getheader(outfile).get('LAYOUT', None)
+            columnar = layout == 'COLUMNAR'
 
         # If the file exists and update_det (and slit_spat_num) is provided, use the existing header
         #   and load up all the other hdus so that we only over-write the ones
         #   we are updating
-        if os.path.isfile(outfile) and (update_det is not None or slitspatnum is not None):
+        if update:
             _specobjs = SpecObjs.from_fitsfile(outfile)
             mask = np.ones(_specobjs.nobj, dtype=bool)
             # Update_det
@@ -668,6 +760,10 @@ class SpecObjs:
                         header[key.upper()] = line
             else:
                 header[key.upper()] = subheader[key]
+        if columnar:
+            header['LAYOUT'] = ('COLUMNAR', 'Spec1D file layout')
+        elif 'LAYOUT' in header:
+            del header['LAYOUT']
 
         # Init
         prihdu = fits.PrimaryHDU()
@@ -684,6 +780,11 @@ class SpecObjs:
 
         detector_hdus = {}
         nspec, ext = 0, 0
+        if columnar:
+            _hdus, detector_hdus = columnar_hdus([sobj for sobj in _specobjs if sobj is not None])
+            nspec = len(_hdus[0].data)
+            hdus += _hdus
+            _specobjs = []
         # Loop on the SpecObj objects
         for sobj in _specobjs:
             if sobj is None:
@@ -918,6 +1019,157 @@ class SpecObjs:
         return groups
 
 
+_select_keys = ['DET', 'NAME', 'SLITID', 'MASKDEF_ID']
+"""
+The :class:`~pypeit.specobj.SpecObj` datamodel items used to select spectra
+when reading a spec1d file.
+"""
+
+
+def select_specobjs(values, det=None, names=None, slitids=None, maskdef_ids=None):
+    """
+    Select spectra by their detector, name, slit, or slitmask ID.
+
+    Args:
+        values (:obj:`list`):
+            The values of the :attr:`_select_keys` items.  Each element is a
+            sequence with one value per spectrum; missing values must be
+            None.
+        det (:obj:`str`, optional):
+            Detector or mosaic to select.
+        names (:obj:`str`, :obj:`list`, optional):
+            Object names to select.
+        slitids (:obj:`int`, :obj:`list`, optional):
+            Slit IDs to select.
+        maskdef_ids (:obj:`int`, :obj:`list`, optional):
+            Slitmask IDs to select.
+
+    Returns:
+        `numpy.ndarray`_: Boolean array selecting the spectra that match all
+        the provided criteria.
+    """
+    gpm = np.ones(len(values[0]), dtype=bool)
+    for vals, sel in zip(values, [det, names, slitids, maskdef_ids]):
+        if sel is None:
+            continue
+        sel = np.atleast_1d(sel).tolist()
+        gpm &= np.array([v in sel for v in vals], dtype=bool)
+    return gpm
+
+
+def columnar_hdus(sobjs):
+    """
+    Construct the binary tables used by the columnar spec1d layout.
+
+    See :func:`SpecObjs.write_to_fits`.
+
+    Args:
+        sobjs (:obj:`list`):
+            The :class:`~pypeit.specobj.SpecObj` objects to write.
+
+    Returns:
+        :obj:`tuple`: The list with the ``INDEX`` and ``SPECTRA``
+        `astropy.io.fits.BinTableHDU`_ objects, and a dictionary with the HDUs
+        with the detector/mosaic metadata, keyed by the detector name.
+    """
+    dm = specobj.SpecObj.datamodel
+    scalar_keys = [key for key in dm.keys() if dm[key]['otype'] != np.ndarray
+                        and key != 'DETECTOR']
+    array_keys = [key for key in dm.keys() if dm[key]['otype'] == np.ndarray
+                        and any([sobj[key] is not None for sobj in sobjs])]
+
+    # Arrays included for each spectrum and their length
+    present = [[key for key in array_keys if sobj[key] is not None] for sobj in sobjs]
+    npix = np.zeros(len(sobjs), dtype=int)
+    detector_hdus = {}
+    for i, sobj in enumerate(sobjs):
+        sizes = np.unique([sobj[key].size for key in present[i]])
+        if sizes.size > 1:
+            msgs.error(f'The arrays of {sobj.NAME} have different lengths; cannot use the '
+                       'columnar spec1d layout.')
+        npix[i] = 0 if sizes.size == 0 else sizes[0]
+        if sobj.DETECTOR is not None:
+            detector_hdus[sobj.DET] = sobj.DETECTOR.to_hdu()[0]
+    start = np.concatenate(([0], np.cumsum(npix)))[:len(sobjs)]
+
+    # Index with the scalar items; missing values are masked
+    index = Table()
+    for key in scalar_keys:
+        otype = dm[key]['otype'][0] if isinstance(dm[key]['otype'], tuple) else dm[key]['otype']
+        values = [sobj[key] for sobj in sobjs]
+        mask = [v is None for v in values]
+        dtype, fill = (str, '') if otype == str else ((float, 0.) if otype == float else (int, 0))
+        index[key] = MaskedColumn([fill if m else v for v, m in zip(values, mask)], mask=mask,
+                                  dtype=dtype)
+    index['SPEC_START'] = start
+    index['SPEC_NPIX'] = npix
+    index['SPEC_ARRAYS'] = [','.join(p) for p in present]
+    index_hdu = fits.table_to_hdu(index)
+    index_hdu.name = 'INDEX'
+    index_hdu.header['DMODCLS'] = (specobj.SpecObj.__name__, 'Datamodel class')
+    index_hdu.header['DMODVER'] = (specobj.SpecObj.version, 'Datamodel version')
+
+    # Packed arrays
+    spectra = Table()
+    for key in array_keys:
+        dtype = next(sobj[key].dtype for sobj in sobjs if sobj[key] is not None)
+        spectra[key] = np.zeros(np.sum(npix), dtype=dtype)
+        for i, sobj in enumerate(sobjs):
+            if sobj[key] is not None:
+                spectra[key][start[i]:start[i]+npix[i]] = sobj[key]
+    spectra_hdu = fits.table_to_hdu(spectra)
+    spectra_hdu.name = 'SPECTRA'
+
+    return [index_hdu, spectra_hdu], detector_hdus
+
+
+def read_columnar_hdus(hdul, chk_version=True, **selection):
+    """
+    Read the spectra from a spec1d file with the columnar layout.
+
+    Only the rows of the packed arrays of the selected spectra are read.
+
+    Args:
+        hdul (`astropy.io.fits.HDUList`_):
+            The opened spec1d file.
+        chk_version (:obj:`bool`, optional):
+            If False, allow a mismatch in datamodel to proceed
+        **selection:
+            Selection criteria passed to :func:`select_specobjs`.
+
+    Returns:
+        :obj:`list`: The selected :class:`~pypeit.specobj.SpecObj` objects,
+        without the detector/mosaic metadata.
+    """
+    dm = specobj.SpecObj.datamodel
+    if hdul['INDEX'].header['DMODVER'] != specobj.SpecObj.version:
+        _f = msgs.error if chk_version else msgs.warn
+        _f(f'Current version of SpecObj object in code (v{specobj.SpecObj.version}) does not '
+           'match version used to write your HDU(s)!')
+    index = Table.read(hdul['INDEX'])
+    values = [[None if np.ma.is_masked(v) else v for v in index[key]] for key in _select_keys]
+    indx = np.where(select_specobjs(values, **selection))[0]
+    if indx.size == 0:
+        return []
+
+    spectra = hdul['SPECTRA'].data
+    sobjs = []
+    for i in indx:
+        d = dict.fromkeys(dm.keys())
+        for key in index.colnames:
+            if key not in dm or np.ma.is_masked(index[key][i]):
+                continue
+            d[key] = bool(index[key][i]) if dm[key]['otype'] == bool else index[key][i].item()
+        arrays = np.ma.filled(index['SPEC_ARRAYS'], '')[i]
+        if len(arrays) > 0:
+            rows = spectra[index['SPEC_START'][i]:index['SPEC_START'][i]+index['SPEC_NPIX'][i]]
+            for key in arrays.split(','):
+                # Force native byte ordering
+                d[key] = rows[key].astype(rows[key].dtype.type)
+        sobjs += [specobj.SpecObj.from_dict(d=d)]
+    return sobjs
+
+
 def lst_to_array(lst, mask=None):
     """
     Simple method to convert a list to an array
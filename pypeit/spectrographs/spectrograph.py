@@ -1238,11 +1238,10 @@ class Spectrograph:
             :obj:`list`: A list of `astropy.io.fits.Header`_ objects with the
             extension headers.
         """
-        # Faster to open the whole file and then assign the headers,
-        # particularly for gzipped files (e.g., DEIMOS)
+        # Only read the header blocks of the file
         if isinstance(inp, str):
             try:
-                hdu = io.fits_open(inp)
+                return io.read_fits_headers(inp)
             except:
                 if strict:
                     msgs.error('Problem opening {0}.'.format(inp))
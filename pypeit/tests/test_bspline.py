@@ -300,3 +300,35 @@ def test_profile_twod():
                                   kwargs_reject={'groupbadpix': True, 'maxrej': 10}, quiet=True)
         assert np.allclose(d['twod_flat_fit'], twod_flat_fit), 'Bad 2D bspline result'
 
+
+
+@bspline_ext_required
+def test_cholesky_band_solve_versions():
+    # Import only when the test is performed
+    from pypeit.bspline.utilpy import cholesky_band_solve as cholesky_band_solve_py
+    from pypeit.bspline.utilc import cholesky_band, cholesky_solve
+    from pypeit.bspline.utilc import cholesky_band_solve as cholesky_band_solve_c
+
+    # Read data
+    d = np.load(data_path('cholesky_band_l.npz'))
+    l = d['l']
+    bb = np.linspace(1., 2., l.shape[1])
+
+    # Decompose and solve in one call
+    e, a = cholesky_band(l, mininf=d['mininf'])
+    b = cholesky_solve(a, bb)[1]
+    _e, _a, _b = cholesky_band_solve_c(l, bb, mininf=d['mininf'])
+    assert _e == -1, 'Decomposition should succeed'
+    assert np.array_equal(a, _a) and np.array_equal(b, _b), 'Fused solution changed'
+    _e, _a, _b = cholesky_band_solve_py(l, bb, mininf=d['mininf'])
+    assert _e == -1, 'Decomposition should succeed'
+    assert np.allclose(a, _a) and np.allclose(b, _b), 'Bad python solution'
+
+    # A system that cannot be decomposed
+    bad = l.copy()
+    bad[0,5] = -1.
+    for cholesky_band_solve in [cholesky_band_solve_c, cholesky_band_solve_py]:
+        _e, _a, _b = cholesky_band_solve(bad, bb, mininf=d['mininf'])
+        assert np.array_equal(_e, [5]), 'Bad entry not caught'
+        assert np.array_equal(_a, bad) and np.array_equal(_b, bb), \
+                'Failed systems should return the input'
@@ -10,7 +10,7 @@ from IPython import embed
 import numpy as np
 
 from pypeit.images import buildimage
-from pypeit.tests.tstutils import dev_suite_required
+from pypeit.tests.tstutils import dev_suite_required, data_path
 from pypeit.spectrographs.util import load_spectrograph
 
 @dev_suite_required
@@ -48,3 +48,48 @@ def test_lris_red_biases():
     bias = buildimage.buildimage_fromlist(spectrograph, 1, par['calibrations']['biasframe'], files)
 
 
+def test_combine_memmap():
+    # Use the flats because they have signal
+    files = [data_path(f'b1{i}.fits.gz') for i in range(1,4)]
+    spectrograph = load_spectrograph('shane_kast_blue')
+    par = spectrograph.default_pypeit_par()['calibrations']['pixelflatframe']
+    par['process']['use_biasimage'] = False
+    for method in ['mean', 'median']:
+        par['process']['combine'] = method
+        par['process']['stack_memmap'] = False
+        flat = buildimage.buildimage_fromlist(spectrograph, 1, par, files)
+        par['process']['stack_memmap'] = True
+        par['process']['stack_tile_nspec'] = 100
+        flat_memmap = buildimage.buildimage_fromlist(spectrograph, 1, par, files)
+        assert np.array_equal(flat.image, flat_memmap.image), \
+                f'Memory-mapped {method} combination changed the image'
+        assert np.array_equal(flat.ivar, flat_memmap.ivar), \
+                f'Memory-mapped {method} combination changed the inverse variance'
+        assert np.array_equal(flat.fullmask, flat_memmap.fullmask), \
+                f'Memory-mapped {method} combination changed the mask'
+
+
+def test_combine_nproc():
+    files = [data_path(f'b1{i}.fits.gz') for i in range(1,4)]
+    spectrograph = load_spectrograph('shane_kast_blue')
+    par = spectrograph.default_pypeit_par()['calibrations']['pixelflatframe']
+    par['process']['use_biasimage'] = False
+    flat = buildimage.buildimage_fromlist(spectrograph, 1, par, files)
+    par['process']['nproc'] = 2
+    flat_nproc = buildimage.buildimage_fromlist(spectrograph, 1, par, files)
+    assert np.array_equal(flat.image, flat_nproc.image), \
+            'Parallel processing changed the combined image'
+    assert np.array_equal(flat.ivar, flat_nproc.ivar), \
+            'Parallel processing changed the combined inverse variance'
+
+    # With a bias image and bad-pixel mask shared with the processes
+    bias_par = spectrograph.default_pypeit_par()['calibrations']['biasframe']
+    bias = buildimage.buildimage_fromlist(spectrograph, 1, bias_par, files[:2])
+    bpm = spectrograph.bpm(files[0], 1)
+    par['process']['use_biasimage'] = True
+    par['process']['nproc'] = 1
+    flat = buildimage.buildimage_fromlist(spectrograph, 1, par, files, bias=bias, bpm=bpm)
+    par['process']['nproc'] = 2
+    flat_nproc = buildimage.buildimage_fromlist(spectrograph, 1, par, files, bias=bias, bpm=bpm)
+    assert np.array_equal(flat.image, flat_nproc.image), \
+            'Parallel processing changed the bias-subtracted image'
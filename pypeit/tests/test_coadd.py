@@ -12,7 +12,8 @@ from linetools.spectra.xspectrum1d import XSpectrum1D
 
 from pypeit.core import coadd
 from pypeit.spectrographs.util import load_spectrograph
-from pypeit.core.datacube import coadd_cube
+from pypeit.core.datacube import coadd_cube, histogram_indices, scatter_histogram, \
+    generate_masterWCS, make_cube_chunked
 from pypeit import msgs
 from pypeit import utils
 from IPython import embed
@@ -107,6 +108,63 @@ def dummy_spectra(s2n=10., seed=1234, wvmnx=None, npix=None):
 #    #coadd.coadd_spectra(dspec, wave_method='concatenate', qafile='tst.pdf')
 #
 
+def test_scatter_histogram():
+    """ Test the datacube histograms against numpy """
+    rng = np.random.default_rng(1)
+    pix_coord = rng.uniform(-2., 12., size=(10000, 3))
+    # Place some pixels exactly on the bin edges
+    pix_coord[:10] = np.round(pix_coord[:10]) - 0.5
+    pix_coord[10:20,2] = 7.5
+    wght = rng.uniform(size=10000)
+    bins = (np.arange(11)-0.5, np.arange(9)-0.5, np.arange(8)-0.5)
+    bin_idx, shape = histogram_indices(pix_coord, bins)
+    assert shape == (10, 8, 7), 'Bad histogram shape'
+    cube, norm = scatter_histogram(bin_idx, shape, weights=[wght, None])
+    assert np.allclose(cube, np.histogramdd(pix_coord, bins=bins, weights=wght)[0]), \
+            'Bad weighted histogram'
+    assert np.array_equal(norm, np.histogramdd(pix_coord, bins=bins)[0]), 'Bad histogram'
+    # Coordinates provided as a sequence of arrays
+    assert np.array_equal(histogram_indices(list(pix_coord.T), bins)[0], bin_idx), \
+            'Coordinate formats should be equivalent'
+
+
+def test_make_cube_chunked():
+    """ Test the construction of a datacube in wavelength chunks """
+    rng = np.random.default_rng(2)
+    nfiles, npix = 3, 5000
+    masterwcs = generate_masterWCS([150., 2., 4000.], [1e-4, 1e-4, 1.])
+    # Each frame must be sorted by wavelength
+    all_wave = np.sort(rng.uniform(4000., 4040., size=(nfiles, npix)), axis=1)
+    # Place some pixels on the edges of the spectral bins
+    all_wave[:,::100] = np.round(all_wave[:,::100]) + 0.5
+    all_wave = all_wave.ravel()
+    all_ra = rng.uniform(150., 150.001, size=all_wave.size)
+    all_dec = rng.uniform(2., 2.001, size=all_wave.size)
+    all_sci = rng.normal(size=all_wave.size)
+    all_ivar = rng.uniform(0., 2., size=all_wave.size)
+    all_wghts = rng.uniform(size=all_wave.size)
+    offsets = np.arange(nfiles+1)*npix
+    world2pix = lambda ra, dec, wave: masterwcs.wcs_world2pix(ra, dec, wave * 1.0E-10, 0)
+    bins = (np.arange(11)-0.5, np.arange(11)-0.5, np.arange(41)-0.5)
+    wave_edges = masterwcs.wcs_pix2world(np.zeros(41), np.zeros(41), bins[2], 0)[2] * 1.0E10
+
+    # Construct the full cube
+    bin_idx, shape = histogram_indices(world2pix(all_ra, all_dec, all_wave), bins)
+    all_var = (all_ivar > 0) / (all_ivar + (all_ivar == 0))
+    cube, norm, var = scatter_histogram(bin_idx, shape, weights=[all_sci*all_wghts, all_wghts,
+                                                                 all_var*all_wghts**2])
+    norm_cube = (norm > 0) / (norm + (norm == 0))
+
+    flux = np.zeros(shape[::-1], dtype=np.float32)
+    variance = np.zeros(shape[::-1], dtype=np.float32)
+    make_cube_chunked(all_ra, all_dec, all_wave, all_sci, all_ivar, all_wghts, offsets, world2pix,
+                      bins, wave_edges, 7, flux, variance)
+    assert np.allclose(flux, (cube*norm_cube).T.astype(np.float32), rtol=1e-5, atol=1e-6), \
+            'Chunked flux cube is different'
+    assert np.allclose(variance, (var*norm_cube**2).T.astype(np.float32), rtol=1e-5, atol=1e-6), \
+            'Chunked variance cube is different'
+
+
 @cooked_required
 def test_coadd_datacube():
     """ Test the coaddition of spec2D files into datacubes """
@@ -203,6 +203,53 @@ def test_group_spectra_by_pixel(monkeypatch):
     assert [x.NAME for x in source_list[5].spec_obj_list] == ['SPAT6934_SLIT6245_DET05']
 
 
+def brute_force_collate(source_list, tolerance, unit=u.arcsec):
+    # Compare each source with every collated source
+    collated_list = []
+    for source in source_list:
+        found = False
+        for collated_source in collated_list:
+            if collated_source.match(source.spec_obj_list[0], source.spec1d_header_list[0],
+                                     tolerance, unit):
+                collated_source.combine(source)
+                found = True
+        if not found:
+            collated_list.append(SourceObject(source.spec_obj_list[0],
+                                              source.spec1d_header_list[0],
+                                              source.spec1d_file_list[0],
+                                              source._spectrograph, source.match_type))
+    return collated_list
+
+
+def test_group_spectra_brute_force():
+    spectrograph = load_spectrograph('keck_deimos')
+    headers = [mock_header('spec1d_file1'), mock_header('spec1d_file2'),
+               dict(mock_header('spec1d_file1'), DISPNAME='600ZD')]
+    rng = np.random.default_rng(42)
+    nsrc = 100
+    # Crowded sources, including sources near RA=0 and the pole
+    ra = np.append(rng.uniform(-0.005, 0.005, nsrc-20) % 360, rng.uniform(0, 360, 20))
+    dec = np.append(rng.uniform(-0.005, 0.005, nsrc-20), rng.uniform(89.995, 90., 20))
+    pix = np.round(rng.uniform(0, 100, nsrc))
+    hdr = rng.integers(len(headers), size=nsrc)
+    spec_objs = [MockSpecObj(MASKDEF_OBJNAME='object', MASKDEF_ID='1', DET=1, RA=ra[i],
+                             DEC=dec[i], SPAT_PIXPOS=pix[i], NAME=f'OBJ{i}')
+                    for i in range(nsrc)]
+
+    for match_type, tolerance, unit in [('ra/dec', 3., u.arcsec), ('ra/dec', 0.001, u.deg),
+                                        ('pixel', 2., u.arcsec), ('pixel', 0., u.arcsec)]:
+        uncollated_list = [SourceObject(spec_objs[i], headers[hdr[i]], f'spec1d_file{hdr[i]}',
+                                        spectrograph, match_type) for i in range(nsrc)]
+        source_list = collate_spectra_by_source(uncollated_list, tolerance, unit)
+        expected = brute_force_collate(uncollated_list, tolerance, unit)
+        assert len(source_list) == len(expected)
+        for source, exp in zip(source_list, expected):
+            assert [x.NAME for x in source.spec_obj_list] == [x.NAME for x in exp.spec_obj_list]
+            assert source.spec1d_file_list == exp.spec1d_file_list
+        # The input is not altered
+        assert all([len(source.spec_obj_list) == 1 for source in uncollated_list])
+
+
 def test_config_key_match():
 
     file_list = ['spec1d_file1', 'spec1d_file2']
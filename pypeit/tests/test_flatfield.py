@@ -9,6 +9,8 @@ import glob
 
 from IPython import embed
 
+import json
+
 import numpy as np
 
 from astropy.io import fits
@@ -19,6 +21,11 @@ from pypeit import slittrace
 from pypeit.spectrographs.util import load_spectrograph
 from pypeit.images import pypeitimage
 from pypeit import bspline
+from pypeit import wavetilts
+from pypeit import wavecalib
+from pypeit.core import fitting
+from pypeit.core.wavecal import wv_fitting
+from pypeit.par import pypeitpar
 
 def data_path(filename):
     data_dir = os.path.join(os.path.dirname(__file__), 'files')
@@ -104,6 +111,55 @@ def test_flatimages():
 #    pytest.set_trace()
 
 
+def dummy_flat(nspec=512, nslits=4, slit_width=30, gap=6):
+    nspat = nslits*(slit_width+gap) + gap
+    spec = np.arange(nspec)
+    left = np.array([gap + i*(slit_width+gap) + 2.*np.sin(spec/300.+i) for i in range(nslits)]).T
+    slits = slittrace.SlitTraceSet(left_init=left, right_init=left+slit_width, pypeline='MultiSlit',
+                                   nspat=nspat, PYP_SPEC='dummy')
+    rng = np.random.default_rng(1)
+    coeffs = 1e-3*rng.normal(size=(4,3,nslits))
+    coeffs[0,0] += 0.5
+    coeffs[1,0] += 0.5
+    waveTilts = wavetilts.WaveTilts(coeffs=coeffs, nslit=nslits, spat_order=np.full(nslits, 2),
+                                    spec_order=np.full(nslits, 3), spat_id=slits.spat_id,
+                                    func2d='legendre2d')
+    wv_fits = np.asarray([wv_fitting.WaveFit(spat_id, pypeitfit=fitting.PypeItFit(
+                                fitc=np.array([4000., 2000.+10*i, 5.]), func='legendre',
+                                minx=0., maxx=1.)) for i, spat_id in enumerate(slits.spat_id)])
+    wv_calib = wavecalib.WaveCalib(wv_fits=wv_fits, nslits=nslits, spat_ids=slits.spat_id,
+                                   strpar=json.dumps({'echelle': False}))
+    # Smooth spectral shape and slit illumination profile with soft edges
+    spat = np.arange(nspat)
+    img = np.full((nspec, nspat), 5.)
+    for i in range(nslits):
+        edge_dist = np.minimum(spat[None,:] - slits.left_init[:,i,None],
+                               slits.right_init[:,i,None] - spat[None,:])
+        img += 2e4*(1+0.5*np.sin(spec/150.+i))[:,None] / (1+np.exp(-edge_dist/0.7))
+    img *= 1 + 0.01*rng.normal(size=img.shape)
+    return pypeitimage.PypeItImage(img), slits, waveTilts, wv_calib
+
+
+def test_flatfield_nproc():
+    spectrograph = load_spectrograph('shane_kast_blue')
+    par = pypeitpar.FlatFieldPar(rej_sticky=True)
+    flatimages = []
+    for nproc in [1, 2]:
+        rawflatimg, slits, waveTilts, wv_calib = dummy_flat()
+        flatimages += [flatfield.FlatField(rawflatimg, spectrograph, par, slits, waveTilts, wv_calib,
+                                           nproc=nproc).run()]
+        assert np.all(slits.mask == 0), 'All slits should be successfully modeled'
+        assert np.any(slits.left_tweak != slits.left_init), 'Edges should be tweaked'
+    # The slits do not overlap, such that the result is independent of the
+    # number of processes
+    for key in ['pixelflat_norm', 'pixelflat_model']:
+        assert np.array_equal(flatimages[0][key], flatimages[1][key])
+    for spat_bspl, _spat_bspl in zip(flatimages[0].pixelflat_spat_bsplines,
+                                     flatimages[1].pixelflat_spat_bsplines):
+        assert np.array_equal(spat_bspl.coeff, _spat_bspl.coeff)
+    assert np.allclose(flatimages[0].pixelflat_norm, 1., atol=0.1), 'Bad pixel flat'
+
+
 #@cooked_required
 #def test_run():
 #    # Masters
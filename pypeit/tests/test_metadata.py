@@ -9,10 +9,13 @@ import pytest
 
 import numpy as np
 
+from astropy.io import fits
+
 from pypeit.par.util import parse_pypeit_file
 from pypeit.pypeitsetup import PypeItSetup
 from pypeit.tests.tstutils import dev_suite_required, data_path
 from pypeit.metadata import PypeItMetaData
+from pypeit.io import FitsHeaderCache
 from pypeit.spectrographs.util import load_spectrograph
 from pypeit.scripts.setup import Setup
 
@@ -56,6 +59,38 @@ def test_read_combid():
 
     shutil.rmtree(config_dir)
 
+def test_independent_calib_groups():
+    file_list = sorted(glob.glob(data_path('b*.fits.gz')))
+    cfg_lines = ['[rdx]',
+                 'spectrograph = shane_kast_blue']
+    ps = PypeItSetup(file_list, cfg_lines=cfg_lines)
+    ps.build_fitstbl()
+    ps.get_frame_types(flag_unknown=True)
+    cfgs = ps.fitstbl.unique_configurations()
+    ps.fitstbl.set_configurations(cfgs)
+    ps.fitstbl.set_calibration_groups()
+    ps.fitstbl.set_combination_groups()
+    assert ps.fitstbl.independent_calib_groups() == [[0]], 'Should be a single group'
+
+    # Assign each pair of frames to a different group
+    ps.fitstbl.table['calib'] = np.array(['0', '0', '1', '1', '2', '2', '3', '3'], dtype=object)
+    ps.fitstbl._set_calib_group_bits()
+    assert ps.fitstbl.independent_calib_groups() == [[0], [1], [2], [3]], \
+            'All groups should be independent'
+
+    # Share a frame between two groups
+    ps.fitstbl['calib'][0] = '0,2'
+    ps.fitstbl._set_calib_group_bits()
+    assert ps.fitstbl.independent_calib_groups() == [[0, 2], [1], [3]], \
+            'Groups sharing a frame should be dependent'
+
+    # Use a frame in one group as the background for a frame in another
+    ps.fitstbl['comb_id'][2] = 5
+    ps.fitstbl['bkg_id'][7] = 5
+    assert ps.fitstbl.independent_calib_groups() == [[0, 2], [1, 3]], \
+            'Groups sharing background frames should be dependent'
+
+
 @dev_suite_required
 def test_lris_red_multi_400():
     file_list = glob.glob(os.path.join(os.environ['PYPEIT_DEV'], 'RAW_DATA', 'keck_lris_red',
@@ -163,3 +198,100 @@ def test_lris_blue_pypeit_overwrite():
     assert fitstbl['target'][0] != fitstbl_usr['target'][0], \
             'Fits header value and input pypeit file value expected to be different.'
 
+
+
+def test_header_cache():
+    file_list = sorted(glob.glob(data_path('b*.fits.gz')))
+    spectrograph = load_spectrograph('shane_kast_blue')
+
+    # The fast header read must match astropy
+    headarr = spectrograph.get_headarr(file_list[0])
+    with fits.open(file_list[0]) as hdu:
+        assert len(headarr) == len(hdu), 'Wrong number of headers'
+        assert all([h == _hdu.header for h, _hdu in zip(headarr, hdu)]), 'Headers changed'
+
+    par = spectrograph.default_pypeit_par()
+    pmd = PypeItMetaData(spectrograph, par, files=file_list)
+
+    # Read the headers in parallel and fill the cache
+    cache_file = data_path('header_cache.db')
+    if os.path.isfile(cache_file):
+        os.remove(cache_file)
+    par['rdx']['header_nproc'] = 2
+    par['rdx']['header_cache'] = cache_file
+    pmd_cache = PypeItMetaData(spectrograph, par, files=file_list)
+    with FitsHeaderCache(cache_file) as cache:
+        assert all([cache.get(f) is not None for f in file_list]), 'Headers should be cached'
+        assert cache.get(file_list[0]) == headarr, 'Cached headers changed'
+    # Use the cache
+    pmd_cache = PypeItMetaData(spectrograph, par, files=file_list)
+    assert np.array_equal(pmd['mjd'], pmd_cache['mjd']) \
+            and np.array_equal(pmd['target'], pmd_cache['target']), 'Metadata changed'
+
+    # Modified files are not taken from the cache
+    tmp_file = data_path('tmp_b1.fits.gz')
+    shutil.copy(file_list[0], tmp_file)
+    with FitsHeaderCache(cache_file) as cache:
+        cache.put(tmp_file, headarr[:1])
+        assert len(cache.get(tmp_file)) == 1, 'Headers not cached'
+        os.utime(tmp_file, ns=(0, 0))
+        assert cache.get(tmp_file) is None, 'Modified file should not be found'
+    os.remove(tmp_file)
+    os.remove(cache_file)
+
+
+def test_metadata_index():
+    file_list = sorted(glob.glob(data_path('b*.fits.gz')))
+    cfg_lines = ['[rdx]', 'spectrograph = shane_kast_blue']
+
+    # Reference setup without the index
+    ps = PypeItSetup(file_list, cfg_lines=cfg_lines)
+    ps.run(setup_only=True, write_files=False)
+
+    # Index a subset of the frames and then add the rest
+    index_file = data_path('metadata_index.db')
+    if os.path.isfile(index_file):
+        os.remove(index_file)
+    _cfg_lines = cfg_lines + ['metadata_index = {0}'.format(index_file)]
+    for files in [file_list[:4], file_list, file_list]:
+        ps_index = PypeItSetup(files, cfg_lines=_cfg_lines)
+        ps_index.run(setup_only=True, write_files=False)
+    assert len(ps_index.fitstbl._indexed) == len(file_list), 'All frames should be indexed'
+    for key in ['filename', 'frametype', 'setup', 'calib', 'mjd']:
+        assert np.array_equal(ps.fitstbl[key], ps_index.fitstbl[key]), \
+                'Incremental setup changed {0}'.format(key)
+    os.remove(index_file)
+
+
+def test_metadata_index_subset():
+    file_list = sorted(glob.glob(data_path('b*.fits.gz')))
+    # Add a science frame with a different configuration
+    new_file = data_path('tmp_b28.fits.gz')
+    with fits.open(file_list[-1]) as hdu:
+        hdu[0].header['GRISM_N'] = '452/3306'
+        hdu.writeto(new_file, overwrite=True)
+    index_file = data_path('metadata_index.db')
+    if os.path.isfile(index_file):
+        os.remove(index_file)
+    cfg_lines = ['[rdx]', 'spectrograph = shane_kast_blue',
+                 'metadata_index = {0}'.format(index_file)]
+
+    # Index all frames
+    ps = PypeItSetup(file_list + [new_file], cfg_lines=cfg_lines)
+    ps.run(setup_only=True, write_files=False)
+    assert list(ps.fitstbl.unique_configurations().keys()) == ['A', 'B']
+
+    # Only the configurations used by a subset of the frames are kept
+    ps = PypeItSetup(file_list, cfg_lines=cfg_lines)
+    ps.run(setup_only=True, write_files=False)
+    assert list(ps.fitstbl.unique_configurations().keys()) == ['A'], \
+            'Unused indexed configurations should be removed'
+    assert np.all(ps.fitstbl['setup'] == 'A')
+
+    # ... but the unused configurations remain in the index
+    ps = PypeItSetup(file_list + [new_file], cfg_lines=cfg_lines)
+    ps.run(setup_only=True, write_files=False)
+    assert list(ps.fitstbl.unique_configurations().keys()) == ['A', 'B']
+    assert ps.fitstbl['setup'][ps.fitstbl['filename'] == os.path.basename(new_file)][0] == 'B'
+    os.remove(index_file)
+    os.remove(new_file)
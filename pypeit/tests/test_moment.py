@@ -155,3 +155,23 @@ def test_width():
     assert np.absolute(np.mean(xr/sig)-1) < 0.02, 'Second moment should be good to better than 2%'
 
 
+
+def test_centroid1d():
+    """
+    Test the fast centroid calculation against moment1d
+    """
+    rng = np.random.default_rng(11)
+    nrow, ncol = 20, 50
+    img = rng.normal(size=(nrow,ncol))
+    ivar = np.where(rng.random(img.shape) < 0.1, 0., rng.random(img.shape))
+    bpm = rng.random(img.shape) < 0.1
+    fwgt = rng.random(img.shape)
+    img[3] = 0.
+    col = rng.uniform(-2, ncol+2, 30)
+    for row in [5, 3, rng.integers(0, nrow, col.size)]:
+        for width in [6., 4.5]:
+            for kw in [{}, dict(ivar=ivar, bpm=bpm, fwgt=fwgt)]:
+                xr, xe, bad = moment.moment1d(img, col, width, row=row, order=1, **kw)
+                _xr, _xe, _bad = moment.centroid1d(img, col, width, row, **kw)
+                assert np.array_equal(xr, _xr) and np.array_equal(xe, _xe) \
+                            and np.array_equal(bad, _bad), 'Centroids should be identical'
@@ -175,3 +175,30 @@ def test_lacosmic():
 
 
 
+
+
+def test_lacosmic_tiled():
+    rng = np.random.default_rng(8)
+    nspec, nspat = 301, 120
+    spat = np.arange(nspat)
+    # Sky plus a Gaussian object trace and Poisson noise
+    img = rng.poisson(100. + 500.*np.exp(-0.5*((spat-60.)/2.)**2)[None,:],
+                      size=(nspec, nspat)).astype(float)
+    # Add cosmic rays, including some that straddle the tile boundaries
+    ncr = 60
+    img[rng.integers(0, nspec, ncr), rng.integers(0, nspat, ncr)] += 5000.
+    img[99:102,30] += 3000.
+    img[199,80:82] += 4000.
+
+    crmask = procimg.lacosmic(img, maxiter=2)
+    assert np.sum(crmask) > ncr, 'Should find the injected cosmic rays'
+
+    for tile_nspec, nproc in zip([100, 37, None], [1, 3, 4]):
+        _crmask = procimg.lacosmic(img, maxiter=2, tile_nspec=tile_nspec, nproc=nproc)
+        assert np.array_equal(_crmask, crmask), 'Tiling should not change the mask'
+
+    onslit = np.zeros(img.shape, dtype=bool)
+    onslit[:,40:] = True
+    _crmask = procimg.lacosmic(img, maxiter=2, onslit=onslit, tile_nspec=100, nproc=2)
+    assert not np.any(_crmask[:,:39]), 'Off-slit pixels should not be flagged'
+    assert np.array_equal(_crmask[:,45:], crmask[:,45:]), 'On-slit pixels should be unchanged'
@@ -6,6 +6,8 @@ import numpy as np
 
 from pypeit.core import skysub
 from pypeit.slittrace import SlitTraceSet
+from pypeit import specobj, specobjs, utils
+from pypeit.find_objects import global_skysub_slit
 
 
 def test_userregions():
@@ -49,6 +51,84 @@ def test_generatemask():
     skymask = skysub.generate_mask("IFU", regs, slits, slits.left_init, slits.right_init)
     assert(np.array_equal(skymask, tstmsk))
 
-#test_userregions()
 
+def fake_slit():
+    rng = np.random.default_rng(3)
+    nspec, nspat = 200, 60
+    spec = np.arange(nspec, dtype=float)[:,None]*np.ones(nspat)[None,:]
+    spat = np.ones(nspec)[:,None]*np.arange(nspat, dtype=float)[None,:]
+    tilts = spec/(nspec-1)
+    waveimg = 4000. + spec
+    # Sky continuum with one emission line
+    sky = 100. + 500.*np.exp(-0.5*((spec-80.)/1.5)**2)
+    thismask = (spat > 5.) & (spat < 55.)
+    # Two blended objects
+    sobjs = specobjs.SpecObjs()
+    model = sky.copy()
+    for objid, (x, flux) in enumerate(zip([25., 31.], [800., 300.])):
+        model += flux*np.exp(-0.5*((spat-x)/1.3)**2)/np.sqrt(2*np.pi)/1.3
+        sobj = specobj.SpecObj('MultiSlit', 'DET01', SLITID=30)
+        sobj.TRACE_SPAT = np.full(nspec, x)
+        sobj.trace_spec = np.arange(nspec)
+        sobj.SPAT_PIXPOS = x
+        sobj.maskwidth = 8.
+        sobj.FWHM = 3.
+        sobj.BOX_RADIUS = 3.
+        sobj.OBJID = objid+1
+        sobjs.add_sobj(sobj)
+    img = rng.normal(model, np.sqrt(model))
+    ivar = thismask/model
+    return img, ivar, tilts, waveimg, sky, thismask, np.full(nspec, 5.), np.full(nspec, 55.), \
+                sobjs
 
+
+def test_local_skysub_extract_batch():
+    img, ivar, tilts, waveimg, sky, thismask, left, right, sobjs = fake_slit()
+    assert len(sobjs.get_extraction_groups()) == 1, 'Objects should be extracted together'
+    base_var = np.full(img.shape, 4.)
+    count_scale = np.full(img.shape, 1.1)
+
+    models = skysub.local_skysub_extract(img, ivar, tilts, waveimg, sky, thismask, left, right,
+                                         sobjs, base_var=base_var, count_scale=count_scale)
+    _sobjs = fake_slit()[-1]
+    _models = skysub.local_skysub_extract(img, ivar, tilts, waveimg, sky, thismask, left, right,
+                                          _sobjs, base_var=base_var, count_scale=count_scale,
+                                          batch=True)
+
+    for model, _model in zip(models, _models):
+        assert np.allclose(model, _model), 'Batch extraction changed the models'
+    for sobj, _sobj in zip(sobjs, _sobjs):
+        assert np.isclose(np.median(sobj.OPT_COUNTS), [800., 300.][sobj.OBJID-1], rtol=0.1), \
+                'Bad optimal extraction'
+        for key in ['OPT_COUNTS', 'OPT_COUNTS_IVAR', 'OPT_COUNTS_NIVAR', 'OPT_COUNTS_SKY',
+                    'OPT_COUNTS_SIG_DET', 'OPT_WAVE', 'OPT_FRAC_USE', 'OPT_CHI2', 'BOX_COUNTS']:
+            assert np.allclose(sobj[key], _sobj[key]), f'Batch extraction changed {key}'
+        assert np.array_equal(sobj.OPT_MASK, _sobj.OPT_MASK), 'Batch extraction changed mask'
+
+
+def test_global_skysub_slits():
+    _, ivar, tilts, waveimg, sky, thismask, left, right, sobjs = fake_slit()
+    # Sky-only image
+    img = np.random.default_rng(5).normal(sky, np.sqrt(sky))
+    # Split the image into two slits
+    slitmask = np.full(img.shape, -1, dtype=int)
+    slitmask[:,6:30] = 17
+    slitmask[:,31:55] = 43
+    lefts = [np.full(img.shape[0], 5.5), np.full(img.shape[0], 30.5)]
+    rights = [np.full(img.shape[0], 29.5), np.full(img.shape[0], 54.5)]
+    kwargs = dict(sigrej=3.0, bsp=1.5, no_poly=True, pos_mask=False, trim_edg=(0,0))
+    shared = dict(image=img, ivar=ivar, tilts=tilts, slitmask=slitmask,
+                  sky_gpm=np.ones(img.shape, dtype=bool))
+    arglist = [(spat_id, l, r, kwargs) for spat_id, l, r in zip([17, 43], lefts, rights)]
+
+    serial = [model for model, _ in utils.parallel_map(global_skysub_slit, arglist, shared=shared)]
+    assert np.isclose(np.median(serial[0]), 100., rtol=0.02), 'Bad sky model'
+    for spat_id, l, r, _sky in zip([17, 43], lefts, rights, serial):
+        _thismask = slitmask == spat_id
+        assert np.array_equal(_sky, skysub.global_skysub(img, ivar, tilts, _thismask, l, r,
+                                                         inmask=_thismask, **kwargs)), \
+                'Wrapper should not change the sky model'
+    parallel = [model for model, _ in utils.parallel_map(global_skysub_slit, arglist, nproc=2,
+                                                     shared=shared)]
+    for _serial, _parallel in zip(serial, parallel):
+        assert np.array_equal(_serial, _parallel), 'Parallel sky model should be identical'
@@ -0,0 +1,95 @@
+"""
+Module to run tests on the lazily evaluated slit images
+"""
+import json
+
+import numpy as np
+
+from pypeit import slittrace, wavetilts, wavecalib, slitimage
+from pypeit.core import tracewave, fitting
+from pypeit.core.wavecal import wv_fitting
+
+
+def dummy_calibs(nspec=200, nslits=4, slit_width=12, gap=4):
+    nspat = nslits*(slit_width+gap) + gap
+    left = np.tile(gap + np.arange(nslits)*(slit_width+gap) + 0., (nspec,1))
+    slits = slittrace.SlitTraceSet(left_init=left, right_init=left+slit_width, pypeline='MultiSlit',
+                                   nspat=nspat, PYP_SPEC='dummy')
+    rng = np.random.default_rng(1)
+    coeffs = 1e-3*rng.normal(size=(6,4,nslits))
+    coeffs[0,0] += 0.5
+    coeffs[1,0] += 0.5
+    waveTilts = wavetilts.WaveTilts(coeffs=coeffs, nslit=nslits, spat_order=np.full(nslits, 3),
+                                    spec_order=np.full(nslits, 5), spat_id=slits.spat_id,
+                                    func2d='legendre2d')
+    wv_fits = np.asarray([wv_fitting.WaveFit(spat_id, pypeitfit=fitting.PypeItFit(
+                                fitc=np.array([4000., 2000.+10*i, 5.]), func='legendre',
+                                minx=0., maxx=1.)) for i, spat_id in enumerate(slits.spat_id)])
+    wv_calib = wavecalib.WaveCalib(wv_fits=wv_fits, nslits=nslits, spat_ids=slits.spat_id,
+                                   strpar=json.dumps({'echelle': False}))
+    return slits, waveTilts, wv_calib
+
+
+def test_lazy_tilts():
+    slits, waveTilts, _ = dummy_calibs()
+    slitmask = slits.slit_img()
+    flexure = 0.4
+    tilts = waveTilts.fit2tiltimg(slitmask, flexure=flexure)
+    # Brute-force evaluation of each slit over the full image
+    for i, spat_id in enumerate(slits.spat_id):
+        coeff = waveTilts.coeffs[:6,:4,i]
+        thismask = slitmask == spat_id
+        assert np.array_equal(tracewave.fit2tilts(slitmask.shape, coeff, 'legendre2d',
+                                                  spat_shift=-flexure)[thismask], tilts[thismask])
+    assert np.all(tilts[slitmask < 0] == 0)
+
+    lazy = waveTilts.fit2tiltimg(slitmask, flexure=flexure, lazy=True, cache_size=2)
+    assert isinstance(lazy, slitimage.LazyTiltImage)
+    spec, spat = lazy.pixels(slits.spat_id[1])
+    assert np.array_equal(lazy.slit(slits.spat_id[1]), tilts[spec, spat])
+    for spat_id in slits.spat_id:
+        lazy.slit(spat_id)
+    assert list(lazy._cache.keys()) == list(slits.spat_id[-2:]), 'Cache should keep the last slits'
+    assert np.array_equal(np.asarray(lazy), tilts)
+    # Arbitrary pixels
+    indx = np.nonzero(slitmask >= -1)
+    assert np.array_equal(lazy.at(*indx), tilts[indx])
+    # Single precision
+    lazy32 = waveTilts.fit2tiltimg(slitmask, flexure=flexure, lazy=True, dtype=np.float32)
+    assert lazy32.to_array().dtype == np.float32
+    assert np.allclose(lazy32.to_array(), tilts, atol=1e-6)
+
+
+def test_lazy_waveimg():
+    slits, waveTilts, wv_calib = dummy_calibs()
+    # Mask a slit
+    slits.mask[2] = slits.bitmask.turn_on(slits.mask[2], 'BADWVCALIB')
+    slitmask = slits.slit_img()
+    tilts = waveTilts.fit2tiltimg(slitmask)
+    spec_flexure = np.linspace(-1., 1., slits.nslits)
+    waveimg = wv_calib.build_waveimg(tilts, slits, spec_flexure=spec_flexure)
+    for i, spat_id in enumerate(slits.spat_id):
+        thismask = slitmask == spat_id
+        if i == 2:
+            assert np.all(waveimg[thismask] == 0)
+            continue
+        assert np.array_equal(waveimg[thismask], wv_calib.wv_fits[i].pypeitfit.eval(
+                                    tilts[thismask] + spec_flexure[i]/(slits.nspec-1)))
+
+    # Lazy wavelengths from the lazy tilts
+    lazy_tilts = waveTilts.fit2tiltimg(slitmask, lazy=True)
+    lazy = wv_calib.build_waveimg(lazy_tilts, slits, spec_flexure=spec_flexure, lazy=True)
+    assert np.array_equal(lazy.slit(slits.spat_id[0]), waveimg[lazy.pixels(slits.spat_id[0])])
+    assert list(lazy_tilts._cache.keys()) == [slits.spat_id[0]], 'Tilts should be reused'
+    box, cutout = lazy.slit_cutout(slits.spat_id[1])
+    assert np.array_equal(cutout, waveimg[box] * (slitmask[box] == slits.spat_id[1]))
+    assert np.array_equal(lazy.to_array(), waveimg)
+
+    # Only re-evaluate the slits with a new spectral flexure
+    spec_flexure[1] += 0.5
+    shifted = wv_calib.build_waveimg(tilts, slits, spec_flexure=spec_flexure)
+    lazy = wv_calib.build_waveimg(tilts, slits, spec_flexure=spec_flexure, lazy=True,
+                                  cache_size=0)
+    assert lazy.fill(waveimg, spat_id=slits.spat_id[1]) is waveimg
+    assert np.array_equal(waveimg, shifted)
+    assert len(lazy._cache) == 0, 'Nothing should be cached'
@@ -192,3 +192,40 @@ def test_all2dobj_update_image(init_dict):
 
     os.remove(ofile)
 
+
+
+def test_all2dobj_lazy(init_dict):
+    allspec2D = spec2dobj.AllSpec2DObj()
+    allspec2D['meta']['bkg_redux'] = False
+    allspec2D['meta']['find_negative'] = False
+    for i in range(2):
+        d = load_spectrograph('keck_deimos').get_detector_par(i+1)
+        allspec2D[d.name] = spec2dobj.Spec2DObj(detector=d, **init_dict)
+    # Write
+    ofile = tstutils.data_path('tst_allspec2d.fits')
+    if os.path.isfile(ofile):
+        os.remove(ofile)
+    allspec2D.write_to_fits(ofile)
+
+    # Read lazily
+    _allspec2D = spec2dobj.AllSpec2DObj.from_fits(ofile, lazy=True)
+    assert _allspec2D.detectors == allspec2D.detectors, 'Bad read: detector mismatch'
+    assert _allspec2D['meta'] == allspec2D['meta'], 'Bad read: meta mismatch'
+    assert len(_allspec2D.loaded) == 0, 'No detectors should have been read'
+    detname = allspec2D.detectors[1]
+    assert np.array_equal(_allspec2D[detname].sciimg, allspec2D[detname].sciimg), 'Bad read'
+    assert _allspec2D.loaded == [detname], 'Only one detector should have been read'
+    _allspec2D.close()
+    assert _allspec2D.detectors == [detname], 'Unread detectors should be removed'
+
+    # Read a subset of the images
+    _spec2DObj = spec2dobj.Spec2DObj.from_file(ofile, detname, images=['sciimg', 'waveimg'])
+    assert np.array_equal(_spec2DObj.waveimg, allspec2D[detname].waveimg), 'Bad read'
+    assert _spec2DObj.skymodel is None and _spec2DObj.tilts is None, 'Images should not be read'
+    assert _spec2DObj.sci_spat_flexure == allspec2D[detname].sci_spat_flexure, \
+            'Header items should be read'
+    assert _spec2DObj.slits.nslits == allspec2D[detname].slits.nslits, 'Bad slits'
+    _spec2DObj = spec2dobj.Spec2DObj.from_file(ofile, detname, images=['waveimg'])
+    assert _spec2DObj.sciimg is None and _spec2DObj.vel_corr == allspec2D[detname].vel_corr
+
+    os.remove(ofile)
@@ -132,3 +132,114 @@ def test_io(sobj1, sobj2, sobj3, sobj4):
 
 
 
+
+
+def test_io_columnar(sobj1, sobj2, sobj3, sobj4):
+    sobjs = specobjs.SpecObjs([sobj1,sobj2,sobj3,sobj4])
+    for i in range(3):
+        sobjs[i]['BOX_WAVE'] = np.arange(1000).astype(float) + i
+        sobjs[i]['BOX_MASK'] = np.arange(1000) % 2 == 0
+    sobjs[1]['BOX_COUNTS'] = np.ones_like(sobjs[0].BOX_WAVE)
+    sobjs[1]['trace_spec'] = np.arange(1000)
+    sobjs[1]['RA'] = 10.
+    sobjs[1]['MASKDEF_ID'] = 7
+    sobjs[2]['MASKDEF_EXTRACT'] = True
+    sobjs[0]['DETECTOR'] = tstutils.get_kastb_detector()
+    # Write
+    header = fits.PrimaryHDU().header
+    ofile = tstutils.data_path('tst_specobjs.fits')
+    if os.path.isfile(ofile):
+        os.remove(ofile)
+    sobjs.write_to_fits(header, ofile, columnar=True)
+    hdul = io.fits_open(ofile)
+    assert [h.name for h in hdul] == ['PRIMARY', 'INDEX', 'SPECTRA', 'DET01-DETECTOR']
+    assert hdul[0].header['NSPEC'] == 4
+    hdul.close()
+
+    # Read all
+    _sobjs = specobjs.SpecObjs.from_fitsfile(ofile)
+    assert _sobjs.nobj == 4
+    assert np.array_equal(_sobjs.NAME, sobjs.NAME)
+    for i in range(4):
+        for key in ['BOX_WAVE', 'BOX_MASK', 'BOX_COUNTS', 'trace_spec']:
+            if sobjs[i][key] is None:
+                assert _sobjs[i][key] is None, 'Missing arrays should be None'
+            else:
+                assert np.array_equal(_sobjs[i][key], sobjs[i][key]), 'Bad array read'
+                assert _sobjs[i][key].dtype == sobjs[i][key].dtype, 'Bad array type'
+    assert _sobjs[1].RA == 10. and _sobjs[0].RA is None
+    assert _sobjs[1].MASKDEF_ID == 7 and _sobjs[0].MASKDEF_ID is None
+    assert _sobjs[2].MASKDEF_EXTRACT is True and _sobjs[1].MASKDEF_EXTRACT is None
+    assert _sobjs[0].DETECTOR is not None and _sobjs[1].DETECTOR is None
+
+    # Select
+    _sobjs = specobjs.SpecObjs.from_fitsfile(ofile, maskdef_ids=7)
+    assert _sobjs.nobj == 1 and _sobjs[0].NAME == sobjs[1].NAME
+    _sobjs = specobjs.SpecObjs.from_fitsfile(ofile, slitids=0, det='DET03')
+    assert _sobjs.nobj == 1 and _sobjs[0].NAME == sobjs[2].NAME
+    _sobjs = specobjs.SpecObjs.from_fitsfile(ofile, names=[sobjs[3].NAME, sobjs[0].NAME])
+    assert np.array_equal(_sobjs.NAME, sobjs.NAME[[0,3]])
+
+    # The layout is kept when rewriting, and the selection works for both
+    _sobjs.write_to_fits(_sobjs.header, ofile)
+    assert fits.getheader(ofile)['LAYOUT'] == 'COLUMNAR'
+    _sobjs.write_to_fits(_sobjs.header, ofile, columnar=False)
+    assert 'LAYOUT' not in fits.getheader(ofile)
+    _sobjs = specobjs.SpecObjs.from_fitsfile(ofile, slitids=10)
+    assert _sobjs.nobj == 1 and _sobjs[0].NAME == sobjs[3].NAME
+
+    # Updating the spectra of one detector keeps the layout of the file
+    sobjs.write_to_fits(header, ofile, columnar=True)
+    det = sobjs[0].DET
+    sobjs[sobjs.DET == det].write_to_fits(header, ofile, update_det=det)
+    assert fits.getheader(ofile)['LAYOUT'] == 'COLUMNAR'
+    assert specobjs.SpecObjs.from_fitsfile(ofile).nobj == 4
+
+    # Empty set
+    specobjs.SpecObjs().write_to_fits(header, ofile, columnar=True)
+    assert fits.getheader(ofile)['LAYOUT'] == 'COLUMNAR'
+    assert specobjs.SpecObjs.from_fitsfile(ofile).nobj == 0
+    os.remove(ofile)
+
+
+def test_cached_attributes(sobj1, sobj2, sobj3, sobj4):
+    sobjs = specobjs.SpecObjs([sobj1,sobj2,sobj3])
+    for i, sobj in enumerate(sobjs):
+        sobj.TRACE_SPAT = np.full(10, float(i))
+    assert np.array_equal(sobjs.SLITID, [0,1,0])
+    # The returned arrays are read-only, except for the copied attributes
+    slitid = sobjs.SLITID
+    with pytest.raises(ValueError):
+        slitid[0] = 5
+    with pytest.raises(ValueError):
+        sobjs.TRACE_SPAT *= 2
+    assert np.array_equal(sobjs.TRACE_SPAT[:,0], [0.,1.,2.])
+    for i, sobj in enumerate(sobjs):
+        sobj.OPT_COUNTS = np.full(10, float(i))
+    counts = sobjs.OPT_COUNTS
+    counts *= -1
+    assert np.array_equal(sobjs.OPT_COUNTS[:,0], [0.,1.,2.])
+    # Changing objects outside of the set does not reset the cache
+    slitid = sobjs.SLITID
+    assert sobjs.SLITID is slitid
+    sobj = specobj.SpecObj('MultiSlit', 'DET01', SLITID=5)
+    sobj.SLITID = 6
+    specobjs.SpecObjs([sobj]).SLITID = 7
+    assert sobjs.SLITID is slitid
+    # Modifying the objects resets the cache
+    sobjs[1].SLITID = 3
+    assert np.array_equal(sobjs.SLITID, [0,3,0])
+    sub = sobjs[np.array([True,False,True])]
+    sub.SLITID = 7
+    assert np.array_equal(sobjs.SLITID, [7,3,7])
+    sobjs[2].TRACE_SPAT = np.zeros(10)
+    assert np.array_equal(sobjs.TRACE_SPAT[:,0], [0.,1.,0.])
+    # Replacing objects
+    sobjs[1] = sobj4
+    assert np.array_equal(sobjs.SLITID, [7,10,7])
+    sobjs[sobjs.SLITID == 7] = specobjs.SpecObjs([sobj2, sobj2])
+    assert np.array_equal(sobjs.SLITID, [3,10,3])
+    with pytest.raises(ValueError):
+        sobjs.specobjs[0] = sobj1
+    sobjs.add_sobj(sobj1)
+    assert np.array_equal(sobjs.SLITID, [3,10,3,7])
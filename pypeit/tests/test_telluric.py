@@ -1,10 +1,13 @@
 import os
+import tempfile
 from pkg_resources import resource_filename
 
 from IPython import embed
 
 import numpy as np
 
+from astropy.io import fits
+
 from pypeit.core import telluric
 from pypeit.tests.tstutils import telluric_required, tell_test_grid
 
@@ -74,3 +77,156 @@ def test_telluric_io():
 
 # TODO: Additional tests?
 
+
+
+def synthetic_telluric_grid(ofile, nspec=6000, shape=(3, 2, 4, 2)):
+    # Log-linear wavelength grid in nm with random absorption lines whose
+    # depth scales with the grid parameters
+    wave = 1000.*10**(np.arange(nspec)*1e-5)
+    rng = np.random.default_rng(5)
+    centers = rng.uniform(wave[0], wave[-1], 200)
+    tau = np.sum(np.exp(-0.5*((wave[:,None] - centers[None,:])/0.02)**2), axis=1)
+    scale = np.arange(1, np.prod(shape)+1).reshape(shape)[...,None]/np.prod(shape)
+    hdr = fits.Header()
+    for key, start, step, n in zip(['PRES', 'TEMP', 'HUM', 'AM'], [500., 270., 0., 1.],
+                                   [50., 10., 25., 0.5], shape):
+        hdr[f'{key}0'] = start
+        hdr[f'D{key}'] = step
+        hdr[f'N{key}'] = n
+    fits.HDUList([fits.PrimaryHDU(data=np.exp(-scale*tau).astype('>f4'), header=hdr),
+                  fits.ImageHDU(data=wave)]).writeto(ofile, overwrite=True)
+
+
+def test_telluric_grid_store(tmp_path, monkeypatch):
+    telgrid = str(tmp_path / 'telgrid.fits')
+    synthetic_telluric_grid(telgrid)
+    store = telluric.TelluricGridStore(telgrid, store_path=str(tmp_path / 'store'))
+    tell_dict = store.subgrid(wave_min=10500., wave_max=11500.)
+
+    with fits.open(telgrid) as hdul:
+        wave = 10.*hdul[1].data
+        lo, hi = np.argmin(np.abs(wave - 0.9*10500.)), np.argmin(np.abs(wave - 1.1*11500.))
+        assert np.array_equal(tell_dict['wave_grid'], wave[lo:hi]), 'Bad wavelengths'
+        assert np.array_equal(tell_dict['tell_grid'], hdul[0].data[...,lo:hi]), 'Bad grid'
+    assert isinstance(tell_dict['tell_grid'], np.memmap), 'Grid should be memory-mapped'
+    assert np.array_equal(tell_dict['h2o_grid'], [0., 25., 50., 75.])
+    assert os.path.isdir(os.path.join(store.directory, 'subgrids', f'{lo}_{hi}'))
+
+    # The store is reused as long as the grid file is unchanged
+    assert telluric.TelluricGridStore(telgrid, store_path=str(tmp_path / 'store')).params \
+                == store.params
+
+    # Evaluate using a grid preconvolved to a ladder of resolutions
+    ladder = np.geomspace(0.5*tell_dict['resln_guess'], 0.1*tell_dict['resln_guess'], 20)[::-1]
+    ladder_dict = store.subgrid(wave_min=10500., wave_max=11500., resln_ladder=ladder)
+    theta = np.array([560., 280., 40., 1.4, ladder[3], 0.3, 1.001])
+    ind_lower, ind_upper = 100, tell_dict['wave_grid'].size-200
+    # The direct convolution zero-pads beyond the padded fitting range, so
+    # only compare pixels that are unaffected
+    interior = slice(100, -100)
+    exact = telluric.eval_telluric(theta, tell_dict, ind_lower=ind_lower, ind_upper=ind_upper)
+    assert np.allclose(telluric.eval_telluric(theta, ladder_dict, ind_lower=ind_lower,
+                                              ind_upper=ind_upper)[interior], exact[interior],
+                       rtol=0, atol=1e-6), \
+            'Preconvolved model should match at a ladder resolution'
+    theta[4] = np.sqrt(ladder[3]*ladder[4])
+    exact = telluric.eval_telluric(theta, tell_dict, ind_lower=ind_lower, ind_upper=ind_upper)
+    assert np.allclose(telluric.eval_telluric(theta, ladder_dict, ind_lower=ind_lower,
+                                              ind_upper=ind_upper)[interior], exact[interior],
+                       rtol=0, atol=2e-3), \
+            'Interpolated model should be close to the convolved model'
+    # Resolutions outside the ladder are convolved directly
+    theta[4] = 2*ladder[-1]
+    assert np.array_equal(telluric.eval_telluric(theta, ladder_dict, ind_lower=ind_lower,
+                                                 ind_upper=ind_upper),
+                          telluric.eval_telluric(theta, tell_dict, ind_lower=ind_lower,
+                                                 ind_upper=ind_upper))
+
+    # Grids that cannot be added to the store are held in memory
+    def _read_only(*args, **kwargs):
+        raise PermissionError('Read-only store')
+    with monkeypatch.context() as m:
+        m.setattr(tempfile, 'mkdtemp', _read_only)
+        _ladder_dict = store.subgrid(wave_min=10100., wave_max=10500., pad_frac=0.,
+                                     resln_ladder=ladder)
+        assert not isinstance(_ladder_dict['tell_grid'], np.memmap), 'Grid should be in memory'
+        _tell_dict = telluric.read_telluric_grid(telgrid, wave_min=10100., wave_max=10500.,
+                                                 pad_frac=0.)
+        assert np.array_equal(_ladder_dict['tell_grid'], _tell_dict['tell_grid']), 'Bad grid'
+        assert np.array_equal(_ladder_dict['tell_grid_conv'],
+                              telluric.preconvolve_telluric_grid(_tell_dict['tell_grid'],
+                                                                 _tell_dict['dloglam'], ladder)), \
+                'Bad preconvolved grid'
+
+
+def test_telluric_grid_store_size(tmp_path):
+    telgrid = str(tmp_path / 'telgrid.fits')
+    synthetic_telluric_grid(telgrid)
+    store = telluric.TelluricGridStore(telgrid, store_path=str(tmp_path / 'store'))
+    subgrids = os.path.join(store.directory, 'subgrids')
+    ranges = [(10100., 10500.), (10600., 11000.), (11000., 11400.)]
+    tell_dict = store.subgrid(*ranges[0], pad_frac=0.)
+
+    # Room for two trimmed grids
+    store.max_size = int(2.5*tell_dict['tell_grid'].nbytes)
+    store.subgrid(*ranges[1], pad_frac=0.)
+    assert len(os.listdir(subgrids)) == 2, 'Both grids should fit in the store'
+    # Use the first grid again, such that the second is the least recently used
+    store.subgrid(*ranges[0], pad_frac=0.)
+    store.subgrid(*ranges[2], pad_frac=0.)
+    kept = os.listdir(subgrids)
+    assert len(kept) == 2, 'Least recently used grid should have been removed'
+    lo, hi = telluric.telluric_grid_limits(store.wave_grid, *ranges[1], pad_frac=0.)
+    assert f'{lo}_{hi}' not in kept, 'Wrong grid removed'
+
+    # The requested grids are kept even if they do not fit
+    store.max_size = 0
+    ladder = np.geomspace(0.1, 0.5, 2)*tell_dict['resln_guess']
+    ladder_dict = store.subgrid(*ranges[0], pad_frac=0., resln_ladder=ladder)
+    assert len(os.listdir(subgrids)) == 1, 'Only the requested grid should be kept'
+    assert np.array_equal(ladder_dict['tell_grid'], tell_dict['tell_grid'])
+    assert ladder_dict['tell_grid_conv'].shape[0] == 2
+
+
+def test_vectorized_telluric(tmp_path):
+    telgrid = str(tmp_path / 'telgrid.fits')
+    synthetic_telluric_grid(telgrid)
+    store = telluric.TelluricGridStore(telgrid, store_path=str(tmp_path / 'store'))
+    tell_dict = store.subgrid(wave_min=10500., wave_max=11500.)
+    resln = tell_dict['resln_guess']
+    ladder = np.geomspace(0.1*resln, 0.5*resln, 20)
+    ladder_dict = store.subgrid(wave_min=10500., wave_max=11500., resln_ladder=ladder)
+    ind_lower, ind_upper = 100, tell_dict['wave_grid'].size-200
+
+    # Random parameter vectors, some with resolutions outside the ladder
+    rng = np.random.default_rng(1)
+    bounds = np.array([[tell_dict[key].min(), tell_dict[key].max()]
+                        for key in ['pressure_grid', 'temp_grid', 'h2o_grid', 'airmass_grid']]
+                      + [[0.05*resln, 0.5*resln], [-1., 1.], [0.999, 1.001]])
+    theta_tell = bounds[:,0] + rng.random((20, 7))*np.diff(bounds, axis=1).T
+    for _tell_dict in [tell_dict, ladder_dict]:
+        models = telluric.eval_telluric(theta_tell, _tell_dict, ind_lower=ind_lower,
+                                        ind_upper=ind_upper)
+        assert models.shape == (20, ind_upper-ind_lower+1), 'Bad shape'
+        for theta, model in zip(theta_tell, models):
+            assert np.allclose(model, telluric.eval_telluric(theta, _tell_dict, ind_lower=ind_lower,
+                                                             ind_upper=ind_upper),
+                               rtol=0, atol=1e-6), 'Batch evaluation should match single vectors'
+
+    # Loss function for a full population, as used by differential evolution
+    wave = tell_dict['wave_grid'][ind_lower:ind_upper+1]
+    obj_dict = dict(func='legendre', model='exp', wave=wave, wave_min=wave.min(),
+                    wave_max=wave.max())
+    arg_dict = dict(obj_model_func=telluric.eval_poly_model, obj_dict=obj_dict, tell_dict=tell_dict,
+                    ind_lower=ind_lower, ind_upper=ind_upper, ivar=np.full(wave.size, 1e4))
+    theta_obj = np.column_stack([rng.normal(0.5, 0.1, 20), rng.normal(size=(20,2))/10])
+    flux = telluric.eval_poly_model(theta_obj[0], obj_dict)[0] \
+                * telluric.eval_telluric(theta_tell[0], tell_dict, ind_lower=ind_lower,
+                                         ind_upper=ind_upper)
+    thismask = np.ones(wave.size, dtype=bool)
+    thismask[:10] = False
+    population = np.column_stack([theta_obj, theta_tell])
+    loss = telluric.tellfit_population(None, population, flux, thismask, arg_dict, chunk_pix=5*wave.size)
+    assert np.allclose(loss, [telluric.tellfit_chi2(p, flux, thismask, arg_dict) for p in population],
+                       rtol=1e-5, atol=1e-6), 'Population loss should match single vectors'
+    assert np.argmin(loss) == 0, 'Input parameters should have the lowest loss'
@@ -0,0 +1,60 @@
+"""
+Module to run tests on pypeit.core.trace functions
+"""
+import numpy as np
+
+from pypeit.core import trace
+from pypeit.edgetrace import EdgeTraceBitMask
+
+
+def test_follow_centroid():
+    # Image with a few tilted, curved features
+    rng = np.random.default_rng(3)
+    nrow, ncol = 300, 120
+    row = np.arange(nrow)[:,None]
+    col = np.arange(ncol)[None,:]
+    cen = np.array([20.3, 45.1, 70.8, 98.4])[None,:] + 0.01*(row - nrow/2) \
+            + 1e-4*(row - nrow/2)**2
+    img = np.sum(np.exp(-0.5*((col[...,None] - cen[:,None,:])/1.5)**2), axis=2)
+    img += rng.normal(scale=0.01, size=img.shape)
+    ivar = np.full(img.shape, 1e4)
+
+    bitmask = EdgeTraceBitMask()
+    start_row = np.array([150, 150, 40, 260])
+    xc, xe, xm = trace.follow_centroid(img, start_row, np.round(cen[start_row, np.arange(4)]),
+                                       width=6., maxshift_follow=0.5, ivar=ivar,
+                                       bitmask=bitmask)
+    assert np.all(xm == 0), 'Traces should be followed along all rows'
+    assert np.all(np.absolute(xc - cen) < 0.1), 'Bad trace centroids'
+    # Result is the same as following each feature separately
+    for i in range(start_row.size):
+        _xc, _xe, _xm = trace.follow_centroid(img, start_row[i], cen[start_row[i],i].round(),
+                                              width=6., maxshift_follow=0.5, ivar=ivar,
+                                              bitmask=bitmask)
+        assert np.array_equal(xc[:,i], _xc[:,0]) and np.array_equal(xe[:,i], _xe[:,0]) \
+                and np.array_equal(xm[:,i], _xm[:,0]), 'Traces should be independent'
+
+
+def test_follow_centroid_stack():
+    # Stack of images, each with a single tilted feature
+    rng = np.random.default_rng(4)
+    nimg, nrow, ncol = 3, 80, 40
+    row = np.arange(nrow)[:,None]
+    col = np.arange(ncol)[None,:]
+    cen = np.array([12.4, 20.1, 27.7])[:,None] + np.array([0.02, -0.03, 0.05])[:,None]*row.T
+    img = np.exp(-0.5*((col[None,...] - cen[...,None])/1.5)**2)
+    img += rng.normal(scale=0.01, size=img.shape)
+    bpm = np.zeros(img.shape, dtype=bool)
+    bpm[1,:,25:27] = True
+
+    start_row = np.array([40, 10, 70])
+    start_cen = np.round(cen[np.arange(nimg), start_row])
+    xc, xe, xm = trace.follow_centroid(img, start_row, start_cen, bpm=bpm, width=6.,
+                                       maxshift_follow=0.5, continuous=False)
+    assert xc.shape == (nrow, nimg), 'Bad output shape'
+    # Result is the same as following each feature in its own image
+    for i in range(nimg):
+        _xc, _xe, _xm = trace.follow_centroid(img[i], start_row[i], start_cen[i], bpm=bpm[i],
+                                              width=6., maxshift_follow=0.5, continuous=False)
+        assert np.array_equal(xc[:,i], _xc[:,0]) and np.array_equal(xe[:,i], _xe[:,0]) \
+                and np.array_equal(xm[:,i], _xm[:,0]), 'Features should be independent'
@@ -117,4 +117,55 @@ def test_yamlify():
 
     # Clean up
     os.remove(tst_file)
-    
\ No newline at end of file
+    
+
+def test_get_nproc():
+    assert utils.get_nproc(None) == 1, 'None should run serially'
+    assert utils.get_nproc(1) == 1, 'Should run serially'
+    assert utils.get_nproc(4) == 4, 'Should use the requested number'
+    assert utils.get_nproc(4, ntasks=2) == 2, 'Should be limited by the number of tasks'
+    assert utils.get_nproc(0) == os.cpu_count(), 'Should use all CPUs'
+    assert utils.get_nproc(0, ntasks=0) == 1, 'Should always return at least 1'
+    ncpu = os.cpu_count()
+    assert utils.get_nproc(0, nworkers=2) == max(ncpu // 2, 1), \
+            'Should be limited by the number of enclosing workers'
+    assert utils.get_nproc(ncpu, nworkers=ncpu+1) == 1, 'Should always return at least 1'
+    assert utils.get_nproc(None, nworkers=2) == 1, 'Should run serially'
+
+
+def shared_element(i):
+    return utils.shared_data('data')[i]
+
+
+def test_parallel_map():
+    data = np.arange(10)*2
+    for nproc in [1, 2]:
+        result = list(utils.parallel_map(shared_element, [(i,) for i in range(10)], nproc=nproc,
+                                         shared={'data': data}))
+        assert np.array_equal(result, data), 'Results should be returned in order'
+    result = list(utils.parallel_map(shared_element, [(i,) for i in range(10)], nproc=2,
+                                     shared={'data': data}, nahead=2))
+    assert np.array_equal(result, data), 'Results should be returned in order'
+
+
+# Changed by test_parallel_map_spawn; workers that are forked instead of spawned
+# would inherit the change
+parent_state = 'imported'
+
+
+def shared_state(i):
+    return parent_state, utils.shared_data('meta')['offset'] + utils.shared_data('data')[i]
+
+
+def test_parallel_map_spawn():
+    global parent_state
+    parent_state = 'modified'
+    data = np.arange(4)
+    try:
+        result = list(utils.parallel_map(shared_state, [(i,) for i in range(4)], nproc=2,
+                                         shared={'data': data, 'meta': {'offset': 10}}))
+    finally:
+        parent_state = 'imported'
+    assert [state for state, _ in result] == ['imported']*4, \
+            'Worker processes should be spawned, not forked'
+    assert [value for _, value in result] == [10, 11, 12, 13], 'Bad shared data'
@@ -11,6 +11,7 @@ import numpy as np
 from pypeit.tests.tstutils import dev_suite_required, load_kast_blue_masters, cooked_required
 from pypeit import wavetilts
 from pypeit import slittrace
+from pypeit.images import buildimage
 from pypeit.core import tracewave, pixels
 from pypeit.par import pypeitpar
 from pypeit.spectrographs.util import load_spectrograph
@@ -132,3 +133,44 @@ def test_run(master_dir):
     assert isinstance(waveTilts.fit2tiltimg(slits.slit_img()), np.ndarray)
 
 
+
+def synthetic_arc(nspec=512, nslits=3, slit_width=30, gap=6, nlines=12, seed=1):
+    """
+    Build a simple tilted arc-line image with slit edges for testing.
+    """
+    rng = np.random.default_rng(seed)
+    nspat = nslits*(slit_width+gap) + gap
+    spec = np.arange(nspec, dtype=float)[:,None]
+    spat = np.arange(nspat, dtype=float)[None,:]
+    left = gap + np.arange(nslits)*(slit_width+gap) + 0.
+    right = left + slit_width
+    lines = rng.uniform(30, nspec-30, nlines)
+    amps = rng.uniform(500, 5000, nlines)
+    img = np.full((nspec, nspat), 50.)
+    for i in range(nslits):
+        cen = (left[i]+right[i])/2
+        on = (spat >= left[i]) & (spat < right[i])
+        for l, a in zip(lines, amps):
+            img += on * a * np.exp(-0.5*((spec - l - 0.02*(i+1)*(spat-cen))/1.7)**2)
+    img += rng.normal(scale=3., size=img.shape)
+    return img, np.tile(left, (nspec,1)), np.tile(right, (nspec,1))
+
+
+def test_run_nproc():
+    img, left, right = synthetic_arc()
+    slits = slittrace.SlitTraceSet(left_init=left, right_init=right, pypeline='MultiSlit',
+                                   nspat=img.shape[1], PYP_SPEC='dummy')
+    mstilt = buildimage.TiltImage(img)
+    spectrograph = load_spectrograph('shane_kast_blue')
+    par = pypeitpar.WaveTiltsPar()
+    wavepar = pypeitpar.WavelengthSolutionPar()
+    tilts = []
+    for nproc in [1, 2]:
+        buildwaveTilts = wavetilts.BuildWaveTilts(mstilt, slits, spectrograph, par, wavepar,
+                                                  nproc=nproc)
+        waveTilts = buildwaveTilts.run(doqa=False)
+        assert np.all(waveTilts['bpmtilts'] == 0), 'Tilts should be fit for all slits'
+        tilts += [(waveTilts['coeffs'], buildwaveTilts.final_tilts)]
+    # Parallel and serial results must be identical
+    assert np.array_equal(tilts[0][0], tilts[1][0])
+    assert np.array_equal(tilts[0][1], tilts[1][1])
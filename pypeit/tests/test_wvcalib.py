@@ -6,15 +6,18 @@ import io
 import os
 import shutil
 import inspect
+import tempfile
 
 import pytest
 
 import numpy as np
 
-from pypeit.core.wavecal import wv_fitting
+import pypeit
+from pypeit.core.wavecal import wv_fitting, autoid, waveio
 from pypeit.core import fitting
 from pypeit import wavecalib
 from pypeit import slittrace
+from pypeit.spectrographs.util import load_spectrograph
 
 def data_path(filename):
     data_dir = os.path.join(os.path.dirname(__file__), 'files')
@@ -117,3 +120,78 @@ def test_wavecalib():
 
     # Finish
     os.remove(out_file)
+
+
+def test_full_template_nproc():
+    "Calibrate slits in parallel"
+    par = load_spectrograph('shane_kast_blue').default_pypeit_par()['calibrations']['wavelengths']
+    par['reid_arxiv'] = 'shane_kast_blue_600.fits'
+    temp_wv, temp_spec, temp_bin = waveio.load_template(par['reid_arxiv'], 1)
+    # Shifted copies of the template
+    spec = np.stack([np.roll(temp_spec, s) for s in (0, 5)], axis=1)[:2048]
+    lamps = ['CdI', 'HgI', 'HeI']
+    serial = autoid.full_template(spec, lamps, par, np.arange(2), 1, temp_bin)
+    parallel = autoid.full_template(spec, lamps, par, np.arange(2), 1, temp_bin, nproc=2)
+    assert list(serial.keys()) == list(parallel.keys()), 'Bad slits'
+    for key in serial.keys():
+        assert serial[key]['rms'] < 0.5, 'Bad fit'
+        assert serial[key]['rms'] == parallel[key]['rms'], 'Parallel result is different'
+        assert np.array_equal(serial[key]['pixel_fit'], parallel[key]['pixel_fit']), \
+                'Parallel result is different'
+
+
+def test_reid_arxiv_store(tmp_path, monkeypatch):
+    # Copy an arxiv file so that it can be changed
+    arxiv_file = str(tmp_path / 'Flamingos2_JH_JH.json')
+    shutil.copy(os.path.join(waveio.reid_arxiv_path, 'Flamingos2_JH_JH.json'), arxiv_file)
+    store_path = str(tmp_path / 'store')
+
+    # Build the store and check it against the arxiv file
+    store = waveio.ReidArxivStore(arxiv_file, store_path=store_path)
+    assert store.is_current(), 'Store should be current'
+    assert isinstance(store['flux'], np.memmap), 'Spectra should be memory-mapped'
+    wv_calib_arxiv, _ = waveio.load_reid_arxiv(arxiv_file)
+    assert np.array_equal(store['flux'][0], wv_calib_arxiv['0']['spec']), 'Bad spectrum'
+    assert np.array_equal(store['wave'][0], wv_calib_arxiv['0']['wave_soln']), 'Bad wavelengths'
+
+    # Features are computed once, for each set of parameters
+    ncalls = []
+    def _feature():
+        ncalls.append(1)
+        return dict(total=np.sum(store['flux'], axis=1))
+    for i in range(2):
+        feature = waveio.ReidArxivStore(arxiv_file, store_path=store_path).feature(
+                        'total', _feature, sigdetect=5.)
+    assert np.allclose(feature['total'], np.sum(store['flux'], axis=1)), 'Bad feature'
+    assert len(ncalls) == 1, 'Feature should have been read from the store'
+    store.feature('total', _feature, sigdetect=10.)
+    assert len(ncalls) == 2, 'Feature should have been computed for the new parameters'
+
+    # Features computed by a different version of the code are not used
+    with monkeypatch.context() as m:
+        m.setattr(pypeit, '__version__', 'test')
+        store.feature('total', _feature, sigdetect=5.)
+    assert len(ncalls) == 3, 'Feature should have been computed for the new version'
+
+    # Features are computed in memory if the store is read-only
+    def _read_only(*args, **kwargs):
+        raise PermissionError('Read-only store')
+    with monkeypatch.context() as m:
+        m.setattr(tempfile, 'mkdtemp', _read_only)
+        feature = store.feature('total', _feature, sigdetect=20.)
+    assert len(ncalls) == 4, 'Feature should have been computed'
+    assert not isinstance(feature['total'], np.memmap), 'Feature should not be saved'
+    assert np.allclose(feature['total'], np.sum(store['flux'], axis=1)), 'Bad feature'
+
+    # Changing the arxiv file invalidates the store
+    with open(arxiv_file, 'a') as f:
+        f.write('\n')
+    store = waveio.ReidArxivStore(arxiv_file, store_path=store_path)
+    assert store.checksum == waveio.file_checksum(arxiv_file), 'Store not rebuilt'
+    store.feature('total', _feature, sigdetect=5.)
+    assert len(ncalls) == 5, 'Features should have been discarded'
+
+    # Forcing a rebuild also discards the features
+    waveio.ReidArxivStore(arxiv_file, store_path=store_path, force=True).feature(
+            'total', _feature, sigdetect=5.)
+    assert len(ncalls) == 6, 'Features should have been discarded'
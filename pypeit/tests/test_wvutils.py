@@ -0,0 +1,40 @@
+"""
+Module to run tests on the wavelength calibration utilities
+"""
+import numpy as np
+
+from pypeit.core.wavecal import waveio, wvutils
+
+
+def test_xcorr_shift_stretch_fft():
+    # Benchmark the accuracy of the FFT shift/stretch search against the
+    # differential evolution optimizer
+    arxiv, _ = waveio.load_reid_arxiv('Flamingos2_JH_JH.json')
+    spec = arxiv['0']['spec']
+    shifts = [12.3, -30.7, 38.2]
+    stretches = [1.0, 1.012, 0.98]
+    spec_arxiv = np.stack([wvutils.shift_and_stretch(spec, shift, stretch)
+                           for shift, stretch in zip(shifts, stretches)], axis=1)
+
+    # All arxiv spectra at once
+    success, shift, stretch, corr, shift_cc, corr_cc \
+            = wvutils.xcorr_shift_stretch_fft(spec, spec_arxiv)
+    assert np.all(success == 1), 'Search failed'
+    assert np.all(corr >= corr_cc), 'Search should improve the cross-correlation'
+    for i in range(spec_arxiv.shape[1]):
+        _success, _shift, _stretch, _corr, _, _ \
+                = wvutils.xcorr_shift_stretch(spec, spec_arxiv[:,i], seed=1)
+        assert np.absolute(shift[i] - _shift) < 0.01, 'Bad shift'
+        # The stretched spectra are resampled to an integer number of pixels
+        assert int(spec.size*stretch[i]) == int(spec.size*_stretch), 'Bad stretch'
+        assert corr[i] > _corr - 1e-5, 'Bad cross-correlation'
+
+    # Single spectrum
+    _success, _shift, _stretch, _corr, _, _ \
+            = wvutils.xcorr_shift_stretch_fft(spec, spec_arxiv[:,1])
+    assert isinstance(_shift, float), 'Should return scalars'
+    assert _shift == shift[1] and _corr == corr[1], 'Result should not depend on batching'
+
+    # No spectra to match
+    result = wvutils.xcorr_shift_stretch_fft(spec, spec_arxiv[:,:0])
+    assert all(r.size == 0 for r in result), 'Should return empty arrays'
@@ -10,7 +10,11 @@ import inspect
 import pickle
 import warnings
 import itertools
+import multiprocessing
+from collections import deque
 from glob import glob
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from typing import List
 
 from IPython import embed
@@ -1378,6 +1382,173 @@ def find_single_file(file_pattern):
         msgs.warn(f'Found multiple files matching {file_pattern}; using the first one.')
         return files[0]
 
+def get_nproc(nproc, ntasks=None, nworkers=1):
+    """
+    Determine the number of processes to use for a set of parallel tasks.
+
+    Args:
+        nproc (:obj:`int`):
+            Requested number of processes.  If None or 1, the tasks should be
+            executed serially.  If 0 or negative, all available CPUs are used.
+        ntasks (:obj:`int`, optional):
+            The number of tasks to execute.  If provided, the returned number
+            of processes is never larger than this.
+        nworkers (:obj:`int`, optional):
+            The number of processes that each start this number of
+            processes; e.g., the number of worker processes in an enclosing
+            pool.  The returned number of processes is limited such that the
+            total number of processes does not exceed the number of
+            available CPUs.
+
+    Returns:
+        :obj:`int`: The number of processes to use.  A value of 1 means the
+        tasks should be executed serially.
+    """
+    if nproc is None:
+        return 1
+    _nproc = os.cpu_count() if nproc < 1 else nproc
+    if ntasks is not None:
+        _nproc = min(_nproc, ntasks)
+    if nworkers > 1:
+        _nproc = min(_nproc, os.cpu_count() // nworkers)
+    return max(_nproc, 1)
+
+
+# Objects made available to the tasks executed by parallel_map
+_shared_data = {}
+# Shared-memory blocks attached by a worker process of parallel_map
+_shared_blocks = []
+
+
+def _set_shared_data(data):
+    """
+    Replace the objects available via :func:`shared_data`.
+    """
+    _shared_data.clear()
+    _shared_data.update(data)
+
+
+def _attach_shared_data(data, arrays):
+    """
+    Initialize a worker process of :func:`parallel_map`.
+
+    Args:
+        data (:obj:`dict`):
+            Objects sent directly to the worker.
+        arrays (:obj:`dict`):
+            Name, shape, and data type of the shared-memory block holding each
+            shared array.  The worker is given read-only views of these
+            blocks.
+    """
+    _shared_blocks.clear()
+    _data = dict(data)
+    for key, (name, shape, dtype) in arrays.items():
+        block = shared_memory.SharedMemory(name=name)
+        _shared_blocks.append(block)
+        _data[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        _data[key].flags.writeable = False
+    _set_shared_data(_data)
+
+
+def shared_data(key):
+    """
+    Return an object shared with the tasks executed by :func:`parallel_map`.
+
+    Args:
+        key (:obj:`str`):
+            Key of the object in the ``shared`` dictionary provided to
+            :func:`parallel_map`.
+
+    Returns:
+        object: The shared object.  When executed by a worker process, shared
+        `numpy.ndarray`_ objects are read-only views of shared memory.
+    """
+    return _shared_data[key]
+
+
+def parallel_map(func, arglist, nproc=1, shared=None, nahead=None):
+    """
+    Execute a function for a list of argument sets, optionally using a pool of
+    processes.
+
+    Objects needed by all tasks (e.g., full-detector images) should be provided
+    using ``shared``, instead of including them in ``arglist``, and the tasks
+    access them using :func:`shared_data`.  When using a pool of processes,
+    the shared `numpy.ndarray`_ objects are copied once into shared memory, and
+    each worker process is given read-only views of these blocks; i.e., the
+    arrays are not copied into each worker.  Any other shared objects are sent
+    to each worker process once, when the process is started.
+
+    The worker processes are started using the ``spawn`` method, such that
+    they do not inherit the state of the calling process (e.g., the open log
+    file of :mod:`~pypeit.pypmsgs` or the threads of the linear-algebra
+    libraries).  This means that ``func``, the arguments, and the shared
+    objects must all be picklable.
+
+    Args:
+        func (callable):
+            Function to execute.  For parallel execution, this must be
+            defined at the top level of a module so that it can be pickled.
+        arglist (:obj:`list`):
+            List of tuples with the positional arguments for each call.
+        nproc (:obj:`int`, optional):
+            Number of processes to use; see :func:`get_nproc`.  If 1, the
+            calls are executed serially.
+        shared (:obj:`dict`, optional):
+            Objects to make available to ``func`` via :func:`shared_data`.
+        nahead (:obj:`int`, optional):
+            When using a pool of processes, the maximum number of tasks
+            submitted ahead of the one with the result that is yielded next.
+            This limits the number of results held in memory when they are
+            consumed more slowly than they are computed.  If None, all tasks
+            are submitted at once.
+
+    Yields:
+        The result of each function call, in the same order as ``arglist``.
+    """
+    _shared = {} if shared is None else shared
+    _nproc = get_nproc(nproc, ntasks=len(arglist))
+    if _nproc == 1:
+        # Restore any previously shared data when finished
+        previous = _shared_data.copy()
+        _set_shared_data(_shared)
+        try:
+            for args in arglist:
+                yield func(*args)
+        finally:
+            _set_shared_data(previous)
+        return
+
+    data = {}
+    arrays = {}
+    blocks = []
+    try:
+        for key, value in _shared.items():
+            if type(value) is not np.ndarray or value.nbytes == 0 or value.dtype.hasobject:
+                data[key] = value
+                continue
+            block = shared_memory.SharedMemory(create=True, size=value.nbytes)
+            blocks.append(block)
+            np.ndarray(value.shape, dtype=value.dtype, buffer=block.buf)[...] = value
+            arrays[key] = (block.name, value.shape, value.dtype)
+
+        with ProcessPoolExecutor(max_workers=_nproc,
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_attach_shared_data,
+                                 initargs=(data, arrays)) as pool:
+            futures = deque()
+            for args in arglist:
+                futures.append(pool.submit(func, *args))
+                if nahead is not None and len(futures) > nahead:
+                    yield futures.popleft().result()
+            while len(futures) > 0:
+                yield futures.popleft().result()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
 def DFS(v: int, visited: List[bool], group: List[int], adj: np.ndarray):
     """
     Depth-First Search of graph given by matrix `adj` starting from `v`.
@@ -22,6 +22,7 @@ from pypeit.core import fitting
 from pypeit.core.wavecal import autoid, waveio, wv_fitting
 from pypeit.core.gui.identify import Identify
 from pypeit import datamodel
+from pypeit import slitimage
 
 from IPython import embed
 
@@ -184,7 +185,8 @@ class WaveCalib(datamodel.DataContainer):
         if not np.array_equal(self.spat_ids, slits.spat_id):
             msgs.error("Your wvcalib solutions are out of sync with your slits.  Remove Masters and start from scratch")
 
-    def build_waveimg(self, tilts, slits, spat_flexure=None, spec_flexure=None):
+    def build_waveimg(self, tilts, slits, spat_flexure=None, spec_flexure=None, lazy=False,
+                      dtype=None, cache_size=None):
         """
         Main algorithm to build the wavelength image
 
@@ -192,7 +194,7 @@ class WaveCalib(datamodel.DataContainer):
          in the exclude_for_reducing list
 
         Args:
-            tilts (`numpy.ndarray`_):
+            tilts (`numpy.ndarray`_, :class:`~pypeit.slitimage.LazyTiltImage`):
                 Image holding tilts
             slits (:class:`pypeit.slittrace.SlitTraceSet`):
             spat_flexure (float, optional):
@@ -204,54 +206,25 @@ class WaveCalib(datamodel.DataContainer):
                 array should be the same as the number of slits. The
                 value of each element is the spectral shift in pixels
                 to be applied to each slit.
+            lazy (bool, optional):
+                Return a :class:`~pypeit.slitimage.LazyWaveImage` that
+                evaluates the wavelengths of each slit on demand instead
+                of the full image.
+            dtype (`numpy.dtype`_, optional):
+                Data type of the wavelengths.  If None, use the data
+                type of ``tilts``.
+            cache_size (int, optional):
+                Maximum number of slits with cached wavelengths in the
+                lazy image.  If None, all evaluated slits are cached.
 
         Returns:
-            `numpy.ndarray`_: The wavelength image.
+            `numpy.ndarray`_, :class:`~pypeit.slitimage.LazyWaveImage`:
+            The wavelength image.
         """
-        # Check spatial flexure type
-        if (spat_flexure is not None) and (not isinstance(spat_flexure, float)):
-            msgs.error("Spatial flexure must be None or float")
-        # Check spectral flexure type
-        if spec_flexure is None: spec_flex = np.zeros(slits.nslits)
-        elif isinstance(spec_flexure, float): spec_flex = spec_flexure*np.ones(slits.nslits)
-        elif isinstance(spec_flexure, np.ndarray):
-            spec_flex = spec_flexure.copy()
-            assert(spec_flexure.size == slits.nslits)
-        spec_flex /= (slits.nspec - 1)
-
-        # Setup
-        #ok_slits = slits.mask == 0
-        bpm = slits.mask.astype(bool)
-        bpm &= np.logical_not(slits.bitmask.flagged(slits.mask, flag=slits.bitmask.exclude_for_reducing))
-        ok_slits = np.logical_not(bpm)
-        #
-        image = np.zeros_like(tilts)
-        slitmask = slits.slit_img(flexure=spat_flexure, exclude_flag=slits.bitmask.exclude_for_reducing)
-
-        # If this is echelle print out a status message and do some error checking
-        if self.par['echelle']:
-            msgs.info('Evaluating 2-d wavelength solution for echelle....')
-            # TODO UPDATE THIS!!
-            #if len(wv_calib['fit2d']['orders']) != np.sum(ok_slits):
-            #    msgs.error('wv_calib and ok_slits do not line up. Something is very wrong!')
-
-        # Unpack some 2-d fit parameters if this is echelle
-        for islit in np.where(ok_slits)[0]:
-            slit_spat = slits.spat_id[islit]
-            thismask = (slitmask == slit_spat)
-            if not np.any(thismask):
-                msgs.error("Something failed in wavelengths or masking..")
-            if self.par['echelle']:
-                # # TODO: Put this in `SlitTraceSet`?
-                # evaluate solution --
-                image[thismask] = self.wv_fit2d.eval(
-                    tilts[thismask] + spec_flex[islit], x2=np.full_like(tilts[thismask], slits.ech_order[islit]))
-                image[thismask] /= slits.ech_order[islit]
-            else:
-                iwv_fits = self.wv_fits[islit]
-                image[thismask] = iwv_fits.pypeitfit.eval(tilts[thismask] + spec_flex[islit])
-        # Return
-        return image
+        waveimg = slitimage.LazyWaveImage(self, tilts, slits, spat_flexure=spat_flexure,
+                                          spec_flexure=spec_flexure, dtype=dtype,
+                                          cache_size=cache_size)
+        return waveimg if lazy else waveimg.to_array()
 
     def print_diagnostics(self):
         """
@@ -304,6 +277,10 @@ class BuildWaveCalib:
         msbpm (ndarray, optional): Bad pixel mask image
         qa_path (str, optional):  For QA
         master_key (:obj:`str`, optional):  For naming QA only
+        nproc (:obj:`int`, optional):
+            Number of processes used to calibrate the slits with the
+            ``holy-grail``, ``reidentify``, and ``full_template`` methods; see
+            :func:`~pypeit.utils.get_nproc`.
 
     Attributes:
         steps : list
@@ -329,7 +306,7 @@ class BuildWaveCalib:
     frametype = 'wv_calib'
 
     def __init__(self, msarc, slits, spectrograph, par, lamps, binspectral=None, det=1,
-                 qa_path=None, msbpm=None, master_key=None):
+                 qa_path=None, msbpm=None, master_key=None, nproc=1):
 
         # TODO: This should be a stop-gap to avoid instantiation of this with
         # any Nones.
@@ -355,6 +332,7 @@ class BuildWaveCalib:
         self.qa_path = qa_path
         self.det = det
         self.master_key = master_key
+        self.nproc = nproc
 
         # Attributes
         self.steps = []     # steps executed
@@ -458,7 +436,7 @@ class BuildWaveCalib:
             # Sometimes works, sometimes fails
             arcfitter = autoid.HolyGrail(arccen, self.lamps, par=self.par, ok_mask=ok_mask_idx,
                                          nonlinear_counts=self.nonlinear_counts,
-                                         spectrograph=self.spectrograph.name)
+                                         spectrograph=self.spectrograph.name, nproc=self.nproc)
             patt_dict, final_fit = arcfitter.get_results()
         elif method == 'identify':
             raise NotImplementedError('method = identify not yet implemented')
@@ -478,7 +456,8 @@ class BuildWaveCalib:
             arcfitter = autoid.ArchiveReid(arccen, self.spectrograph, self.lamps, self.par, ok_mask=ok_mask_idx,
                                            #slit_spat_pos=self.spat_coo,
                                            orders=self.orders,
-                                           nonlinear_counts=self.nonlinear_counts)
+                                           nonlinear_counts=self.nonlinear_counts,
+                                           nproc=self.nproc)
             patt_dict, final_fit = arcfitter.get_results()
         elif method == 'full_template':
             # Now preferred
@@ -489,7 +468,7 @@ class BuildWaveCalib:
             final_fit = autoid.full_template(arccen, self.lamps, self.par, ok_mask_idx, self.det,
                                              self.binspectral,
                                              nonlinear_counts=self.nonlinear_counts,
-                                             nsnippet=self.par['nsnippet'])
+                                             nsnippet=self.par['nsnippet'], nproc=self.nproc)
                                              #debug=True, debug_reid=True, debug_xcorr=True)
         else:
             msgs.error('Unrecognized wavelength calibration method: {:}'.format(method))
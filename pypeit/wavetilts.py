@@ -14,7 +14,7 @@ from matplotlib import pyplot as plt
 
 from astropy import stats, visualization
 
-from pypeit import msgs, datamodel
+from pypeit import msgs, datamodel, utils, slitimage
 from pypeit.display import display
 from pypeit.core import arc
 from pypeit.core import tracewave
@@ -89,7 +89,7 @@ class WaveTilts(datamodel.DataContainer):
         if not np.array_equal(self.spat_id, slits.spat_id):
             msgs.error("Your tilt solutions are out of sync with your slits.  Remove Masters and start from scratch")
 
-    def fit2tiltimg(self, slitmask, flexure=None):
+    def fit2tiltimg(self, slitmask, flexure=None, lazy=False, dtype=float, cache_size=None):
         """
         Generate a tilt image from the fit parameters
 
@@ -100,26 +100,24 @@ class WaveTilts(datamodel.DataContainer):
             flexure (float, optional):
                 Spatial shift of the tilt image onto the desired frame
                 (typically a science image)
+            lazy (bool, optional):
+                Return a :class:`~pypeit.slitimage.LazyTiltImage` that
+                evaluates the tilts of each slit on demand instead of
+                the full image.
+            dtype (`numpy.dtype`_, optional):
+                Data type of the tilts.
+            cache_size (int, optional):
+                Maximum number of slits with cached tilts in the lazy
+                image.  If None, all evaluated slits are cached.
 
         Returns:
-            `numpy.ndarray`_:  New tilt image
+            `numpy.ndarray`_, :class:`~pypeit.slitimage.LazyTiltImage`:
+            New tilt image
 
         """
-        _flexure = 0. if flexure is None else flexure
-
-        final_tilts = np.zeros_like(slitmask).astype(float)
-        gdslit_spat = np.unique(slitmask[slitmask >= 0]).astype(int)
-        # Loop
-        for slit_spat in gdslit_spat:
-            slit_idx = self.spatid_to_zero(slit_spat)
-            # Calculate
-            coeff_out = self.coeffs[:self.spec_order[slit_idx]+1,:self.spat_order[slit_idx]+1,slit_idx]
-            _tilts = tracewave.fit2tilts(final_tilts.shape, coeff_out, self.func2d, spat_shift=-1*_flexure)
-            # Fill
-            thismask_science = slitmask == slit_spat
-            final_tilts[thismask_science] = _tilts[thismask_science]
-        # Return
-        return final_tilts
+        tilts = slitimage.LazyTiltImage(self, slitmask, flexure=flexure, dtype=dtype,
+                                        cache_size=cache_size)
+        return tilts if lazy else tilts.to_array()
 
     def spatid_to_zero(self, spat_id):
         """
@@ -158,6 +156,11 @@ class BuildWaveTilts:
         spat_flexure (float, optional):
             If input, the slitmask and slit edges are shifted prior
             to tilt analysis.
+        nproc (:obj:`int`, optional):
+            Number of processes used to trace and fit the tilts of the
+            slits; see :func:`~pypeit.utils.get_nproc`.  The slits are
+            treated independently, so the result does not depend on this
+            number.
 
 
     Attributes:
@@ -183,7 +186,7 @@ class BuildWaveTilts:
 
     # TODO This needs to be modified to take an inmask
     def __init__(self, mstilt, slits, spectrograph, par, wavepar, det=1, qa_path=None,
-                 master_key=None, spat_flexure=None):
+                 master_key=None, spat_flexure=None, nproc=1):
 
         # TODO: Perform type checking
         self.spectrograph = spectrograph
@@ -196,6 +199,7 @@ class BuildWaveTilts:
         self.qa_path = qa_path
         self.master_key = master_key
         self.spat_flexure = spat_flexure
+        self.nproc = nproc
 
         # Get the non-linear count level
         # TODO: This is currently hacked to deal with Mosaics
@@ -239,7 +243,6 @@ class BuildWaveTilts:
         # Key Internals
         self.mask = None
         self.all_trace_dict = [None]*self.slits.nslits
-        self.tilts = None
         # 2D fits are stored as a dictionary rather than list because we will jsonify the dict
         self.all_fit_dict = [None]*self.slits.nslits
         self.steps = []
@@ -592,42 +595,29 @@ class BuildWaveTilts:
         if show:
             viewer,ch = display.show_image(self.mstilt.image*(self.slitmask > -1),chname='tilts')
 
-        # Loop on all slits
-        for slit_idx, slit_spat in enumerate(self.slits.spat_id):
-            if self.tilt_bpm[slit_idx]:
-                msgs.info('Skipping bad slit {0}/{1}'.format(slit_idx, self.slits.nslits))
-                self.slits.mask[slit_idx] = self.slits.bitmask.turn_on(self.slits.mask[slit_idx], 'BADTILTCALIB')
-                continue
-            #msgs.info('Computing tilts for slit {0}/{1}'.format(slit, self.slits.nslits-1))
-            msgs.info('Computing tilts for slit {0}/{1}'.format(slit_idx, self.slits.nslits))
-            # Identify lines for tracing tilts
-            msgs.info('Finding lines for tilt analysis')
-            self.lines_spec, self.lines_spat \
-                    = self.find_lines(self.arccen[:,slit_idx], self.slitcen[:,slit_idx],
-                                      slit_idx,
-                                      bpm=self.arccen_bpm[:,slit_idx], debug=debug)
-
-            if self.lines_spec is None:
-                msgs.warn('Did not recover any lines for slit/order = {:d}'.format(self.slits.slitord_id[slit_idx]) +
-                          '. This slit/order will not reduced!')
-                self.slits.mask[slit_idx] = self.slits.bitmask.turn_on(self.slits.mask[slit_idx], 'BADTILTCALIB')
-                continue
-
-            thismask = self.slitmask == slit_spat
-
-            # Performs the initial tracing of the line centroids as a
-            # function of spatial position resulting in 1D traces for
-            # each line.
-            msgs.info('Trace the tilts')
-            self.trace_dict = self.trace_tilts(_mstilt, self.lines_spec, self.lines_spat,
-                                               thismask, self.slitcen[:, slit_idx])
-            # IF there are < 2 usable arc lines for tilt tracing, PCA fit does not work and the reduction crushes
-            # TODO investigate why some slits have <2 usable arc lines
-            if np.sum(self.trace_dict['use_tilt']) < 2:
-                msgs.warn('Less than 2 usable arc lines for slit/order = {:d}'.format(self.slits.slitord_id[slit_idx]) +
-                          '. This slit/order will not reduced!')
+        # Flag the bad slits
+        for slit_idx in np.where(self.tilt_bpm)[0]:
+            msgs.info('Skipping bad slit {0}/{1}'.format(slit_idx, self.slits.nslits))
+            self.slits.mask[slit_idx] = self.slits.bitmask.turn_on(self.slits.mask[slit_idx], 'BADTILTCALIB')
+
+        # Trace and fit the tilts in each slit
+        good_slits = np.where(np.invert(self.tilt_bpm))[0]
+        arglist = [(slit_idx, self.slits.spat_id[slit_idx], doqa, debug, show)
+                   for slit_idx in good_slits]
+        # NOTE: The debugging plots cannot be shown by the worker processes
+        _nproc = 1 if debug or show else self.nproc
+        if utils.get_nproc(_nproc, ntasks=len(arglist)) > 1:
+            msgs.info(f'Tracing the tilts of {len(arglist)} slits using '
+                      f'{utils.get_nproc(_nproc, ntasks=len(arglist))} processes.')
+        shared = dict(tiltfitter=self, arcimg=_mstilt)
+        for slit_idx, result in zip(good_slits, utils.parallel_map(trace_tilts_slit, arglist,
+                                                                   nproc=_nproc, shared=shared)):
+            trace_dict, fit_dict, all_trace_dict, tilts = result
+            if fit_dict is None:
+                # Tracing failed
                 self.slits.mask[slit_idx] = self.slits.bitmask.turn_on(self.slits.mask[slit_idx], 'BADTILTCALIB')
                 continue
+            self.trace_dict = trace_dict
 
             # TODO: Show the traces before running the 2D fit
 
@@ -636,25 +626,17 @@ class BuildWaveTilts:
 
             self.spat_order[slit_idx] = self._parse_param(self.par, 'spat_order', slit_idx)
             self.spec_order[slit_idx] = self._parse_param(self.par, 'spec_order', slit_idx)
-            # 2D model of the tilts, includes construction of QA
-            # NOTE: This also fills in self.all_fit_dict and self.all_trace_dict
-            coeff_out = self.fit_tilts(self.trace_dict, thismask, self.slitcen[:,slit_idx],
-                                       self.spat_order[slit_idx], self.spec_order[slit_idx],
-                                       slit_idx,
-                                       doqa=doqa, show_QA=show)
+            self.all_fit_dict[slit_idx] = fit_dict
+            self.all_trace_dict[slit_idx] = all_trace_dict
+            coeff_out = fit_dict['coeff2']
             self.coeffs[:self.spec_order[slit_idx]+1,:self.spat_order[slit_idx]+1,slit_idx] = coeff_out
 
             # TODO: Need a way to assess the success of fit_tilts and
             # flag the slit if it fails
 
-            # Tilts are created with the size of the original slitmask,
-            # which corresonds to the same binning as the science
-            # images, trace images, and pixelflats etc.
-            self.tilts = tracewave.fit2tilts(self.slitmask_science.shape, coeff_out,
-                                             self.par['func2d'])
             # Save to final image
-            thismask_science = self.slitmask_science == slit_spat
-            self.final_tilts[thismask_science] = self.tilts[thismask_science]
+            thismask_science = self.slitmask_science == self.slits.spat_id[slit_idx]
+            self.final_tilts[thismask_science] = tilts
 
         if debug:
             # TODO: Add this to the show method?
@@ -728,3 +710,77 @@ class BuildWaveTilts:
         txt += '>'
         return txt
 
+
+def trace_tilts_slit(slit_idx, slit_spat, doqa, debug, show):
+    """
+    Trace and fit the tilts of a single slit; see
+    :func:`BuildWaveTilts.run`.
+
+    This is executed by :func:`~pypeit.utils.parallel_map`; the
+    :class:`BuildWaveTilts` object and the (continuum-subtracted) arc image
+    must be available via :func:`~pypeit.utils.shared_data` using the keys
+    ``tiltfitter`` and ``arcimg``.
+
+    Args:
+        slit_idx (:obj:`int`):
+            Zero-based index of the slit.
+        slit_spat (:obj:`int`):
+            Spatial ID of the slit.
+        doqa (:obj:`bool`):
+            Construct the QA plot.
+        debug (:obj:`bool`):
+            Show the lines found for tracing.
+        show (:obj:`bool`):
+            Show the QA instead of writing it to a file.
+
+    Returns:
+        :obj:`tuple`: The dictionary with the traced tilts, the dictionaries
+        with the tilt fit and the tilt traces used in the fit (see
+        :func:`~pypeit.core.tracewave.fit_tilts`), and the tilts evaluated for
+        the pixels in the slit.  All but the first are None if the tracing
+        failed, and all are None if no lines were found.
+    """
+    tiltfitter = utils.shared_data('tiltfitter')
+    arcimg = utils.shared_data('arcimg')
+    #msgs.info('Computing tilts for slit {0}/{1}'.format(slit, self.slits.nslits-1))
+    msgs.info('Computing tilts for slit {0}/{1}'.format(slit_idx, tiltfitter.slits.nslits))
+    # Identify lines for tracing tilts
+    msgs.info('Finding lines for tilt analysis')
+    lines_spec, lines_spat \
+            = tiltfitter.find_lines(tiltfitter.arccen[:,slit_idx], tiltfitter.slitcen[:,slit_idx],
+                                    slit_idx, bpm=tiltfitter.arccen_bpm[:,slit_idx], debug=debug)
+
+    if lines_spec is None:
+        msgs.warn('Did not recover any lines for slit/order = {:d}'.format(
+                  tiltfitter.slits.slitord_id[slit_idx]) + '. This slit/order will not reduced!')
+        return None, None, None, None
+
+    thismask = tiltfitter.slitmask == slit_spat
+
+    # Performs the initial tracing of the line centroids as a
+    # function of spatial position resulting in 1D traces for
+    # each line.
+    msgs.info('Trace the tilts')
+    trace_dict = tiltfitter.trace_tilts(arcimg, lines_spec, lines_spat, thismask,
+                                        tiltfitter.slitcen[:, slit_idx])
+    # IF there are < 2 usable arc lines for tilt tracing, PCA fit does not work and the reduction crushes
+    # TODO investigate why some slits have <2 usable arc lines
+    if np.sum(trace_dict['use_tilt']) < 2:
+        msgs.warn('Less than 2 usable arc lines for slit/order = {:d}'.format(
+                  tiltfitter.slits.slitord_id[slit_idx]) + '. This slit/order will not reduced!')
+        return trace_dict, None, None, None
+
+    spat_order = tiltfitter._parse_param(tiltfitter.par, 'spat_order', slit_idx)
+    spec_order = tiltfitter._parse_param(tiltfitter.par, 'spec_order', slit_idx)
+    # 2D model of the tilts, includes construction of QA
+    coeff_out = tiltfitter.fit_tilts(trace_dict, thismask, tiltfitter.slitcen[:,slit_idx],
+                                     spat_order, spec_order, slit_idx, doqa=doqa, show_QA=show)
+
+    # Tilts are created with the size of the original slitmask,
+    # which corresonds to the same binning as the science
+    # images, trace images, and pixelflats etc.
+    thismask_science = tiltfitter.slitmask_science == slit_spat
+    tilts = tracewave.fit2tilts(tiltfitter.slitmask_science.shape, coeff_out,
+                                tiltfitter.par['func2d'], gpm=thismask_science)
+    return trace_dict, tiltfitter.all_fit_dict[slit_idx], tiltfitter.all_trace_dict[slit_idx], \
+                tilts[thismask_science]